@@ -9,10 +9,13 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import HTMLResponse
 from pydantic import BaseModel
 from typing import Optional, Dict, Any, List
-import pymysql
+from contextlib import asynccontextmanager
+import aiomysql
 import json
 import os
-from datetime import datetime
+import ssl
+import time
+from datetime import datetime, timedelta
 import openai
 from dotenv import load_dotenv
 import asyncio
@@ -77,9 +80,324 @@ TIDB_CONFIG = {
     'charset': 'utf8mb4'
 }
 
-def get_tidb_connection():
-    """Get TiDB Cloud connection"""
-    return pymysql.connect(**TIDB_CONFIG)
+# Connection pool sizing; TiDB Cloud drops idle connections, so recycle them first
+TIDB_POOL_MIN_SIZE = int(os.getenv("TIDB_POOL_MIN_SIZE", "2"))
+TIDB_POOL_MAX_SIZE = int(os.getenv("TIDB_POOL_MAX_SIZE", "20"))
+TIDB_POOL_RECYCLE_SECONDS = int(os.getenv("TIDB_POOL_RECYCLE_SECONDS", "300"))
+
+_tidb_pool: Optional[aiomysql.Pool] = None
+_tidb_pool_lock = asyncio.Lock()
+
+def _tidb_ssl_context() -> ssl.SSLContext:
+    """TLS context for TiDB Cloud (certificate verification disabled, as before)"""
+    context = ssl.create_default_context()
+    context.check_hostname = False
+    context.verify_mode = ssl.CERT_NONE
+    return context
+
+async def get_tidb_pool() -> aiomysql.Pool:
+    """Get the shared TiDB Cloud connection pool, creating it on first use"""
+    global _tidb_pool
+    if _tidb_pool is None:
+        async with _tidb_pool_lock:
+            if _tidb_pool is None:
+                _tidb_pool = await aiomysql.create_pool(
+                    host=TIDB_CONFIG['host'],
+                    port=TIDB_CONFIG['port'],
+                    user=TIDB_CONFIG['user'],
+                    password=TIDB_CONFIG['password'],
+                    db=TIDB_CONFIG['database'],
+                    charset=TIDB_CONFIG['charset'],
+                    ssl=_tidb_ssl_context(),
+                    minsize=TIDB_POOL_MIN_SIZE,
+                    maxsize=TIDB_POOL_MAX_SIZE,
+                    pool_recycle=TIDB_POOL_RECYCLE_SECONDS,
+                    autocommit=True
+                )
+    return _tidb_pool
+
+@asynccontextmanager
+async def tidb_connection():
+    """Check out a pooled TiDB Cloud connection for the duration of a request"""
+    pool = await get_tidb_pool()
+    async with pool.acquire() as conn:
+        yield conn
+
+@asynccontextmanager
+async def tidb_transaction():
+    """Pooled connection running its statements in a single transaction"""
+    async with tidb_connection() as conn:
+        await conn.begin()
+        try:
+            yield conn
+            await conn.commit()
+        except BaseException:
+            await conn.rollback()
+            raise
+
+@app.on_event("startup")
+async def open_tidb_pool():
+    """Open and warm the TiDB pool so the first requests skip the TLS handshake"""
+    try:
+        pool = await get_tidb_pool()
+        async with pool.acquire() as conn:
+            async with conn.cursor() as cursor:
+                await cursor.execute("SELECT 1")
+        logger.info(f"TiDB connection pool ready ({pool.size} connections)")
+    except Exception as e:
+        # Still serve the demo pages; database endpoints retry on first use
+        logger.error(f"TiDB connection pool warm-up failed: {e}")
+
+@app.on_event("shutdown")
+async def close_tidb_pool():
+    """Close all pooled TiDB connections"""
+    global _tidb_pool
+    if _tidb_pool is not None:
+        _tidb_pool.close()
+        await _tidb_pool.wait_closed()
+        _tidb_pool = None
+
+# Parameterized statements shared by the API handlers
+INSERT_PRODUCT_SQL = """
+    INSERT INTO products 
+    (name, description, price, seller_name, authenticity_score, is_counterfeit, 
+     confidence_score, brand, category, ai_analysis, evidence, created_at)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+"""
+
+INSERT_ANALYSIS_RESULT_SQL = """
+    INSERT INTO analysis_results 
+    (product_id, analysis_type, confidence_score, ai_model, analysis_text, 
+     evidence, processing_time_ms, created_at)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+"""
+
+SELECT_PRODUCTS_SQL = """
+    SELECT id, name, price, authenticity_score, is_counterfeit, 
+           brand, created_at
+    FROM products 
+    ORDER BY created_at DESC LIMIT %s
+"""
+
+SELECT_COUNTERFEIT_PRODUCTS_SQL = """
+    SELECT id, name, price, authenticity_score, is_counterfeit, 
+           brand, created_at
+    FROM products 
+    WHERE is_counterfeit = TRUE
+    ORDER BY created_at DESC LIMIT %s
+"""
+
+# Dashboard rollups: maintained in the same transaction as each product insert,
+# so the dashboard reads a few summary rows instead of aggregating the tables.
+# The 24h activity count is kept in hourly buckets (accurate to the hour).
+DASHBOARD_SNAPSHOT_TTL_SECONDS = float(os.getenv("DASHBOARD_SNAPSHOT_TTL_SECONDS", "5"))
+
+# An UPDATE, not an upsert: until the totals row is built from the base tables,
+# the rebuild (which also covers this insert) is the only writer
+UPDATE_DASHBOARD_STATS_SQL = """
+    UPDATE dashboard_stats
+    SET total_products = total_products + 1,
+        counterfeit_count = counterfeit_count + %s,
+        authenticity_score_sum = authenticity_score_sum + %s,
+        analysis_count = analysis_count + 1,
+        processing_time_sum_ms = processing_time_sum_ms + %s
+    WHERE id = 1
+"""
+
+UPSERT_DASHBOARD_BRAND_STATS_SQL = """
+    INSERT INTO dashboard_brand_stats (brand, products_analyzed, authenticity_score_sum)
+    VALUES (%s, 1, %s)
+    ON DUPLICATE KEY UPDATE
+        products_analyzed = products_analyzed + 1,
+        authenticity_score_sum = authenticity_score_sum + VALUES(authenticity_score_sum)
+"""
+
+UPSERT_DASHBOARD_HOURLY_STATS_SQL = """
+    INSERT INTO dashboard_hourly_stats (bucket_start, products)
+    VALUES (%s, 1)
+    ON DUPLICATE KEY UPDATE products = products + 1
+"""
+
+SELECT_DASHBOARD_ROLLUP_SQL = """
+    SELECT s.total_products, s.counterfeit_count, s.authenticity_score_sum,
+           s.analysis_count, s.processing_time_sum_ms,
+           (SELECT COALESCE(SUM(h.products), 0) FROM dashboard_hourly_stats h
+            WHERE h.bucket_start >= %s) AS recent_analyses
+    FROM dashboard_stats s
+    WHERE s.id = 1
+"""
+
+SELECT_DASHBOARD_TOP_BRANDS_SQL = """
+    SELECT brand, products_analyzed, authenticity_score_sum / products_analyzed
+    FROM dashboard_brand_stats
+    ORDER BY products_analyzed DESC
+    LIMIT 5
+"""
+
+# Cold path: every scalar aggregate in one scan of each base table
+SELECT_DASHBOARD_BASE_SQL = """
+    SELECT p.total_products, p.counterfeit_count, p.authenticity_score_sum,
+           a.analysis_count, a.processing_time_sum_ms, p.recent_analyses
+    FROM (
+        SELECT COUNT(*) AS total_products,
+               COALESCE(SUM(is_counterfeit = TRUE), 0) AS counterfeit_count,
+               COALESCE(SUM(authenticity_score), 0) AS authenticity_score_sum,
+               COALESCE(SUM(created_at >= %s), 0) AS recent_analyses
+        FROM products
+    ) p
+    CROSS JOIN (
+        SELECT COUNT(processing_time_ms) AS analysis_count,
+               COALESCE(SUM(processing_time_ms), 0) AS processing_time_sum_ms
+        FROM analysis_results
+    ) a
+"""
+
+SELECT_BASE_TOP_BRANDS_SQL = """
+    SELECT brand, COUNT(*) as count, 
+           AVG(authenticity_score) as avg_score
+    FROM products 
+    WHERE brand IS NOT NULL
+    GROUP BY brand 
+    ORDER BY count DESC 
+    LIMIT 5
+"""
+
+REBUILD_DASHBOARD_SQL = [
+    "DELETE FROM dashboard_stats",
+    "DELETE FROM dashboard_brand_stats",
+    "DELETE FROM dashboard_hourly_stats",
+    """
+    INSERT INTO dashboard_stats 
+    (id, total_products, counterfeit_count, authenticity_score_sum, analysis_count, processing_time_sum_ms)
+    SELECT 1, p.total_products, p.counterfeit_count, p.authenticity_score_sum,
+           a.analysis_count, a.processing_time_sum_ms
+    FROM (
+        SELECT COUNT(*) AS total_products,
+               COALESCE(SUM(is_counterfeit = TRUE), 0) AS counterfeit_count,
+               COALESCE(SUM(authenticity_score), 0) AS authenticity_score_sum
+        FROM products
+    ) p
+    CROSS JOIN (
+        SELECT COUNT(processing_time_ms) AS analysis_count,
+               COALESCE(SUM(processing_time_ms), 0) AS processing_time_sum_ms
+        FROM analysis_results
+    ) a
+    """,
+    """
+    INSERT INTO dashboard_brand_stats (brand, products_analyzed, authenticity_score_sum)
+    SELECT brand, COUNT(*), COALESCE(SUM(authenticity_score), 0)
+    FROM products
+    WHERE brand IS NOT NULL
+    GROUP BY brand
+    """,
+    """
+    INSERT INTO dashboard_hourly_stats (bucket_start, products)
+    SELECT DATE_FORMAT(created_at, '%Y-%m-%d %H:00:00'), COUNT(*)
+    FROM products
+    WHERE created_at >= DATE_SUB(NOW(), INTERVAL 25 HOUR)
+    GROUP BY DATE_FORMAT(created_at, '%Y-%m-%d %H:00:00')
+    """
+]
+
+SELECT_DASHBOARD_ROLLUPS_INSTALLED_SQL = """
+    SELECT COUNT(*) FROM information_schema.tables
+    WHERE table_schema = DATABASE() AND table_name = 'dashboard_stats'
+"""
+
+_dashboard_rollups_enabled: Optional[bool] = None
+_dashboard_snapshot: Optional[Dict[str, Any]] = None
+_dashboard_snapshot_expires_at = 0.0
+_dashboard_snapshot_lock = asyncio.Lock()
+
+def _hour_bucket(timestamp: datetime) -> datetime:
+    """Start of the hourly rollup bucket containing timestamp"""
+    return timestamp.replace(minute=0, second=0, microsecond=0)
+
+async def dashboard_rollups_enabled() -> bool:
+    """Whether the rollup tables exist (created by setup_tidb_schema.py); checked once"""
+    global _dashboard_rollups_enabled
+    if _dashboard_rollups_enabled is None:
+        async with tidb_connection() as conn:
+            async with conn.cursor() as cursor:
+                await cursor.execute(SELECT_DASHBOARD_ROLLUPS_INSTALLED_SQL)
+                _dashboard_rollups_enabled = bool((await cursor.fetchone())[0])
+        if not _dashboard_rollups_enabled:
+            logger.warning("Dashboard rollup tables missing, aggregating base tables (run setup_tidb_schema.py)")
+    return _dashboard_rollups_enabled
+
+async def rebuild_dashboard_rollups() -> None:
+    """Recompute the dashboard rollup tables from the base tables"""
+    async with tidb_transaction() as conn:
+        async with conn.cursor() as cursor:
+            for statement in REBUILD_DASHBOARD_SQL:
+                await cursor.execute(statement)
+    invalidate_dashboard_snapshot()
+    logger.info("Dashboard rollups rebuilt")
+
+def invalidate_dashboard_snapshot() -> None:
+    """Drop the cached dashboard snapshot so the next request reloads it"""
+    global _dashboard_snapshot, _dashboard_snapshot_expires_at
+    _dashboard_snapshot = None
+    _dashboard_snapshot_expires_at = 0.0
+
+async def _read_dashboard_rollups(recent_cutoff: datetime):
+    """Summary row and top brands from the rollup tables (row is None if never built)"""
+    async with tidb_connection() as conn:
+        async with conn.cursor() as cursor:
+            await cursor.execute(SELECT_DASHBOARD_ROLLUP_SQL, (_hour_bucket(recent_cutoff),))
+            stats = await cursor.fetchone()
+            if stats is None:
+                return None, []
+            await cursor.execute(SELECT_DASHBOARD_TOP_BRANDS_SQL)
+            return stats, await cursor.fetchall()
+
+async def _read_dashboard_base_tables(recent_cutoff: datetime):
+    """Summary row and top brands aggregated directly from the base tables"""
+    async with tidb_connection() as conn:
+        async with conn.cursor() as cursor:
+            await cursor.execute(SELECT_DASHBOARD_BASE_SQL, (recent_cutoff,))
+            stats = await cursor.fetchone()
+            await cursor.execute(SELECT_BASE_TOP_BRANDS_SQL)
+            return stats, await cursor.fetchall()
+
+async def _load_dashboard_aggregates() -> Dict[str, Any]:
+    """Read dashboard aggregates from the rollups, building them on first use"""
+    recent_cutoff = datetime.now() - timedelta(hours=24)
+    
+    if not await dashboard_rollups_enabled():
+        stats, top_brands = await _read_dashboard_base_tables(recent_cutoff)
+    else:
+        stats, top_brands = await _read_dashboard_rollups(recent_cutoff)
+        if stats is None:
+            # Rollup tables are empty (fresh schema or demo data reload)
+            await rebuild_dashboard_rollups()
+            stats, top_brands = await _read_dashboard_rollups(recent_cutoff)
+    
+    total_products, counterfeit_count, score_sum, analysis_count, processing_time_sum, recent_analyses = stats
+    return {
+        "total_products": int(total_products or 0),
+        "counterfeit_count": int(counterfeit_count or 0),
+        "avg_authenticity": float(score_sum or 0) / total_products if total_products else 0.0,
+        "avg_processing_time": float(processing_time_sum or 0) / analysis_count if analysis_count else 0,
+        "recent_analyses": int(recent_analyses or 0),
+        "top_brands": top_brands
+    }
+
+async def get_dashboard_snapshot() -> Dict[str, Any]:
+    """Dashboard aggregates, cached in process for DASHBOARD_SNAPSHOT_TTL_SECONDS"""
+    global _dashboard_snapshot, _dashboard_snapshot_expires_at
+    if _dashboard_snapshot is not None and time.monotonic() < _dashboard_snapshot_expires_at:
+        return _dashboard_snapshot
+    
+    # One reload at a time; concurrent pollers wait for it instead of querying
+    async with _dashboard_snapshot_lock:
+        if _dashboard_snapshot is not None and time.monotonic() < _dashboard_snapshot_expires_at:
+            return _dashboard_snapshot
+        
+        snapshot = await _load_dashboard_aggregates()
+        _dashboard_snapshot = snapshot
+        _dashboard_snapshot_expires_at = time.monotonic() + DASHBOARD_SNAPSHOT_TTL_SECONDS
+        return snapshot
 
 # Hedera AI Studio Integration
 async def integrate_hedera_agents(analysis_result: Dict[str, Any]) -> Dict[str, Any]:
@@ -1055,11 +1373,9 @@ async def health_check():
     # Test TiDB connection
     tidb_status = "connected"
     try:
-        conn = get_tidb_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT 1")
-        cursor.close()
-        conn.close()
+        async with tidb_connection() as conn:
+            async with conn.cursor() as cursor:
+                await cursor.execute("SELECT 1")
     except Exception as e:
         tidb_status = f"error: {str(e)}"
     
@@ -2168,58 +2484,57 @@ async def analyze_product(request: ProductAnalysisRequest, background_tasks: Bac
         logger.info(f"Analyzing product: {request.product_name}")
         ai_result = await analyze_with_openai(request)
         
-        # Step 2: Store in TiDB Cloud
-        conn = get_tidb_connection()
-        cursor = conn.cursor()
-        
+        # Step 2: Store in TiDB Cloud (product and analysis result in one transaction)
         seller_name = request.seller_info.get('name', 'Unknown') if request.seller_info else 'Unknown'
         brand = request.product_name.split()[0]  # Simple brand extraction
-        
-        # Insert product
-        cursor.execute("""
-            INSERT INTO products 
-            (name, description, price, seller_name, authenticity_score, is_counterfeit, 
-             confidence_score, brand, category, ai_analysis, evidence, created_at)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        """, (
-            request.product_name,
-            request.description,
-            request.price,
-            seller_name,
-            ai_result["authenticity_score"],
-            ai_result["is_counterfeit"],
-            ai_result["authenticity_score"],  # Using same as confidence
-            brand,
-            request.category,
-            ai_result["reasoning"],
-            json.dumps(ai_result["evidence"]),
-            datetime.now()
-        ))
-        
-        product_id = cursor.lastrowid
-        
-        # Insert analysis result
-        processing_time = int((datetime.now() - start_time).total_seconds() * 1000)
-        
-        cursor.execute("""
-            INSERT INTO analysis_results 
-            (product_id, analysis_type, confidence_score, ai_model, analysis_text, 
-             evidence, processing_time_ms, created_at)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-        """, (
-            product_id,
-            'ai_detection',
-            ai_result["authenticity_score"],
-            'gpt-4o-mini',
-            ai_result["reasoning"],
-            json.dumps(ai_result["evidence"]),
-            processing_time,
-            datetime.now()
-        ))
-        
-        conn.commit()
-        cursor.close()
-        conn.close()
+        created_at = datetime.now()
+        maintain_rollups = await dashboard_rollups_enabled()
+        
+        async with tidb_transaction() as conn:
+            async with conn.cursor() as cursor:
+                # Insert product
+                await cursor.execute(INSERT_PRODUCT_SQL, (
+                    request.product_name,
+                    request.description,
+                    request.price,
+                    seller_name,
+                    ai_result["authenticity_score"],
+                    ai_result["is_counterfeit"],
+                    ai_result["authenticity_score"],  # Using same as confidence
+                    brand,
+                    request.category,
+                    ai_result["reasoning"],
+                    json.dumps(ai_result["evidence"]),
+                    created_at
+                ))
+                
+                product_id = cursor.lastrowid
+                
+                # Insert analysis result
+                processing_time = int((datetime.now() - start_time).total_seconds() * 1000)
+                
+                await cursor.execute(INSERT_ANALYSIS_RESULT_SQL, (
+                    product_id,
+                    'ai_detection',
+                    ai_result["authenticity_score"],
+                    'gpt-4o-mini',
+                    ai_result["reasoning"],
+                    json.dumps(ai_result["evidence"]),
+                    processing_time,
+                    datetime.now()
+                ))
+                
+                # Keep dashboard rollups in step with the inserts
+                if maintain_rollups:
+                    await cursor.execute(UPDATE_DASHBOARD_STATS_SQL, (
+                        int(bool(ai_result["is_counterfeit"])),
+                        ai_result["authenticity_score"],
+                        processing_time
+                    ))
+                    await cursor.execute(UPSERT_DASHBOARD_BRAND_STATS_SQL, (brand, ai_result["authenticity_score"]))
+                    await cursor.execute(UPSERT_DASHBOARD_HOURLY_STATS_SQL, (_hour_bucket(created_at),))
+        
+        invalidate_dashboard_snapshot()
         
         logger.info(f"Product {product_id} analyzed and stored in TiDB")
         
@@ -2261,25 +2576,12 @@ async def get_products(limit: int = 10, counterfeit_only: bool = False):
     """Get analyzed products from TiDB"""
     
     try:
-        conn = get_tidb_connection()
-        cursor = conn.cursor()
-        
-        query = """
-            SELECT id, name, price, authenticity_score, is_counterfeit, 
-                   brand, created_at
-            FROM products 
-        """
-        
-        if counterfeit_only:
-            query += " WHERE is_counterfeit = TRUE"
-            
-        query += " ORDER BY created_at DESC LIMIT %s"
-        
-        cursor.execute(query, (limit,))
-        products = cursor.fetchall()
+        query = SELECT_COUNTERFEIT_PRODUCTS_SQL if counterfeit_only else SELECT_PRODUCTS_SQL
         
-        cursor.close()
-        conn.close()
+        async with tidb_connection() as conn:
+            async with conn.cursor() as cursor:
+                await cursor.execute(query, (limit,))
+                products = await cursor.fetchall()
         
         return [
             ProductSummary(
@@ -2302,43 +2604,13 @@ async def get_dashboard_analytics():
     """Real-time analytics using TiDB HTAP capabilities"""
     
     try:
-        conn = get_tidb_connection()
-        cursor = conn.cursor()
-        
-        # Basic statistics
-        cursor.execute("SELECT COUNT(*) FROM products")
-        total_products = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM products WHERE is_counterfeit = TRUE")
-        counterfeit_count = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT AVG(authenticity_score) FROM products")
-        avg_authenticity = cursor.fetchone()[0] or 0.0
-        
-        cursor.execute("SELECT AVG(processing_time_ms) FROM analysis_results")
-        avg_processing_time = cursor.fetchone()[0] or 0
-        
-        # Recent activity (last 24 hours)
-        cursor.execute("""
-            SELECT COUNT(*) FROM products 
-            WHERE created_at >= DATE_SUB(NOW(), INTERVAL 24 HOUR)
-        """)
-        recent_analyses = cursor.fetchone()[0]
-        
-        # Top brands analyzed
-        cursor.execute("""
-            SELECT brand, COUNT(*) as count, 
-                   AVG(authenticity_score) as avg_score
-            FROM products 
-            WHERE brand IS NOT NULL
-            GROUP BY brand 
-            ORDER BY count DESC 
-            LIMIT 5
-        """)
-        top_brands = cursor.fetchall()
-        
-        cursor.close()
-        conn.close()
+        snapshot = await get_dashboard_snapshot()
+        total_products = snapshot["total_products"]
+        counterfeit_count = snapshot["counterfeit_count"]
+        avg_authenticity = snapshot["avg_authenticity"]
+        avg_processing_time = snapshot["avg_processing_time"]
+        recent_analyses = snapshot["recent_analyses"]
+        top_brands = snapshot["top_brands"]
         
         return {
             "total_products_analyzed": total_products,
@@ -2367,21 +2639,17 @@ async def get_tidb_stats():
     """TiDB Cloud specific statistics and capabilities"""
     
     try:
-        conn = get_tidb_connection()
-        cursor = conn.cursor()
-        
-        # Database information
-        cursor.execute("SELECT VERSION()")
-        version = cursor.fetchone()[0]
-        
-        cursor.execute("SHOW TABLE STATUS LIKE 'products'")
-        table_info = cursor.fetchone()
-        
-        cursor.execute("SELECT COUNT(*) FROM INFORMATION_SCHEMA.TABLES WHERE TABLE_SCHEMA = 'verichainx'")
-        table_count = cursor.fetchone()[0]
-        
-        cursor.close()
-        conn.close()
+        async with tidb_connection() as conn:
+            async with conn.cursor() as cursor:
+                # Database information
+                await cursor.execute("SELECT VERSION()")
+                version = (await cursor.fetchone())[0]
+                
+                await cursor.execute("SHOW TABLE STATUS LIKE 'products'")
+                table_info = await cursor.fetchone()
+                
+                await cursor.execute("SELECT COUNT(*) FROM INFORMATION_SCHEMA.TABLES WHERE TABLE_SCHEMA = 'verichainx'")
+                table_count = (await cursor.fetchone())[0]
         
         return {
             "tidb_version": version,
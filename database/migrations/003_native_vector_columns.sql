@@ -0,0 +1,64 @@
+-- Migration 003: Native VECTOR columns with HNSW indexes for similarity search
+-- Moves the JSON embedding columns to native TiDB VECTOR columns so that
+-- similarity queries can use VEC_COSINE_DISTANCE over an HNSW index instead
+-- of re-parsing JSON for every row.
+--
+-- The migration is online: the native columns are added alongside the JSON
+-- columns, backfilled in small non-transactional batches and indexed while
+-- the application keeps reading and writing the JSON columns. Once
+-- VECTOR_NATIVE_COLUMNS=true is deployed the application dual-writes both
+-- column sets and queries the native ones; the JSON columns are kept for
+-- rollback and can be dropped in a later migration.
+--
+-- Requires TiDB with vector search support (v8.4+ or TiDB Cloud Serverless).
+
+-- Step 1: add native vector columns (instant DDL, no table rewrite)
+ALTER TABLE products
+    ADD COLUMN IF NOT EXISTS description_embedding_vec VECTOR(1536) NULL COMMENT 'Text embedding (1536-dim), native vector type',
+    ADD COLUMN IF NOT EXISTS image_embedding_vec VECTOR(512) NULL COMMENT 'Image embedding (512-dim), native vector type';
+
+-- Step 2: vector indexes are built on the TiFlash replica
+ALTER TABLE products SET TIFLASH REPLICA 1;
+
+-- Step 3: backfill from the JSON columns in batches of 1000 rows.
+-- BATCH ... splits the statement into independent transactions so the
+-- backfill never holds long locks or a huge transaction. Rows whose JSON does
+-- not have the expected dimension are left NULL and reported in step 5.
+BATCH ON id LIMIT 1000
+UPDATE products
+SET description_embedding_vec = VEC_FROM_TEXT(CAST(description_embedding AS CHAR))
+WHERE description_embedding IS NOT NULL
+  AND description_embedding_vec IS NULL
+  AND JSON_LENGTH(description_embedding) = 1536;
+
+BATCH ON id LIMIT 1000
+UPDATE products
+SET image_embedding_vec = VEC_FROM_TEXT(CAST(image_embedding AS CHAR))
+WHERE image_embedding IS NOT NULL
+  AND image_embedding_vec IS NULL
+  AND JSON_LENGTH(image_embedding) = 512;
+
+-- Step 4: HNSW indexes keyed on the cosine distance expression used by
+-- VectorRepository (ORDER BY VEC_COSINE_DISTANCE(col, :query) LIMIT k)
+CREATE VECTOR INDEX IF NOT EXISTS idx_products_description_vec_hnsw
+    ON products ((VEC_COSINE_DISTANCE(description_embedding_vec))) USING HNSW;
+
+CREATE VECTOR INDEX IF NOT EXISTS idx_products_image_vec_hnsw
+    ON products ((VEC_COSINE_DISTANCE(image_embedding_vec))) USING HNSW;
+
+-- Step 5: verification - both counts should be zero before enabling
+-- VECTOR_NATIVE_COLUMNS. Re-run step 3 to catch rows written during the
+-- backfill; malformed rows need their embeddings regenerated.
+SELECT
+    COUNT(CASE WHEN description_embedding IS NOT NULL AND description_embedding_vec IS NULL THEN 1 END) AS text_rows_missing,
+    COUNT(CASE WHEN image_embedding IS NOT NULL AND image_embedding_vec IS NULL THEN 1 END) AS image_rows_missing
+FROM products;
+
+-- Index build progress (wait for ROWS_STABLE_NOT_INDEXED = 0)
+SELECT INDEX_NAME, ROWS_STABLE_INDEXED, ROWS_STABLE_NOT_INDEXED
+FROM INFORMATION_SCHEMA.TIFLASH_INDEXES
+WHERE TIDB_DATABASE = DATABASE() AND TIDB_TABLE = 'products';
+
+-- Update the JSON column comments now that they are legacy
+ALTER TABLE products MODIFY COLUMN description_embedding JSON COMMENT 'Legacy JSON text embedding, superseded by description_embedding_vec';
+ALTER TABLE products MODIFY COLUMN image_embedding JSON COMMENT 'Legacy JSON image embedding, superseded by image_embedding_vec';
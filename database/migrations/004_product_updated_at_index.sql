@@ -0,0 +1,6 @@
+-- Migration 004: Index products by last update
+-- The in-memory similarity indexes are kept in step with the table by a
+-- periodic delta refresh that reads products changed since the last sync
+-- (WHERE updated_at >= ?). Without this index every refresh is a full scan.
+
+CREATE INDEX IF NOT EXISTS idx_product_updated_at ON products (updated_at);
@@ -75,6 +75,35 @@ def setup_tidb():
         )
     """)
     
+    # Dashboard rollups, maintained by the API on every product insert
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS dashboard_stats (
+            id TINYINT PRIMARY KEY,
+            total_products BIGINT NOT NULL DEFAULT 0,
+            counterfeit_count BIGINT NOT NULL DEFAULT 0,
+            authenticity_score_sum DECIMAL(20,2) NOT NULL DEFAULT 0,
+            analysis_count BIGINT NOT NULL DEFAULT 0,
+            processing_time_sum_ms BIGINT NOT NULL DEFAULT 0
+        ) COMMENT 'Single-row dashboard totals'
+    """)
+    
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS dashboard_brand_stats (
+            brand VARCHAR(100) PRIMARY KEY,
+            products_analyzed BIGINT NOT NULL DEFAULT 0,
+            authenticity_score_sum DECIMAL(20,2) NOT NULL DEFAULT 0,
+            
+            INDEX idx_products_analyzed (products_analyzed)
+        ) COMMENT 'Per-brand dashboard totals'
+    """)
+    
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS dashboard_hourly_stats (
+            bucket_start DATETIME PRIMARY KEY,
+            products BIGINT NOT NULL DEFAULT 0
+        ) COMMENT 'Products analyzed per hour, for the 24h activity count'
+    """)
+    
     # Insert demo data
     cursor.execute("""
         INSERT IGNORE INTO products 
@@ -86,6 +115,9 @@ def setup_tidb():
         (4, 'Rolex Submariner', 'Luxury diving watch - best replica', 500.00, 'WatchDeals99', 0.08, TRUE, 'Rolex', 'Watches', 'Counterfeit: Advertised as replica', '["replica_keyword", "suspicious_price"]')
     """)
     
+    # Demo rows bypass the API, so clear the totals; the API rebuilds them on next load
+    cursor.execute("DELETE FROM dashboard_stats")
+    
     connection.commit()
     
     # Test the setup
@@ -103,6 +135,7 @@ def setup_tidb():
     print("🎉 TiDB setup complete!")
     print("✅ Database 'verichainx' created")
     print("✅ Tables created with demo data")
+    print("✅ Dashboard rollup tables created")
     print("✅ Ready for VeriChainX hackathon demo!")
 
 if __name__ == "__main__":
@@ -0,0 +1,168 @@
+"""
+Tests for load-aware agent dispatch.
+"""
+
+import random
+from collections import Counter
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock
+
+import pytest
+
+from src.counterfeit_detection.agents.base import AgentMetadata, AgentResponse, AgentStatus
+from src.counterfeit_detection.agents.orchestrator import (
+    AgentOrchestrator,
+    WorkflowExecution,
+    WorkflowStep
+)
+from src.counterfeit_detection.agents.utils.dispatch import (
+    HealthWeightedStrategy,
+    LeastOutstandingStrategy,
+    LoadTracker,
+    PowerOfTwoChoicesStrategy,
+    get_dispatch_strategy
+)
+
+
+def make_agents(count, agent_type="analyzer"):
+    """Create running agents of one type."""
+    return [
+        AgentMetadata(agent_id=f"{agent_type}_{i:03d}", agent_type=agent_type, status=AgentStatus.RUNNING)
+        for i in range(count)
+    ]
+
+
+class TestLoadTracker:
+    """Test LoadTracker functionality."""
+
+    def test_in_flight_and_latency(self):
+        """Test in-flight counting and latency averaging."""
+        loads = LoadTracker(latency_alpha=0.5)
+
+        loads.started("a")
+        loads.started("a")
+        assert loads.get("a").in_flight == 2
+
+        loads.finished("a", 100.0, True)
+        loads.finished("a", 200.0, True)
+
+        load = loads.get("a")
+        assert load.in_flight == 0
+        assert load.latency_ms == 150.0
+        assert load.completed == 2
+
+    def test_health_score(self):
+        """Test that failures and slow responses reduce health."""
+        loads = LoadTracker(slow_latency_ms=1000.0)
+        assert loads.health_score("unknown") == 1.0
+
+        loads.finished("failing", 10.0, False)
+        loads.finished("failing", 10.0, False)
+        loads.finished("slow", 4000.0, True)
+
+        assert loads.health_score("failing") == pytest.approx(0.6)
+        assert loads.health_score("slow") == pytest.approx(0.25)
+
+
+class TestDispatchStrategies:
+    """Test dispatch strategy selection."""
+
+    def test_least_outstanding(self):
+        """Test that the least loaded agent is chosen."""
+        agents = make_agents(3)
+        loads = LoadTracker()
+        loads.started(agents[0].agent_id)
+        loads.started(agents[1].agent_id)
+
+        strategy = LeastOutstandingStrategy()
+
+        assert strategy.select(agents, loads) is agents[2]
+
+    def test_least_outstanding_rotates_ties(self):
+        """Test that idle agents share work instead of the first one taking it all."""
+        agents = make_agents(3)
+        strategy = LeastOutstandingStrategy()
+
+        chosen = {strategy.select(agents, LoadTracker()).agent_id for _ in range(3)}
+
+        assert len(chosen) == 3
+
+    def test_power_of_two_prefers_lower_cost(self):
+        """Test that the cheaper of the two sampled agents wins."""
+        agents = make_agents(2)
+        loads = LoadTracker()
+        loads.finished(agents[0].agent_id, 500.0, True)
+        loads.finished(agents[1].agent_id, 50.0, True)
+
+        strategy = PowerOfTwoChoicesStrategy(rng=random.Random(1))
+
+        assert all(strategy.select(agents, loads) is agents[1] for _ in range(10))
+
+    def test_health_weighted_avoids_failing_agents(self):
+        """Test that unhealthy agents receive less traffic."""
+        agents = make_agents(2)
+        loads = LoadTracker()
+        for _ in range(4):
+            loads.finished(agents[0].agent_id, 10.0, False)
+
+        strategy = HealthWeightedStrategy(rng=random.Random(7))
+        counts = Counter(strategy.select(agents, loads).agent_id for _ in range(1000))
+
+        assert counts[agents[1].agent_id] > counts[agents[0].agent_id] * 3
+
+    def test_unknown_strategy(self):
+        """Test that unknown strategy names are rejected."""
+        with pytest.raises(ValueError):
+            get_dispatch_strategy("random")
+
+
+class TestOrchestratorDispatch:
+    """Test load-aware dispatch of workflow steps."""
+
+    @pytest.fixture
+    def orchestrator(self):
+        """Orchestrator with registered analyzer agents."""
+        orchestrator = AgentOrchestrator(dispatch_strategy="least_outstanding")
+        for agent in make_agents(2):
+            orchestrator.registered_agents[agent.agent_id] = agent
+        return orchestrator
+
+    def test_select_skips_expired_heartbeats(self, orchestrator):
+        """Test that agents with stale heartbeats are not selected."""
+        stale = orchestrator.registered_agents["analyzer_000"]
+        stale.last_heartbeat = datetime.utcnow() - timedelta(minutes=5)
+
+        for _ in range(4):
+            assert orchestrator._select_agent("analyzer").agent_id == "analyzer_001"
+
+        orchestrator.registered_agents["analyzer_001"].last_heartbeat = stale.last_heartbeat
+        with pytest.raises(RuntimeError):
+            orchestrator._select_agent("analyzer")
+
+    @pytest.mark.asyncio
+    async def test_step_records_load_and_retries_elsewhere(self, orchestrator, monkeypatch):
+        """Test that a failed attempt moves to another agent and outcomes feed back."""
+        monkeypatch.setattr("asyncio.sleep", AsyncMock())
+        calls = []
+
+        async def send(agent_id, message, timeout):
+            calls.append(agent_id)
+            assert orchestrator.agent_loads.get(agent_id).in_flight == 1
+            if len(calls) == 1:
+                return AgentResponse(success=False, error="overloaded", processing_time_ms=5.0)
+            return AgentResponse(success=True, result={"score": 0.9}, processing_time_ms=5.0)
+
+        orchestrator.send_message_to_agent = send
+        step = WorkflowStep(step_id="analyze", agent_type="analyzer", message_type="analyze", retry_count=1)
+        execution = WorkflowExecution(execution_id="exec_001", workflow_id="workflow_001")
+
+        result = await orchestrator._execute_workflow_step(execution, step, {})
+
+        assert result == {"score": 0.9}
+        assert len(set(calls)) == 2
+
+        stats = orchestrator.get_dispatch_stats()
+        assert stats["strategy"] == "least_outstanding"
+        assert stats["agents"][calls[0]]["failures"] == 1
+        assert stats["agents"][calls[1]]["completed"] == 1
+        assert all(agent["in_flight"] == 0 for agent in stats["agents"].values())
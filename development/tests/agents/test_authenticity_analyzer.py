@@ -153,8 +153,11 @@ class TestAuthenticityAnalyzer:
     async def test_process_message_batch_analysis(self, authenticity_analyzer):
         """Test processing batch analysis message."""
         product_ids = [str(uuid4()), str(uuid4())]
+        mock_product_repo = AsyncMock()
         
-        with patch.object(authenticity_analyzer, 'analyze_product_authenticity') as mock_analyze:
+        with patch.object(authenticity_analyzer, 'analyze_product_authenticity') as mock_analyze, \
+             patch('src.counterfeit_detection.agents.authenticity_analyzer.get_db_session'), \
+             patch('src.counterfeit_detection.agents.authenticity_analyzer.ProductRepository', return_value=mock_product_repo):
             mock_results = [
                 ProductAnalysisResult(
                     product_id=pid,
@@ -183,6 +186,49 @@ class TestAuthenticityAnalyzer:
             assert response.result["successful_count"] == 2
             assert response.result["error_count"] == 0
             assert len(response.result["successful_analyses"]) == 2
+            
+            # Products are loaded once for the batch and shared with each analysis
+            mock_product_repo.get_products_by_ids.assert_awaited_once_with(product_ids)
+            identity_maps = [call.args[1] for call in mock_analyze.call_args_list]
+            assert identity_maps[0] is identity_maps[1]
+    
+    @pytest.mark.asyncio
+    async def test_batch_analysis_invalid_id_fails_alone(self, authenticity_analyzer):
+        """Test that a malformed product ID is kept out of the prefetch and fails on its own."""
+        valid_id = str(uuid4())
+        mock_product_repo = AsyncMock()
+        
+        async def analyze(product_id, identity_map):
+            if product_id == "not-a-uuid":
+                raise ValueError(f"Product {product_id} not found")
+            return ProductAnalysisResult(
+                product_id=product_id,
+                agent_id=authenticity_analyzer.agent_id,
+                authenticity_score=80.0,
+                confidence_score=0.9,
+                reasoning="Test analysis",
+                analysis_duration_ms=1500.0,
+                llm_model="gpt-4",
+                comparison_products=[]
+            )
+        
+        with patch.object(authenticity_analyzer, 'analyze_product_authenticity', side_effect=analyze), \
+             patch('src.counterfeit_detection.agents.authenticity_analyzer.get_db_session'), \
+             patch('src.counterfeit_detection.agents.authenticity_analyzer.ProductRepository', return_value=mock_product_repo):
+            message = AgentMessage(
+                sender_id="test-sender",
+                message_type="batch_analysis_request",
+                payload={"product_ids": [valid_id, "not-a-uuid"]}
+            )
+            
+            response = await authenticity_analyzer.process_message(message)
+            
+            assert response.success is True
+            assert response.result["successful_count"] == 1
+            assert response.result["errors"] == [
+                {"product_id": "not-a-uuid", "error": "Product not-a-uuid not found"}
+            ]
+            mock_product_repo.get_products_by_ids.assert_awaited_once_with([valid_id])
     
     @pytest.mark.asyncio
     async def test_analyze_product_authenticity_success(
@@ -224,6 +270,9 @@ class TestAuthenticityAnalyzer:
             
             result = await authenticity_analyzer.analyze_product_authenticity(str(mock_product.id))
             
+            # Result and audit writes run in the background
+            await asyncio.gather(*authenticity_analyzer._pending_writes)
+            
             assert result.product_id == str(mock_product.id)
             assert result.agent_id == authenticity_analyzer.agent_id
             assert result.authenticity_score == 75.5
@@ -236,6 +285,118 @@ class TestAuthenticityAnalyzer:
             mock_vector_repo.find_similar_products_by_text.assert_called_once()
             mock_analysis_repo.create_analysis_result.assert_called_once()
     
+    @pytest.fixture
+    def pipeline_analyzer(self, authenticity_analyzer, mock_product, mock_similar_products):
+        """Analyzer with a mocked product lookup and slow context stages."""
+        mock_product_repo = AsyncMock()
+        mock_product_repo.get_product_by_id.return_value = mock_product
+        
+        async def slow(result, delay=0.2):
+            await asyncio.sleep(delay)
+            return result
+        
+        session_context = AsyncMock()
+        session_context.__aenter__ = AsyncMock(return_value=session_context)
+        session_context.__aexit__ = AsyncMock(return_value=None)
+        
+        module = 'src.counterfeit_detection.agents.authenticity_analyzer'
+        with patch(f'{module}.get_db_session', return_value=session_context), \
+             patch(f'{module}.ProductRepository', return_value=mock_product_repo), \
+             patch(f'{module}.VectorRepository'), \
+             patch(f'{module}.AnalysisRepository'), \
+             patch.object(authenticity_analyzer, '_get_similar_products', side_effect=lambda p: slow(mock_similar_products)), \
+             patch.object(authenticity_analyzer, '_verify_zksnark_proofs', side_effect=lambda p: slow({"has_valid_proof": True, "proof_verification_score": 95.0, "proof_types_verified": ["product_authenticity"]})), \
+             patch.object(authenticity_analyzer, '_analyze_brand_protection', side_effect=lambda p: slow({"protection_score": 50.0})), \
+             patch.object(authenticity_analyzer, '_create_analysis_audit_entry', new_callable=AsyncMock), \
+             patch.object(authenticity_analyzer, '_perform_llm_analysis', new_callable=AsyncMock) as mock_llm:
+            mock_llm.return_value = AuthenticityScore(
+                authenticity_score=75.0,
+                confidence=0.9,
+                reasoning="Consistent listing"
+            )
+            yield authenticity_analyzer
+    
+    @pytest.mark.asyncio
+    async def test_analysis_context_stages_run_concurrently(self, pipeline_analyzer, mock_product):
+        """Test that independent stages overlap instead of running back to back."""
+        start = asyncio.get_event_loop().time()
+        
+        result = await pipeline_analyzer.analyze_product_authenticity(str(mock_product.id))
+        
+        elapsed = asyncio.get_event_loop().time() - start
+        assert elapsed < 0.5  # Three 0.2s stages
+        assert result.component_scores["zkproof_verification"] == 95.0
+        
+        await asyncio.gather(*pipeline_analyzer._pending_writes)
+        pipeline_analyzer._create_analysis_audit_entry.assert_called_once()
+    
+    @pytest.mark.asyncio
+    async def test_analysis_stage_timeout_degrades(self, pipeline_analyzer, mock_product):
+        """Test that a stage exceeding its timeout falls back to a neutral result."""
+        pipeline_analyzer.STAGE_TIMEOUTS = {**pipeline_analyzer.STAGE_TIMEOUTS, "zkproof_verification": 0.05}
+        
+        result = await pipeline_analyzer.analyze_product_authenticity(str(mock_product.id))
+        
+        assert result.component_scores["zkproof_verification"] == 50.0
+        assert pipeline_analyzer.stage_timeouts == 1
+        
+        await asyncio.gather(*pipeline_analyzer._pending_writes)
+    
+    @pytest.mark.asyncio
+    async def test_llm_failure_reason_in_fallback(self, pipeline_analyzer, mock_product):
+        """Test that the fallback reasoning reports the actual LLM failure."""
+        pipeline_analyzer._perform_llm_analysis.side_effect = RuntimeError("rate limited")
+        
+        result = await pipeline_analyzer.analyze_product_authenticity(str(mock_product.id))
+        
+        assert result.reasoning == "Analysis failed: llm_analysis failed: rate limited"
+        assert pipeline_analyzer.stage_failures == 1
+        assert pipeline_analyzer.stage_timeouts == 0
+        
+        await asyncio.gather(*pipeline_analyzer._pending_writes)
+    
+    @pytest.mark.asyncio
+    async def test_stage_metrics_sent_to_injected_collector(self, mock_openai_client):
+        """Test that per-stage latencies are recorded through the injected collector."""
+        collector = AsyncMock()
+        analyzer = AuthenticityAnalyzer("test-analyzer", metrics_collector=collector)
+        
+        await analyzer._record_stage_metrics("product_001", {"similar_products": 12.5}, 40.0)
+        
+        events = [call.args[0] for call in collector.record_metric.await_args_list]
+        assert [event.component for event in events] == [
+            "authenticity_analyzer.similar_products",
+            "authenticity_analyzer.total"
+        ]
+        assert [event.value for event in events] == [12.5, 40.0]
+    
+    @pytest.mark.asyncio
+    async def test_persist_analysis_commits(self, authenticity_analyzer, mock_product):
+        """Test that the stored analysis result is committed."""
+        session_context = AsyncMock()
+        session_context.__aenter__ = AsyncMock(return_value=session_context)
+        session_context.__aexit__ = AsyncMock(return_value=None)
+        mock_analysis_repo = AsyncMock()
+        result = ProductAnalysisResult(
+            product_id=str(mock_product.id),
+            agent_id=authenticity_analyzer.agent_id,
+            authenticity_score=75.0,
+            confidence_score=0.9,
+            reasoning="Consistent listing",
+            analysis_duration_ms=100.0,
+            llm_model="gpt-4",
+            comparison_products=[]
+        )
+        
+        module = 'src.counterfeit_detection.agents.authenticity_analyzer'
+        with patch(f'{module}.get_db_session', return_value=session_context), \
+             patch(f'{module}.AnalysisRepository', return_value=mock_analysis_repo), \
+             patch.object(authenticity_analyzer, '_create_analysis_audit_entry', new_callable=AsyncMock):
+            await authenticity_analyzer._persist_analysis(mock_product, result, {})
+        
+        mock_analysis_repo.create_analysis_result.assert_awaited_once()
+        session_context.commit.assert_awaited_once()
+    
     @pytest.mark.asyncio
     async def test_analyze_product_not_found(self, authenticity_analyzer, mock_db_session):
         """Test analysis of non-existent product."""
@@ -13,8 +13,10 @@ from src.counterfeit_detection.agents.base import (
     AgentResponse,
     AgentMetadata,
     AgentCapability,
-    AgentStatus
+    AgentStatus,
+    ResponseDispatcher
 )
+from src.counterfeit_detection.agents.utils.streams import StreamTransport
 
 
 class MockAgent(BaseAgent):
@@ -247,6 +249,41 @@ class TestBaseAgent:
         assert response.result["message_type"] == "test_message"
         assert response.processing_time_ms == 10.0
     
+    @pytest.mark.asyncio
+    async def test_stream_entry_received_while_paused_is_redelivered(self, mock_agent):
+        """Test that a stream entry stays pending while paused and is handled once reclaimed."""
+        redis_client = AsyncMock()
+        transport = StreamTransport(redis_client, claim_idle_ms=0)
+        stream = "stream:agent.test_agent_001:normal"
+        fields = {
+            "message": AgentMessage(
+                sender_id="sender_001",
+                message_type="test_message",
+                payload={"data": "test"}
+            ).json()
+        }
+        mock_agent.status = AgentStatus.PAUSED
+        
+        handled = await transport._handle(
+            stream, "test_agent_001", "consumer", "1-0", fields, mock_agent._handle_incoming_message
+        )
+        
+        assert handled is False
+        redis_client.xack.assert_not_called()
+        assert mock_agent.processed_messages == 0
+        
+        # Resumed: the pending entry is reclaimed and processed
+        await mock_agent.resume()
+        redis_client.xautoclaim.return_value = ["0-0", [("1-0", fields)], []]
+        redis_client.xpending_range.return_value = [{"times_delivered": 2}]
+        
+        await transport._reclaim(
+            [stream], "test_agent_001", "test_agent_001", mock_agent._handle_incoming_message
+        )
+        
+        redis_client.xack.assert_called_once_with(stream, "test_agent_001", "1-0")
+        assert mock_agent.processed_messages == 1
+    
     @pytest.mark.asyncio
     async def test_agent_error_handling(self, mock_redis):
         """Test agent error handling."""
@@ -369,4 +406,142 @@ class TestAgentIntegration:
             call for call in mock_redis.publish.call_args_list
             if call[0][0] == "orchestrator.deregister"
         ]
-        assert len(deregistration_calls) > 0
\ No newline at end of file
+        assert len(deregistration_calls) > 0
+
+
+class FakePubSub:
+    """In-memory stand-in for a Redis pubsub subscription."""
+    
+    def __init__(self):
+        self.queue = asyncio.Queue()
+        self.subscribed = []
+    
+    async def subscribe(self, *channels):
+        self.subscribed.extend(channels)
+    
+    async def unsubscribe(self):
+        self.subscribed = []
+    
+    async def close(self):
+        pass
+    
+    async def listen(self):
+        while True:
+            yield await self.queue.get()
+    
+    def deliver(self, response: AgentResponse):
+        self.queue.put_nowait({"type": "message", "data": response.json()})
+
+
+class TestResponseDispatcher:
+    """Test ResponseDispatcher request/response routing."""
+    
+    @pytest.fixture
+    async def dispatcher(self):
+        """Create a started dispatcher on an in-memory subscription."""
+        pubsub = FakePubSub()
+        redis_client = MagicMock()
+        redis_client.pubsub.return_value = pubsub
+        
+        dispatcher = ResponseDispatcher(redis_client, "response.test_agent")
+        await dispatcher.start()
+        dispatcher.fake_pubsub = pubsub
+        yield dispatcher
+        await dispatcher.stop()
+    
+    @staticmethod
+    def _response(correlation_id: str) -> AgentResponse:
+        return AgentResponse(
+            success=True,
+            result={"correlation": correlation_id},
+            processing_time_ms=1.0,
+            correlation_id=correlation_id
+        )
+    
+    @pytest.mark.asyncio
+    async def test_single_subscription(self, dispatcher):
+        """Test that the channel is subscribed once, not per request."""
+        for correlation_id in ["a", "b", "c"]:
+            dispatcher.register(correlation_id, "test_message")
+            dispatcher.fake_pubsub.deliver(self._response(correlation_id))
+            await dispatcher.wait(correlation_id, timeout=1.0)
+        
+        assert dispatcher.fake_pubsub.subscribed == ["response.test_agent"]
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_routed_by_correlation_id(self, dispatcher):
+        """Test that out-of-order responses reach the right waiters."""
+        ids = [f"request-{i}" for i in range(10)]
+        for correlation_id in ids:
+            dispatcher.register(correlation_id, "test_message")
+        
+        waiters = [asyncio.create_task(dispatcher.wait(cid, timeout=1.0)) for cid in ids]
+        for correlation_id in reversed(ids):
+            dispatcher.fake_pubsub.deliver(self._response(correlation_id))
+        
+        responses = await asyncio.gather(*waiters)
+        
+        assert [r.result["correlation"] for r in responses] == ids
+        assert dispatcher.pending == {}
+        assert dispatcher.get_latency_stats()["test_message"]["count"] == 10
+    
+    @pytest.mark.asyncio
+    async def test_response_before_wait_is_not_lost(self, dispatcher):
+        """Test that a response arriving before wait() is still delivered."""
+        dispatcher.register("fast", "test_message")
+        dispatcher.fake_pubsub.deliver(self._response("fast"))
+        await asyncio.sleep(0.01)
+        
+        response = await dispatcher.wait("fast", timeout=1.0)
+        
+        assert response.correlation_id == "fast"
+    
+    @pytest.mark.asyncio
+    async def test_timeout_and_cancellation_cleanup(self, dispatcher):
+        """Test that timed out and cancelled requests are removed."""
+        dispatcher.register("slow", "slow_message")
+        assert await dispatcher.wait("slow", timeout=0.01) is None
+        
+        dispatcher.register("cancelled", "slow_message")
+        waiter = asyncio.create_task(dispatcher.wait("cancelled", timeout=5.0))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        
+        # A late response is ignored
+        dispatcher.fake_pubsub.deliver(self._response("slow"))
+        await asyncio.sleep(0.01)
+        
+        assert dispatcher.pending == {}
+        assert dispatcher.unmatched_responses == 1
+        assert dispatcher.get_latency_stats()["slow_message"]["timeouts"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_send_cancelled_while_publishing_is_discarded(self, dispatcher):
+        """Test that a request cancelled before it was published leaves nothing pending."""
+        agent = MockAgent("test_agent_001")
+        publishing = asyncio.Event()
+        
+        async def publish_forever(*args):
+            publishing.set()
+            await asyncio.Event().wait()
+        
+        agent.redis_client = dispatcher.redis_client
+        agent.redis_client.publish = publish_forever
+        agent.response_dispatcher = dispatcher
+        message = AgentMessage(
+            sender_id="test_agent_001",
+            recipient_id="other_agent",
+            message_type="test_message",
+            payload={},
+            correlation_id="request-1"
+        )
+        
+        sender = asyncio.create_task(agent.send_message(message, timeout=5.0))
+        await publishing.wait()
+        assert "request-1" in dispatcher.pending
+        
+        sender.cancel()
+        await asyncio.gather(sender, return_exceptions=True)
+        
+        assert dispatcher.pending == {}
@@ -0,0 +1,198 @@
+"""
+Tests for the Redis Streams agent message transport.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+from redis.exceptions import ResponseError
+
+from src.counterfeit_detection.agents.utils.streams import (
+    StreamTransport,
+    priority_lane,
+    type_stream
+)
+
+
+@pytest.fixture
+def redis_client():
+    """Mock Redis client."""
+    return AsyncMock()
+
+
+@pytest.fixture
+def transport(redis_client):
+    """Stream transport on the mock client."""
+    return StreamTransport(redis_client, maxlen=500, block_ms=10, claim_idle_ms=1000, max_deliveries=3)
+
+
+class TestStreamTransport:
+    """Test StreamTransport functionality."""
+
+    def test_priority_lanes(self):
+        """Test mapping of message priorities to lanes."""
+        assert priority_lane(10) == "high"
+        assert priority_lane(0) == "normal"
+        assert priority_lane(-1) == "low"
+
+    @pytest.mark.asyncio
+    async def test_publish_bounded_stream(self, transport, redis_client):
+        """Test that messages are appended to the lane's capped stream."""
+        await transport.publish(type_stream("authenticity_analyzer"), '{"x": 1}', priority=10)
+
+        redis_client.xadd.assert_called_once_with(
+            "stream:type.authenticity_analyzer:high",
+            {"message": '{"x": 1}'},
+            maxlen=500,
+            approximate=True
+        )
+        assert transport.stats["published"] == 1
+
+    @pytest.mark.asyncio
+    async def test_ensure_group_is_idempotent(self, transport, redis_client):
+        """Test that existing consumer groups are tolerated."""
+        redis_client.xgroup_create.side_effect = ResponseError("BUSYGROUP Consumer Group name already exists")
+
+        await transport.ensure_group("type.analyzer", "analyzer")
+
+        assert redis_client.xgroup_create.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_read_drains_high_priority_first(self, transport, redis_client):
+        """Test that a non-empty higher lane is read without touching lower ones."""
+        redis_client.xreadgroup.return_value = [
+            ["stream:t:high", [("1-0", {"message": "{}"})]]
+        ]
+        keys = [transport.stream_key("t", lane) for lane in ("high", "normal", "low")]
+
+        entries = await transport._read(keys, "group", "consumer")
+
+        assert entries == [("stream:t:high", "1-0", {"message": "{}"})]
+        redis_client.xreadgroup.assert_called_once_with(
+            "group", "consumer", {"stream:t:high": ">"}, count=transport.batch_size
+        )
+
+    @pytest.mark.asyncio
+    async def test_handler_error_still_acknowledged(self, transport, redis_client):
+        """Test that failing messages are acknowledged rather than redelivered forever."""
+        handler = AsyncMock(side_effect=ValueError("bad message"))
+
+        await transport._handle("stream:t:normal", "group", "consumer", "1-0", {"message": "{}"}, handler)
+
+        redis_client.xack.assert_called_once_with("stream:t:normal", "group", "1-0")
+        assert transport.stats["handler_errors"] == 1
+
+    @pytest.mark.asyncio
+    async def test_deferred_entry_left_pending(self, transport, redis_client):
+        """Test that entries the handler declines are not acknowledged."""
+        handler = AsyncMock(return_value=False)
+
+        handled = await transport._handle("stream:t:normal", "group", "consumer", "1-0", {"message": "{}"}, handler)
+
+        assert handled is False
+        redis_client.xack.assert_not_called()
+        assert transport.stats["deferred"] == 1
+        assert transport.stats["processed"] == 0
+
+    @pytest.mark.asyncio
+    async def test_long_handler_keeps_entry_claimed(self, redis_client):
+        """Test that entries are re-claimed while their handler runs, without a new delivery."""
+        transport = StreamTransport(redis_client, claim_idle_ms=1000, heartbeat_ms=10)
+
+        async def slow_handler(message_json):
+            await asyncio.sleep(0.05)
+
+        await transport._handle("stream:t:normal", "group", "consumer", "1-0", {"message": "{}"}, slow_handler)
+        claims = redis_client.xclaim.await_count
+        await asyncio.sleep(0.03)
+
+        assert claims >= 2
+        assert redis_client.xclaim.await_count == claims
+        redis_client.xclaim.assert_awaited_with("stream:t:normal", "group", "consumer", 0, ["1-0"], justid=True)
+        redis_client.xack.assert_called_once_with("stream:t:normal", "group", "1-0")
+
+    @pytest.mark.asyncio
+    async def test_deferred_reclaim_does_not_count_towards_dead_letter(self, transport, redis_client):
+        """Test that deferred entries get their delivery back and are left reclaimable."""
+        redis_client.xautoclaim.return_value = ["0-0", [("1-0", {"message": "{}"}), ("2-0", {"message": "{}"})], []]
+        redis_client.xpending_range.return_value = [{"times_delivered": 3}]
+        handler = AsyncMock(return_value=False)
+
+        await transport._reclaim(["stream:t:normal"], "group", "consumer", handler)
+
+        # The rest of the claimed batch is handed back without being offered
+        handler.assert_awaited_once()
+        assert [call.args[4] for call in redis_client.xclaim.await_args_list] == [["1-0"], ["2-0"]]
+        redis_client.xclaim.assert_awaited_with(
+            "stream:t:normal", "group", "consumer", 0, ["2-0"],
+            idle=transport.claim_idle_ms, retrycount=2, justid=True
+        )
+        redis_client.xack.assert_not_called()
+        redis_client.xadd.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_consume_idles_while_not_accepting(self, transport, redis_client):
+        """Test that nothing is read or reclaimed while the owner is not taking messages."""
+        shutdown_event = asyncio.Event()
+        checks = []
+
+        def is_accepting():
+            checks.append(True)
+            if len(checks) == 3:
+                shutdown_event.set()
+            return False
+
+        await asyncio.wait_for(
+            transport.consume(
+                "agent.analyzer-1", "analyzer-1", "analyzer-1",
+                AsyncMock(), shutdown_event, is_accepting=is_accepting
+            ),
+            timeout=1.0
+        )
+
+        assert len(checks) == 3
+        redis_client.xreadgroup.assert_not_called()
+        redis_client.xautoclaim.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_reclaim_and_dead_letter(self, transport, redis_client):
+        """Test that idle pending entries are reclaimed or dead-lettered."""
+        redis_client.xautoclaim.return_value = [
+            "0-0",
+            [("1-0", {"message": "retry"}), ("2-0", {"message": "poison"})],
+            []
+        ]
+        redis_client.xpending_range.side_effect = [
+            [{"times_delivered": 2}],
+            [{"times_delivered": 4}]
+        ]
+        handler = AsyncMock()
+
+        await transport._reclaim(["stream:t:normal"], "group", "consumer", handler)
+
+        handler.assert_awaited_once_with("retry")
+        dead_letter_call = redis_client.xadd.call_args
+        assert dead_letter_call[0][0] == "stream:t:normal:dead"
+        assert dead_letter_call[0][1]["message"] == "poison"
+        assert transport.stats["dead_lettered"] == 1
+        assert redis_client.xack.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_consume_stops_on_shutdown(self, transport, redis_client):
+        """Test that consumption ends when the shutdown event is set."""
+        shutdown_event = asyncio.Event()
+        redis_client.xautoclaim.return_value = ["0-0", [], []]
+
+        async def read_then_stop(*args, **kwargs):
+            shutdown_event.set()
+            return []
+
+        redis_client.xreadgroup.side_effect = read_then_stop
+
+        await asyncio.wait_for(
+            transport.consume("type.analyzer", "analyzer", "analyzer-1", AsyncMock(), shutdown_event),
+            timeout=1.0
+        )
+
+        assert redis_client.xgroup_create.call_count == 3
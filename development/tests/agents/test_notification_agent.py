@@ -18,7 +18,8 @@ from src.counterfeit_detection.agents.notification_agent import (
     AlertPayload,
     NotificationRequest,
     NotificationResult,
-    BatchNotificationResult
+    BatchNotificationResult,
+    PreferenceSnapshot
 )
 from src.counterfeit_detection.agents.base import AgentMessage, AgentResponse
 from src.counterfeit_detection.models.enums import NotificationChannel, NotificationStatus, AlertSeverity
@@ -314,12 +315,19 @@ class TestNotificationAgent:
         mock_preferences.severity_levels = ["high", "critical"]
         mock_preferences.rate_limit_per_hour = 10
         
-        notification_agent.notification_repository.get_all_notification_users.return_value = ["user1", "user2"]
-        notification_agent.notification_repository.get_user_preferences.return_value = mock_preferences
-        notification_agent.notification_repository.get_user_channels.return_value = [NotificationChannel.SLACK]
+        snapshot = PreferenceSnapshot(
+            preferences={"user1": mock_preferences, "user2": mock_preferences},
+            endpoints={
+                "user1": {NotificationChannel.SLACK: MagicMock()},
+                "user2": {NotificationChannel.SLACK: MagicMock()}
+            },
+            generation=0,
+            loaded_at=0.0
+        )
         
         # Mock quiet hours and rate limiting checks
-        with patch.object(notification_agent, '_is_quiet_hours', return_value=False), \
+        with patch.object(notification_agent, '_get_preference_snapshot', return_value=snapshot), \
+             patch.object(notification_agent, '_is_quiet_hours', return_value=False), \
              patch.object(notification_agent, '_is_rate_limited', return_value=False):
             
             request = NotificationRequest(
@@ -345,8 +353,12 @@ class TestNotificationAgent:
         mock_preferences.alert_threshold_score = 10  # Very low threshold
         mock_preferences.severity_levels = ["high", "critical"]
         
-        notification_agent.notification_repository.get_all_notification_users.return_value = ["user1"]
-        notification_agent.notification_repository.get_user_preferences.return_value = mock_preferences
+        snapshot = PreferenceSnapshot(
+            preferences={"user1": mock_preferences},
+            endpoints={"user1": {NotificationChannel.SLACK: MagicMock()}},
+            generation=0,
+            loaded_at=0.0
+        )
         
         request = NotificationRequest(
             alert_payload=AlertPayload(
@@ -357,10 +369,62 @@ class TestNotificationAgent:
             )
         )
         
-        eligible_users = await notification_agent._get_eligible_users(request)
+        with patch.object(notification_agent, '_get_preference_snapshot', return_value=snapshot):
+            eligible_users = await notification_agent._get_eligible_users(request)
         
         assert len(eligible_users) == 0  # Should be filtered out
     
+    @pytest.mark.asyncio
+    async def test_preference_snapshot_reused_until_invalidated(self, notification_agent):
+        """Test that preferences are loaded in bulk once and reloaded after changes."""
+        from src.counterfeit_detection.db.repositories.notification_repository import (
+            invalidate_notification_preferences
+        )
+        
+        mock_repo = AsyncMock()
+        mock_repo.get_all_user_preferences.return_value = {}
+        mock_repo.get_active_endpoints_by_user.return_value = {
+            "user1": {NotificationChannel.EMAIL: MagicMock()}
+        }
+        
+        with patch('src.counterfeit_detection.agents.notification_agent.get_db_session'), \
+             patch('src.counterfeit_detection.agents.notification_agent.NotificationRepository', return_value=mock_repo):
+            first = await notification_agent._get_preference_snapshot()
+            assert await notification_agent._get_preference_snapshot() is first
+            
+            invalidate_notification_preferences()
+            second = await notification_agent._get_preference_snapshot()
+        
+        assert second is not first
+        assert second.user_ids == ["user1"]
+        assert mock_repo.get_all_user_preferences.await_count == 2
+        mock_repo.get_user_preferences.assert_not_called()
+        mock_repo.get_user_channels.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_fan_out_uses_snapshot_endpoints(self, notification_agent, sample_alert_payload):
+        """Test that fan-out to many users makes no per-user lookups."""
+        endpoint = MagicMock()
+        endpoint.endpoint_config = {"email": "admin@example.com"}
+        snapshot = PreferenceSnapshot(
+            preferences={},
+            endpoints={f"user{i}": {NotificationChannel.EMAIL: endpoint} for i in range(1000)},
+            generation=0,
+            loaded_at=0.0
+        )
+        
+        with patch.object(notification_agent, '_get_preference_snapshot', return_value=snapshot), \
+             patch.object(notification_agent, '_log_notification_batch'), \
+             patch('src.counterfeit_detection.agents.notification_agent.get_db_session') as mock_session:
+            notification_agent._preference_snapshot = snapshot
+            
+            result = await notification_agent.send_alert_notification(
+                NotificationRequest(alert_payload=sample_alert_payload)
+            )
+        
+        assert result.successful_deliveries == 1000
+        mock_session.assert_not_called()
+    
     @pytest.mark.asyncio
     async def test_is_quiet_hours(self, notification_agent):
         """Test quiet hours checking."""
@@ -6,6 +6,7 @@ import asyncio
 import pytest
 from datetime import datetime
 from unittest.mock import AsyncMock, MagicMock, patch
+from pydantic import ValidationError
 
 from src.counterfeit_detection.agents.orchestrator import (
     AgentOrchestrator,
@@ -78,6 +79,12 @@ class TestWorkflow:
         assert workflow.description == "A test workflow"
         assert len(workflow.steps) == 2
         assert isinstance(workflow.created_at, datetime)
+    
+    @pytest.mark.parametrize("max_concurrency", [0, -1])
+    def test_max_concurrency_must_be_positive(self, max_concurrency):
+        """Test that a workflow cannot be limited to no running steps."""
+        with pytest.raises(ValidationError):
+            Workflow(workflow_id="workflow_001", name="Test Workflow", steps=[], max_concurrency=max_concurrency)
 
 
 class TestAgentOrchestrator:
@@ -470,4 +477,108 @@ class TestWorkflowExecution:
         execution.completed_at = datetime.utcnow()
         
         assert execution.status == "completed"
-        assert execution.completed_at is not None
\ No newline at end of file
+        assert execution.completed_at is not None
+
+
+class TestWorkflowScheduling:
+    """Test DAG scheduling of workflow steps."""
+    
+    @pytest.fixture
+    def orchestrator(self):
+        """Orchestrator whose steps sleep for their payload's delay."""
+        orchestrator = AgentOrchestrator()
+        
+        async def run_step(execution, step, context):
+            if step.payload.get("fail"):
+                raise RuntimeError(f"{step.step_id} failed")
+            await asyncio.sleep(step.payload.get("delay", 0))
+            return {step.step_id: "done"}
+        
+        orchestrator._execute_workflow_step = run_step
+        return orchestrator
+    
+    async def run(self, orchestrator, steps, **kwargs):
+        """Run a workflow to completion and return its execution."""
+        workflow = Workflow(workflow_id="dag", name="DAG", steps=steps, **kwargs)
+        orchestrator.register_workflow(workflow)
+        execution = WorkflowExecution(execution_id="exec_dag", workflow_id="dag")
+        await orchestrator._execute_workflow_steps(execution, workflow, {})
+        return execution
+    
+    @staticmethod
+    def step(step_id, depends_on=(), **payload):
+        return WorkflowStep(
+            step_id=step_id,
+            agent_type="test_agent",
+            message_type="process",
+            payload=payload,
+            depends_on=list(depends_on)
+        )
+    
+    @pytest.mark.asyncio
+    async def test_dependents_start_when_parent_completes(self, orchestrator):
+        """Test that a slow step does not hold back independent dependents."""
+        execution = await self.run(orchestrator, [
+            self.step("slow", delay=0.2),
+            self.step("fast", delay=0.01),
+            self.step("after_fast", depends_on=["fast"], delay=0.01)
+        ])
+        
+        timings = execution.step_timings
+        assert execution.status == "completed"
+        assert timings["after_fast"]["finished_ms"] < timings["slow"]["finished_ms"]
+        assert execution.step_results["after_fast"] == {"after_fast": "done"}
+    
+    @pytest.mark.asyncio
+    async def test_max_concurrency(self, orchestrator):
+        """Test that the workflow concurrency limit is respected."""
+        execution = await self.run(orchestrator, [
+            self.step("a", delay=0.02),
+            self.step("b", delay=0.02)
+        ], max_concurrency=1)
+        
+        timings = execution.step_timings
+        first, second = sorted(timings.values(), key=lambda timing: timing["started_ms"])
+        assert execution.status == "completed"
+        assert second["started_ms"] >= first["finished_ms"]
+    
+    @pytest.mark.asyncio
+    async def test_failure_cancels_siblings(self, orchestrator):
+        """Test that a failing step cancels running steps and skips dependents."""
+        execution = await asyncio.wait_for(self.run(orchestrator, [
+            self.step("broken", fail=True),
+            self.step("long", delay=10),
+            self.step("next", depends_on=["broken"])
+        ]), timeout=2.0)
+        
+        assert execution.status == "failed"
+        assert execution.failed_steps == {"broken"}
+        assert execution.cancelled_steps == {"long"}
+        assert "next" not in execution.step_timings
+    
+    @pytest.mark.asyncio
+    async def test_critical_path(self, orchestrator):
+        """Test that the critical path follows the dependency that finished last."""
+        execution = await self.run(orchestrator, [
+            self.step("short", delay=0.01),
+            self.step("long", delay=0.1),
+            self.step("join", depends_on=["short", "long"], delay=0.01)
+        ])
+        
+        assert execution.critical_path == ["long", "join"]
+        assert execution.critical_path_ms == execution.step_timings["join"]["finished_ms"]
+    
+    def test_invalid_dependencies_rejected(self, orchestrator):
+        """Test that unknown and cyclic dependencies are rejected on registration."""
+        with pytest.raises(ValueError):
+            orchestrator.register_workflow(Workflow(
+                workflow_id="unknown", name="Unknown", steps=[self.step("a", depends_on=["missing"])]
+            ))
+        
+        with pytest.raises(ValueError):
+            orchestrator.register_workflow(Workflow(
+                workflow_id="cycle", name="Cycle", steps=[
+                    self.step("a", depends_on=["b"]),
+                    self.step("b", depends_on=["a"])
+                ]
+            ))
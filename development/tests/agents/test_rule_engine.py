@@ -7,10 +7,12 @@ detection rules, handle rule combinations, and resolve conflicts.
 
 import asyncio
 import json
+from datetime import datetime, timedelta
 from decimal import Decimal
 from unittest.mock import AsyncMock, MagicMock, patch
 from uuid import uuid4
 
+import numpy as np
 import pytest
 
 from src.counterfeit_detection.agents.rule_engine import (
@@ -20,7 +22,9 @@ from src.counterfeit_detection.agents.rule_engine import (
     ThresholdEvaluator,
     KeywordEvaluator,
     SupplierEvaluator,
-    PriceAnomalyEvaluator
+    PriceAnomalyEvaluator,
+    ProductBatch,
+    BatchRuleEvaluator
 )
 from src.counterfeit_detection.agents.base import AgentMessage, AgentResponse
 from src.counterfeit_detection.models.enums import RuleType, RuleAction, ProductCategory
@@ -216,6 +220,53 @@ class TestRuleEngine:
         with pytest.raises(ValueError, match="Product .+ not found"):
             await rule_engine.evaluate_product_rules(str(uuid4()))
     
+    @pytest.mark.asyncio
+    async def test_evaluate_products_batch(
+        self,
+        rule_engine,
+        mock_product,
+        mock_threshold_rule,
+        mock_keyword_rule,
+        mock_supplier_rule
+    ):
+        """Test batch evaluation loads products once and keeps request order."""
+        replica = MagicMock()
+        replica.id = uuid4()
+        replica.title = "Replica handbag"
+        replica.description = "AAA quality"
+        replica.category = ProductCategory.BAGS
+        replica.price = Decimal("45.00")
+        replica.brand = "Gucci"
+        replica.supplier_id = uuid4()
+        replica.supplier_reputation = 0.2
+        mock_product.title = "Leather handbag"
+        
+        product_repo = AsyncMock()
+        product_repo.get_products_by_ids.return_value = [mock_product, replica]
+        missing_id = str(uuid4())
+        product_ids = [str(replica.id), missing_id, str(mock_product.id)]
+        rules = [mock_keyword_rule, mock_supplier_rule, mock_threshold_rule]
+        
+        with patch('src.counterfeit_detection.agents.rule_engine.ProductRepository', return_value=product_repo), \
+             patch('src.counterfeit_detection.agents.rule_engine.get_db_session') as mock_session, \
+             patch.object(rule_engine, '_get_applicable_rules', return_value=rules):
+            mock_session.return_value.__aenter__ = AsyncMock(return_value=MagicMock())
+            mock_session.return_value.__aexit__ = AsyncMock(return_value=None)
+            
+            results = await rule_engine.evaluate_products_batch(
+                product_ids, {str(replica.id): 20.0}
+            )
+        
+        product_repo.get_products_by_ids.assert_called_once()
+        assert results[1] is None
+        assert results[0].product_id == str(replica.id)
+        assert {m.rule_id for m in results[0].matched_rules} == {
+            mock_keyword_rule.id, mock_supplier_rule.id, mock_threshold_rule.id
+        }
+        assert results[2].product_id == str(mock_product.id)
+        assert results[2].matched_rules == []
+        assert results[2].total_rules_evaluated == 3
+    
     @pytest.mark.asyncio
     async def test_get_applicable_rules_with_cache(self, rule_engine, mock_threshold_rule):
         """Test getting applicable rules with caching."""
@@ -249,6 +300,51 @@ class TestRuleEngine:
             assert len(rule_engine.rules_cache) > 0
             assert rule_engine.rules_cache_timestamp is not None
     
+    @pytest.mark.asyncio
+    async def test_stale_rules_snapshot_reloaded_as_a_whole(self, rule_engine, mock_threshold_rule, mock_keyword_rule):
+        """Test that cached category entries expire with the snapshot timestamp."""
+        category = ProductCategory.ELECTRONICS
+        rule_engine.rules_cache.set(f"category_{category.value}", [mock_threshold_rule])
+        rule_engine.rules_cache.set("category_general", [])
+        rule_engine.rules_cache_timestamp = datetime.utcnow() - timedelta(
+            seconds=rule_engine.cache_ttl_seconds + 1
+        )
+        
+        async def refresh():
+            rule_engine.rules_cache.clear()
+            rule_engine.rules_cache.set("category_general", [mock_keyword_rule])
+            rule_engine.rules_cache_timestamp = datetime.utcnow()
+        
+        with patch.object(rule_engine, '_refresh_rules_cache', AsyncMock(side_effect=refresh)) as refresh_mock:
+            assert await rule_engine._get_applicable_rules(category) == [mock_keyword_rule]
+            assert await rule_engine._get_applicable_rules(ProductCategory.BAGS) == [mock_keyword_rule]
+            
+            refresh_mock.assert_awaited_once()
+    
+    def test_keyword_rules_reused_for_cache_snapshot(self, rule_engine, mock_threshold_rule, mock_keyword_rule):
+        """Test that compiled keyword rules are reused only for their own rules snapshot."""
+        rules = [mock_keyword_rule, mock_threshold_rule]
+        compiled = KeywordEvaluator.compile_rules(rules)
+        rule_engine.keyword_rules = {"category_general": compiled}
+        
+        assert mock_keyword_rule.id in compiled
+        assert mock_threshold_rule.id not in compiled
+        assert rule_engine._get_keyword_rules(ProductCategory.BAGS, rules) is compiled
+        
+        # Rules outside the snapshot get their own matcher
+        new_rule = DetectionRule(
+            id=str(uuid4()),
+            name="New Keywords",
+            rule_type=RuleType.KEYWORD,
+            config={"patterns": ["dupe"]},
+            priority=50,
+            active=True,
+            category=None
+        )
+        recompiled = rule_engine._get_keyword_rules(ProductCategory.BAGS, rules + [new_rule])
+        assert recompiled is not compiled
+        assert new_rule.id in recompiled
+    
     @pytest.mark.asyncio
     async def test_calculate_overall_risk_score(self, rule_engine):
         """Test overall risk score calculation."""
@@ -454,6 +550,28 @@ class TestKeywordEvaluator:
         product_data = {"description": "This is a FAKE product"}
         match = KeywordEvaluator.evaluate_keyword_rule(rule, product_data)
         assert match is not None
+    
+    def test_evaluate_keyword_rule_reuses_compiled_rule(self):
+        """Test that a rule is compiled once per version, not per evaluation."""
+        rule = DetectionRule(
+            id="cached-rule",
+            name="Cached Keywords",
+            rule_type=RuleType.KEYWORD,
+            config={"patterns": ["replica"], "action": "flag", "match_type": "any"},
+            priority=100,
+            active=True
+        )
+        product_data = {"description": "A replica watch"}
+        
+        with patch.object(KeywordEvaluator, "compile_rules", wraps=KeywordEvaluator.compile_rules) as compile_rules:
+            for _ in range(3):
+                assert KeywordEvaluator.evaluate_keyword_rule(rule, product_data) is not None
+            assert compile_rules.call_count == 1
+            
+            # An edited rule is recompiled
+            rule.config = {"patterns": ["counterfeit"], "action": "flag", "match_type": "any"}
+            assert KeywordEvaluator.evaluate_keyword_rule(rule, product_data) is None
+            assert compile_rules.call_count == 2
 
 
 class TestSupplierEvaluator:
@@ -611,4 +729,74 @@ class TestPriceAnomalyEvaluator:
             rule, product_data, market_data
         )
         
-        assert match is None  # Small deviation, should not trigger
\ No newline at end of file
+        assert match is None  # Small deviation, should not trigger
+
+
+class TestBatchRuleEvaluator:
+    """Test vectorized rule evaluation against the per-product evaluators."""
+    
+    @pytest.fixture
+    def product_data(self):
+        """Products covering matching and non-matching cases."""
+        return [
+            {"id": "p1", "title": "", "description": "", "category": ProductCategory.WATCHES,
+             "price": Decimal("25.00"), "brand": "Rolex", "supplier_id": "supplier-123",
+             "supplier_reputation": 0.9},
+            {"id": "p2", "title": "", "description": "", "category": ProductCategory.WATCHES,
+             "price": Decimal("25.00"), "brand": "Casio", "supplier_id": "supplier-789",
+             "supplier_reputation": 0.3},
+            {"id": "p3", "title": "", "description": "", "category": ProductCategory.BAGS,
+             "price": None, "brand": "Gucci", "supplier_id": None,
+             "supplier_reputation": 1.0},
+        ]
+    
+    @pytest.mark.parametrize("rule_type,config", [
+        (RuleType.THRESHOLD, {"score_threshold": 40.0, "action": "flag"}),
+        (RuleType.SUPPLIER, {"blacklist": ["supplier-123"], "reputation_threshold": 0.5, "action": "block"}),
+        (RuleType.SUPPLIER, {"whitelist": ["supplier-789"], "action": "quarantine"}),
+        (RuleType.PRICE_ANOMALY, {"action": "flag"}),
+    ])
+    def test_matches_per_product_evaluation(self, product_data, rule_type, config):
+        """Test that batch matches equal the per-product evaluator results."""
+        rule = DetectionRule(
+            id="test-rule",
+            name="Batch Rule",
+            rule_type=rule_type,
+            config=config,
+            priority=100,
+            active=True
+        )
+        scores = [20.0, None, 60.0]
+        batch = ProductBatch(product_data, scores)
+        
+        batch_matches = dict(BatchRuleEvaluator.evaluate(rule, batch, np.arange(len(batch))))
+        
+        for row, data in enumerate(product_data):
+            if rule_type == RuleType.THRESHOLD:
+                expected = ThresholdEvaluator.evaluate_threshold_rule(rule, data, scores[row])
+            elif rule_type == RuleType.SUPPLIER:
+                expected = SupplierEvaluator.evaluate_supplier_rule(rule, data)
+            else:
+                expected = PriceAnomalyEvaluator.evaluate_price_anomaly_rule(rule, data) if data["price"] is not None else None
+            
+            actual = batch_matches.get(row)
+            if expected is None:
+                assert actual is None
+            else:
+                assert actual.confidence == pytest.approx(expected.confidence)
+                assert actual.action == expected.action
+                assert actual.evidence == pytest.approx(expected.evidence)
+    
+    def test_unsupported_rule_type(self, product_data):
+        """Test that rule types without a vectorized form are not evaluated."""
+        rule = DetectionRule(
+            id="test-rule",
+            name="Keywords",
+            rule_type=RuleType.KEYWORD,
+            config={"patterns": ["replica"]},
+            priority=100,
+            active=True
+        )
+        batch = ProductBatch(product_data, [None] * len(product_data))
+        
+        assert BatchRuleEvaluator.evaluate(rule, batch, np.arange(len(batch))) is None
@@ -0,0 +1,28 @@
+"""
+Tests for Redis configuration.
+"""
+
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from src.counterfeit_detection.config import redis as redis_config
+
+
+@pytest.mark.asyncio
+async def test_shared_client_is_reused_and_closed():
+    """Test that requests share one client, which is closed on shutdown."""
+    client = AsyncMock()
+    with patch.object(redis_config, "get_redis_client", AsyncMock(return_value=client)) as factory:
+        first = await redis_config.get_shared_redis_client()
+        second = await redis_config.get_shared_redis_client()
+        
+        assert first is second is client
+        factory.assert_awaited_once()
+        
+        await redis_config.close_shared_redis_client()
+        client.close.assert_awaited_once()
+        
+        # A later request gets a fresh client
+        await redis_config.get_shared_redis_client()
+        assert factory.await_count == 2
+        await redis_config.close_shared_redis_client()
@@ -0,0 +1,98 @@
+"""
+Tests for AnalyticsRepository queries against the MySQL/TiDB dialect.
+"""
+
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy.dialects import mysql
+
+from src.counterfeit_detection.db.repositories.analytics_repository import AnalyticsRepository
+from src.counterfeit_detection.utils.lru_cache import LRUCache
+
+START_DATE = datetime(2024, 1, 1)
+END_DATE = datetime(2024, 1, 31)
+
+
+@pytest.fixture
+def session():
+    """Mock database session returning no rows."""
+    session = MagicMock()
+    session.execute = AsyncMock(return_value=[])
+    return session
+
+
+@pytest.fixture
+def repository(session):
+    """Analytics repository with a private cache."""
+    return AnalyticsRepository(session, cache=LRUCache(), read_from_tiflash=False)
+
+
+def executed_sql(session) -> str:
+    """Compile the last executed query for MySQL."""
+    query = session.execute.call_args[0][0]
+    return str(query.compile(dialect=mysql.dialect())).lower()
+
+
+class TestTimeSeries:
+    """Test time series bucketing."""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("granularity,bucket", [
+        ("hourly", "date_format(authenticity_analyses.created_at, %s)"),
+        ("daily", "date(authenticity_analyses.created_at)"),
+        ("weekly", "subdate(date(authenticity_analyses.created_at), weekday(authenticity_analyses.created_at))"),
+        ("monthly", "date_format(authenticity_analyses.created_at, %s)")
+    ])
+    async def test_periods_use_mysql_functions(self, repository, session, granularity, bucket):
+        """Test that periods are bucketed with functions MySQL and TiDB support."""
+        await repository.get_time_series_data(START_DATE, END_DATE, granularity=granularity)
+
+        sql = executed_sql(session)
+        assert "date_trunc" not in sql
+        assert f"cast({bucket} as datetime)" in sql
+        assert sql.count(bucket) == 3  # selected, grouped and ordered by
+
+    @pytest.mark.asyncio
+    async def test_product_columns_join_products(self, repository, session):
+        """Test that metrics on product columns join the analysed products."""
+        await repository.get_time_series_data(START_DATE, END_DATE, metric_type="false_positive_rate")
+
+        assert "from authenticity_analyses inner join products on" in executed_sql(session)
+
+
+class TestCaching:
+    """Test caching of dashboard queries."""
+
+    @pytest.mark.asyncio
+    async def test_consecutive_relative_periods_share_cache_entry(self, repository, session):
+        """Test that "last N days" requests made moments apart load once."""
+        end_date = datetime(2024, 1, 31, 12, 30, 5, 250000)
+
+        for offset in (0, 2, 40):
+            request_time = end_date + timedelta(seconds=offset)
+            await repository.get_time_series_data(request_time - timedelta(days=7), request_time)
+
+        assert session.execute.await_count == 1
+
+
+class TestGroupedMetrics:
+    """Test per-supplier and per-attribute aggregations."""
+
+    @pytest.mark.asyncio
+    async def test_supplier_metrics_join(self, repository, session):
+        """Test that supplier metrics select from products joined to analyses."""
+        assert await repository.get_supplier_metrics(START_DATE, END_DATE) == []
+
+        sql = executed_sql(session)
+        assert "from products inner join authenticity_analyses on" in sql
+        assert "group by products.supplier_id" in sql
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("attribute", ["category", "supplier_id", "price_range"])
+    async def test_bias_analysis_join(self, repository, session, attribute):
+        """Test that bias analysis selects from products joined to analyses."""
+        assert await repository.get_bias_analysis_data(START_DATE, END_DATE, attribute) == []
+
+        assert "from products inner join authenticity_analyses on" in executed_sql(session)
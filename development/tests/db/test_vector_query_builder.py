@@ -0,0 +1,142 @@
+"""
+Tests for the native vector similarity queries built by VectorQueryBuilder.
+"""
+
+import json
+from decimal import Decimal
+from uuid import UUID
+
+import pytest
+
+from src.counterfeit_detection.db.repositories.vector_repository import VectorQueryBuilder
+
+QUERY_EMBEDDING = [0.1, 0.2, 0.3]
+SUPPLIER_ID = UUID("12345678-1234-5678-1234-567812345678")
+
+
+def normalized_sql(query) -> str:
+    """SQL text of a query with whitespace collapsed."""
+    return " ".join(str(query).split())
+
+
+def split_candidates(sql: str):
+    """Split a query into its candidate subquery and the outer query."""
+    inner, outer = sql.split(") candidates")
+    return inner.strip(), outer.strip()
+
+
+@pytest.fixture
+def builder():
+    """Query builder with the default oversampling."""
+    return VectorQueryBuilder(oversample=2, filtered_oversample=20, max_candidates=1000)
+
+
+class TestSimilarityQuery:
+    """Test single-column similarity queries."""
+
+    def test_index_scan_has_no_predicates(self, builder):
+        """Test that the candidate scan is an ORDER BY distance LIMIT the index can serve."""
+        query, params = builder.similarity_query(
+            "description_embedding_vec",
+            QUERY_EMBEDDING,
+            supplier_id=SUPPLIER_ID,
+            price_min=Decimal("10"),
+            limit=10
+        )
+
+        inner, outer = split_candidates(normalized_sql(query))
+        assert inner.endswith(
+            "FROM products "
+            "WHERE description_embedding_vec IS NOT NULL "
+            "ORDER BY VEC_COSINE_DISTANCE(description_embedding_vec, VEC_FROM_TEXT(:query_embedding)) "
+            "LIMIT :candidate_limit"
+        )
+        assert inner.count("WHERE") == 1
+        assert outer == (
+            "WHERE supplier_id = :supplier_id AND price >= :price_min AND 1 - distance / 2 > :threshold"
+            " ORDER BY distance LIMIT :limit"
+        )
+
+        assert params == {
+            "supplier_id": str(SUPPLIER_ID),
+            "price_min": Decimal("10"),
+            "query_embedding": json.dumps(QUERY_EMBEDDING),
+            "candidate_limit": 200,
+            "threshold": 0.7,
+            "limit": 10
+        }
+
+    def test_bind_params_cover_query(self, builder):
+        """Test that every bind parameter in the SQL is supplied and none are extra."""
+        query, params = builder.similarity_query(
+            "image_embedding_vec", QUERY_EMBEDDING, price_max=Decimal("99"), similarity_threshold=0.8
+        )
+
+        assert set(query.compile().params) == set(params)
+
+    @pytest.mark.parametrize("limit,filtered,candidate_limit", [
+        (10, False, 20),
+        (10, True, 200),
+        (50, True, 1000),
+        (600, False, 1000),
+        (1, True, 20)
+    ])
+    def test_candidate_oversampling(self, builder, limit, filtered, candidate_limit):
+        """Test that filtered searches over-fetch more and that candidates are capped."""
+        _, params = builder.similarity_query(
+            "description_embedding_vec",
+            QUERY_EMBEDDING,
+            supplier_id=SUPPLIER_ID if filtered else None,
+            limit=limit
+        )
+
+        assert params["candidate_limit"] == candidate_limit
+
+    def test_candidates_never_fewer_than_limit(self):
+        """Test that the oversampling factor never yields fewer candidates than requested."""
+        builder = VectorQueryBuilder(oversample=0, filtered_oversample=0, max_candidates=1000)
+
+        _, params = builder.similarity_query("description_embedding_vec", QUERY_EMBEDDING, limit=25)
+
+        assert params["candidate_limit"] == 25
+
+
+class TestHybridSimilarityQuery:
+    """Test weighted text + image similarity queries."""
+
+    def test_candidates_are_union_of_index_scans(self, builder):
+        """Test that both columns' nearest neighbours are unioned and filtered afterwards."""
+        query, params = builder.hybrid_similarity_query(
+            text_embedding=[0.1, 0.2],
+            image_embedding=[0.3, 0.4],
+            text_weight=0.6,
+            image_weight=0.4,
+            supplier_id=SUPPLIER_ID,
+            limit=5
+        )
+
+        inner, outer = split_candidates(normalized_sql(query))
+        assert (
+            "JOIN ( ( SELECT id FROM products "
+            "WHERE description_embedding_vec IS NOT NULL "
+            "ORDER BY VEC_COSINE_DISTANCE(description_embedding_vec, VEC_FROM_TEXT(:text_embedding)) "
+            "LIMIT :candidate_limit ) "
+            "UNION "
+            "( SELECT id FROM products "
+            "WHERE image_embedding_vec IS NOT NULL "
+            "ORDER BY VEC_COSINE_DISTANCE(image_embedding_vec, VEC_FROM_TEXT(:image_embedding)) "
+            "LIMIT :candidate_limit ) "
+            ") candidate_ids ON candidate_ids.id = p.id"
+        ) in inner
+        assert inner.count("WHERE") == 2
+        assert outer == (
+            "WHERE supplier_id = :supplier_id"
+            " AND text_similarity IS NOT NULL AND image_similarity IS NOT NULL"
+            " AND :text_weight * text_similarity + :image_weight * image_similarity > :threshold"
+            " ORDER BY combined_similarity_score DESC LIMIT :limit"
+        )
+
+        assert params["candidate_limit"] == 100
+        assert params["text_embedding"] == json.dumps([0.1, 0.2])
+        assert params["image_embedding"] == json.dumps([0.3, 0.4])
+        assert set(query.compile().params) == set(params)
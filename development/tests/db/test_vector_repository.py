@@ -0,0 +1,208 @@
+"""
+Tests for warming the in-memory vector indexes in VectorRepository.
+"""
+
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from src.counterfeit_detection.db.repositories.vector_repository import (
+    TEXT_EMBEDDING_DIMENSIONS,
+    TEXT_INDEX_NAME,
+    VectorRepository,
+    run_after_commit
+)
+from src.counterfeit_detection.utils.vector_index import (
+    FlatVectorIndex,
+    IVFVectorIndex,
+    VectorSearchFilters,
+    get_vector_index,
+    set_vector_index_factory
+)
+
+
+def embedding(seed: int):
+    """Random text embedding."""
+    return np.random.default_rng(seed).standard_normal(TEXT_EMBEDDING_DIMENSIONS).tolist()
+
+
+def product_row(product_id: str, seed: int):
+    """Product row as returned by the warm-up query."""
+    return SimpleNamespace(
+        id=product_id,
+        category="bags",
+        supplier_id=None,
+        price=None,
+        status="active",
+        description_embedding=embedding(seed),
+        image_embedding=None
+    )
+
+
+@pytest.fixture(autouse=True)
+def fresh_indexes():
+    """Start every test with cold, empty shared indexes."""
+    set_vector_index_factory(lambda dimensions: FlatVectorIndex(dimensions, initial_capacity=16))
+    yield
+    set_vector_index_factory(IVFVectorIndex)
+
+
+class TestWarmVectorIndexes:
+    """Test loading the shared ANN indexes."""
+
+    @pytest.mark.asyncio
+    async def test_changes_during_warmup_are_replayed(self):
+        """Test that upserts and removals made while loading survive the index swap."""
+        session = MagicMock()
+        repository = VectorRepository(session, native_vectors=False)
+
+        async def read_page(query, params=None):
+            if "UTC_TIMESTAMP" in str(query):
+                return MagicMock(scalar=MagicMock(return_value=datetime(2026, 1, 1)))
+            # Page read from the database, then changed before the swap
+            rows = [product_row("p1", 1), product_row("p2", 2)]
+            repository.index_product_embeddings("p1", description_embedding=embedding(10))
+            repository.index_product_embeddings("p3", description_embedding=embedding(3))
+            repository.remove_product_from_vector_indexes("p2")
+            return MagicMock(fetchall=MagicMock(return_value=rows))
+
+        session.execute = AsyncMock(side_effect=read_page)
+
+        await repository.warm_vector_indexes(page_size=100)
+
+        index = get_vector_index(TEXT_INDEX_NAME, TEXT_EMBEDDING_DIMENSIONS)
+        assert index.is_warm
+        assert len(index) == 2
+        assert {product_id for product_id, _ in index.search(embedding(3), limit=10)} == {"p1", "p3"}
+        assert index.search(embedding(10), limit=1)[0][0] == "p1"
+
+
+class TestRefreshVectorIndexes:
+    """Test keeping warm indexes in step with the database."""
+
+    @staticmethod
+    def session_returning(*pages):
+        """Session answering the clock query and then each page of rows in turn."""
+        session = MagicMock()
+        pages = list(pages)
+
+        async def execute(query, params=None):
+            if "UTC_TIMESTAMP" in str(query):
+                return MagicMock(scalar=MagicMock(return_value=datetime(2026, 1, 1)))
+            return MagicMock(fetchall=MagicMock(return_value=pages.pop(0)))
+
+        session.execute = AsyncMock(side_effect=execute)
+        return session
+
+    @pytest.mark.asyncio
+    async def test_refresh_applies_changes_from_other_processes(self):
+        """Test that new embeddings, attribute changes and cleared embeddings are applied."""
+        session = self.session_returning([product_row("p1", 1), product_row("p2", 2)])
+        repository = VectorRepository(session, native_vectors=False)
+        await repository.warm_vector_indexes(page_size=100)
+
+        changed = product_row("p1", 1)
+        changed.status = "flagged"
+        cleared = product_row("p2", 2)
+        cleared.description_embedding = None
+        session.execute.side_effect = self.session_returning(
+            [changed, cleared, product_row("p3", 3)]
+        ).execute.side_effect
+
+        assert await repository.refresh_vector_indexes() == 3
+
+        index = get_vector_index(TEXT_INDEX_NAME, TEXT_EMBEDDING_DIMENSIONS)
+        assert {product_id for product_id, _ in index.search(embedding(3), limit=10)} == {"p1", "p3"}
+        active = VectorSearchFilters(status="active")
+        assert [product_id for product_id, _ in index.search(embedding(1), limit=10, filters=active)] == ["p3"]
+
+    @pytest.mark.asyncio
+    async def test_refresh_reads_changes_in_pages(self):
+        """Test that the delta refresh walks the changed rows with a keyset cursor."""
+        session = self.session_returning([product_row("p1", 1)])
+        repository = VectorRepository(session, native_vectors=False)
+        await repository.warm_vector_indexes(page_size=100)
+
+        session.execute.side_effect = self.session_returning(
+            [product_row("p1", 1), product_row("p2", 2)],
+            [product_row("p3", 3)]
+        ).execute.side_effect
+
+        assert await repository.refresh_vector_indexes(page_size=2) == 3
+        page_params = [call.args[1] for call in session.execute.call_args_list[-2:]]
+        assert [params["last_id"] for params in page_params] == ["", "p2"]
+        assert all(params["page_size"] == 2 for params in page_params)
+
+    @pytest.mark.asyncio
+    async def test_refresh_skipped_while_cold(self):
+        """Test that cold indexes are left for the next warm-up."""
+        session = self.session_returning()
+        repository = VectorRepository(session, native_vectors=False)
+
+        assert await repository.refresh_vector_indexes() == 0
+        session.execute.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_status_update_reaches_warm_index(self):
+        """Test that a status change is reflected in index filters immediately."""
+        session = self.session_returning([product_row("p1", 1)])
+        repository = VectorRepository(session, native_vectors=False)
+        await repository.warm_vector_indexes(page_size=100)
+
+        repository.update_product_in_vector_indexes("p1", status=SimpleNamespace(value="removed"))
+
+        index = get_vector_index(TEXT_INDEX_NAME, TEXT_EMBEDDING_DIMENSIONS)
+        assert index.search(embedding(1), filters=VectorSearchFilters(status="active")) == []
+        assert index.search(embedding(1), filters=VectorSearchFilters(status="removed"))[0][0] == "p1"
+
+
+class TestRunAfterCommit:
+    """Test deferring index updates until the write is committed."""
+
+    @staticmethod
+    def session():
+        """Async session stand-in wrapping a real SQLite session."""
+        return SimpleNamespace(sync_session=Session(create_engine("sqlite://")))
+
+    def test_update_applied_on_commit(self):
+        """Test that a queued update runs once the transaction commits."""
+        session = self.session()
+        applied = []
+        session.sync_session.execute(text("SELECT 1"))
+        run_after_commit(session, lambda: applied.append("p1"))
+
+        assert applied == []
+        session.sync_session.commit()
+        assert applied == ["p1"]
+
+        session.sync_session.commit()
+        assert applied == ["p1"]
+
+    def test_update_discarded_on_rollback(self):
+        """Test that a rolled-back write never reaches the index."""
+        session = self.session()
+        applied = []
+        session.sync_session.execute(text("SELECT 1"))
+        run_after_commit(session, lambda: applied.append("p1"))
+        session.sync_session.rollback()
+
+        session.sync_session.execute(text("SELECT 1"))
+        session.sync_session.commit()
+        assert applied == []
+
+    def test_savepoint_rollback_keeps_outer_updates(self):
+        """Test that rolling back a savepoint leaves earlier updates queued."""
+        session = self.session()
+        applied = []
+        session.sync_session.execute(text("SELECT 1"))
+        run_after_commit(session, lambda: applied.append("p1"))
+        savepoint = session.sync_session.begin_nested()
+        savepoint.rollback()
+
+        session.sync_session.commit()
+        assert applied == ["p1"]
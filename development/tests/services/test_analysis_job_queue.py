@@ -0,0 +1,258 @@
+"""
+Tests for the durable analysis job queue.
+"""
+
+import json
+import time
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.counterfeit_detection.services.analysis_job_queue import (
+    JOB_STREAM,
+    AnalysisJob,
+    AnalysisJobQueue
+)
+
+
+@pytest.fixture
+def pipeline():
+    """Mock Redis pipeline recording queued commands."""
+    pipe = MagicMock()
+    pipe.execute = AsyncMock(return_value=[])
+    return pipe
+
+
+@pytest.fixture
+def redis_client(pipeline):
+    """Mock Redis client."""
+    client = MagicMock()
+    client.pipeline.return_value = pipeline
+    client.hmget = AsyncMock(return_value=["queued", None])
+    client.hset = AsyncMock()
+    client.hincrby = AsyncMock()
+    return client
+
+
+@pytest.fixture
+def transport():
+    """Mock stream transport."""
+    transport = MagicMock()
+    transport.publish = AsyncMock()
+    transport.publish_many = AsyncMock()
+    return transport
+
+
+@pytest.fixture
+def queue(redis_client, transport):
+    """Job queue with a mock analyzer factory."""
+    return AnalysisJobQueue(
+        redis_client,
+        transport,
+        workers=2,
+        max_attempts=2,
+        retry_backoff_seconds=0,
+        analyzer_factory=MagicMock
+    )
+
+
+def make_job(attempt=1):
+    """Create a serialized job."""
+    return AnalysisJob(
+        job_id="job_001",
+        product_id="product_001",
+        idempotency_key="product_001",
+        batch_id="batch_001",
+        attempt=attempt
+    ).to_json()
+
+
+class TestLifecycle:
+    """Test starting and stopping workers."""
+
+    @pytest.mark.asyncio
+    async def test_failed_start_can_be_retried(self, redis_client, transport):
+        """Test that a failed start stops started workers and leaves the queue stopped."""
+        started = MagicMock()
+        started.start = AsyncMock()
+        started.stop = AsyncMock()
+        broken = MagicMock()
+        broken.start = AsyncMock(side_effect=RuntimeError("model unavailable"))
+        transport.consume = AsyncMock()
+        queue = AnalysisJobQueue(
+            redis_client,
+            transport,
+            workers=2,
+            analyzer_factory=MagicMock(side_effect=[started, broken])
+        )
+
+        with pytest.raises(RuntimeError):
+            await queue.start()
+
+        assert not queue.running
+        assert queue.analyzers == []
+        started.stop.assert_awaited_once()
+
+
+class TestEnqueue:
+    """Test batch enqueueing."""
+
+    @pytest.mark.asyncio
+    async def test_duplicates_are_not_queued(self, queue, pipeline, transport):
+        """Test that products with an existing job are skipped."""
+        pipeline.execute.side_effect = [[True, False, True], []]
+
+        result = await queue.enqueue_batch(
+            ["p1", "p2", "p3", "p1"], batch_id="batch_001", priority="urgent"
+        )
+
+        assert result["queued_product_ids"] == ["p1", "p3"]
+        assert result["duplicate_product_ids"] == ["p2"]
+
+        assert [c.args[0] for c in pipeline.hsetnx.call_args_list] == [
+            "analysis:job:p1", "analysis:job:p2", "analysis:job:p3"
+        ]
+        target, messages = transport.publish_many.await_args.args
+        assert target == JOB_STREAM
+        assert [AnalysisJob.from_json(m).product_id for m, _ in messages] == ["p1", "p3"]
+        assert all(priority == 10 for _, priority in messages)
+
+        batch_fields = pipeline.hset.call_args_list[-1].kwargs["mapping"]
+        assert batch_fields["total"] == 3
+        assert batch_fields["queued"] == 2
+        assert batch_fields["duplicates"] == 1
+
+    @pytest.mark.asyncio
+    async def test_force_uses_batch_scoped_keys(self, queue, pipeline):
+        """Test that forced reanalysis does not collide with existing jobs."""
+        pipeline.execute.side_effect = [[True], []]
+
+        await queue.enqueue_batch(["p1"], batch_id="batch_001", force=True)
+
+        assert pipeline.hsetnx.call_args.args[0] == "analysis:job:p1:batch_001"
+
+
+class TestProcessing:
+    """Test job processing by workers."""
+
+    @pytest.mark.asyncio
+    async def test_success_updates_batch(self, queue, redis_client, pipeline):
+        """Test that a completed job is recorded on its batch."""
+        pipeline.execute.return_value = [1, True, True]
+        analyzer = MagicMock()
+        analyzer.analyze_product_authenticity = AsyncMock(
+            return_value=MagicMock(analysis_id="analysis_001", authenticity_score=0.9)
+        )
+
+        assert await queue._process(analyzer, make_job()) is True
+
+        analyzer.analyze_product_authenticity.assert_awaited_once_with("product_001")
+        redis_client.hincrby.assert_awaited_once_with("analysis:batch:batch_001", "completed", 1)
+        product_id, result = pipeline.hsetnx.call_args.args[1:]
+        assert product_id == "product_001"
+        assert json.loads(result)["analysis_id"] == "analysis_001"
+        assert queue.stats["completed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_repeated_finish_counts_once(self, queue, redis_client, pipeline):
+        """Test that a job finished again (e.g. redelivered before its ack) is not double counted."""
+        pipeline.execute.return_value = [0, False, True]
+        analyzer = MagicMock()
+        analyzer.analyze_product_authenticity = AsyncMock(
+            return_value=MagicMock(analysis_id="analysis_001", authenticity_score=0.9)
+        )
+
+        await queue._process(analyzer, make_job())
+
+        redis_client.hincrby.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_job_running_elsewhere_is_deferred(self, queue, redis_client):
+        """Test that a reclaimed job with a fresh heartbeat is left to its worker."""
+        redis_client.hmget.return_value = ["running", str(time.time())]
+        analyzer = MagicMock()
+        analyzer.analyze_product_authenticity = AsyncMock()
+
+        assert await queue._process(analyzer, make_job()) is False
+
+        analyzer.analyze_product_authenticity.assert_not_awaited()
+        redis_client.hset.assert_not_awaited()
+        assert queue.stats["deferred"] == 1
+
+    @pytest.mark.asyncio
+    async def test_job_with_stale_heartbeat_is_rerun(self, queue, redis_client, pipeline):
+        """Test that a running job whose worker stopped heartbeating is taken over."""
+        redis_client.hmget.return_value = ["running", str(time.time() - 3 * queue.heartbeat_seconds - 1)]
+        pipeline.execute.return_value = [1, True, True]
+        analyzer = MagicMock()
+        analyzer.analyze_product_authenticity = AsyncMock(
+            return_value=MagicMock(analysis_id="analysis_001", authenticity_score=0.9)
+        )
+
+        assert await queue._process(analyzer, make_job()) is True
+
+        analyzer.analyze_product_authenticity.assert_awaited_once_with("product_001")
+
+    @pytest.mark.asyncio
+    async def test_failure_is_retried(self, queue, redis_client, transport):
+        """Test that a failed attempt is re-queued with the next attempt number."""
+        analyzer = MagicMock()
+        analyzer.analyze_product_authenticity = AsyncMock(side_effect=RuntimeError("LLM timeout"))
+
+        await queue._process(analyzer, make_job(attempt=1))
+
+        target, message_json, _ = transport.publish.await_args.args
+        assert target == JOB_STREAM
+        assert AnalysisJob.from_json(message_json).attempt == 2
+        redis_client.hincrby.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_last_attempt_marks_failed(self, queue, redis_client, transport, pipeline):
+        """Test that a job failing its last attempt is recorded as failed."""
+        pipeline.execute.return_value = [1, True, True, True]
+        analyzer = MagicMock()
+        analyzer.analyze_product_authenticity = AsyncMock(side_effect=RuntimeError("LLM timeout"))
+
+        await queue._process(analyzer, make_job(attempt=2))
+
+        transport.publish.assert_not_awaited()
+        redis_client.hincrby.assert_awaited_once_with("analysis:batch:batch_001", "failed", 1)
+        assert queue.stats["failed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_completed_job_is_skipped(self, queue, redis_client):
+        """Test that a redelivered job that already completed is not rerun."""
+        redis_client.hmget.return_value = ["completed", None]
+        analyzer = MagicMock()
+        analyzer.analyze_product_authenticity = AsyncMock()
+
+        await queue._process(analyzer, make_job())
+
+        analyzer.analyze_product_authenticity.assert_not_awaited()
+        assert queue.stats["skipped"] == 1
+
+
+class TestProgress:
+    """Test batch progress reporting."""
+
+    @pytest.mark.asyncio
+    async def test_progress(self, queue, pipeline):
+        """Test counters, status and results of a batch."""
+        pipeline.execute.return_value = [
+            {"total": "4", "queued": "4", "duplicates": "0", "completed": "2", "failed": "1"},
+            {"p1": json.dumps({"status": "completed", "attempts": 1, "analysis_id": "a1"})}
+        ]
+
+        progress = await queue.get_batch_progress("batch_001")
+
+        assert progress["status"] == "processing"
+        assert progress["pending_count"] == 1
+        assert progress["progress"] == 0.75
+        assert progress["results"]["p1"]["analysis_id"] == "a1"
+
+    @pytest.mark.asyncio
+    async def test_unknown_batch(self, queue, pipeline):
+        """Test that an unknown batch has no progress."""
+        pipeline.execute.return_value = [{}, {}]
+
+        assert await queue.get_batch_progress("missing") is None
@@ -0,0 +1,187 @@
+"""
+Tests for streaming bulk uploads in BrandProductService.
+"""
+
+import io
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src.counterfeit_detection.services.brand_product_service import (
+    BrandProductService,
+    iter_csv_row_chunks
+)
+
+CSV_HEADER = "official_product_name,official_description,category,official_price_min,official_price_max\n"
+
+
+def make_csv(rows):
+    """Build CSV bytes from row strings."""
+    return io.BytesIO((CSV_HEADER + "".join(f"{row}\n" for row in rows)).encode("utf-8"))
+
+
+@pytest.fixture
+def sessions():
+    """Mock database sessions, one per get_db_session call."""
+    return []
+
+
+@pytest.fixture
+def commit_errors():
+    """Errors raised by the next commits."""
+    return []
+
+
+@pytest.fixture
+def service(sessions, commit_errors):
+    """Brand product service with mocked database and embeddings."""
+
+    def commit():
+        error = commit_errors.pop(0) if commit_errors else None
+        if error:
+            raise error
+
+    @asynccontextmanager
+    async def fake_db_session():
+        session = MagicMock()
+        session.flush = AsyncMock()
+        session.commit = AsyncMock(side_effect=commit)
+        sessions.append(session)
+        yield session
+
+    brand = MagicMock(id="brand_001", brand_name="Acme")
+    product_service = BrandProductService()
+    product_service.settings = MagicMock(
+        brand_bulk_upload_chunk_size=2,
+        brand_bulk_upload_max_products=100
+    )
+    product_service.embedding_service = MagicMock()
+    product_service.embedding_service.generate_text_embeddings_batch = AsyncMock(
+        side_effect=lambda texts: [[0.1] * 3 for _ in texts]
+    )
+
+    with patch(
+        "src.counterfeit_detection.services.brand_product_service.get_db_session",
+        fake_db_session
+    ), patch.object(product_service, "_get_verified_brand", AsyncMock(return_value=brand)):
+        yield product_service
+
+
+class TestCsvChunks:
+    """Test incremental CSV parsing."""
+
+    def test_rows_are_chunked(self):
+        """Test chunk sizes, row indexes and quoted multi-line fields."""
+        stream = io.BytesIO(
+            "\ufeffofficial_product_name,official_description\n"
+            "A,one\n"
+            "B,\"two\nlines\"\n"
+            "C,three\n".encode("utf-8")
+        )
+
+        chunks = list(iter_csv_row_chunks(stream, chunk_size=2))
+
+        assert [len(chunk) for chunk in chunks] == [2, 1]
+        assert chunks[0][1] == (1, {"official_product_name": "B", "official_description": "two\nlines"})
+        assert chunks[1][0][0] == 2
+
+
+class TestBulkIngest:
+    """Test chunked ingestion of CSV uploads."""
+
+    @pytest.mark.asyncio
+    async def test_chunks_are_inserted_per_transaction(self, service, sessions):
+        """Test that valid rows are inserted chunk by chunk and invalid rows reported."""
+        upload = await service.start_bulk_upload("brand_001", "catalogue.csv", "user_001")
+        csv_stream = make_csv([
+            "Runner,Running shoe,shoes,10,20",
+            "Bad price,Cheap shoe,shoes,30,20",
+            ",Missing name,shoes,,",
+            "Unknown category,Some shoe,spaceships,,",
+            "Trail,Trail shoe,shoes,,",
+            "Road,Road shoe,shoes,,"
+        ])
+
+        result = await service.ingest_products_csv("brand_001", upload["upload_id"], csv_stream, "user_001")
+
+        assert result.total_products == 6
+        assert result.successful_uploads == 3
+        assert result.failed_uploads == 3
+        assert sorted(error["product_index"] for error in result.errors) == [1, 2, 3]
+
+        # Upload and brand lookups, then one transaction per chunk with valid rows
+        insert_sessions = sessions[2:]
+        assert len(insert_sessions) == 2
+        assert all(session.commit.await_count == 1 for session in insert_sessions)
+        assert len(insert_sessions[0].add_all.call_args_list[0].args[0]) == 1
+        assert len(insert_sessions[1].add_all.call_args_list[0].args[0]) == 2
+        assert service.embedding_service.generate_text_embeddings_batch.await_count == 2
+
+        progress = await service.get_bulk_upload_progress("brand_001", upload["upload_id"])
+        assert progress["status"] == "completed"
+        assert progress["rows_processed"] == 6
+        assert progress["successful_uploads"] == 3
+        assert await service.get_bulk_upload_progress("brand_002", upload["upload_id"]) is None
+
+    @pytest.mark.asyncio
+    async def test_failed_chunk_reports_only_failing_rows(self, service, sessions, commit_errors):
+        """Test that a failed chunk is retried in halves and only the offending row fails."""
+        upload = await service.start_bulk_upload("brand_001", "catalogue.csv", "user_001")
+        # The first chunk fails, then its second row fails on its own
+        commit_errors.extend([RuntimeError("Duplicate entry"), None, RuntimeError("Duplicate entry")])
+        csv_stream = make_csv([f"Shoe {i},Running shoe,shoes,," for i in range(4)])
+
+        result = await service.ingest_products_csv(
+            "brand_001", upload["upload_id"], csv_stream, "user_001"
+        )
+
+        assert result.successful_uploads == 3
+        assert result.failed_uploads == 1
+        assert result.errors == [{"product_index": 1, "product_name": "Shoe 1", "error": "Duplicate entry"}]
+        assert len(result.uploaded_product_ids) == 3
+
+        # Upload and brand lookups, the failed chunk, its halves and the second chunk
+        assert len(sessions) == 2 + 3 + 1
+
+    @pytest.mark.asyncio
+    async def test_rows_beyond_max_products_are_rejected(self, service):
+        """Test that rows past the product limit are counted under one error and the upload completes."""
+        service.settings.brand_bulk_upload_max_products = 3
+        upload = await service.start_bulk_upload("brand_001", "catalogue.csv", "user_001")
+        csv_stream = make_csv([f"Shoe {i},Running shoe,shoes,," for i in range(5)])
+
+        with patch.object(service, "_finish_bulk_upload", AsyncMock()) as finish:
+            result = await service.ingest_products_csv(
+                "brand_001", upload["upload_id"], csv_stream, "user_001"
+            )
+
+        assert result.successful_uploads == 3
+        assert result.failed_uploads == 2
+        assert [error["product_index"] for error in result.errors] == [3]
+        assert result.errors[0]["error"].startswith("2 rows beyond the maximum of 3")
+        finish.assert_awaited_once()
+
+        progress = await service.get_bulk_upload_progress("brand_001", upload["upload_id"])
+        assert progress["status"] == "completed"
+        assert progress["rows_processed"] == 5
+
+    @pytest.mark.asyncio
+    async def test_row_errors_are_capped(self, service):
+        """Test that only the first row errors are kept while every failure is counted."""
+        upload = await service.start_bulk_upload("brand_001", "catalogue.csv", "user_001")
+        csv_stream = make_csv([f"Shoe {i},Running shoe,spaceships,," for i in range(5)])
+
+        with patch(
+            "src.counterfeit_detection.services.brand_product_service.MAX_BULK_UPLOAD_ERRORS", 2
+        ):
+            result = await service.ingest_products_csv(
+                "brand_001", upload["upload_id"], csv_stream, "user_001"
+            )
+
+        assert result.failed_uploads == 5
+        assert [error["product_index"] for error in result.errors] == [0, 1]
+
+        progress = await service.get_bulk_upload_progress("brand_001", upload["upload_id"])
+        assert progress["failed_uploads"] == 5
+        assert len(progress["errors"]) == 2
@@ -0,0 +1,134 @@
+"""
+Tests for the tiered embedding cache.
+"""
+
+import os
+import time
+
+import numpy as np
+import pytest
+
+from src.counterfeit_detection.services.embedding_cache import (
+    DiskEmbeddingStore,
+    EmbeddingCache,
+    MemoryEmbeddingStore
+)
+
+
+class TestMemoryEmbeddingStore:
+    """Test the byte-bounded LRU tier."""
+    
+    def test_evicts_least_recently_used_over_budget(self):
+        """Test that the oldest untouched entry is evicted first."""
+        store = MemoryEmbeddingStore(max_bytes=3 * 4 * 4)  # three 4-dim float32 vectors
+        for key in ("a", "b", "c"):
+            store.put(key, np.ones(4, dtype=np.float32))
+        
+        store.get("a")  # "b" becomes least recently used
+        store.put("d", np.ones(4, dtype=np.float32))
+        
+        assert "b" not in store
+        assert {"a", "c", "d"} <= set(store._entries)
+        assert store.evictions == 1
+        assert store.size_bytes == 48
+    
+    def test_replacing_entry_keeps_byte_count(self):
+        """Test that overwriting a key does not double count its bytes."""
+        store = MemoryEmbeddingStore(max_bytes=1024)
+        store.put("a", np.ones(4, dtype=np.float32))
+        store.put("a", np.zeros(4, dtype=np.float32))
+        
+        assert len(store) == 1
+        assert store.size_bytes == 16
+
+
+class TestDiskEmbeddingStore:
+    """Test the on-disk tier's size and age bounds."""
+    
+    def test_prunes_least_recently_used_over_budget(self, tmp_path):
+        """Test that the oldest files are removed once the byte cap is exceeded."""
+        store = DiskEmbeddingStore(str(tmp_path), "text:test:4", max_bytes=3 * 144)
+        for age, key in enumerate(("c", "b", "a")):
+            store.put(key, np.ones(4, dtype=np.float32))
+            os.utime(store._file_path(key), (time.time() - age * 60, time.time() - age * 60))
+        
+        store.put("d", np.ones(4, dtype=np.float32))
+        store.prune()
+        
+        assert store.get("a") is None
+        assert store.get("d") is not None
+        assert sum(path.stat().st_size for path in store.path.glob("*/*.npy")) <= 3 * 144
+        assert store.evictions >= 1
+    
+    def test_expired_entries_are_dropped(self, tmp_path):
+        """Test that entries older than the TTL read as misses and are removed."""
+        store = DiskEmbeddingStore(str(tmp_path), "text:test:4", ttl_seconds=60)
+        store.put("old", np.ones(4, dtype=np.float32))
+        store.put("new", np.ones(4, dtype=np.float32))
+        stale = time.time() - 120
+        os.utime(store._file_path("old"), (stale, stale))
+        
+        assert store.get("old") is None
+        assert not store._file_path("old").exists()
+        assert store.get("new") is not None
+
+
+class TestEmbeddingCache:
+    """Test tier promotion and statistics."""
+    
+    @pytest.fixture
+    def disk_store(self, tmp_path):
+        """Create an on-disk tier in a temporary directory."""
+        return DiskEmbeddingStore(str(tmp_path), "text:test:4")
+    
+    def test_local_round_trip_stores_float32(self):
+        """Test that embeddings are stored as float32 arrays."""
+        cache = EmbeddingCache("text:test:4", MemoryEmbeddingStore(1024))
+        
+        cache.put_local("key", [0.1, 0.2, 0.3, 0.4])
+        value = cache.get_local("key")
+        
+        assert value.dtype == np.float32
+        assert value.tolist() == pytest.approx([0.1, 0.2, 0.3, 0.4])
+        assert cache.get_stats()["hits"] == 1
+    
+    def test_disk_tier_survives_new_process_cache(self, disk_store):
+        """Test that a fresh memory tier is refilled from disk."""
+        EmbeddingCache("text:test:4", MemoryEmbeddingStore(1024), disk=disk_store).put_local(
+            "key", [1.0, 2.0, 3.0, 4.0]
+        )
+        restarted = EmbeddingCache("text:test:4", MemoryEmbeddingStore(1024), disk=disk_store)
+        
+        value = restarted.get_local("key")
+        
+        assert value.tolist() == [1.0, 2.0, 3.0, 4.0]
+        assert "key" in restarted
+        assert restarted.get_stats()["disk_hits"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_get_many_counts_misses(self):
+        """Test batch lookups without a remote tier."""
+        cache = EmbeddingCache("text:test:4", MemoryEmbeddingStore(1024))
+        await cache.put("present", [1.0, 0.0, 0.0, 0.0])
+        
+        results = await cache.get_many(["present", "absent"])
+        
+        assert results["absent"] is None
+        assert results["present"] is not None
+        stats = cache.get_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_async_round_trip_through_disk(self, disk_store):
+        """Test that async writes reach disk and async reads refill memory from it."""
+        await EmbeddingCache("text:test:4", MemoryEmbeddingStore(1024), disk=disk_store).put_many({
+            "key": [1.0, 2.0, 3.0, 4.0]
+        })
+        restarted = EmbeddingCache("text:test:4", MemoryEmbeddingStore(1024), disk=disk_store)
+        
+        results = await restarted.get_many(["key", "absent"])
+        
+        assert results["key"].tolist() == [1.0, 2.0, 3.0, 4.0]
+        assert results["absent"] is None
+        assert restarted.get_stats()["disk_hits"] == 1
@@ -10,6 +10,16 @@ import pytest
 from PIL import Image
 
 from src.counterfeit_detection.services.embedding_service import EmbeddingService
+from src.counterfeit_detection.services.embedding_cache import reset_embedding_caches
+from src.counterfeit_detection.services.image_embedding_executor import ImageEmbeddingExecutor
+
+
+@pytest.fixture(autouse=True)
+def isolated_embedding_caches():
+    """Give every test fresh process-wide embedding caches."""
+    reset_embedding_caches()
+    yield
+    reset_embedding_caches()
 
 
 class TestEmbeddingService:
@@ -42,6 +52,13 @@ class TestEmbeddingService:
         """Create embedding service with mocked dependencies."""
         return EmbeddingService(openai_client=mock_openai_client)
     
+    @pytest.fixture
+    def pooled_embedding_service(self, mock_openai_client, mock_clip_model):
+        """Create embedding service whose image executor runs in-process."""
+        mock_clip_model.encode.side_effect = lambda images, **kwargs: [[0.1] * 512 for _ in images]
+        executor = ImageEmbeddingExecutor(workers=0, batch_window_ms=5, model=mock_clip_model)
+        return EmbeddingService(openai_client=mock_openai_client, image_executor=executor)
+    
     @pytest.fixture
     def sample_image_data(self):
         """Create sample image data."""
@@ -86,6 +103,126 @@ class TestEmbeddingService:
         # Should only call OpenAI once due to caching
         mock_openai_client.embeddings.create.assert_called_once()
     
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_share_one_api_call(self, embedding_service, mock_openai_client):
+        """Test that concurrent single-text requests are micro-batched."""
+        def mock_create_embedding(**kwargs):
+            inputs = kwargs['input'] if isinstance(kwargs['input'], list) else [kwargs['input']]
+            mock_response = MagicMock()
+            mock_response.data = [MagicMock() for _ in inputs]
+            for i, data in enumerate(mock_response.data):
+                data.embedding = [float(i + 1)] * 1536
+            return mock_response
+        
+        mock_openai_client.embeddings.create.side_effect = mock_create_embedding
+        texts = [f"Product description {i}" for i in range(10)]
+        
+        embeddings = await asyncio.gather(
+            *(embedding_service.generate_text_embedding(text) for text in texts)
+        )
+        
+        assert len(embeddings) == 10
+        assert [embedding[0] for embedding in embeddings] == [float(i + 1) for i in range(10)]
+        mock_openai_client.embeddings.create.assert_called_once()
+        assert mock_openai_client.embeddings.create.call_args.kwargs['input'] == texts
+        assert embedding_service.get_batcher_stats()['api_calls'] == 1
+    
+    @pytest.mark.asyncio
+    async def test_identical_in_flight_texts_single_flight(self, embedding_service, mock_openai_client):
+        """Test that identical concurrent texts are embedded once."""
+        text = "Duplicate listing description"
+        
+        embeddings = await asyncio.gather(
+            *(embedding_service.generate_text_embedding(text) for _ in range(5))
+        )
+        
+        assert all(embedding == embeddings[0] for embedding in embeddings)
+        mock_openai_client.embeddings.create.assert_called_once_with(
+            model="text-embedding-3-small",
+            input=text,
+            dimensions=1536
+        )
+        assert embedding_service.get_batcher_stats()['coalesced_requests'] == 4
+    
+    @pytest.mark.asyncio
+    async def test_micro_batch_flushes_at_batch_size(self, embedding_service, mock_openai_client):
+        """Test that a full batch is dispatched without waiting for the window."""
+        embedding_service.batch_size = 2
+        embedding_service.batch_window_seconds = 60
+        
+        def mock_create_embedding(**kwargs):
+            mock_response = MagicMock()
+            mock_response.data = [MagicMock() for _ in kwargs['input']]
+            for data in mock_response.data:
+                data.embedding = [0.1] * 1536
+            return mock_response
+        
+        mock_openai_client.embeddings.create.side_effect = mock_create_embedding
+        
+        embeddings = await asyncio.wait_for(
+            asyncio.gather(
+                embedding_service.generate_text_embedding("first"),
+                embedding_service.generate_text_embedding("second")
+            ),
+            timeout=1
+        )
+        
+        assert len(embeddings) == 2
+    
+    @pytest.mark.asyncio
+    async def test_rejected_text_fails_only_its_caller(self, embedding_service, mock_openai_client):
+        """Test that a batch rejected for one input is split so other callers succeed."""
+        class InvalidInputError(Exception):
+            status_code = 400
+        
+        def mock_create_embedding(**kwargs):
+            inputs = kwargs['input'] if isinstance(kwargs['input'], list) else [kwargs['input']]
+            if "oversized" in inputs:
+                raise InvalidInputError("maximum context length exceeded")
+            mock_response = MagicMock()
+            mock_response.data = [MagicMock() for _ in inputs]
+            for data in mock_response.data:
+                data.embedding = [0.1] * 1536
+            return mock_response
+        
+        mock_openai_client.embeddings.create.side_effect = mock_create_embedding
+        texts = ["first", "oversized", "third", "fourth"]
+        
+        results = await asyncio.gather(
+            *(embedding_service.generate_text_embedding(text) for text in texts),
+            return_exceptions=True
+        )
+        
+        assert isinstance(results[1], InvalidInputError)
+        assert all(len(results[i]) == 1536 for i in (0, 2, 3))
+        assert embedding_service.get_batcher_stats()['split_batches'] == 2
+    
+    @pytest.mark.asyncio
+    async def test_service_error_fails_batch_without_retries(self, embedding_service, mock_openai_client):
+        """Test that request-wide errors fail the batch in one call."""
+        mock_openai_client.embeddings.create.side_effect = ConnectionError("provider unavailable")
+        
+        results = await asyncio.gather(
+            *(embedding_service.generate_text_embedding(f"text {i}") for i in range(4)),
+            return_exceptions=True
+        )
+        
+        assert all(isinstance(result, ConnectionError) for result in results)
+        mock_openai_client.embeddings.create.assert_called_once()
+    
+    @pytest.mark.asyncio
+    async def test_text_cache_shared_between_instances(self, mock_openai_client):
+        """Test that separate service instances share the embedding cache."""
+        text = "Shared product description"
+        first_service = EmbeddingService(openai_client=mock_openai_client)
+        second_service = EmbeddingService(openai_client=mock_openai_client)
+        
+        await first_service.generate_text_embedding(text)
+        await second_service.generate_text_embedding(text)
+        
+        mock_openai_client.embeddings.create.assert_called_once()
+        assert second_service.get_cache_stats()['text_cache']['hits'] == 1
+    
     @pytest.mark.asyncio
     async def test_generate_text_embeddings_batch(self, embedding_service, mock_openai_client):
         """Test batch text embedding generation."""
@@ -164,15 +301,96 @@ class TestEmbeddingService:
         assert embeddings == []
     
     @pytest.mark.asyncio
-    async def test_process_product_embeddings(self, embedding_service, mock_clip_model, sample_image_data):
+    async def test_concurrent_image_requests_share_one_batch(self, pooled_embedding_service, mock_clip_model):
+        """Test that concurrent async image requests are encoded in one call."""
+        image_data_list = []
+        for color in ['red', 'green', 'blue']:
+            img = Image.new('RGB', (100, 100), color=color)
+            img_bytes = io.BytesIO()
+            img.save(img_bytes, format='PNG')
+            image_data_list.append(img_bytes.getvalue())
+        
+        embeddings = await asyncio.gather(*(
+            pooled_embedding_service.generate_image_embedding_async(image_data)
+            for image_data in image_data_list
+        ))
+        
+        assert len(embeddings) == 3
+        assert all(len(emb) == 512 for emb in embeddings)
+        mock_clip_model.encode.assert_called_once()
+        assert len(mock_clip_model.encode.call_args[0][0]) == 3
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_broken_pool_restarts_once(self, sample_image_data):
+        """Test that batches failing on the same broken pool share one replacement."""
+        from concurrent.futures import Executor, Future
+        from concurrent.futures.process import BrokenProcessPool
+
+        class FakePool(Executor):
+            def __init__(self, broken):
+                self.broken = broken
+                self.shut_down = False
+
+            def submit(self, fn, *args, **kwargs):
+                future = Future()
+                if self.broken:
+                    future.set_exception(BrokenProcessPool("worker died"))
+                else:
+                    future.set_result([[0.1] * 512 for _ in args[0]])
+                return future
+
+            def shutdown(self, wait=True, *, cancel_futures=False):
+                self.shut_down = True
+
+        broken_pool = FakePool(broken=True)
+        pools = [broken_pool]
+        executor = ImageEmbeddingExecutor(workers=2, batch_size=1)
+
+        def get_pool():
+            if executor._pool is None:
+                pools.append(FakePool(broken=False))
+                executor._pool = pools[-1]
+            return executor._pool
+
+        executor._pool = broken_pool
+        executor._get_pool = get_pool
+
+        embeddings = await asyncio.wait_for(
+            asyncio.gather(*(executor.embed(sample_image_data) for _ in range(3))),
+            timeout=5
+        )
+
+        assert len(embeddings) == 3
+        assert executor.get_stats()["pool_restarts"] == 1
+        assert len(pools) == 2
+        assert broken_pool.shut_down
+        assert not pools[1].shut_down
+
+    @pytest.mark.asyncio
+    async def test_image_batch_async_invalid_image_gets_zero_vector(self, pooled_embedding_service, sample_image_data):
+        """Test that one undecodable image does not fail the whole batch."""
+        embeddings = await pooled_embedding_service.generate_image_embeddings_batch_async(
+            [sample_image_data, b"not an image", sample_image_data]
+        )
+        
+        assert len(embeddings) == 3
+        assert embeddings[1] == [0.0] * 512
+        assert embeddings[0] == embeddings[2]
+        assert embeddings[0] != [0.0] * 512
+    
+    @pytest.mark.asyncio
+    async def test_image_embedding_async_invalid_image_raises(self, pooled_embedding_service):
+        """Test that a single undecodable image raises."""
+        with pytest.raises(ValueError):
+            await pooled_embedding_service.generate_image_embedding_async(b"not an image")
+    
+    @pytest.mark.asyncio
+    async def test_process_product_embeddings(self, pooled_embedding_service, sample_image_data):
         """Test processing both text and image embeddings for a product."""
         description = "Luxury leather handbag with premium materials"
         image_data_list = [sample_image_data]
         
-        # Mock clip model behavior
-        mock_clip_model.encode.return_value = [[0.1] * 512]
-        
-        text_embedding, image_embeddings = await embedding_service.process_product_embeddings(
+        text_embedding, image_embeddings = await pooled_embedding_service.process_product_embeddings(
             description, image_data_list
         )
         
@@ -203,10 +421,11 @@ class TestEmbeddingService:
         stats = embedding_service.get_cache_stats()
         
         expected_keys = {
-            'text_cache_size', 'image_cache_size', 'text_model', 
-            'text_dimensions', 'image_dimensions', 'batch_size'
+            'text_cache_size', 'image_cache_size', 'text_cache', 'image_cache',
+            'text_model', 'text_dimensions', 'image_dimensions', 'batch_size'
         }
         assert set(stats.keys()) == expected_keys
+        assert {'hits', 'misses', 'evictions', 'memory_bytes'} <= set(stats['text_cache'].keys())
         assert stats['text_dimensions'] == 1536
         assert stats['image_dimensions'] == 512
         assert stats['text_model'] == "text-embedding-3-small"
@@ -214,8 +433,8 @@ class TestEmbeddingService:
     def test_clear_cache(self, embedding_service):
         """Test cache clearing."""
         # Add some items to cache
-        embedding_service._text_cache['test'] = [0.1] * 1536
-        embedding_service._image_cache['test'] = [0.1] * 512
+        embedding_service._text_cache.put_local('test', [0.1] * 1536)
+        embedding_service._image_cache.put_local('test', [0.1] * 512)
         
         assert len(embedding_service._text_cache) == 1
         assert len(embedding_service._image_cache) == 1
@@ -0,0 +1,150 @@
+"""
+Tests for buffered Redis writes in the metrics collector.
+"""
+
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src.counterfeit_detection.services.metrics_collector import (
+    AnalysisEvent,
+    MetricsCollector,
+    acquire_shared_metrics_collector,
+    release_shared_metrics_collector
+)
+
+
+def make_event(flagged=False, processing_time_ms=100.0, category="electronics"):
+    """Create an analysis event."""
+    return AnalysisEvent(
+        product_id="product_001",
+        analysis_id="analysis_001",
+        authenticity_score=0.3 if flagged else 0.9,
+        processing_time_ms=processing_time_ms,
+        category=category,
+        supplier_id="supplier_001",
+        timestamp=datetime(2024, 1, 15, 12, 30),
+        flagged=flagged,
+        confidence_score=0.8
+    )
+
+
+@pytest.fixture
+def pipeline():
+    """Mock Redis pipeline recording queued commands."""
+    pipe = MagicMock()
+    pipe.execute = AsyncMock(return_value=[])
+    return pipe
+
+
+@pytest.fixture
+def collector(pipeline):
+    """Metrics collector on a mock Redis client."""
+    collector = MetricsCollector(redis_batch_size=1000)
+    collector.redis_client = MagicMock()
+    collector.redis_client.pipeline.return_value = pipeline
+    return collector
+
+
+class TestRedisBuffering:
+    """Test coalescing and pipelined flushing of Redis writes."""
+
+    @pytest.mark.asyncio
+    async def test_events_do_not_hit_redis_until_flush(self, collector, pipeline):
+        """Test that recording only updates local buffers."""
+        for _ in range(3):
+            await collector.record_analysis_event(make_event(flagged=True))
+
+        collector.redis_client.pipeline.assert_not_called()
+        assert collector._pending_counters[("metrics:daily:2024-01-15", "total_analyzed")] == 3
+
+    @pytest.mark.asyncio
+    async def test_flush_coalesces_into_one_pipeline(self, collector, pipeline):
+        """Test that repeated increments become one command per counter."""
+        for i in range(10):
+            await collector.record_analysis_event(make_event(flagged=i % 2 == 0, processing_time_ms=10.0))
+
+        await collector._flush_redis()
+
+        collector.redis_client.pipeline.assert_called_once_with(transaction=False)
+        pipeline.execute.assert_awaited_once()
+        pipeline.hincrby.assert_any_call("metrics:daily:2024-01-15", "total_analyzed", 10)
+        pipeline.hincrby.assert_any_call("metrics:daily:2024-01-15", "flagged_products", 5)
+        pipeline.hincrby.assert_any_call("metrics:category:electronics:2024-01-15", "flagged_count", 5)
+
+        bucket_key = f"metrics:bucket:authenticity_analyzer:analysis_time:{collector._minute(make_event().timestamp)}"
+        pipeline.hincrby.assert_any_call(bucket_key, "count", 10)
+        pipeline.hincrbyfloat.assert_called_once_with(bucket_key, "sum", 100.0)
+        assert pipeline.setex.call_count == 1
+        assert pipeline.expire.call_count == 3
+        assert collector._pending_writes == 0
+
+    @pytest.mark.asyncio
+    async def test_size_trigger_flushes_in_background(self, collector, pipeline):
+        """Test that reaching the batch size starts a flush."""
+        collector.redis_batch_size = 5
+
+        await collector.record_analysis_event(make_event())
+        await collector._redis_flush_task
+
+        pipeline.execute.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_snapshot_reads_buckets_in_one_pipeline(self, collector, pipeline):
+        """Test that the snapshot aggregates bucket counts and sums."""
+        window = collector.SNAPSHOT_WINDOW_MINUTES
+        results = []
+        for component in collector.SNAPSHOT_SERIES:
+            if component == "authenticity_analyzer":
+                results.extend([[b"4", b"400.0"], [b"6", b"200.0"]] + [[None, None]] * (window - 2))
+                results.append(b'{"status": "healthy"}')
+            else:
+                results.extend([[None, None]] * window)
+                results.append(None)
+        pipeline.execute.return_value = results
+
+        snapshot = await collector.get_performance_snapshot()
+
+        collector.redis_client.pipeline.assert_called_once_with(transaction=False)
+        assert snapshot.response_times["authenticity_analyzer"] == 60.0
+        assert snapshot.throughput["authenticity_analyzer"] == 10 / window
+        assert snapshot.agent_status["authenticity_analyzer"] == "healthy"
+        assert snapshot.response_times["api_server"] == 0
+        assert snapshot.agent_status["api_server"] == "unknown"
+
+    @pytest.mark.asyncio
+    async def test_round_trips_do_not_grow_with_records(self, collector, pipeline):
+        """Test that a burst of records costs one pipelined round trip, not one per record."""
+        collector.redis_batch_size = 100
+
+        for _ in range(2000):
+            await collector.record_analysis_event(make_event(flagged=True))
+        await collector._redis_flush_task
+        await collector._flush_redis()
+
+        assert collector.redis_client.pipeline.call_count == 1
+        pipeline.execute.assert_awaited_once()
+        pipeline.hincrby.assert_any_call("metrics:daily:2024-01-15", "total_analyzed", 2000)
+        collector.redis_client.hincrby.assert_not_called()
+        collector.redis_client.setex.assert_not_called()
+
+
+class TestSharedCollector:
+    """Test the process-wide collector shared by agents."""
+
+    @pytest.mark.asyncio
+    async def test_one_collector_started_and_stopped_with_last_user(self):
+        """Test that concurrent users share one started collector."""
+        with patch.object(MetricsCollector, "start", new_callable=AsyncMock) as start, \
+             patch.object(MetricsCollector, "stop", new_callable=AsyncMock) as stop:
+            first = await acquire_shared_metrics_collector("redis://localhost:6379")
+            second = await acquire_shared_metrics_collector("redis://localhost:6379")
+
+            assert first is second
+            start.assert_awaited_once()
+
+            await release_shared_metrics_collector()
+            stop.assert_not_awaited()
+            await release_shared_metrics_collector()
+            stop.assert_awaited_once()
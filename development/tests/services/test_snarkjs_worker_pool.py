@@ -0,0 +1,101 @@
+"""
+Tests for the resident snarkjs worker pool.
+
+The Node worker is replaced by a Python script speaking the same
+line-delimited JSON protocol.
+"""
+
+import sys
+
+import pytest
+
+from src.counterfeit_detection.services import snarkjs_worker_pool
+from src.counterfeit_detection.services.snarkjs_worker_pool import (
+    SnarkjsWorkerError,
+    SnarkjsWorkerPool,
+    SnarkjsWorkerUnavailable
+)
+
+
+FAKE_WORKER = r'''
+import json
+import os
+import sys
+
+for line in sys.stdin:
+    request = json.loads(line)
+    op = request["op"]
+    if op == "verify":
+        response = {"id": request["id"], "ok": True, "result": request["proof"].get("valid", False)}
+    elif op == "fullprove":
+        response = {"id": request["id"], "ok": True, "result": {"proof": {"pi_a": []}, "public_signals": [request["input"]["x"]]}}
+    elif op == "crash":
+        os._exit(1)
+    else:
+        response = {"id": request["id"], "ok": False, "error": "Unknown op: " + op}
+    sys.stdout.write(json.dumps(response) + "\n")
+    sys.stdout.flush()
+'''
+
+
+@pytest.fixture
+async def worker_pool(tmp_path, monkeypatch):
+    """Pool running the fake worker."""
+    monkeypatch.setattr(snarkjs_worker_pool, "WORKER_SCRIPT", FAKE_WORKER)
+    pool = SnarkjsWorkerPool(
+        workers=2,
+        node_binary=sys.executable,
+        request_timeout_seconds=10,
+        script_dir=str(tmp_path)
+    )
+    yield pool
+    await pool.close()
+
+
+class TestSnarkjsWorkerPool:
+    """Test SnarkjsWorkerPool functionality."""
+
+    @pytest.mark.asyncio
+    async def test_verify_many_pipelines_requests(self, worker_pool):
+        """Test that many proofs are verified by a fixed set of processes."""
+        requests = [("vkey.json", {"valid": i % 2 == 0}, [str(i)]) for i in range(50)]
+
+        outcomes = await worker_pool.verify_many(requests)
+
+        assert outcomes == [i % 2 == 0 for i in range(50)]
+        stats = worker_pool.get_stats()
+        assert stats["worker_starts"] == 2
+        assert stats["requests"] == 50
+        assert stats["in_flight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_full_prove(self, worker_pool):
+        """Test in-memory proof generation round trip."""
+        result = await worker_pool.full_prove("circuit.wasm", "circuit.zkey", {"x": "7"})
+
+        assert result["public_signals"] == ["7"]
+
+    @pytest.mark.asyncio
+    async def test_worker_error(self, worker_pool):
+        """Test that rejected requests raise SnarkjsWorkerError."""
+        with pytest.raises(SnarkjsWorkerError) as exc_info:
+            await worker_pool._request({"op": "unknown"})
+
+        assert not isinstance(exc_info.value, SnarkjsWorkerUnavailable)
+
+    @pytest.mark.asyncio
+    async def test_worker_restarts_after_exit(self, worker_pool):
+        """Test that a crashed worker fails its requests and is restarted."""
+        with pytest.raises(SnarkjsWorkerUnavailable):
+            await worker_pool._request({"op": "crash"})
+
+        assert await worker_pool.verify("vkey.json", {"valid": True}, [])
+        assert worker_pool.get_stats()["worker_exits"] >= 1
+
+    @pytest.mark.asyncio
+    async def test_missing_binary(self, tmp_path):
+        """Test that an unavailable Node binary raises SnarkjsWorkerUnavailable."""
+        pool = SnarkjsWorkerPool(workers=1, node_binary=str(tmp_path / "missing-node"), script_dir=str(tmp_path))
+
+        with pytest.raises(SnarkjsWorkerUnavailable):
+            await pool.verify("vkey.json", {}, [])
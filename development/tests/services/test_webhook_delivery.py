@@ -0,0 +1,298 @@
+"""
+Tests for the webhook delivery engine.
+"""
+
+import asyncio
+import random
+
+import pytest
+import pytest_asyncio
+
+from src.counterfeit_detection.models.enums import WebhookStatus
+from src.counterfeit_detection.services.webhook_delivery import (
+    CircuitBreaker,
+    WebhookDeliveryEngine
+)
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def respond_with(engine, responses):
+    """Replace HTTP attempts with scripted status codes per URL."""
+    calls = []
+
+    async def execute(attempt, payload_str):
+        calls.append(attempt.url)
+        response = responses[attempt.url]
+        if isinstance(response, asyncio.Event):
+            await response.wait()
+            attempt.status_code = 200
+        elif isinstance(response, list):
+            attempt.status_code = response.pop(0)
+        else:
+            attempt.status_code = response
+
+    engine._execute_attempt = execute
+    return calls
+
+
+def submit(engine, url, user_id=None, fail_fast=False):
+    """Submit a delivery with minimal headers."""
+    return engine.submit(
+        url,
+        {"event_type": "test"},
+        '{"event_type":"test"}',
+        {"X-Webhook-ID": f"wh-{url}"},
+        {"user_id": user_id, "alert_id": "alert_001"} if user_id else None,
+        fail_fast=fail_fast
+    )
+
+
+@pytest_asyncio.fixture
+async def engine():
+    """Engine without backoff delays."""
+    engine = WebhookDeliveryEngine(
+        max_attempts=3,
+        retry_base_delay_seconds=0,
+        log_batch_size=1000
+    )
+    yield engine
+    engine._pending_logs = []
+    await engine.close()
+
+
+class TestRetryDelay:
+    """Test the backoff schedule."""
+
+    def test_jittered_exponential_backoff(self):
+        """Test that delays double per attempt, are capped and jittered."""
+        engine = WebhookDeliveryEngine(
+            retry_base_delay_seconds=1,
+            retry_max_delay_seconds=10,
+            rng=random.Random(42)
+        )
+
+        for attempt_number, ceiling in [(1, 1), (2, 2), (3, 4), (4, 8), (5, 10), (9, 10)]:
+            delays = [engine._retry_delay(attempt_number) for _ in range(50)]
+            assert all(ceiling / 2 <= delay <= ceiling for delay in delays)
+            assert len(set(delays)) > 1
+
+
+class TestCircuitBreaker:
+    """Test CircuitBreaker state transitions."""
+
+    def test_opens_after_consecutive_failures(self):
+        """Test that the threshold of consecutive failures opens the circuit."""
+        breaker = CircuitBreaker(failure_threshold=3, reset_timeout_seconds=30, clock=FakeClock())
+
+        breaker.record_failure()
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        breaker.record_failure()
+        assert breaker.allow_request()
+
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+        assert not breaker.allow_request()
+        assert breaker.retry_after() == 30
+
+    def test_half_open_allows_single_probe(self):
+        """Test that one probe is let through after the reset timeout."""
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout_seconds=30, clock=clock)
+        breaker.record_failure()
+
+        clock.now = 30
+        assert breaker.allow_request()
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        assert not breaker.allow_request()
+
+        # Failed probe re-opens the circuit
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+        assert not breaker.allow_request()
+
+        clock.now = 60
+        assert breaker.allow_request()
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+        assert breaker.allow_request()
+
+
+class TestDelivery:
+    """Test submitting and delivering webhooks."""
+
+    @pytest.mark.asyncio
+    async def test_submit_returns_before_delivery(self, engine):
+        """Test that a slow endpoint does not block submission or other hosts."""
+        slow_endpoint = asyncio.Event()
+        respond_with(engine, {
+            "https://slow.example.com/hook": slow_endpoint,
+            "https://fast.example.com/hook": 200
+        })
+
+        slow = submit(engine, "https://slow.example.com/hook")
+        fast = submit(engine, "https://fast.example.com/hook")
+        assert slow.final_status == WebhookStatus.PENDING
+
+        await asyncio.wait_for(fast.wait(), 1)
+        assert fast.is_successful()
+        assert not slow.is_complete()
+
+        slow_endpoint.set()
+        await asyncio.wait_for(slow.wait(), 1)
+        assert slow.is_successful()
+
+    @pytest.mark.asyncio
+    async def test_failed_attempt_is_retried(self, engine):
+        """Test that a failed attempt is re-attempted by the scheduler."""
+        calls = respond_with(engine, {"https://api.example.com/hook": [503, 200]})
+
+        result = await asyncio.wait_for(submit(engine, "https://api.example.com/hook").wait(), 1)
+
+        assert result.is_successful()
+        assert [attempt.status_code for attempt in result.attempts] == [503, 200]
+        assert len(calls) == 2
+        assert engine.stats["retries_scheduled"] == 1
+
+    @pytest.mark.asyncio
+    async def test_client_error_is_final(self, engine):
+        """Test that non-retryable responses fail without retries and are logged."""
+        respond_with(engine, {"https://api.example.com/hook": 404})
+
+        result = await asyncio.wait_for(
+            submit(engine, "https://api.example.com/hook", user_id="user_001").wait(), 1
+        )
+
+        assert result.final_status == WebhookStatus.FAILED
+        assert len(result.attempts) == 1
+        log_entry = engine._pending_logs[0]
+        assert log_entry["user_id"] == "user_001"
+        assert log_entry["notification_type"] == "webhook"
+        assert log_entry["payload"]["attempts"] == 1
+        assert log_entry["error_message"] == "HTTP 404"
+
+    @pytest.mark.asyncio
+    async def test_exhausted_attempts_fail(self, engine):
+        """Test that a delivery fails after max attempts."""
+        respond_with(engine, {"https://api.example.com/hook": 500})
+
+        result = await asyncio.wait_for(submit(engine, "https://api.example.com/hook").wait(), 1)
+
+        assert result.final_status == WebhookStatus.FAILED
+        assert len(result.attempts) == 3
+
+    @pytest.mark.asyncio
+    async def test_open_circuit_defers_without_spending_attempts(self, engine):
+        """Test that deliveries to a host with an open circuit are rescheduled."""
+        calls = respond_with(engine, {
+            "https://down.example.com/a": 500,
+            "https://down.example.com/b": 500,
+            "https://down.example.com/c": 200
+        })
+        engine.max_attempts = 1
+        engine.circuit_failure_threshold = 2
+
+        await submit(engine, "https://down.example.com/a").wait()
+        await submit(engine, "https://down.example.com/b").wait()
+
+        deferred = submit(engine, "https://down.example.com/c")
+        await asyncio.sleep(0.01)
+
+        assert "https://down.example.com/c" not in calls
+        assert not deferred.attempts
+        assert engine.stats["short_circuited"] == 1
+        assert engine.get_stats()["open_circuits"] == ["down.example.com"]
+
+    @pytest.mark.asyncio
+    async def test_open_circuit_fails_delivery_past_deadline(self, engine):
+        """Test that a delivery stops waiting on an open circuit after the max deferral."""
+        respond_with(engine, {
+            "https://down.example.com/a": 500,
+            "https://down.example.com/b": 200
+        })
+        engine.max_attempts = 1
+        engine.circuit_failure_threshold = 1
+        engine.max_deferral_seconds = 10
+
+        await submit(engine, "https://down.example.com/a").wait()
+        result = await asyncio.wait_for(
+            submit(engine, "https://down.example.com/b", user_id="user_001").wait(), 1
+        )
+
+        assert result.final_status == WebhookStatus.FAILED
+        assert not result.attempts
+        assert result.error_message == "Circuit open for down.example.com"
+        assert engine.stats["circuit_open_failures"] == 1
+        assert engine._pending_logs[-1]["error_message"] == "Circuit open for down.example.com"
+
+    @pytest.mark.asyncio
+    async def test_fail_fast_delivery_does_not_wait_on_open_circuit(self, engine):
+        """Test that interactive deliveries fail at once while the circuit is open."""
+        respond_with(engine, {
+            "https://down.example.com/a": 500,
+            "https://down.example.com/test": 200
+        })
+        engine.max_attempts = 1
+        engine.circuit_failure_threshold = 1
+        engine.circuit_reset_seconds = 1
+        engine.max_deferral_seconds = 3600
+
+        await submit(engine, "https://down.example.com/a").wait()
+        queued = submit(engine, "https://down.example.com/a")
+        result = await asyncio.wait_for(
+            submit(engine, "https://down.example.com/test", fail_fast=True).wait(), 1
+        )
+
+        assert result.final_status == WebhookStatus.FAILED
+        assert result.error_message == "Circuit open for down.example.com"
+        assert not queued.is_complete()
+
+    @pytest.mark.asyncio
+    async def test_rejected_probe_closes_circuit(self, engine):
+        """Test that a 4xx answer to a half-open probe closes the circuit."""
+        calls = respond_with(engine, {
+            "https://flaky.example.com/a": 500,
+            "https://flaky.example.com/b": 404,
+            "https://flaky.example.com/c": 200
+        })
+        engine.max_attempts = 1
+        engine.circuit_failure_threshold = 1
+        engine.circuit_reset_seconds = 0
+
+        await submit(engine, "https://flaky.example.com/a").wait()
+        probe = await asyncio.wait_for(submit(engine, "https://flaky.example.com/b").wait(), 1)
+        result = await asyncio.wait_for(submit(engine, "https://flaky.example.com/c").wait(), 1)
+
+        assert probe.final_status == WebhookStatus.FAILED
+        assert result.is_successful()
+        assert engine.get_stats()["open_circuits"] == []
+        assert len(calls) == 3
+
+    @pytest.mark.asyncio
+    async def test_close_completes_unfinished_deliveries(self, engine):
+        """Test that shutdown fails in-flight and queued deliveries instead of hanging."""
+        respond_with(engine, {
+            "https://slow.example.com/hook": asyncio.Event(),
+            "https://retry.example.com/hook": 503
+        })
+        engine.retry_base_delay_seconds = 60
+
+        in_flight = submit(engine, "https://slow.example.com/hook")
+        queued = submit(engine, "https://retry.example.com/hook", user_id="user_001")
+        await asyncio.sleep(0.01)
+
+        await engine.close()
+
+        for result in (in_flight, queued):
+            await asyncio.wait_for(result.wait(), 1)
+            assert result.final_status == WebhookStatus.FAILED
@@ -0,0 +1,3 @@
+"""
+Tests for utility modules.
+"""
@@ -0,0 +1,80 @@
+"""
+Tests for the multi-pattern keyword matcher.
+"""
+
+from src.counterfeit_detection.utils.keyword_matcher import KeywordMatcher, normalize_text
+
+
+class TestKeywordMatcher:
+    """Test KeywordMatcher functionality."""
+
+    def test_overlapping_and_nested_keywords(self):
+        """Test that keywords sharing text are all found in one pass."""
+        matcher = KeywordMatcher()
+        matcher.add("fake", "fake")
+        matcher.add("fake_rolex", "fake rolex")
+        matcher.add("ake", "ake")
+        matcher.add("rolex", "rolex")
+        matcher.add("missing", "replica")
+
+        found = matcher.compile().find("Buy a FAKE Rolex today")
+
+        assert found == {"fake", "fake_rolex", "ake", "rolex"}
+
+    def test_case_sensitive(self):
+        """Test that case-sensitive keywords require exact case."""
+        matcher = KeywordMatcher()
+        matcher.add("upper", "AAA", case_sensitive=True)
+        matcher.add("lower", "aaa", case_sensitive=True)
+
+        assert matcher.find("AAA quality") == {"upper"}
+
+    def test_word_boundary(self):
+        """Test whole-word matching."""
+        matcher = KeywordMatcher()
+        matcher.add("word", "rep", word_boundary=True)
+        matcher.add("substring", "rep")
+
+        assert matcher.find("genuine representation") == {"substring"}
+        assert matcher.find("1:1 rep, best price") == {"word", "substring"}
+
+    def test_leet_speak(self):
+        """Test that leet-speak spellings match."""
+        matcher = KeywordMatcher()
+        matcher.add("replica", "replica", leet_speak=True)
+
+        assert matcher.find("top r3pl1c4 watch") == {"replica"}
+
+    def test_fuzzy(self):
+        """Test that separators inside a keyword are ignored."""
+        matcher = KeywordMatcher()
+        matcher.add("replica", "replica", fuzzy=True)
+        matcher.add("strict", "replica")
+
+        assert matcher.find("r.e.p-l i_c.a handbag") == {"replica"}
+
+    def test_empty_keyword_always_matches(self):
+        """Test that an empty keyword behaves like a substring check."""
+        matcher = KeywordMatcher()
+        matcher.add("empty", "")
+
+        assert matcher.find("anything") == {"empty"}
+        assert len(matcher) == 1
+
+    def test_normalize_text(self):
+        """Test the normalisation helper."""
+        assert normalize_text("R3PL!CA", leet_speak=True) == "replica"
+        assert normalize_text("A.b-C", case_sensitive=True, fuzzy=True) == "AbC"
+
+    def test_many_keywords(self):
+        """Test that one scan finds exactly the matching keywords among many."""
+        matcher = KeywordMatcher()
+        for i in range(900):
+            matcher.add(i, f"keyword{i} term", word_boundary=i % 2 == 0)
+        matcher.compile()
+
+        text = "Premium leather handbag with keyword42 term, xkeyword7 term and keyword420 terms " * 5
+
+        # Even keywords need word boundaries, odd keywords match inside words
+        assert matcher.find(text) == {42, 7}
+        assert matcher.find("Premium leather handbag with original packaging") == set()
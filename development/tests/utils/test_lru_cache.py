@@ -0,0 +1,123 @@
+"""
+Tests for the shared LRU+TTL cache.
+"""
+
+import asyncio
+
+import pytest
+
+from src.counterfeit_detection.utils.lru_cache import LRUCache
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestLRUCache:
+    """Test LRUCache functionality."""
+
+    def test_evicts_least_recently_used(self):
+        """Test that a lookup protects an entry from eviction."""
+        cache = LRUCache(max_entries=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+
+        assert cache.get("a") == 1
+        cache.set("c", 3)
+
+        assert "a" in cache
+        assert "b" not in cache
+        assert cache.evictions == 1
+
+    def test_byte_budget(self):
+        """Test eviction by total size and rejection of oversized values."""
+        cache = LRUCache(max_bytes=10, size_of=len)
+        cache.set("a", "xxxx")
+        cache.set("b", "yyyy")
+        cache.set("c", "zzzz")
+
+        assert "a" not in cache
+        assert cache.size_bytes == 8
+
+        cache.set("huge", "x" * 11)
+        assert "huge" not in cache
+        assert cache.size_bytes == 8
+
+    def test_ttl_expiry(self):
+        """Test default and per-entry TTLs."""
+        clock = FakeClock()
+        cache = LRUCache(default_ttl_seconds=10, clock=clock)
+        cache.set("default", 1)
+        cache.set("short", 2, ttl_seconds=1)
+
+        clock.now = 5
+        assert cache.get("short") is None
+        assert cache.get("default") == 1
+
+        clock.now = 10
+        assert cache.get("default") is None
+        assert cache.expirations == 2
+        assert len(cache) == 0
+
+    def test_purge_expired(self):
+        """Test bulk removal of expired entries."""
+        clock = FakeClock()
+        cache = LRUCache(clock=clock)
+        cache.set("a", 1, ttl_seconds=1)
+        cache.set("b", 2)
+
+        clock.now = 2
+
+        assert cache.purge_expired() == 1
+        assert list(cache) == ["b"]
+
+    def test_stats(self):
+        """Test hit/miss counters."""
+        cache = LRUCache(max_entries=10)
+        cache.set("a", 1)
+        cache.get("a")
+        cache.get("missing")
+
+        stats = cache.get_stats()
+
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
+        assert stats["entries"] == 1
+
+    @pytest.mark.asyncio
+    async def test_get_or_load_single_flight(self):
+        """Test that concurrent misses share one loader call."""
+        cache = LRUCache(max_entries=10)
+        calls = 0
+
+        async def loader():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return "value"
+
+        results = await asyncio.gather(*(cache.get_or_load("key", loader) for _ in range(5)))
+
+        assert results == ["value"] * 5
+        assert calls == 1
+        assert cache.get("key") == "value"
+
+    @pytest.mark.asyncio
+    async def test_get_or_load_propagates_errors(self):
+        """Test that loader failures are raised and not cached."""
+        cache = LRUCache(max_entries=10)
+
+        async def failing_loader():
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            await cache.get_or_load("key", failing_loader)
+
+        assert "key" not in cache
@@ -0,0 +1,218 @@
+"""
+Tests for Merkle tree construction and the incremental (append-only) tree.
+"""
+
+import hashlib
+
+import pytest
+
+from src.counterfeit_detection.utils.merkle_tree import (
+    FileMerkleNodeStore,
+    IncrementalMerkleTree,
+    MerkleTree
+)
+
+
+def leaf(i: int) -> str:
+    """Deterministic leaf hash."""
+    return hashlib.sha256(f"entry-{i}".encode()).hexdigest()
+
+
+def reference_root(leaves):
+    """Recursive RFC 6962 MTH over raw leaf digests."""
+    if len(leaves) == 1:
+        return leaves[0]
+    split = 1 << ((len(leaves) - 1).bit_length() - 1)
+    return hashlib.sha256(
+        b"\x01" + reference_root(leaves[:split]) + reference_root(leaves[split:])
+    ).digest()
+
+
+def reference_proof_path(leaves, index):
+    """Proof path built level by level, as the tree did before level arrays."""
+    tree = MerkleTree()
+    path = []
+    level = leaves[:]
+    while len(level) > 1:
+        if index % 2:
+            path.append({"hash": level[index - 1], "is_left": True, "level": len(path)})
+        else:
+            sibling = level[index + 1] if index + 1 < len(level) else level[index]
+            path.append({"hash": sibling, "is_left": False, "level": len(path)})
+        if len(level) % 2:
+            level = level + [level[-1]]
+        level = [tree._combine_hashes(level[i], level[i + 1]) for i in range(0, len(level), 2)]
+        index //= 2
+    return path
+
+
+class TestMerkleTreeBatchProofs:
+    """Test single-pass proof generation for audit batches."""
+
+    @pytest.mark.parametrize("size", [1, 2, 3, 7, 8, 33])
+    def test_build_tree_with_proofs_matches_per_leaf_proofs(self, size):
+        """Test that every proof equals the level-by-level reference and verifies."""
+        tree = MerkleTree()
+        leaves = [leaf(i) for i in range(size)]
+
+        root, proof_data = tree.build_tree_with_proofs(leaves)
+
+        assert root == tree.build_tree(leaves)
+        assert proof_data["tree_size"] == size
+        for i in range(size):
+            proof_info = proof_data["leaf_proofs"][str(i)]
+            assert proof_info["proof_path"] == reference_proof_path(leaves, i)
+            assert proof_info["proof_path"] == tree.generate_proof(leaves, i).proof_path
+            assert tree.verify_proof(leaves[i], proof_data, root, i)
+
+    def test_threaded_levels_match_serial(self):
+        """Test that threaded level hashing produces the same tree."""
+        tree = MerkleTree()
+        leaves = [leaf(i) for i in range(1001)]
+
+        serial = tree.build_levels(leaves)
+        threaded = tree.build_levels(leaves, max_workers=4, parallel_threshold=16)
+
+        assert threaded == serial
+
+    def test_empty_batch(self):
+        """Test proofs for an empty batch."""
+        tree = MerkleTree()
+
+        assert tree.build_tree_with_proofs([]) == (tree.empty_hash, {})
+
+
+@pytest.fixture
+def tree():
+    """Tree with 37 leaves."""
+    tree = IncrementalMerkleTree()
+    for i in range(37):
+        tree.append_leaf(leaf(i))
+    return tree
+
+
+class TestIncrementalMerkleTree:
+    """Test IncrementalMerkleTree functionality."""
+
+    def test_roots_match_reference_at_every_size(self):
+        """Test that incremental roots equal a full recomputation."""
+        tree = IncrementalMerkleTree()
+        leaves = []
+
+        for i in range(70):
+            leaves.append(bytes.fromhex(leaf(i)))
+            root, index = tree.append_leaf(leaf(i))
+
+            assert index == i
+            assert root == reference_root(leaves).hex()
+
+        for size in range(1, 71):
+            assert tree.get_root_at_size(size) == reference_root(leaves[:size]).hex()
+
+    def test_empty_tree(self):
+        """Test root of an empty tree."""
+        tree = IncrementalMerkleTree()
+
+        assert tree.get_current_root() == hashlib.sha256(b"").hexdigest()
+        assert len(tree) == 0
+
+    def test_inclusion_proofs_at_all_sizes(self, tree):
+        """Test inclusion proofs for every leaf at every historical size."""
+        for size in range(1, len(tree) + 1):
+            for index in range(size):
+                proof = tree.get_proof_at_size(index, size)
+
+                assert proof.leaf_hash == leaf(index)
+                assert tree.verify_historical_proof(proof, size)
+
+    def test_inclusion_proof_rejects_tampering(self, tree):
+        """Test that modified proofs fail verification."""
+        proof = tree.get_inclusion_proof(12)
+        assert IncrementalMerkleTree.verify_inclusion_proof(proof)
+
+        proof.leaf_hash = leaf(13)
+        assert not IncrementalMerkleTree.verify_inclusion_proof(proof)
+
+        proof = tree.get_inclusion_proof(12)
+        proof.leaf_index = 13
+        assert not IncrementalMerkleTree.verify_inclusion_proof(proof)
+
+        proof = tree.get_inclusion_proof(12)
+        assert not IncrementalMerkleTree.verify_inclusion_proof(proof, tree.get_root_at_size(20))
+
+    def test_proof_size_is_logarithmic(self, tree):
+        """Test that proof paths do not grow linearly."""
+        for i in range(37, 4096):
+            tree.append_leaf(leaf(i))
+
+        proof = tree.get_inclusion_proof(1234)
+
+        assert len(proof.proof_path) == 12
+        assert IncrementalMerkleTree.verify_inclusion_proof(proof)
+
+    def test_consistency_proofs(self, tree):
+        """Test consistency proofs between every pair of sizes."""
+        for new_size in range(1, len(tree) + 1):
+            for old_size in range(1, new_size + 1):
+                proof = tree.get_consistency_proof(old_size, new_size)
+
+                assert IncrementalMerkleTree.verify_consistency_proof(proof)
+
+    def test_consistency_proof_rejects_wrong_root(self, tree):
+        """Test that a consistency proof does not verify against another history."""
+        proof = tree.get_consistency_proof(6, 37)
+        forged = IncrementalMerkleTree()
+        for i in range(6):
+            forged.append_leaf(leaf(i + 100))
+
+        assert not IncrementalMerkleTree.verify_consistency_proof(
+            proof, old_root=forged.get_current_root()
+        )
+
+    def test_invalid_arguments(self, tree):
+        """Test validation of indexes and sizes."""
+        with pytest.raises(ValueError):
+            tree.get_proof_at_size(5, 5)
+        with pytest.raises(ValueError):
+            tree.get_consistency_proof(0, 10)
+        with pytest.raises(ValueError):
+            tree.get_consistency_proof(10, 100)
+        with pytest.raises(ValueError):
+            tree.append_leaf("abcd")
+
+    def test_file_store_resumes_tree(self, tmp_path):
+        """Test that a file-backed tree reopens with the same state."""
+        store = FileMerkleNodeStore(str(tmp_path))
+        tree = IncrementalMerkleTree(store)
+        for i in range(45):
+            tree.append_leaf(leaf(i))
+        root = tree.get_current_root()
+        store.close()
+
+        reopened = IncrementalMerkleTree(FileMerkleNodeStore(str(tmp_path)))
+
+        assert len(reopened) == 45
+        assert reopened.get_current_root() == root
+
+        new_root, index = reopened.append_leaf(leaf(45))
+        leaves = [bytes.fromhex(leaf(i)) for i in range(46)]
+        assert index == 45
+        assert new_root == reference_root(leaves).hex()
+
+    def test_file_store_repairs_interrupted_append(self, tmp_path):
+        """Test recovery when parent nodes were not written."""
+        store = FileMerkleNodeStore(str(tmp_path))
+        tree = IncrementalMerkleTree(store)
+        for i in range(16):
+            tree.append_leaf(leaf(i))
+
+        # Simulate a crash after the leaf write but before its parents
+        for level in range(1, store.level_count()):
+            store.truncate(level, store.count(level) - 1)
+        store.close()
+
+        reopened = IncrementalMerkleTree(FileMerkleNodeStore(str(tmp_path)))
+        leaves = [bytes.fromhex(leaf(i)) for i in range(16)]
+
+        assert reopened.get_current_root() == reference_root(leaves).hex()
+        assert reopened.verify_historical_proof(reopened.get_proof_at_size(3, 16), 16)
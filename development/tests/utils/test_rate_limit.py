@@ -0,0 +1,91 @@
+"""
+Tests for the sliding-window rate limiter and TTL set.
+"""
+
+from src.counterfeit_detection.utils.rate_limit import SlidingWindowRateLimiter, TTLSet
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestSlidingWindowRateLimiter:
+    """Test SlidingWindowRateLimiter functionality."""
+
+    def test_limit_within_window(self):
+        """Test that events beyond the limit are refused until the window slides."""
+        clock = FakeClock()
+        limiter = SlidingWindowRateLimiter(window_seconds=60, clock=clock)
+
+        for second in range(3):
+            clock.now = second * 10
+            assert limiter.allow("user1", 3)
+        assert not limiter.allow("user1", 3)
+        assert limiter.allow("user2", 3)
+
+        # The first event leaves the window
+        clock.now = 60
+        assert limiter.allow("user1", 3)
+        assert not limiter.allow("user1", 3)
+        assert limiter.count("user1") == 3
+
+    def test_limit_change_keeps_recent_events(self):
+        """Test that lowering a key's limit applies to its recorded events."""
+        limiter = SlidingWindowRateLimiter(window_seconds=60, clock=FakeClock())
+
+        for _ in range(5):
+            assert limiter.allow("user1", 10)
+
+        assert not limiter.allow("user1", 2)
+        assert not limiter.allow("user1", 0)
+
+    def test_purge_expired(self):
+        """Test that idle keys are forgotten."""
+        clock = FakeClock()
+        limiter = SlidingWindowRateLimiter(window_seconds=60, clock=clock)
+        limiter.allow("idle", 5)
+        clock.now = 30
+        limiter.allow("active", 5)
+
+        clock.now = 61
+        assert limiter.purge_expired() == 1
+        assert len(limiter) == 1
+
+
+class TestTTLSet:
+    """Test TTLSet functionality."""
+
+    def test_members_expire(self):
+        """Test membership within and after the TTL."""
+        clock = FakeClock()
+        members = TTLSet(ttl_seconds=300, clock=clock)
+        members.add("alert1")
+
+        clock.now = 299
+        assert "alert1" in members
+
+        clock.now = 300
+        assert "alert1" not in members
+
+    def test_readding_restarts_ttl_and_evicts_expired(self):
+        """Test that re-adding extends a member and adds evict expired ones."""
+        clock = FakeClock()
+        members = TTLSet(ttl_seconds=10, clock=clock)
+        members.add("a")
+        members.add("b")
+
+        clock.now = 5
+        members.add("a")
+
+        clock.now = 12
+        members.add("c")
+
+        assert "a" in members
+        assert "b" not in members
+        assert len(members) == 2
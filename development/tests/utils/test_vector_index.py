@@ -0,0 +1,157 @@
+"""
+Tests for the in-memory ANN vector index.
+"""
+
+import numpy as np
+import pytest
+
+from src.counterfeit_detection.utils.vector_index import (
+    FlatVectorIndex,
+    IVFVectorIndex,
+    VectorIndexEntry,
+    VectorSearchFilters
+)
+
+
+DIMENSIONS = 32
+
+
+def make_entries(count: int, seed: int = 0):
+    """Create random entries spread across three categories."""
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((count, DIMENSIONS)).astype(np.float32)
+    categories = ["bags", "shoes", "watches"]
+    return [
+        VectorIndexEntry(
+            product_id=str(i),
+            embedding=vectors[i],
+            category=categories[i % 3],
+            supplier_id=f"supplier-{i % 5}",
+            price=float(i % 100),
+            status="active" if i % 2 else "flagged"
+        )
+        for i in range(count)
+    ]
+
+
+@pytest.fixture(params=[FlatVectorIndex, IVFVectorIndex])
+def index(request):
+    """Create an index of each implementation with 5000 entries."""
+    index = request.param(DIMENSIONS, initial_capacity=16)
+    index.add(make_entries(5000))
+    return index
+
+
+class TestVectorIndex:
+    """Test vector index search and maintenance."""
+    
+    def test_exact_match_ranks_first(self, index):
+        """Test that a stored vector is its own nearest neighbour."""
+        entries = make_entries(5000)
+        
+        results = index.search(entries[42].embedding, limit=5)
+        
+        assert results[0][0] == "42"
+        assert results[0][1] == pytest.approx(1.0, abs=1e-5)
+        assert [score for _, score in results] == sorted(
+            (score for _, score in results), reverse=True
+        )
+    
+    def test_filters_applied_before_scoring(self, index):
+        """Test that every result satisfies the attribute filters."""
+        entries = {entry.product_id: entry for entry in make_entries(5000)}
+        filters = VectorSearchFilters(
+            category="shoes", status="active", price_min=10, price_max=20
+        )
+        
+        results = index.search(entries["0"].embedding, limit=10, filters=filters)
+        
+        assert results
+        for product_id, _ in results:
+            entry = entries[product_id]
+            assert entry.category == "shoes"
+            assert entry.status == "active"
+            assert 10 <= entry.price <= 20
+    
+    def test_similarity_threshold(self, index):
+        """Test that results below the threshold are dropped."""
+        entries = make_entries(5000)
+        
+        results = index.search(entries[0].embedding, limit=100, similarity_threshold=0.9)
+        
+        assert all(score > 0.9 for _, score in results)
+    
+    def test_upsert_and_remove(self, index):
+        """Test replacing and removing entries."""
+        entries = make_entries(5000)
+        index.add([VectorIndexEntry(
+            product_id="1",
+            embedding=entries[2].embedding,
+            category="bags"
+        )])
+        
+        results = index.search(entries[2].embedding, limit=2)
+        assert {product_id for product_id, _ in results} == {"1", "2"}
+        
+        assert index.remove("1") is True
+        assert index.remove("1") is False
+        assert "1" not in [product_id for product_id, _ in index.search(entries[2].embedding, limit=5)]
+        assert len(index) == 4999
+    
+    def test_update_attributes(self, index):
+        """Test that attribute updates change which filters a row passes."""
+        entries = make_entries(5000)
+        
+        assert index.update_attributes("42", category="shoes", price=None) is True
+        assert index.update_attributes("missing", status="active") is False
+        
+        shoes = index.search(entries[42].embedding, limit=1, filters=VectorSearchFilters(category="shoes"))
+        assert shoes[0][0] == "42"
+        priced = index.search(entries[42].embedding, limit=1, filters=VectorSearchFilters(price_min=0))
+        assert priced[0][0] != "42"
+    
+    def test_rejects_wrong_dimensions(self, index):
+        """Test that mismatched embeddings are ignored."""
+        written = index.add([VectorIndexEntry(product_id="bad", embedding=[1.0, 2.0])])
+        
+        assert written == 0
+        assert index.search([1.0, 2.0]) == []
+    
+    def test_compaction_preserves_results(self, index):
+        """Test that removing most rows compacts storage without losing entries."""
+        entries = make_entries(5000)
+        for i in range(0, 4000):
+            index.remove(str(i))
+        
+        results = index.search(entries[4500].embedding, limit=1)
+        
+        assert results[0][0] == "4500"
+        assert index.get_stats()["tombstoned_rows"] < 4000
+
+
+class TestIVFVectorIndex:
+    """Test IVF-specific behaviour."""
+    
+    def test_trains_after_min_size(self):
+        """Test that clustering starts once enough vectors are indexed."""
+        index = IVFVectorIndex(DIMENSIONS, min_train_size=1000)
+        index.add(make_entries(500))
+        assert not index.is_trained
+        
+        index.add(make_entries(1500, seed=1)[500:])
+        assert index.is_trained
+        assert index.get_stats()["nlist"] > 0
+    
+    def test_selective_filter_falls_back_to_exact(self):
+        """Test that a filter matching few rows returns the exact top results."""
+        entries = make_entries(5000)
+        ivf_index = IVFVectorIndex(DIMENSIONS, min_train_size=1000, nprobe=1)
+        flat_index = FlatVectorIndex(DIMENSIONS)
+        ivf_index.add(entries)
+        flat_index.add(entries)
+        filters = VectorSearchFilters(supplier_id="supplier-0", price_max=0)
+        
+        results = ivf_index.search(entries[1].embedding, limit=5, filters=filters)
+        
+        assert len(results) == 5
+        assert results == flat_index.search(entries[1].embedding, limit=5, filters=filters)
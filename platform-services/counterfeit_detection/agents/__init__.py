@@ -13,7 +13,8 @@ from .base import (
     AgentResponse,
     AgentMetadata,
     AgentCapability,
-    AgentStatus
+    AgentStatus,
+    ResponseDispatcher
 )
 from .orchestrator import (
     AgentOrchestrator,
@@ -39,6 +40,7 @@ __all__ = [
     "AgentMetadata",
     "AgentCapability",
     "AgentStatus",
+    "ResponseDispatcher",
     
     # Orchestrator classes
     "AgentOrchestrator",
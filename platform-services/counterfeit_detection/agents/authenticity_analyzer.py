@@ -6,7 +6,7 @@ import asyncio
 import json
 import uuid
 from decimal import Decimal
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Awaitable, Callable, Dict, List, Optional, Any, Set, Tuple
 from datetime import datetime
 
 import openai
@@ -15,11 +15,18 @@ from pydantic import BaseModel, Field
 import structlog
 
 from .base import BaseAgent, AgentMessage, AgentResponse, AgentCapability
-from ..services.embedding_service import EmbeddingService
+from ..services.embedding_service import get_embedding_service
 from ..services.zkproof_service import ZKProofService
 from ..services.brand_protection_service import BrandProtectionService
 from ..services.audit_trail_service import AuditTrailService, AuditEventData, AuditEventType
 from ..services.proof_verification_cache import ProofVerificationCache
+from ..services.metrics_collector import (
+    MetricsCollector,
+    MetricEvent,
+    MetricType,
+    acquire_shared_metrics_collector,
+    release_shared_metrics_collector
+)
 from ..db.repositories.vector_repository import VectorRepository
 from ..db.repositories.product_repository import ProductRepository
 from ..db.repositories.analysis_repository import AnalysisRepository
@@ -27,6 +34,7 @@ from ..models.enums import ProductCategory, ProductStatus
 from ..models.zkproof import ProofType, VerificationStatus
 from ..core.config import get_settings
 from ..core.database import get_db_session
+from ..config.settings import get_settings as get_app_settings
 
 
 class AuthenticityScore(BaseModel):
@@ -99,6 +107,16 @@ class AuthenticityAnalyzer(BaseAgent):
         "brand_protection": 0.10
     }
     
+    # Per-stage timeouts (seconds); a stage that times out or fails degrades
+    # to its neutral fallback instead of failing the analysis
+    STAGE_TIMEOUTS = {
+        "similar_products": 5.0,
+        "supplier_reputation": 2.0,
+        "zkproof_verification": 10.0,
+        "brand_protection": 10.0,
+        "llm_analysis": 60.0
+    }
+    
     # LLM prompt template
     ANALYSIS_PROMPT = """
 Analyze this product for authenticity indicators based on the provided data and comparison with similar authentic products.
@@ -135,8 +153,15 @@ Provide your analysis in this exact JSON format (no additional text):
 }}
 """
     
-    def __init__(self, agent_id: str = None):
-        """Initialize the authenticity analyzer agent."""
+    def __init__(self, agent_id: str = None, metrics_collector: Optional[MetricsCollector] = None):
+        """
+        Initialize the authenticity analyzer agent.
+        
+        Args:
+            agent_id: Agent ID (generated if omitted)
+            metrics_collector: Sink for per-stage latency metrics; if omitted
+                the agent uses the process-wide collector from start()
+        """
         if not agent_id:
             agent_id = f"authenticity-analyzer-{uuid.uuid4().hex[:8]}"
         
@@ -170,7 +195,7 @@ Provide your analysis in this exact JSON format (no additional text):
         self.anthropic_client = anthropic.AsyncAnthropic(api_key=getattr(self.settings, 'anthropic_api_key', None))
         
         # Service dependencies
-        self.embedding_service = EmbeddingService()
+        self.embedding_service = get_embedding_service()
         self.zkproof_service = ZKProofService()
         self.brand_protection_service = BrandProtectionService()
         self.audit_trail_service = AuditTrailService()
@@ -183,10 +208,22 @@ Provide your analysis in this exact JSON format (no additional text):
         self.product_repository: Optional[ProductRepository] = None
         self.analysis_repository: Optional[AnalysisRepository] = None
         
+        # Sink for per-stage latency metrics
+        self.metrics_collector = metrics_collector
+        self._shares_metrics_collector = False
+        
+        # Result/audit writes running off the response path
+        self._pending_writes: Set[asyncio.Task] = set()
+        
+        # Warms the shared ANN indexes, then keeps them in step with the database
+        self._index_warmup_task: Optional[asyncio.Task] = None
+        
         # Performance tracking
         self.total_analyses = 0
         self.total_analysis_time = 0.0
         self.llm_token_usage = 0
+        self.stage_timeouts = 0
+        self.stage_failures = 0
         
         self.logger = structlog.get_logger(
             agent_id=self.agent_id,
@@ -203,8 +240,66 @@ Provide your analysis in this exact JSON format (no additional text):
             self.product_repository = ProductRepository(session)
             self.analysis_repository = AnalysisRepository(session)
         
+        # Warm the shared ANN indexes in the background; similarity search
+        # uses the SQL path until they are ready
+        self._index_warmup_task = asyncio.create_task(self._maintain_vector_indexes())
+        
+        if self.metrics_collector is None:
+            await self._start_metrics_collector()
+        
         self.logger.info("AuthenticityAnalyzer started with LLM integration")
     
+    async def stop(self) -> None:
+        """Stop the agent after pending result and audit writes have finished."""
+        if self._pending_writes:
+            await asyncio.gather(*self._pending_writes, return_exceptions=True)
+        
+        if self._index_warmup_task is not None:
+            self._index_warmup_task.cancel()
+            await asyncio.gather(self._index_warmup_task, return_exceptions=True)
+            self._index_warmup_task = None
+        
+        if self._shares_metrics_collector:
+            self.metrics_collector = None
+            self._shares_metrics_collector = False
+            await release_shared_metrics_collector()
+        
+        await super().stop()
+    
+    async def _start_metrics_collector(self) -> None:
+        """Join the process-wide metrics collector; analysis runs without stage metrics if it fails."""
+        try:
+            collector = await acquire_shared_metrics_collector(get_app_settings().redis_url)
+        except Exception as e:
+            self.logger.warning("Metrics collector unavailable, stage metrics disabled", error=str(e))
+            return
+        
+        self.metrics_collector = collector
+        self._shares_metrics_collector = True
+    
+    async def _maintain_vector_indexes(self) -> None:
+        """
+        Load product embeddings into the in-memory similarity indexes, then
+        periodically apply products changed by other workers and processes.
+        """
+        try:
+            async with get_db_session() as session:
+                await VectorRepository(session).warm_vector_indexes()
+        except Exception as e:
+            self.logger.warning(
+                "Vector index warm-up failed, using SQL similarity search",
+                error=str(e)
+            )
+            return
+        
+        while True:
+            await asyncio.sleep(self.settings.vector_index_refresh_seconds)
+            try:
+                async with get_db_session() as session:
+                    await VectorRepository(session).refresh_vector_indexes()
+            except Exception as e:
+                self.logger.warning("Vector index refresh failed", error=str(e))
+    
     async def process_message(self, message: AgentMessage) -> AgentResponse:
         """Process incoming messages for authenticity analysis."""
         try:
@@ -270,9 +365,22 @@ Provide your analysis in this exact JSON format (no additional text):
             if not product_ids:
                 raise ValueError("product_ids list is required")
             
+            # Load the batch's products in bulk; each analysis then finds its
+            # product in the shared identity map instead of querying for it.
+            # Malformed IDs are left out so they fail their own analysis only.
+            identity_map: Dict[str, Any] = {}
+            valid_ids = [product_id for product_id in product_ids if self._is_product_id(product_id)]
+            if valid_ids:
+                try:
+                    async with get_db_session() as session:
+                        await ProductRepository(session, identity_map).get_products_by_ids(valid_ids)
+                except Exception as e:
+                    # Analyses look their products up one by one instead
+                    self.logger.warning("Failed to prefetch batch products", error=str(e))
+            
             # Process products concurrently
             analysis_tasks = [
-                self.analyze_product_authenticity(product_id)
+                self.analyze_product_authenticity(product_id, identity_map)
                 for product_id in product_ids
             ]
             
@@ -313,6 +421,15 @@ Provide your analysis in this exact JSON format (no additional text):
                 processing_time_ms=processing_time
             )
     
+    @staticmethod
+    def _is_product_id(product_id: Any) -> bool:
+        """Whether a requested product ID is a valid UUID."""
+        try:
+            uuid.UUID(str(product_id))
+            return True
+        except ValueError:
+            return False
+    
     async def _handle_get_stats(self, message: AgentMessage) -> AgentResponse:
         """Handle request for agent statistics."""
         stats = {
@@ -323,6 +440,9 @@ Provide your analysis in this exact JSON format (no additional text):
                 if self.total_analyses > 0 else 0
             ),
             "total_llm_tokens_used": self.llm_token_usage,
+            "stage_timeouts": self.stage_timeouts,
+            "stage_failures": self.stage_failures,
+            "pending_writes": len(self._pending_writes),
             "processed_messages": self.processed_messages,
             "error_count": self.error_count,
             "status": self.status.value,
@@ -338,56 +458,117 @@ Provide your analysis in this exact JSON format (no additional text):
             processing_time_ms=1.0
         )
     
-    async def analyze_product_authenticity(self, product_id: str) -> ProductAnalysisResult:
+    async def analyze_product_authenticity(
+        self,
+        product_id: str,
+        identity_map: Optional[Dict[str, Any]] = None
+    ) -> ProductAnalysisResult:
         """
         Perform comprehensive authenticity analysis on a product.
         
+        Stages run as a dependency graph: once the product is loaded, the
+        similar-product search, supplier reputation, zkSNARK verification and
+        brand protection checks run concurrently, each with its own timeout
+        and neutral fallback; the LLM call waits for all four. The result and
+        audit entry are written in the background after the result is
+        returned.
+        
         Args:
             product_id: UUID of the product to analyze
+            identity_map: Products already loaded by the caller, by ID
+                (a new map scoped to this analysis if omitted)
             
         Returns:
             Complete analysis result with scoring and explanations
         """
         analysis_start = asyncio.get_event_loop().time()
+        stage_timings: Dict[str, float] = {}
         
         try:
             self.logger.info("Starting authenticity analysis", product_id=product_id)
             
-            # 1. Retrieve product data
             async with get_db_session() as session:
-                self.product_repository = ProductRepository(session)
+                self.product_repository = ProductRepository(
+                    session, identity_map if identity_map is not None else {}
+                )
                 self.vector_repository = VectorRepository(session)
-                self.analysis_repository = AnalysisRepository(session)
                 
+                # 1. Retrieve product data (every other stage depends on it)
                 product = await self.product_repository.get_product_by_id(product_id)
                 if not product:
                     raise ValueError(f"Product {product_id} not found")
                 
-                # 2. Find similar products for comparison
-                similar_products = await self._get_similar_products(product)
-                
-                # 3. Get supplier reputation
-                supplier_reputation = await self._get_supplier_reputation(product.supplier_id)
-            
-            # 4. Check for zkSNARK proofs
-            zkproof_verification = await self._verify_zksnark_proofs(product)
-            
-            # 5. Check brand protection data
-            brand_protection_data = await self._analyze_brand_protection(product)
+                # 2. Independent context stages; only the similarity search
+                # uses the session, so they can share this block
+                (
+                    similar_products,
+                    supplier_reputation,
+                    zkproof_verification,
+                    brand_protection_data
+                ) = await asyncio.gather(
+                    self._run_stage(
+                        "similar_products",
+                        lambda: self._get_similar_products(product),
+                        lambda reason: [],
+                        stage_timings
+                    ),
+                    self._run_stage(
+                        "supplier_reputation",
+                        lambda: self._get_supplier_reputation(product.supplier_id),
+                        lambda reason: 50.0,
+                        stage_timings
+                    ),
+                    self._run_stage(
+                        "zkproof_verification",
+                        lambda: self._verify_zksnark_proofs(product),
+                        lambda reason: {
+                            "has_valid_proof": False,
+                            "proof_verification_score": 50.0,
+                            "proof_types_verified": [],
+                            "proof_details": {},
+                            "error_messages": ["Proof verification unavailable"]
+                        },
+                        stage_timings
+                    ),
+                    self._run_stage(
+                        "brand_protection",
+                        lambda: self._analyze_brand_protection(product),
+                        lambda reason: {
+                            "protection_score": 50.0,
+                            "brand_match_found": False,
+                            "violation_indicators": [],
+                            "brand_enhancement_applied": False,
+                            "brand_analysis_details": {"error": "Brand protection analysis unavailable"}
+                        },
+                        stage_timings
+                    )
+                )
             
-            # 6. Perform LLM analysis with enhanced context
-            llm_result = await self._perform_llm_analysis(
-                product, similar_products, supplier_reputation, 
-                zkproof_verification, brand_protection_data
+            # 3. LLM analysis with the full context
+            llm_result = await self._run_stage(
+                "llm_analysis",
+                lambda: self._perform_llm_analysis(
+                    product, similar_products, supplier_reputation,
+                    zkproof_verification, brand_protection_data
+                ),
+                lambda reason: AuthenticityScore(
+                    authenticity_score=50.0,
+                    confidence=0.1,
+                    reasoning=f"Analysis failed: {reason}",
+                    red_flags=["System error during analysis"],
+                    positive_indicators=[],
+                    component_scores={}
+                ),
+                stage_timings
             )
             
-            # 7. Calculate final scores with cryptographic verification
+            # 4. Calculate final scores with cryptographic verification
             final_score, component_scores = self._calculate_enhanced_score(
                 llm_result, product, supplier_reputation,
                 zkproof_verification, brand_protection_data
             )
             
-            # 6. Create analysis result
+            # 5. Create analysis result
             analysis_duration = (asyncio.get_event_loop().time() - analysis_start) * 1000
             
             result = ProductAnalysisResult(
@@ -413,15 +594,11 @@ Provide your analysis in this exact JSON format (no additional text):
                 positive_indicators=llm_result.positive_indicators
             )
             
-            # 7. Store analysis result
-            result_with_supplier = result.dict()
-            result_with_supplier["supplier_id"] = str(product.supplier_id)
-            await self.analysis_repository.create_analysis_result(result_with_supplier)
+            # 6. Store result and audit entry off the response path
+            self._schedule_write(self._persist_analysis(product, result, zkproof_verification))
+            self._schedule_write(self._record_stage_metrics(product_id, stage_timings, analysis_duration))
             
-            # 8. Create audit trail entry
-            await self._create_analysis_audit_entry(product, result, zkproof_verification)
-            
-            # 9. Update metrics
+            # 7. Update metrics
             self.total_analyses += 1
             self.total_analysis_time += analysis_duration
             
@@ -432,7 +609,8 @@ Provide your analysis in this exact JSON format (no additional text):
                 confidence=llm_result.confidence,
                 zkproof_verified=zkproof_verification.get("has_valid_proof", False),
                 brand_protection_score=brand_protection_data.get("protection_score", 0),
-                analysis_time_ms=analysis_duration
+                analysis_time_ms=analysis_duration,
+                stage_timings_ms=stage_timings
             )
             
             return result
@@ -445,6 +623,90 @@ Provide your analysis in this exact JSON format (no additional text):
             )
             raise
     
+    async def _run_stage(
+        self,
+        stage: str,
+        operation: Callable[[], Awaitable[Any]],
+        fallback: Callable[[str], Any],
+        stage_timings: Dict[str, float]
+    ) -> Any:
+        """
+        Run one analysis stage with its timeout, falling back on failure.
+        
+        Args:
+            stage: Stage name (key of STAGE_TIMEOUTS)
+            operation: Factory for the stage coroutine
+            fallback: Factory for the degraded result, given why the stage failed
+            stage_timings: Collects the stage latency in milliseconds
+            
+        Returns:
+            Stage result, or the fallback result if the stage timed out or failed
+        """
+        stage_start = asyncio.get_event_loop().time()
+        timeout = self.STAGE_TIMEOUTS[stage]
+        try:
+            return await asyncio.wait_for(operation(), timeout=timeout)
+        except asyncio.TimeoutError:
+            self.stage_timeouts += 1
+            self.logger.warning("Analysis stage timed out, using fallback", stage=stage)
+            return fallback(f"{stage} timed out after {timeout:g}s")
+        except Exception as e:
+            self.stage_failures += 1
+            self.logger.warning("Analysis stage failed, using fallback", stage=stage, error=str(e))
+            return fallback(f"{stage} failed: {e}")
+        finally:
+            stage_timings[stage] = (asyncio.get_event_loop().time() - stage_start) * 1000
+    
+    def _schedule_write(self, coro: Awaitable[None]) -> None:
+        """Run a write in the background, tracked so stop() can wait for it."""
+        task = asyncio.create_task(coro)
+        self._pending_writes.add(task)
+        task.add_done_callback(self._pending_writes.discard)
+    
+    async def _persist_analysis(
+        self,
+        product,
+        result: ProductAnalysisResult,
+        zkproof_verification: Dict[str, Any]
+    ) -> None:
+        """Store the analysis result and its audit trail entry."""
+        try:
+            result_with_supplier = result.dict()
+            result_with_supplier["supplier_id"] = str(product.supplier_id)
+            
+            async with get_db_session() as session:
+                await AnalysisRepository(session).create_analysis_result(result_with_supplier)
+                await session.commit()
+        except Exception as e:
+            self.logger.error(
+                "Failed to store analysis result",
+                analysis_id=result.analysis_id,
+                error=str(e)
+            )
+        
+        await self._create_analysis_audit_entry(product, result, zkproof_verification)
+    
+    async def _record_stage_metrics(
+        self,
+        product_id: str,
+        stage_timings: Dict[str, float],
+        analysis_duration: float
+    ) -> None:
+        """Emit per-stage and end-to-end latency to the metrics collector."""
+        if not self.metrics_collector:
+            return
+        
+        timestamp = datetime.utcnow()
+        for stage, duration_ms in {**stage_timings, "total": analysis_duration}.items():
+            await self.metrics_collector.record_metric(MetricEvent(
+                metric_type=MetricType.ANALYSIS_TIME,
+                timestamp=timestamp,
+                component=f"{self.agent_type}.{stage}",
+                value=duration_ms,
+                metadata={"product_id": str(product_id), "agent_id": self.agent_id},
+                tags={"stage": stage}
+            ))
+    
     async def _get_similar_products(self, product) -> List[Dict[str, Any]]:
         """Get similar products for comparison using vector search."""
         try:
@@ -4,17 +4,20 @@ Base agent class and core data structures for the multi-agent system.
 
 import asyncio
 import json
+import time
 import uuid
 from abc import ABC, abstractmethod
+from bisect import bisect_left
 from datetime import datetime
 from enum import Enum
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 import structlog
 from pydantic import BaseModel, Field
 from redis.asyncio import Redis
 
 from ..config.redis import get_redis_client
+from ..config.settings import get_settings
 
 logger = structlog.get_logger(module=__name__)
 
@@ -76,6 +79,216 @@ class AgentMetadata(BaseModel):
     error_count: int = Field(default=0)
 
 
+# Upper bounds (ms) of the response latency histogram buckets
+RESPONSE_LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+
+class ResponseDispatcher:
+    """
+    Routes responses arriving on one Redis channel to waiting requests.
+    
+    A single subscription lives as long as its owner (like
+    MessageBus._response_listener) instead of a subscribe/unsubscribe pair
+    per request. Requests register their correlation ID before the request
+    is published, so a fast response cannot be missed, and each response
+    resolves only the future of its own request.
+    """
+    
+    RESUBSCRIBE_DELAY_SECONDS = 1.0
+    
+    def __init__(self, redis_client: Redis, channel: str, logger: Optional[Any] = None):
+        """
+        Initialize the dispatcher.
+        
+        Args:
+            redis_client: Redis client to subscribe with
+            channel: Response channel to listen on
+            logger: Logger to use (defaults to a component logger)
+        """
+        self.redis_client = redis_client
+        self.channel = channel
+        self.logger = logger or structlog.get_logger(component="response_dispatcher", channel=channel)
+        
+        # correlation_id -> (future, message_type, start time)
+        self.pending: Dict[str, Tuple[asyncio.Future, str, float]] = {}
+        self.latency_histograms: Dict[str, Dict[str, Any]] = {}
+        self.unmatched_responses = 0
+        
+        self._pubsub = None
+        self._listener_task: Optional[asyncio.Task] = None
+        self._start_lock = asyncio.Lock()
+    
+    @property
+    def running(self) -> bool:
+        return self._listener_task is not None and not self._listener_task.done()
+    
+    async def start(self) -> None:
+        """Subscribe to the response channel and start routing responses."""
+        async with self._start_lock:
+            if self.running:
+                return
+            
+            # Subscribed before returning, so requests sent afterwards are covered
+            self._pubsub = self.redis_client.pubsub()
+            await self._pubsub.subscribe(self.channel)
+            self._listener_task = asyncio.create_task(self._listen())
+        
+        self.logger.info("Response dispatcher started", channel=self.channel)
+    
+    async def stop(self) -> None:
+        """Stop listening and cancel all pending requests."""
+        task, self._listener_task = self._listener_task, None
+        if task:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        
+        for future, _, _ in self.pending.values():
+            if not future.done():
+                future.cancel()
+        self.pending.clear()
+        
+        await self._close_pubsub()
+    
+    def register(self, correlation_id: str, message_type: str = "unknown") -> asyncio.Future:
+        """
+        Register a request expecting a response.
+        
+        Must be called before the request is published.
+        
+        Args:
+            correlation_id: Correlation ID of the request
+            message_type: Request message type (latency histogram label)
+            
+        Returns:
+            Future resolved with the response
+        """
+        future = asyncio.get_running_loop().create_future()
+        self.pending[correlation_id] = (future, message_type, time.monotonic())
+        return future
+    
+    def discard(self, correlation_id: str) -> None:
+        """Drop a registered request (e.g. when publishing it failed)."""
+        entry = self.pending.pop(correlation_id, None)
+        if entry and not entry[0].done():
+            entry[0].cancel()
+    
+    async def wait(self, correlation_id: str, timeout: float) -> Optional[AgentResponse]:
+        """
+        Wait for the response to a registered request.
+        
+        Args:
+            correlation_id: Correlation ID of the request
+            timeout: Response timeout in seconds
+            
+        Returns:
+            Response, or None on timeout
+        """
+        if correlation_id not in self.pending:
+            self.register(correlation_id)
+        future, message_type, started_at = self.pending[correlation_id]
+        
+        try:
+            response = await asyncio.wait_for(future, timeout=timeout)
+            self._record_latency(message_type, (time.monotonic() - started_at) * 1000)
+            return response
+            
+        except asyncio.TimeoutError:
+            self._histogram(message_type)["timeouts"] += 1
+            self.logger.warning(
+                "Response timeout",
+                correlation_id=correlation_id,
+                message_type=message_type
+            )
+            return None
+        finally:
+            # Also reached on cancellation of the waiting caller
+            self.pending.pop(correlation_id, None)
+    
+    def get_latency_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Response latency histogram per request message type."""
+        stats = {}
+        for message_type, histogram in self.latency_histograms.items():
+            buckets = {
+                f"le_{bound}ms": count
+                for bound, count in zip(RESPONSE_LATENCY_BUCKETS_MS, histogram["buckets"])
+            }
+            buckets["le_inf"] = histogram["buckets"][-1]
+            stats[message_type] = {
+                "count": histogram["count"],
+                "timeouts": histogram["timeouts"],
+                "average_ms": histogram["total_ms"] / histogram["count"] if histogram["count"] else 0.0,
+                "max_ms": histogram["max_ms"],
+                "buckets": buckets
+            }
+        return stats
+    
+    async def _listen(self) -> None:
+        """Route responses until cancelled, resubscribing if the connection drops."""
+        while True:
+            try:
+                if self._pubsub is None:
+                    self._pubsub = self.redis_client.pubsub()
+                    await self._pubsub.subscribe(self.channel)
+                
+                async for message in self._pubsub.listen():
+                    if message["type"] == "message":
+                        self._dispatch(message["data"])
+                        
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.error("Response listener error", error=str(e), channel=self.channel)
+            
+            await self._close_pubsub()
+            await asyncio.sleep(self.RESUBSCRIBE_DELAY_SECONDS)
+    
+    def _dispatch(self, data: Union[str, bytes]) -> None:
+        """Resolve the pending request a response belongs to."""
+        try:
+            response = AgentResponse(**json.loads(data))
+        except Exception as e:
+            self.logger.error("Invalid response message", error=str(e), channel=self.channel)
+            return
+        
+        entry = self.pending.get(response.correlation_id)
+        if entry is None:
+            # Late response to a request that timed out, or one sent elsewhere
+            self.unmatched_responses += 1
+            return
+        
+        if not entry[0].done():
+            entry[0].set_result(response)
+    
+    def _histogram(self, message_type: str) -> Dict[str, Any]:
+        histogram = self.latency_histograms.get(message_type)
+        if histogram is None:
+            histogram = self.latency_histograms[message_type] = {
+                "count": 0,
+                "timeouts": 0,
+                "total_ms": 0.0,
+                "max_ms": 0.0,
+                "buckets": [0] * (len(RESPONSE_LATENCY_BUCKETS_MS) + 1)
+            }
+        return histogram
+    
+    def _record_latency(self, message_type: str, latency_ms: float) -> None:
+        histogram = self._histogram(message_type)
+        histogram["count"] += 1
+        histogram["total_ms"] += latency_ms
+        histogram["max_ms"] = max(histogram["max_ms"], latency_ms)
+        histogram["buckets"][bisect_left(RESPONSE_LATENCY_BUCKETS_MS, latency_ms)] += 1
+    
+    async def _close_pubsub(self) -> None:
+        pubsub, self._pubsub = self._pubsub, None
+        if pubsub is None:
+            return
+        try:
+            await pubsub.unsubscribe()
+            await pubsub.close()
+        except Exception as e:
+            self.logger.debug("Error closing response subscription", error=str(e))
+
+
 class BaseAgent(ABC):
     """
     Abstract base class for all agents in the multi-agent system.
@@ -110,6 +323,10 @@ class BaseAgent(ABC):
         
         self.status = AgentStatus.STOPPED
         self.redis_client: Optional[Redis] = None
+        self.response_dispatcher: Optional[ResponseDispatcher] = None
+        # Durable transport for direct and agent-type messages (streams mode)
+        self.stream_transport = None
+        self._stream_targets: List[Tuple[str, str]] = []
         self.message_handlers: Dict[str, callable] = {}
         self.running_tasks: List[asyncio.Task] = []
         self.shutdown_event = asyncio.Event()
@@ -138,6 +355,9 @@ class BaseAgent(ABC):
             # Initialize Redis connection
             self.redis_client = await get_redis_client()
             
+            # Listen for responses to this agent's requests
+            await self._get_response_dispatcher()
+            
             # Register message handlers
             await self._setup_message_handlers()
             
@@ -148,6 +368,9 @@ class BaseAgent(ABC):
             await self._register_with_orchestrator()
             
             self.status = AgentStatus.RUNNING
+            
+            # Consume streams only once messages can be handled
+            self._start_stream_consumers()
             self.logger.info("Agent started successfully")
             
         except Exception as e:
@@ -175,6 +398,10 @@ class BaseAgent(ABC):
             # Deregister from orchestrator
             await self._deregister_from_orchestrator()
             
+            if self.response_dispatcher:
+                await self.response_dispatcher.stop()
+                self.response_dispatcher = None
+            
             # Close Redis connection
             if self.redis_client:
                 await self.redis_client.close()
@@ -218,6 +445,11 @@ class BaseAgent(ABC):
         if not self.redis_client:
             raise RuntimeError("Agent not started - Redis client not available")
         
+        # Register before publishing so an immediate response is not missed
+        if message.correlation_id:
+            dispatcher = await self._get_response_dispatcher()
+            dispatcher.register(message.correlation_id, message.message_type)
+        
         try:
             # Determine routing key
             if message.recipient_id:
@@ -227,7 +459,10 @@ class BaseAgent(ABC):
             
             # Serialize and publish message
             message_json = message.json()
-            await self.redis_client.publish(routing_key, message_json)
+            if self.stream_transport and message.recipient_id:
+                await self.stream_transport.publish(routing_key, message_json, message.priority)
+            else:
+                await self.redis_client.publish(routing_key, message_json)
             
             self.logger.debug(
                 "Message sent",
@@ -250,6 +485,10 @@ class BaseAgent(ABC):
                 message_id=message.message_id
             )
             raise
+        finally:
+            # Also reached on cancellation while publishing
+            if message.correlation_id and self.response_dispatcher:
+                self.response_dispatcher.discard(message.correlation_id)
     
     @abstractmethod
     async def process_message(self, message: AgentMessage) -> AgentResponse:
@@ -264,6 +503,12 @@ class BaseAgent(ABC):
         """
         pass
     
+    def get_response_latency_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get response latency histograms per request message type."""
+        if not self.response_dispatcher:
+            return {}
+        return self.response_dispatcher.get_latency_stats()
+    
     def get_metadata(self) -> AgentMetadata:
         """Get current agent metadata."""
         return AgentMetadata(
@@ -285,13 +530,42 @@ class BaseAgent(ABC):
         
         # Subscribe to broadcast messages for agent type
         broadcast_channel = f"broadcast.{self.agent_type}"
+        channels = [agent_channel, broadcast_channel]
+        
+        if get_settings().message_bus_transport == "streams":
+            # Imported here: the agents.utils package imports this module
+            from .utils.streams import StreamTransport, type_stream
+            
+            # Direct messages and this type's shared work queue come from
+            # streams (consumed once running, see _start_stream_consumers)
+            self.stream_transport = StreamTransport.from_settings(self.redis_client, get_settings())
+            self._stream_targets = [
+                (agent_channel, self.agent_id),
+                (type_stream(self.agent_type), self.agent_type)
+            ]
+            channels = [broadcast_channel]
         
         # Start message listener task
         listener_task = asyncio.create_task(
-            self._message_listener([agent_channel, broadcast_channel])
+            self._message_listener(channels)
         )
         self.running_tasks.append(listener_task)
     
+    def _start_stream_consumers(self) -> None:
+        """Start consuming the agent's streams; the type's consumer group splits work across replicas."""
+        if not self.stream_transport:
+            return
+        
+        for target, group in self._stream_targets:
+            consumer_task = asyncio.create_task(
+                self.stream_transport.consume(
+                    target, group, self.agent_id,
+                    self._handle_incoming_message, self.shutdown_event,
+                    is_accepting=lambda: self.status == AgentStatus.RUNNING
+                )
+            )
+            self.running_tasks.append(consumer_task)
+    
     async def _message_listener(self, channels: List[str]) -> None:
         """Listen for incoming messages on Redis channels."""
         try:
@@ -315,10 +589,16 @@ class BaseAgent(ABC):
                 await pubsub.unsubscribe()
                 await pubsub.close()
     
-    async def _handle_incoming_message(self, message_data: str) -> None:
-        """Handle incoming message from Redis."""
+    async def _handle_incoming_message(self, message_data: str) -> bool:
+        """
+        Handle incoming message from Redis.
+        
+        Returns:
+            False if the message was not handled because the agent is not
+            running (stream entries then stay pending for redelivery)
+        """
         if self.status != AgentStatus.RUNNING:
-            return  # Ignore messages when not running
+            return False
         
         try:
             # Parse message
@@ -348,6 +628,8 @@ class BaseAgent(ABC):
         except Exception as e:
             self.error_count += 1
             self.logger.error("Error processing message", error=str(e))
+        
+        return True
     
     async def _send_response(self, recipient_id: str, response: AgentResponse) -> None:
         """Send response back to message sender."""
@@ -355,36 +637,24 @@ class BaseAgent(ABC):
         response_json = response.json()
         await self.redis_client.publish(response_channel, response_json)
     
+    async def _get_response_dispatcher(self) -> ResponseDispatcher:
+        """Get the response dispatcher, starting it on first use."""
+        if self.response_dispatcher is None:
+            self.response_dispatcher = ResponseDispatcher(
+                self.redis_client, f"response.{self.agent_id}", self.logger
+            )
+        if not self.response_dispatcher.running:
+            await self.response_dispatcher.start()
+        return self.response_dispatcher
+    
     async def _wait_for_response(
         self, 
         correlation_id: str, 
         timeout: float
     ) -> Optional[AgentResponse]:
         """Wait for response with given correlation ID."""
-        response_channel = f"response.{self.agent_id}"
-        pubsub = self.redis_client.pubsub()
-        
-        try:
-            await pubsub.subscribe(response_channel)
-            
-            async def listen_for_response():
-                async for message in pubsub.listen():
-                    if message["type"] == "message":
-                        response_dict = json.loads(message["data"])
-                        response = AgentResponse(**response_dict)
-                        if response.correlation_id == correlation_id:
-                            return response
-                return None
-            
-            # Wait for response with timeout
-            return await asyncio.wait_for(listen_for_response(), timeout=timeout)
-            
-        except asyncio.TimeoutError:
-            self.logger.warning("Response timeout", correlation_id=correlation_id)
-            return None
-        finally:
-            await pubsub.unsubscribe()
-            await pubsub.close()
+        dispatcher = await self._get_response_dispatcher()
+        return await dispatcher.wait(correlation_id, timeout)
     
     def _start_background_tasks(self) -> None:
         """Start background tasks for agent operation."""
@@ -7,8 +7,10 @@ when counterfeit products are detected, providing immediate alerts to administra
 
 import asyncio
 import json
-from datetime import datetime, time, timedelta
-from typing import Any, Dict, List, Optional, Set
+from dataclasses import dataclass
+from datetime import datetime, time
+from time import monotonic
+from typing import Any, Dict, List, Optional
 from uuid import uuid4
 
 import structlog
@@ -16,11 +18,12 @@ from pydantic import BaseModel, Field
 
 from ..agents.base import BaseAgent, AgentCapability, AgentMessage, AgentResponse, AgentStatus
 from ..core.database import get_db_session
-from ..db.repositories.notification_repository import NotificationRepository
+from ..db.repositories.notification_repository import NotificationRepository, get_preferences_generation
 from ..services.notification_service import NotificationService
 from ..services.webhook_service import WebhookService
 from ..models.enums import NotificationChannel, NotificationStatus, AlertSeverity
 from ..models.database import NotificationEndpoint, UserNotificationPreferences
+from ..utils.rate_limit import SlidingWindowRateLimiter, TTLSet
 
 logger = structlog.get_logger(__name__)
 
@@ -67,6 +70,20 @@ class BatchNotificationResult(BaseModel):
     processing_duration_ms: float
 
 
+@dataclass
+class PreferenceSnapshot:
+    """Notification preferences and active endpoints of all users."""
+    preferences: Dict[str, UserNotificationPreferences]
+    endpoints: Dict[str, Dict[NotificationChannel, NotificationEndpoint]]
+    generation: int
+    loaded_at: float
+    
+    @property
+    def user_ids(self) -> List[str]:
+        """Users with notification endpoints or preferences."""
+        return list(self.endpoints.keys() | self.preferences.keys())
+
+
 class NotificationAgent(BaseAgent):
     """
     Notification Agent for multi-channel alert delivery.
@@ -124,13 +141,19 @@ class NotificationAgent(BaseAgent):
         self.total_notifications_sent = 0
         self.total_delivery_time = 0.0
         self.channel_stats: Dict[str, int] = {}
-        self.recent_alerts: Set[str] = set()  # For deduplication
-        self.rate_limit_cache: Dict[str, List[datetime]] = {}  # Per-user rate limiting
         
         # Configuration
         self.deduplication_window_minutes = 5
         self.max_rate_limit_per_hour = 50
         self.quiet_hours_enabled = True
+        self.preference_snapshot_ttl_seconds = 60
+        
+        self.recent_alerts = TTLSet(self.deduplication_window_minutes * 60)  # For deduplication
+        self.rate_limiter = SlidingWindowRateLimiter(window_seconds=3600)  # Per-user rate limiting
+        
+        # Preferences and endpoints of all users, reloaded when changed or expired
+        self._preference_snapshot: Optional[PreferenceSnapshot] = None
+        self._snapshot_lock = asyncio.Lock()
         
     async def start(self) -> None:
         """Start the notification agent."""
@@ -375,15 +398,19 @@ class NotificationAgent(BaseAgent):
                     processing_duration_ms=0
                 )
             
-            # Send notifications to each eligible user
+            # Send notifications to each eligible user, with endpoints from
+            # the preference snapshot
+            endpoints = self._preference_snapshot.endpoints if self._preference_snapshot else {}
             notification_tasks = []
             for user_id, channels in eligible_users.items():
+                user_endpoints = endpoints.get(user_id, {})
                 for channel in channels:
                     task = self._send_single_notification(
                         request.alert_payload,
                         user_id,
                         channel,
-                        request.priority_override
+                        request.priority_override,
+                        user_endpoints.get(channel)
                     )
                     notification_tasks.append(task)
             
@@ -447,52 +474,54 @@ class NotificationAgent(BaseAgent):
             raise
     
     async def _get_eligible_users(self, request: NotificationRequest) -> Dict[str, List[NotificationChannel]]:
-        """Get users eligible to receive the alert and their preferred channels."""
+        """
+        Get users eligible to receive the alert and their preferred channels.
+        
+        Preferences and channels come from the preference snapshot, so no
+        per-user queries are made.
+        """
         eligible_users = {}
         
         try:
-            async with get_db_session() as session:
-                notification_repo = NotificationRepository(session)
-                
-                # Get target users
-                if request.user_ids:
-                    # Specific users requested
-                    target_users = request.user_ids
-                else:
-                    # Get all users with notification preferences
-                    target_users = await notification_repo.get_all_notification_users()
+            snapshot = await self._get_preference_snapshot()
+            
+            # Specific users requested, otherwise all users with preferences or endpoints
+            target_users = request.user_ids or snapshot.user_ids
+            alert_score = request.alert_payload.analysis.get("authenticity_score", 100)
+            severity = request.alert_payload.severity.value
+            
+            # Check each user's eligibility and preferences
+            for user_id in target_users:
+                preferences = snapshot.preferences.get(user_id)
                 
-                # Check each user's eligibility and preferences
-                for user_id in target_users:
-                    # Get user preferences
-                    preferences = await notification_repo.get_user_preferences(user_id)
-                    
-                    # Check if alert meets user's threshold
-                    if not request.priority_override and preferences:
-                        alert_score = request.alert_payload.analysis.get("authenticity_score", 100)
-                        if alert_score > preferences.alert_threshold_score:
-                            continue  # Score too high (less suspicious) for user's threshold
-                        
-                        # Check severity level preference
-                        if request.alert_payload.severity.value not in preferences.severity_levels:
-                            continue
-                        
-                        # Check quiet hours
-                        if await self._is_quiet_hours(preferences):
-                            continue
-                        
-                        # Check rate limits
-                        if await self._is_rate_limited(user_id, preferences):
-                            continue
+                # Check if alert meets user's threshold
+                if not request.priority_override and preferences:
+                    if alert_score > preferences.alert_threshold_score:
+                        continue  # Score too high (less suspicious) for user's threshold
                     
-                    # Get user's notification channels
-                    if request.channel_override:
-                        channels = [request.channel_override]
-                    else:
-                        channels = await notification_repo.get_user_channels(user_id)
+                    # Check severity level preference
+                    if severity not in preferences.severity_levels:
+                        continue
                     
-                    if channels:
-                        eligible_users[user_id] = channels
+                    # Check quiet hours
+                    if await self._is_quiet_hours(preferences):
+                        continue
+                
+                # Get user's notification channels
+                if request.channel_override:
+                    channels = [request.channel_override]
+                else:
+                    channels = list(snapshot.endpoints.get(user_id, {}))
+                
+                if not channels:
+                    continue
+                
+                # Check rate limits last, so only notifications that are sent count
+                if not request.priority_override and preferences:
+                    if await self._is_rate_limited(user_id, preferences):
+                        continue
+                
+                eligible_users[user_id] = channels
             
             return eligible_users
         
@@ -500,21 +529,75 @@ class NotificationAgent(BaseAgent):
             logger.error("Failed to get eligible users", error=str(e))
             return {}
     
+    async def _get_preference_snapshot(self) -> PreferenceSnapshot:
+        """
+        Get the preferences and endpoints of all users.
+        
+        The snapshot is loaded with two bulk queries and reused until
+        preferences or endpoints change or it is older than
+        preference_snapshot_ttl_seconds (which bounds staleness after
+        changes made by other processes).
+        """
+        if self._is_snapshot_current(self._preference_snapshot):
+            return self._preference_snapshot
+        
+        async with self._snapshot_lock:
+            # Another caller may have reloaded while we waited
+            if self._is_snapshot_current(self._preference_snapshot):
+                return self._preference_snapshot
+            
+            generation = get_preferences_generation()
+            async with get_db_session() as session:
+                notification_repo = NotificationRepository(session)
+                preferences = await notification_repo.get_all_user_preferences()
+                endpoints = await notification_repo.get_active_endpoints_by_user()
+            
+            self._preference_snapshot = PreferenceSnapshot(
+                preferences=preferences,
+                endpoints=endpoints,
+                generation=generation,
+                loaded_at=monotonic()
+            )
+            
+            # Drop rate limit state of users idle for a whole window
+            self.rate_limiter.purge_expired()
+            
+            logger.debug(
+                "Notification preference snapshot loaded",
+                users_with_preferences=len(preferences),
+                users_with_endpoints=len(endpoints)
+            )
+            return self._preference_snapshot
+    
+    def _is_snapshot_current(self, snapshot: Optional[PreferenceSnapshot]) -> bool:
+        return (
+            snapshot is not None
+            and snapshot.generation == get_preferences_generation()
+            and monotonic() - snapshot.loaded_at < self.preference_snapshot_ttl_seconds
+        )
+    
     async def _send_single_notification(
         self,
         alert_payload: AlertPayload,
         user_id: str,
         channel: NotificationChannel,
-        priority_override: bool = False
+        priority_override: bool = False,
+        endpoint: Optional[NotificationEndpoint] = None
     ) -> NotificationResult:
-        """Send a single notification to a user via specified channel."""
+        """
+        Send a single notification to a user via specified channel.
+        
+        The channel endpoint is looked up unless passed in (as resolved
+        from the preference snapshot).
+        """
         start_time = datetime.utcnow()
         
         try:
             # Get channel-specific endpoint configuration
-            async with get_db_session() as session:
-                notification_repo = NotificationRepository(session)
-                endpoint = await notification_repo.get_user_channel_endpoint(user_id, channel)
+            if endpoint is None:
+                async with get_db_session() as session:
+                    notification_repo = NotificationRepository(session)
+                    endpoint = await notification_repo.get_user_channel_endpoint(user_id, channel)
                 
                 if not endpoint:
                     return NotificationResult(
@@ -537,7 +620,7 @@ class NotificationAgent(BaseAgent):
                 )
             elif channel == NotificationChannel.WEBHOOK:
                 success = await self.webhook_service.send_webhook_notification(
-                    alert_payload, endpoint.endpoint_config
+                    alert_payload, endpoint.endpoint_config, user_id=user_id
                 )
             else:
                 success = False
@@ -579,7 +662,6 @@ class NotificationAgent(BaseAgent):
     
     async def _is_duplicate_alert(self, alert_id: str) -> bool:
         """Check if alert is a duplicate within the deduplication window."""
-        # Simple in-memory deduplication - in production, use Redis
         return alert_id in self.recent_alerts
     
     async def _is_quiet_hours(self, preferences: UserNotificationPreferences) -> bool:
@@ -598,29 +680,15 @@ class NotificationAgent(BaseAgent):
             return quiet_start <= current_time <= quiet_end
     
     async def _is_rate_limited(self, user_id: str, preferences: UserNotificationPreferences) -> bool:
-        """Check if user has exceeded their rate limit."""
+        """
+        Check if user has exceeded their rate limit.
+        
+        Notifications that are not limited count towards the limit.
+        """
         if not preferences:
             return False
         
-        current_time = datetime.utcnow()
-        hour_ago = current_time - timedelta(hours=1)
-        
-        # Get user's recent notifications from cache
-        if user_id not in self.rate_limit_cache:
-            self.rate_limit_cache[user_id] = []
-        
-        user_notifications = self.rate_limit_cache[user_id]
-        
-        # Remove notifications older than 1 hour
-        user_notifications[:] = [ts for ts in user_notifications if ts > hour_ago]
-        
-        # Check if user has exceeded rate limit
-        if len(user_notifications) >= preferences.rate_limit_per_hour:
-            return True
-        
-        # Add current notification to cache
-        user_notifications.append(current_time)
-        return False
+        return not self.rate_limiter.allow(user_id, preferences.rate_limit_per_hour)
     
     async def _consolidate_similar_alerts(self, alerts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Consolidate similar alerts to reduce notification fatigue."""
@@ -649,15 +717,22 @@ class NotificationAgent(BaseAgent):
             async with get_db_session() as session:
                 notification_repo = NotificationRepository(session)
                 
-                for result in results:
-                    await notification_repo.log_notification(
-                        product_id=None,  # Will be derived from alert_payload
-                        user_id=result.user_id,
-                        notification_type=result.channel.value,
-                        delivery_status=result.status,
-                        payload={"alert_id": alert_id},
-                        error_message=result.error_message
+                await notification_repo.log_notifications([
+                    {
+                        "product_id": None,  # Will be derived from alert_payload
+                        "user_id": result.user_id,
+                        "notification_type": result.channel.value,
+                        "delivery_status": result.status,
+                        "payload": {"alert_id": alert_id},
+                        "error_message": result.error_message
+                    }
+                    for result in results
+                    # Queued webhooks are logged by the delivery engine once final
+                    if not (
+                        result.channel == NotificationChannel.WEBHOOK
+                        and result.status == NotificationStatus.SENT
                     )
+                ])
         
         except Exception as e:
             logger.error("Failed to log notification batch", error=str(e))
\ No newline at end of file
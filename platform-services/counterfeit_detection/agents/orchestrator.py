@@ -4,9 +4,10 @@ Agent orchestrator for coordinating multi-agent workflows and managing agent lif
 
 import asyncio
 import json
+import time
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Set, Any
-from collections import defaultdict
+from collections import defaultdict, deque
 
 import structlog
 from pydantic import BaseModel, Field
@@ -16,9 +17,13 @@ from .base import (
     AgentMessage, 
     AgentResponse, 
     AgentMetadata, 
-    AgentStatus
+    AgentStatus,
+    ResponseDispatcher
 )
+from .utils.dispatch import DispatchStrategy, LoadTracker, get_dispatch_strategy
+from .utils.streams import StreamTransport, agent_stream
 from ..config.redis import get_redis_client
+from ..config.settings import get_settings
 
 logger = structlog.get_logger(module=__name__)
 
@@ -40,6 +45,7 @@ class Workflow(BaseModel):
     name: str = Field(..., description="Human-readable workflow name")
     description: str = Field("", description="Workflow description")
     steps: List[WorkflowStep] = Field(..., description="Workflow steps")
+    max_concurrency: Optional[int] = Field(None, ge=1, description="Maximum steps running at once (None for unlimited)")
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
 
@@ -53,7 +59,14 @@ class WorkflowExecution(BaseModel):
     current_step: Optional[str] = Field(None)
     completed_steps: Set[str] = Field(default_factory=set)
     failed_steps: Set[str] = Field(default_factory=set)
+    cancelled_steps: Set[str] = Field(default_factory=set)
     step_results: Dict[str, Any] = Field(default_factory=dict)
+    step_timings: Dict[str, Dict[str, float]] = Field(
+        default_factory=dict,
+        description="Per-step ready/started/finished offsets and duration in ms from execution start"
+    )
+    critical_path: List[str] = Field(default_factory=list, description="Dependency chain that bounded latency")
+    critical_path_ms: Optional[float] = Field(None, description="Execution latency along the critical path")
     error_message: Optional[str] = Field(None)
 
 
@@ -68,8 +81,17 @@ class AgentOrchestrator:
     - Load balancing across agent instances
     """
     
-    def __init__(self):
+    def __init__(self, dispatch_strategy: Optional[str] = None):
+        """
+        Initialize the orchestrator.
+        
+        Args:
+            dispatch_strategy: Agent selection strategy for workflow steps
+                (defaults to the agent_dispatch_strategy setting)
+        """
         self.redis_client = None
+        self.response_dispatcher: Optional[ResponseDispatcher] = None
+        self.stream_transport: Optional[StreamTransport] = None
         self.registered_agents: Dict[str, AgentMetadata] = {}
         self.agent_instances: Dict[str, List[str]] = defaultdict(list)  # agent_type -> [agent_ids]
         self.workflows: Dict[str, Workflow] = {}
@@ -77,6 +99,14 @@ class AgentOrchestrator:
         self.running_tasks: List[asyncio.Task] = []
         self.shutdown_event = asyncio.Event()
         
+        # Load-aware agent selection
+        self.heartbeat_timeout = timedelta(minutes=2)
+        self.agent_loads = LoadTracker()
+        self._configured_dispatch_strategy = dispatch_strategy
+        self.dispatch_strategy: DispatchStrategy = get_dispatch_strategy(
+            dispatch_strategy or "least_outstanding"
+        )
+        
         self.logger = structlog.get_logger(
             component="orchestrator"
         )
@@ -89,6 +119,17 @@ class AgentOrchestrator:
             # Initialize Redis connection
             self.redis_client = await get_redis_client()
             
+            # Listen for responses to orchestrator requests
+            await self._get_response_dispatcher()
+            
+            # Agents read direct messages from streams in streams mode
+            settings = get_settings()
+            if settings.message_bus_transport == "streams":
+                self.stream_transport = StreamTransport.from_settings(self.redis_client, settings)
+            
+            if self._configured_dispatch_strategy is None:
+                self.dispatch_strategy = get_dispatch_strategy(settings.agent_dispatch_strategy)
+            
             # Start background tasks
             self._start_background_tasks()
             
@@ -110,6 +151,10 @@ class AgentOrchestrator:
             if self.running_tasks:
                 await asyncio.gather(*self.running_tasks, return_exceptions=True)
             
+            if self.response_dispatcher:
+                await self.response_dispatcher.stop()
+                self.response_dispatcher = None
+            
             # Close Redis connection
             if self.redis_client:
                 await self.redis_client.close()
@@ -122,6 +167,7 @@ class AgentOrchestrator:
     
     def register_workflow(self, workflow: Workflow) -> None:
         """Register a workflow definition."""
+        self._validate_workflow(workflow)
         self.workflows[workflow.workflow_id] = workflow
         self.logger.info(
             "Workflow registered",
@@ -130,6 +176,39 @@ class AgentOrchestrator:
             steps=len(workflow.steps)
         )
     
+    @staticmethod
+    def _validate_workflow(workflow: Workflow) -> None:
+        """Check that step dependencies exist and form a DAG."""
+        step_ids = [step.step_id for step in workflow.steps]
+        if len(set(step_ids)) != len(step_ids):
+            raise ValueError(f"Workflow {workflow.workflow_id} has duplicate step IDs")
+        
+        remaining_deps = {}
+        dependents: Dict[str, List[str]] = defaultdict(list)
+        for step in workflow.steps:
+            unknown = set(step.depends_on) - set(step_ids)
+            if unknown:
+                raise ValueError(
+                    f"Step {step.step_id} depends on unknown steps: {', '.join(sorted(unknown))}"
+                )
+            remaining_deps[step.step_id] = len(set(step.depends_on))
+            for dep in set(step.depends_on):
+                dependents[dep].append(step.step_id)
+        
+        # Kahn's algorithm: every step is reached only if there is no cycle
+        ready = [step_id for step_id, count in remaining_deps.items() if count == 0]
+        reached = 0
+        while ready:
+            step_id = ready.pop()
+            reached += 1
+            for dependent in dependents[step_id]:
+                remaining_deps[dependent] -= 1
+                if remaining_deps[dependent] == 0:
+                    ready.append(dependent)
+        
+        if reached != len(step_ids):
+            raise ValueError(f"Workflow {workflow.workflow_id} has cyclic step dependencies")
+    
     async def execute_workflow(
         self, 
         workflow_id: str, 
@@ -182,6 +261,19 @@ class AgentOrchestrator:
         """Get all currently registered agents."""
         return self.registered_agents.copy()
     
+    def get_response_latency_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get agent response latency histograms per request message type."""
+        if not self.response_dispatcher:
+            return {}
+        return self.response_dispatcher.get_latency_stats()
+    
+    def get_dispatch_stats(self) -> Dict[str, Any]:
+        """Get the dispatch strategy and per-agent load."""
+        return {
+            "strategy": self.dispatch_strategy.name,
+            "agents": self.agent_loads.get_stats()
+        }
+    
     def get_agents_by_type(self, agent_type: str) -> List[AgentMetadata]:
         """Get all agents of a specific type."""
         return [
@@ -199,15 +291,20 @@ class AgentOrchestrator:
         if agent_id not in self.registered_agents:
             raise ValueError(f"Agent {agent_id} not registered")
         
-        # Set up response listener
-        response_channel = f"response.orchestrator"
         correlation_id = message.correlation_id or message.message_id
         
+        # Register before publishing so an immediate response is not missed
+        dispatcher = await self._get_response_dispatcher()
+        dispatcher.register(correlation_id, message.message_type)
+        
         try:
             # Send message
             agent_channel = f"agent.{agent_id}"
             message_json = message.json()
-            await self.redis_client.publish(agent_channel, message_json)
+            if self.stream_transport:
+                await self.stream_transport.publish(agent_stream(agent_id), message_json, message.priority)
+            else:
+                await self.redis_client.publish(agent_channel, message_json)
             
             self.logger.debug(
                 "Message sent to agent",
@@ -229,6 +326,9 @@ class AgentOrchestrator:
                 error=str(e)
             )
             raise
+        finally:
+            # Also reached on cancellation while publishing
+            dispatcher.discard(correlation_id)
     
     async def broadcast_message(
         self, 
@@ -320,6 +420,7 @@ class AgentOrchestrator:
                 if agent_id in self.registered_agents:
                     metadata = self.registered_agents[agent_id]
                     del self.registered_agents[agent_id]
+                    self.agent_loads.remove(agent_id)
                     
                     if agent_id in self.agent_instances[metadata.agent_type]:
                         self.agent_instances[metadata.agent_type].remove(agent_id)
@@ -381,7 +482,7 @@ class AgentOrchestrator:
         while not self.shutdown_event.is_set():
             try:
                 current_time = datetime.utcnow()
-                timeout_threshold = current_time - timedelta(minutes=2)  # 2 minute timeout
+                timeout_threshold = current_time - self.heartbeat_timeout
                 
                 inactive_agents = []
                 for agent_id, metadata in self.registered_agents.items():
@@ -412,54 +513,86 @@ class AgentOrchestrator:
         workflow: Workflow,
         context: Dict[str, Any]
     ) -> None:
-        """Execute workflow steps in dependency order."""
+        """
+        Execute workflow steps in dependency order.
+        
+        Steps are scheduled as a DAG: each step starts as soon as its last
+        dependency completes (up to the workflow's max_concurrency steps at
+        once), and the first failure cancels the steps still running.
+        """
+        running: Dict[asyncio.Task, str] = {}
+        
         try:
             execution.status = "running"
             
             # Build dependency graph
             step_map = {step.step_id: step for step in workflow.steps}
-            ready_steps = [step for step in workflow.steps if not step.depends_on]
-            
-            while ready_steps and execution.status == "running":
-                # Execute ready steps in parallel
-                step_tasks = []
-                for step in ready_steps:
+            remaining_deps = {step.step_id: len(set(step.depends_on)) for step in workflow.steps}
+            dependents: Dict[str, List[str]] = defaultdict(list)
+            for step in workflow.steps:
+                for dep in set(step.depends_on):
+                    dependents[dep].append(step.step_id)
+            
+            ready = deque(step_id for step_id, count in remaining_deps.items() if count == 0)
+            ready_at = {step_id: 0.0 for step_id in ready}
+            max_running = workflow.max_concurrency or len(workflow.steps)
+            origin = time.perf_counter()
+            
+            while (ready or running) and execution.status == "running":
+                # Start ready steps up to the concurrency limit
+                while ready and len(running) < max_running:
+                    step_id = ready.popleft()
+                    execution.step_timings[step_id] = {
+                        "ready_ms": ready_at[step_id],
+                        "started_ms": (time.perf_counter() - origin) * 1000
+                    }
                     task = asyncio.create_task(
-                        self._execute_workflow_step(execution, step, context)
+                        self._execute_workflow_step(execution, step_map[step_id], context)
                     )
-                    step_tasks.append((step.step_id, task))
+                    running[task] = step_id
+                
+                # Handle whichever steps finish first
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
                 
-                # Wait for step completion
-                for step_id, task in step_tasks:
+                for task in done:
+                    step_id = running.pop(task)
+                    timing = execution.step_timings[step_id]
+                    timing["finished_ms"] = (time.perf_counter() - origin) * 1000
+                    timing["duration_ms"] = timing["finished_ms"] - timing["started_ms"]
+                    
                     try:
-                        result = await task
-                        execution.completed_steps.add(step_id)
-                        execution.step_results[step_id] = result
-                        
-                        # Update context with step results
-                        if result and isinstance(result, dict):
-                            context.update(result)
-                            
+                        result = task.result()
                     except Exception as e:
                         execution.failed_steps.add(step_id)
                         execution.error_message = str(e)
                         execution.status = "failed"
-                        break
-                
-                if execution.status == "failed":
-                    break
-                
-                # Find next ready steps
-                ready_steps = []
-                for step in workflow.steps:
-                    if (step.step_id not in execution.completed_steps and
-                        step.step_id not in execution.failed_steps and
-                        all(dep in execution.completed_steps for dep in step.depends_on)):
-                        ready_steps.append(step)
+                        continue
+                    
+                    execution.completed_steps.add(step_id)
+                    execution.step_results[step_id] = result
+                    
+                    # Update context with step results
+                    if result and isinstance(result, dict):
+                        context.update(result)
+                    
+                    # Release dependents whose last dependency just completed
+                    for dependent in dependents[step_id]:
+                        remaining_deps[dependent] -= 1
+                        if remaining_deps[dependent] == 0:
+                            ready.append(dependent)
+                            ready_at[dependent] = timing["finished_ms"]
             
             # Mark execution as completed if all steps succeeded
-            if execution.status == "running" and len(execution.completed_steps) == len(workflow.steps):
-                execution.status = "completed"
+            if execution.status == "running":
+                if len(execution.completed_steps) == len(workflow.steps):
+                    execution.status = "completed"
+                else:
+                    execution.status = "failed"
+                    execution.error_message = "Workflow has unsatisfiable step dependencies"
+            
+            execution.critical_path = self._critical_path(workflow, execution.step_timings)
+            if execution.critical_path:
+                execution.critical_path_ms = execution.step_timings[execution.critical_path[-1]]["finished_ms"]
             
             execution.completed_at = datetime.utcnow()
             
@@ -468,7 +601,9 @@ class AgentOrchestrator:
                 execution_id=execution.execution_id,
                 status=execution.status,
                 completed_steps=len(execution.completed_steps),
-                total_steps=len(workflow.steps)
+                total_steps=len(workflow.steps),
+                critical_path=execution.critical_path,
+                critical_path_ms=execution.critical_path_ms
             )
             
         except Exception as e:
@@ -481,6 +616,50 @@ class AgentOrchestrator:
                 execution_id=execution.execution_id,
                 error=str(e)
             )
+        
+        finally:
+            # Cancel sibling steps after a failure (or if the execution itself is cancelled)
+            if running:
+                for task in running:
+                    task.cancel()
+                await asyncio.gather(*running, return_exceptions=True)
+                execution.cancelled_steps.update(running.values())
+                
+                self.logger.warning(
+                    "Workflow steps cancelled",
+                    execution_id=execution.execution_id,
+                    steps=sorted(running.values())
+                )
+    
+    @staticmethod
+    def _critical_path(workflow: Workflow, step_timings: Dict[str, Dict[str, float]]) -> List[str]:
+        """
+        Chain of steps that bounded the execution's latency.
+        
+        Starts at the step that finished last and walks back through the
+        dependency that finished last, i.e. the one that released it.
+        """
+        finished = {
+            step_id: timing["finished_ms"]
+            for step_id, timing in step_timings.items()
+            if "finished_ms" in timing
+        }
+        if not finished:
+            return []
+        
+        depends_on = {step.step_id: step.depends_on for step in workflow.steps}
+        current = max(finished, key=finished.get)
+        path = [current]
+        
+        while True:
+            parents = [dep for dep in depends_on[current] if dep in finished]
+            if not parents:
+                break
+            current = max(parents, key=finished.get)
+            path.append(current)
+        
+        path.reverse()
+        return path
     
     async def _execute_workflow_step(
         self, 
@@ -490,39 +669,41 @@ class AgentOrchestrator:
     ) -> Optional[Dict[str, Any]]:
         """Execute a single workflow step."""
         execution.current_step = step.step_id
-        
-        # Find available agent of required type
-        available_agents = [
-            agent for agent in self.registered_agents.values()
-            if (agent.agent_type == step.agent_type and 
-                agent.status == AgentStatus.RUNNING)
-        ]
-        
-        if not available_agents:
-            raise RuntimeError(f"No available agents of type {step.agent_type}")
-        
-        # Use simple round-robin for load balancing
-        agent = available_agents[0]
-        
-        # Create step message
-        step_message = AgentMessage(
-            sender_id="orchestrator",
-            recipient_id=agent.agent_id,
-            message_type=step.message_type,
-            payload={**step.payload, **context},
-            correlation_id=f"{execution.execution_id}_{step.step_id}"
-        )
+        failed_agents: Set[str] = set()
         
         # Execute step with retries
         for attempt in range(step.retry_count + 1):
+            # Re-select per attempt so a retry can move to another agent
+            agent = self._select_agent(step.agent_type, exclude=failed_agents)
+            
+            # Create step message
+            step_message = AgentMessage(
+                sender_id="orchestrator",
+                recipient_id=agent.agent_id,
+                message_type=step.message_type,
+                payload={**step.payload, **context},
+                correlation_id=f"{execution.execution_id}_{step.step_id}"
+            )
+            
             try:
-                response = await self.send_message_to_agent(
-                    agent.agent_id, 
-                    step_message, 
-                    step.timeout
-                )
+                self.agent_loads.started(agent.agent_id)
+                start_time = time.perf_counter()
+                success = False
+                try:
+                    response = await self.send_message_to_agent(
+                        agent.agent_id, 
+                        step_message, 
+                        step.timeout
+                    )
+                    success = bool(response and response.success)
+                finally:
+                    self.agent_loads.finished(
+                        agent.agent_id,
+                        (time.perf_counter() - start_time) * 1000,
+                        success
+                    )
                 
-                if response and response.success:
+                if success:
                     self.logger.info(
                         "Workflow step completed",
                         execution_id=execution.execution_id,
@@ -535,12 +716,14 @@ class AgentOrchestrator:
                     raise RuntimeError(f"Step failed: {error_msg}")
                     
             except Exception as e:
+                failed_agents.add(agent.agent_id)
                 if attempt < step.retry_count:
                     self.logger.warning(
                         "Workflow step failed, retrying",
                         execution_id=execution.execution_id,
                         step_id=step.step_id,
                         attempt=attempt + 1,
+                        agent_id=agent.agent_id,
                         error=str(e)
                     )
                     await asyncio.sleep(1)  # Brief delay before retry
@@ -549,35 +732,50 @@ class AgentOrchestrator:
         
         raise RuntimeError(f"Step {step.step_id} failed after {step.retry_count + 1} attempts")
     
+    def _select_agent(self, agent_type: str, exclude: Optional[Set[str]] = None) -> AgentMetadata:
+        """
+        Select an agent of a type using the dispatch strategy.
+        
+        Agents that are not running or whose heartbeat has expired are
+        skipped. Agents in ``exclude`` (e.g. ones that just failed the
+        step) are only used when no other agent is available.
+        """
+        heartbeat_threshold = datetime.utcnow() - self.heartbeat_timeout
+        available_agents = [
+            agent for agent in self.registered_agents.values()
+            if (agent.agent_type == agent_type and 
+                agent.status == AgentStatus.RUNNING and
+                (agent.last_heartbeat is None or agent.last_heartbeat >= heartbeat_threshold))
+        ]
+        
+        if not available_agents:
+            raise RuntimeError(f"No available agents of type {agent_type}")
+        
+        if exclude:
+            available_agents = [
+                agent for agent in available_agents if agent.agent_id not in exclude
+            ] or available_agents
+        
+        return self.dispatch_strategy.select(available_agents, self.agent_loads)
+    
+    async def _get_response_dispatcher(self) -> ResponseDispatcher:
+        """Get the response dispatcher, starting it on first use."""
+        if self.response_dispatcher is None:
+            self.response_dispatcher = ResponseDispatcher(
+                self.redis_client, "response.orchestrator", self.logger
+            )
+        if not self.response_dispatcher.running:
+            await self.response_dispatcher.start()
+        return self.response_dispatcher
+    
     async def _wait_for_response(
         self, 
         correlation_id: str, 
         timeout: float
     ) -> Optional[AgentResponse]:
         """Wait for response message with correlation ID."""
-        response_channel = "response.orchestrator"
-        pubsub = self.redis_client.pubsub()
-        
-        try:
-            await pubsub.subscribe(response_channel)
-            
-            async def listen_for_response():
-                async for message in pubsub.listen():
-                    if message["type"] == "message":
-                        response_dict = json.loads(message["data"])
-                        response = AgentResponse(**response_dict)
-                        if response.correlation_id == correlation_id:
-                            return response
-                return None
-            
-            return await asyncio.wait_for(listen_for_response(), timeout=timeout)
-            
-        except asyncio.TimeoutError:
-            self.logger.warning("Response timeout", correlation_id=correlation_id)
-            return None
-        finally:
-            await pubsub.unsubscribe()
-            await pubsub.close()
+        dispatcher = await self._get_response_dispatcher()
+        return await dispatcher.wait(correlation_id, timeout)
     
     async def _cleanup_completed_workflows(self) -> None:
         """Clean up completed workflow executions periodically."""
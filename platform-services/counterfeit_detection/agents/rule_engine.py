@@ -11,8 +11,9 @@ import json
 from datetime import datetime
 from decimal import Decimal
 from typing import Any, Dict, List, Optional, Set, Tuple
-from uuid import uuid4
+from uuid import UUID, uuid4
 
+import numpy as np
 import structlog
 from pydantic import BaseModel, Field, validator
 
@@ -22,6 +23,8 @@ from ..db.repositories.product_repository import ProductRepository
 from ..db.repositories.rule_repository import RuleRepository
 from ..models.enums import ProductCategory, RuleType, RuleAction
 from ..models.database import DetectionRule
+from ..utils.keyword_matcher import KeywordMatcher
+from ..utils.lru_cache import LRUCache
 
 logger = structlog.get_logger(__name__)
 
@@ -104,6 +107,10 @@ class ThresholdEvaluator:
 class KeywordEvaluator:
     """Handles keyword-based rule evaluation."""
     
+    # Single-rule matchers by rule ID and version, so rules evaluated one at
+    # a time are not recompiled for every product
+    _compiled_rules = LRUCache(max_entries=1024)
+    
     @staticmethod
     def evaluate_keyword_rule(
         rule: DetectionRule, 
@@ -119,12 +126,83 @@ class KeywordEvaluator:
         Returns:
             RuleMatch if rule is triggered, None otherwise
         """
-        config = rule.config
-        patterns = config.get("patterns", [])
-        case_sensitive = config.get("case_sensitive", False)
-        match_type = config.get("match_type", "any")  # "any" or "all"
-        action = RuleAction(config.get("action", "flag"))
+        key = (rule.id, KeywordEvaluator._rule_version(rule))
+        compiled = KeywordEvaluator._compiled_rules.get(key)
+        if compiled is None:
+            compiled = KeywordEvaluator.compile_rules([rule])
+            KeywordEvaluator._compiled_rules.set(key, compiled)
+        
+        return compiled.evaluate(product_data).get(rule.id)
+    
+    @staticmethod
+    def _rule_version(rule: DetectionRule) -> Tuple[Any, ...]:
+        """Everything a compiled rule depends on besides its ID."""
+        return (
+            getattr(rule, "updated_at", None),
+            rule.name,
+            rule.priority,
+            rule.rule_type,
+            json.dumps(rule.config, sort_keys=True, default=str)
+        )
+    
+    @staticmethod
+    def compile_rules(rules: List[DetectionRule]) -> "CompiledKeywordRules":
+        """Compile the keyword rules among ``rules`` into a single matcher."""
+        return CompiledKeywordRules(rules)
+
+
+class CompiledKeywordRules:
+    """
+    Keyword rules compiled into one multi-pattern matcher.
+    
+    One scan of the product text finds the patterns of every rule, instead
+    of a substring search per pattern per rule. Besides the existing
+    ``patterns``, ``case_sensitive`` and ``match_type`` settings, rule configs
+    may enable ``word_boundary`` (whole words only), ``leet_speak``
+    ("r3pl1ca" matches "replica") and ``fuzzy`` (separators ignored, so
+    "r.e.p.l.i.c.a" matches "replica").
+    """
+    
+    def __init__(self, rules: List[DetectionRule]):
+        """
+        Compile keyword rules.
+        
+        Args:
+            rules: Detection rules; rules of other types are ignored
+        """
+        self.source_rules = rules
+        self.rules = [rule for rule in rules if rule.rule_type == RuleType.KEYWORD]
+        self.rule_ids = frozenset(rule.id for rule in self.rules)
+        self.matcher = KeywordMatcher()
+        
+        for rule_index, rule in enumerate(self.rules):
+            config = rule.config
+            for pattern_index, pattern in enumerate(config.get("patterns", [])):
+                self.matcher.add(
+                    (rule_index, pattern_index),
+                    pattern,
+                    case_sensitive=config.get("case_sensitive", False),
+                    word_boundary=config.get("word_boundary", False),
+                    leet_speak=config.get("leet_speak", False),
+                    fuzzy=config.get("fuzzy", False)
+                )
         
+        self.matcher.compile()
+    
+    def __contains__(self, rule_id: str) -> bool:
+        return rule_id in self.rule_ids
+    
+    def evaluate(self, product_data: Dict[str, Any]) -> Dict[str, Optional[RuleMatch]]:
+        """
+        Evaluate all compiled rules against product data.
+        
+        Args:
+            product_data: Product information
+            
+        Returns:
+            Mapping of every compiled rule ID to its RuleMatch, or None if
+            the rule was not triggered
+        """
         # Check product description and title
         text_fields = []
         if "description" in product_data:
@@ -132,15 +210,26 @@ class KeywordEvaluator:
         if "title" in product_data:
             text_fields.append(product_data["title"])
         
-        search_text = " ".join(text_fields)
-        if not case_sensitive:
-            search_text = search_text.lower()
-            patterns = [p.lower() for p in patterns]
+        found = self.matcher.find(" ".join(text_fields))
         
-        matches = []
-        for pattern in patterns:
-            if pattern in search_text:
-                matches.append(pattern)
+        return {
+            rule.id: self._build_match(rule_index, rule, found)
+            for rule_index, rule in enumerate(self.rules)
+        }
+    
+    @staticmethod
+    def _build_match(rule_index: int, rule: DetectionRule, found: Set[Tuple[int, int]]) -> Optional[RuleMatch]:
+        """Build the RuleMatch for one rule from the matched pattern keys."""
+        config = rule.config
+        patterns = config.get("patterns", [])
+        case_sensitive = config.get("case_sensitive", False)
+        match_type = config.get("match_type", "any")  # "any" or "all"
+        
+        matches = [
+            pattern if case_sensitive else pattern.lower()
+            for pattern_index, pattern in enumerate(patterns)
+            if (rule_index, pattern_index) in found
+        ]
         
         # Determine if rule is triggered based on match_type
         triggered = False
@@ -149,24 +238,22 @@ class KeywordEvaluator:
         elif match_type == "all" and len(matches) == len(patterns):
             triggered = True
         
-        if triggered:
-            confidence = len(matches) / len(patterns)
-            
-            return RuleMatch(
-                rule_id=rule.id,
-                rule_name=rule.name,
-                rule_type=rule.rule_type,
-                priority=rule.priority,
-                action=action,
-                confidence=confidence,
-                evidence={
-                    "matched_patterns": matches,
-                    "match_type": match_type,
-                    "total_patterns": len(patterns)
-                }
-            )
+        if not triggered:
+            return None
         
-        return None
+        return RuleMatch(
+            rule_id=rule.id,
+            rule_name=rule.name,
+            rule_type=rule.rule_type,
+            priority=rule.priority,
+            action=RuleAction(config.get("action", "flag")),
+            confidence=len(matches) / len(patterns),
+            evidence={
+                "matched_patterns": matches,
+                "match_type": match_type,
+                "total_patterns": len(patterns)
+            }
+        )
 
 
 class SupplierEvaluator:
@@ -239,6 +326,8 @@ class SupplierEvaluator:
 class PriceAnomalyEvaluator:
     """Handles price anomaly rule evaluation."""
     
+    LUXURY_BRANDS = {"rolex", "gucci", "louis vuitton", "prada", "hermès", "chanel"}
+    
     @staticmethod
     def evaluate_price_anomaly_rule(
         rule: DetectionRule, 
@@ -296,9 +385,8 @@ class PriceAnomalyEvaluator:
         
         # Heuristic-based evaluation for luxury brands
         brand = product_data.get("brand", "").lower()
-        luxury_brands = {"rolex", "gucci", "louis vuitton", "prada", "hermès", "chanel"}
         
-        if any(luxury_brand in brand for luxury_brand in luxury_brands):
+        if any(luxury_brand in brand for luxury_brand in PriceAnomalyEvaluator.LUXURY_BRANDS):
             # Luxury items below $50 are highly suspicious
             if product_price < 50.0:
                 return RuleMatch(
@@ -318,6 +406,217 @@ class PriceAnomalyEvaluator:
         return None
 
 
+class ProductBatch:
+    """
+    Columnar view of a batch of products for vectorized rule evaluation.
+    
+    Numeric fields are NumPy arrays (NaN where missing) and supplier IDs are
+    factorized into integer codes, so rules can be evaluated as masks over
+    the whole batch instead of one product at a time.
+    """
+    
+    def __init__(
+        self,
+        product_data: List[Dict[str, Any]],
+        analysis_scores: List[Optional[float]]
+    ):
+        """
+        Build the batch.
+        
+        Args:
+            product_data: Rule evaluation dictionaries, one per product
+            analysis_scores: LLM authenticity score per product (or None)
+        """
+        self.product_data = product_data
+        self.scores = analysis_scores
+        
+        self.analysis_scores = self._float_column(analysis_scores)
+        self.prices = self._float_column(data["price"] for data in product_data)
+        self.supplier_reputations = self._float_column(
+            data["supplier_reputation"] for data in product_data
+        )
+        
+        # Supplier IDs as integer codes (-1 for no supplier)
+        self.supplier_index: Dict[str, int] = {}
+        self.supplier_codes = np.array(
+            [
+                self.supplier_index.setdefault(data["supplier_id"], len(self.supplier_index))
+                if data["supplier_id"] else -1
+                for data in product_data
+            ],
+            dtype=np.int64
+        )
+        
+        self.luxury_brands = np.array(
+            [
+                any(luxury_brand in data["brand"].lower() for luxury_brand in PriceAnomalyEvaluator.LUXURY_BRANDS)
+                for data in product_data
+            ],
+            dtype=bool
+        )
+    
+    def __len__(self) -> int:
+        return len(self.product_data)
+    
+    def rows_by_category(self) -> Dict[ProductCategory, np.ndarray]:
+        """Row indices of the batch grouped by product category."""
+        groups: Dict[ProductCategory, List[int]] = {}
+        for row, data in enumerate(self.product_data):
+            groups.setdefault(data["category"], []).append(row)
+        return {category: np.array(rows, dtype=np.int64) for category, rows in groups.items()}
+    
+    def supplier_codes_for(self, supplier_ids: List[str]) -> np.ndarray:
+        """Codes of the given supplier IDs that occur in the batch."""
+        codes = [self.supplier_index[supplier_id] for supplier_id in supplier_ids if supplier_id in self.supplier_index]
+        return np.array(codes, dtype=np.int64)
+    
+    @staticmethod
+    def _float_column(values) -> np.ndarray:
+        return np.array(
+            [np.nan if value is None else float(value) for value in values],
+            dtype=np.float64
+        )
+
+
+class BatchRuleEvaluator:
+    """
+    Vectorized evaluation of threshold, supplier and price anomaly rules.
+    
+    Produces the same matches as the per-product evaluators for the rows of
+    a ProductBatch. Rule types without a vectorized form return None so the
+    caller can fall back to per-product evaluation.
+    """
+    
+    @staticmethod
+    def evaluate(
+        rule: DetectionRule,
+        batch: ProductBatch,
+        rows: np.ndarray
+    ) -> Optional[List[Tuple[int, RuleMatch]]]:
+        """
+        Evaluate a rule against rows of a batch.
+        
+        Args:
+            rule: Rule to evaluate
+            batch: Product batch
+            rows: Row indices to evaluate
+            
+        Returns:
+            (row, RuleMatch) pairs for triggered rows, or None if the rule
+            type cannot be vectorized
+        """
+        if rule.rule_type == RuleType.THRESHOLD:
+            return BatchRuleEvaluator._evaluate_threshold(rule, batch, rows)
+        elif rule.rule_type == RuleType.SUPPLIER:
+            return BatchRuleEvaluator._evaluate_supplier(rule, batch, rows)
+        elif rule.rule_type == RuleType.PRICE_ANOMALY:
+            return BatchRuleEvaluator._evaluate_price_anomaly(rule, batch, rows)
+        return None
+    
+    @staticmethod
+    def _evaluate_threshold(rule: DetectionRule, batch: ProductBatch, rows: np.ndarray) -> List[Tuple[int, RuleMatch]]:
+        config = rule.config
+        threshold = float(config.get("score_threshold", 50.0))
+        action = RuleAction(config.get("action", "flag"))
+        
+        if threshold <= 0:
+            # No valid confidence can be computed
+            return []
+        
+        scores = batch.analysis_scores[rows]
+        mask = scores < threshold  # NaN (no score) never triggers
+        hit_rows = rows[mask]
+        hit_scores = scores[mask]
+        confidences = np.minimum(1.0, (threshold - hit_scores) / threshold)
+        
+        return [
+            (row, BatchRuleEvaluator._match(rule, action, confidence, {
+                "analysis_score": score,
+                "threshold": threshold,
+                "score_difference": threshold - score
+            }))
+            for row, score, confidence in zip(hit_rows.tolist(), hit_scores.tolist(), confidences.tolist())
+        ]
+    
+    @staticmethod
+    def _evaluate_supplier(rule: DetectionRule, batch: ProductBatch, rows: np.ndarray) -> List[Tuple[int, RuleMatch]]:
+        config = rule.config
+        blacklist = config.get("blacklist", [])
+        whitelist = config.get("whitelist", [])
+        reputation_threshold = float(config.get("reputation_threshold", 0.0))
+        action = RuleAction(config.get("action", "flag"))
+        
+        codes = batch.supplier_codes[rows]
+        reputations = batch.supplier_reputations[rows]
+        
+        # Same precedence as SupplierEvaluator: blacklist, whitelist, reputation
+        blacklisted = (codes >= 0) & np.isin(codes, batch.supplier_codes_for(blacklist))
+        remaining = ~blacklisted
+        
+        if whitelist:
+            whitelist_violation = remaining & ~np.isin(codes, batch.supplier_codes_for(whitelist))
+            remaining &= ~whitelist_violation
+        else:
+            whitelist_violation = np.zeros(len(rows), dtype=bool)
+        
+        if reputation_threshold > 0:
+            below_threshold = remaining & (reputations < reputation_threshold)
+            reputation_confidences = (reputation_threshold - reputations) / reputation_threshold
+            below_threshold &= reputation_confidences <= 1.0
+        else:
+            below_threshold = np.zeros(len(rows), dtype=bool)
+            reputation_confidences = np.zeros(len(rows))
+        
+        matches = []
+        for index in np.flatnonzero(blacklisted | whitelist_violation | below_threshold).tolist():
+            row = int(rows[index])
+            supplier_id = batch.product_data[row]["supplier_id"]
+            if blacklisted[index]:
+                confidence = 1.0
+                evidence = {"blacklist_match": True, "supplier_id": supplier_id}
+            elif whitelist_violation[index]:
+                confidence = 0.8
+                evidence = {"whitelist_violation": True, "supplier_id": supplier_id}
+            else:
+                confidence = float(reputation_confidences[index])
+                evidence = {
+                    "reputation_below_threshold": True,
+                    "supplier_reputation": float(reputations[index]),
+                    "reputation_threshold": reputation_threshold
+                }
+            matches.append((row, BatchRuleEvaluator._match(rule, action, confidence, evidence)))
+        
+        return matches
+    
+    @staticmethod
+    def _evaluate_price_anomaly(rule: DetectionRule, batch: ProductBatch, rows: np.ndarray) -> List[Tuple[int, RuleMatch]]:
+        # Without market data only the luxury brand heuristic applies
+        action = RuleAction(rule.config.get("action", "flag"))
+        prices = batch.prices[rows]
+        mask = batch.luxury_brands[rows] & (prices < 50.0)
+        
+        return [
+            (row, BatchRuleEvaluator._match(rule, action, 0.95, {
+                "product_price": price,
+                "luxury_brand_detected": True,
+                "suspicious_low_price": True
+            }))
+            for row, price in zip(rows[mask].tolist(), prices[mask].tolist())
+        ]
+    
+    @staticmethod
+    def _match(rule: DetectionRule, action: RuleAction, confidence: float, evidence: Dict[str, Any]) -> RuleMatch:
+        return RuleMatch(
+            rule_id=rule.id,
+            rule_name=rule.name,
+            rule_type=rule.rule_type,
+            priority=rule.priority,
+            action=action,
+            confidence=confidence,
+            evidence=evidence
+        )
+
+
 class RuleEngine(BaseAgent):
     """
     Rule Engine Agent for configurable detection rules and threshold-based flagging.
@@ -371,12 +670,22 @@ class RuleEngine(BaseAgent):
         self.supplier_evaluator = SupplierEvaluator()
         self.price_evaluator = PriceAnomalyEvaluator()
         
+        # Products loaded and evaluated together by batch evaluation
+        self.batch_chunk_size = 1000
+        
         # Performance metrics
         self.total_evaluations = 0
         self.total_evaluation_time = 0.0
-        self.rules_cache: Dict[str, List[DetectionRule]] = {}
-        self.rules_cache_timestamp: Optional[datetime] = None
+        # Applicable rules per category (category rules + general rules).
+        # Entries carry no expiry or size limit of their own: the whole
+        # snapshot expires at once, when rules_cache_timestamp is stale.
         self.cache_ttl_seconds = 300  # 5 minutes
+        self.rules_cache = LRUCache()
+        self.rules_cache_timestamp: Optional[datetime] = None
+        self.rules_loaded = 0
+        self._rules_refresh_lock = asyncio.Lock()
+        # Compiled keyword rules per category, rebuilt with the rules cache
+        self.keyword_rules: Dict[str, CompiledKeywordRules] = {}
         
         # Repositories (initialized in start method)
         self.rule_repository: Optional[RuleRepository] = None
@@ -475,42 +784,34 @@ class RuleEngine(BaseAgent):
                 error="product_ids array is required"
             )
         
+        try:
+            results = await self.evaluate_products_batch(product_ids, analysis_scores)
+        except Exception as e:
+            logger.error("Batch rule evaluation failed", error=str(e), product_count=len(product_ids))
+            return AgentResponse(
+                success=False,
+                error=f"Batch rule evaluation failed: {str(e)}"
+            )
+        
         evaluations = []
         successful_count = 0
         error_count = 0
         
-        # Process products in parallel (limited concurrency)
-        semaphore = asyncio.Semaphore(5)  # Limit to 5 concurrent evaluations
-        
-        async def evaluate_single(pid: str) -> Optional[Dict[str, Any]]:
-            async with semaphore:
-                try:
-                    analysis_score = analysis_scores.get(pid)
-                    result = await self.evaluate_product_rules(pid, analysis_score)
-                    return {
-                        "evaluation_id": result.evaluation_id,
-                        "product_id": result.product_id,
-                        "matched_rules_count": len(result.matched_rules),
-                        "highest_priority_action": result.highest_priority_action.value if result.highest_priority_action else None,
-                        "overall_risk_score": result.overall_risk_score,
-                        "evaluation_duration_ms": result.evaluation_duration_ms
-                    }
-                except Exception as e:
-                    logger.error("Batch evaluation failed for product", error=str(e), product_id=pid)
-                    return None
-        
-        # Execute batch evaluation
-        tasks = [evaluate_single(pid) for pid in product_ids]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-        
-        for result in results:
-            if isinstance(result, Exception):
-                error_count += 1
-            elif result is not None:
-                evaluations.append(result)
-                successful_count += 1
-            else:
+        for pid, result in zip(product_ids, results):
+            if result is None:
+                logger.error("Batch evaluation failed for product", error="Product not found", product_id=pid)
                 error_count += 1
+                continue
+            
+            evaluations.append({
+                "evaluation_id": result.evaluation_id,
+                "product_id": result.product_id,
+                "matched_rules_count": len(result.matched_rules),
+                "highest_priority_action": result.highest_priority_action.value if result.highest_priority_action else None,
+                "overall_risk_score": result.overall_risk_score,
+                "evaluation_duration_ms": result.evaluation_duration_ms
+            })
+            successful_count += 1
         
         return AgentResponse(
             success=True,
@@ -539,7 +840,8 @@ class RuleEngine(BaseAgent):
                     self.total_evaluation_time / self.total_evaluations 
                     if self.total_evaluations > 0 else 0
                 ),
-                "rules_cache_size": sum(len(rules) for rules in self.rules_cache.values()),
+                "rules_cache_size": self.rules_loaded,
+                "rules_cache": self.rules_cache.get_stats(),
                 "cache_last_updated": self.rules_cache_timestamp.isoformat() if self.rules_cache_timestamp else None,
                 "processed_messages": self.processed_messages,
                 "error_count": self.error_count
@@ -554,7 +856,7 @@ class RuleEngine(BaseAgent):
                 success=True,
                 result={
                     "cache_refreshed": True,
-                    "rules_loaded": sum(len(rules) for rules in self.rules_cache.values()),
+                    "rules_loaded": self.rules_loaded,
                     "cache_timestamp": self.rules_cache_timestamp.isoformat()
                 }
             )
@@ -593,24 +895,18 @@ class RuleEngine(BaseAgent):
                     raise ValueError(f"Product {product_id} not found")
                 
                 # Convert product to dictionary for rule evaluation
-                product_data = {
-                    "id": str(product.id),
-                    "title": getattr(product, 'title', ''),
-                    "description": product.description or '',
-                    "category": product.category,
-                    "price": product.price,
-                    "brand": product.brand or '',
-                    "supplier_id": str(product.supplier_id) if product.supplier_id else None,
-                    "supplier_reputation": getattr(product, 'supplier_reputation', 1.0)
-                }
+                product_data = self._product_to_rule_data(product)
                 
                 # Get applicable rules
                 rules = await self._get_applicable_rules(product.category)
                 
+                # All keyword rules are matched in one pass over the text
+                keyword_matches = self._get_keyword_rules(product.category, rules).evaluate(product_data)
+                
                 # Evaluate rules
                 matched_rules = []
                 for rule in rules:
-                    match = await self._evaluate_single_rule(rule, product_data, analysis_score)
+                    match = await self._evaluate_single_rule(rule, product_data, analysis_score, keyword_matches)
                     if match:
                         matched_rules.append(match)
                 
@@ -650,22 +946,188 @@ class RuleEngine(BaseAgent):
             logger.error("Rule evaluation failed", error=str(e), product_id=product_id)
             raise
     
+    async def evaluate_products_batch(
+        self,
+        product_ids: List[str],
+        analysis_scores: Optional[Dict[str, float]] = None
+    ) -> List[Optional[RuleEvaluationResult]]:
+        """
+        Evaluate many products against their applicable detection rules.
+        
+        Products are loaded with one query per chunk of batch_chunk_size and
+        evaluated column-wise: threshold, supplier and price anomaly rules as
+        NumPy masks over the chunk, keyword rules with one compiled scan per
+        product. Other rule types fall back to per-product evaluation.
+        
+        Args:
+            product_ids: IDs of products to evaluate
+            analysis_scores: LLM authenticity scores by product ID (optional)
+            
+        Returns:
+            One RuleEvaluationResult per product ID, in order (None for
+            products that were not found)
+        """
+        analysis_scores = analysis_scores or {}
+        results: List[Optional[RuleEvaluationResult]] = []
+        
+        for chunk_start in range(0, len(product_ids), self.batch_chunk_size):
+            chunk = product_ids[chunk_start:chunk_start + self.batch_chunk_size]
+            results.extend(await self._evaluate_products_chunk(chunk, analysis_scores))
+        
+        return results
+    
+    async def _evaluate_products_chunk(
+        self,
+        product_ids: List[str],
+        analysis_scores: Dict[str, float]
+    ) -> List[Optional[RuleEvaluationResult]]:
+        """Load and evaluate one chunk of a batch."""
+        start_time = datetime.utcnow()
+        
+        async with get_db_session() as session:
+            product_repo = ProductRepository(session)
+            products = await product_repo.get_products_by_ids(
+                [key for key in map(self._product_key, product_ids) if key is not None]
+            )
+        products_by_key = {str(product.id): product for product in products}
+        
+        # Rows of the batch; duplicated IDs are evaluated once per occurrence
+        found_positions = []
+        product_data = []
+        scores = []
+        for position, pid in enumerate(product_ids):
+            product = products_by_key.get(self._product_key(pid))
+            if product is not None:
+                found_positions.append(position)
+                product_data.append(self._product_to_rule_data(product))
+                scores.append(analysis_scores.get(pid))
+        
+        batch = ProductBatch(product_data, scores)
+        row_matches: List[List[RuleMatch]] = [[] for _ in range(len(batch))]
+        row_rule_counts = [0] * len(batch)
+        
+        for category, rows in batch.rows_by_category().items():
+            rules = await self._get_applicable_rules(category)
+            for row in rows.tolist():
+                row_rule_counts[row] = len(rules)
+            
+            keyword_rules = self._get_keyword_rules(category, rules)
+            keyword_matches = {
+                row: keyword_rules.evaluate(batch.product_data[row]) for row in rows.tolist()
+            } if keyword_rules.rules else {}
+            
+            # Rules in priority order, so match order equals the single-product path
+            for rule in rules:
+                try:
+                    if rule.rule_type == RuleType.KEYWORD and keyword_matches:
+                        triggered = [(row, keyword_matches[row].get(rule.id)) for row in rows.tolist()]
+                    else:
+                        triggered = BatchRuleEvaluator.evaluate(rule, batch, rows)
+                except Exception as e:
+                    logger.error("Batch rule evaluation error", error=str(e), rule_id=rule.id)
+                    continue
+                
+                if triggered is None:
+                    triggered = [
+                        (row, await self._evaluate_single_rule(rule, batch.product_data[row], batch.scores[row]))
+                        for row in rows.tolist()
+                    ]
+                
+                for row, match in triggered:
+                    if match:
+                        row_matches[row].append(match)
+        
+        duration_ms = (datetime.utcnow() - start_time).total_seconds() * 1000
+        per_product_ms = duration_ms / len(batch) if len(batch) else 0.0
+        
+        self.total_evaluations += len(batch)
+        self.total_evaluation_time += duration_ms
+        
+        results: List[Optional[RuleEvaluationResult]] = [None] * len(product_ids)
+        for row, position in enumerate(found_positions):
+            matched_rules = row_matches[row]
+            results[position] = RuleEvaluationResult(
+                product_id=product_ids[position],
+                agent_id=self.agent_id,
+                total_rules_evaluated=row_rule_counts[row],
+                matched_rules=matched_rules,
+                highest_priority_action=self._get_highest_priority_action(matched_rules),
+                overall_risk_score=self._calculate_overall_risk_score(matched_rules),
+                evaluation_duration_ms=per_product_ms
+            )
+        
+        logger.info(
+            "Batch rule evaluation completed",
+            products_requested=len(product_ids),
+            products_evaluated=len(batch),
+            rules_matched=sum(len(matches) for matches in row_matches),
+            duration_ms=duration_ms
+        )
+        
+        return results
+    
+    @staticmethod
+    def _product_key(product_id: Any) -> Optional[str]:
+        """Canonical string form of a product ID (None if not a valid UUID)."""
+        try:
+            return str(product_id if isinstance(product_id, UUID) else UUID(str(product_id)))
+        except ValueError:
+            return None
+    
+    @staticmethod
+    def _product_to_rule_data(product: Any) -> Dict[str, Any]:
+        """Convert a product to the dictionary rules are evaluated against."""
+        return {
+            "id": str(product.id),
+            "title": getattr(product, 'title', ''),
+            "description": product.description or '',
+            "category": product.category,
+            "price": product.price,
+            "brand": product.brand or '',
+            "supplier_id": str(product.supplier_id) if product.supplier_id else None,
+            "supplier_reputation": getattr(product, 'supplier_reputation', 1.0)
+        }
+    
     async def _get_applicable_rules(self, category: ProductCategory) -> List[DetectionRule]:
         """Get rules applicable to a product category."""
-        # Check cache first
-        if self._is_cache_valid():
-            cache_key = f"category_{category.value}"
-            if cache_key in self.rules_cache:
-                return self.rules_cache[cache_key]
+        cache_key = f"category_{category.value}"
         
-        # Refresh cache if needed
-        await self._refresh_rules_cache()
+        # Freshness is checked once for the whole snapshot; reload it for all
+        # concurrent callers if it has expired
+        if not self._is_cache_valid():
+            async with self._rules_refresh_lock:
+                if not self._is_cache_valid():
+                    await self._refresh_rules_cache()
         
-        # Return category-specific rules + general rules
-        category_rules = self.rules_cache.get(f"category_{category.value}", [])
-        general_rules = self.rules_cache.get("category_general", [])
+        rules = self.rules_cache.get(cache_key)
+        if rules is None:
+            # Category without specific rules: general rules only
+            rules = self.rules_cache.peek("category_general", [])
+            self.rules_cache.set(cache_key, rules)
         
-        return category_rules + general_rules
+        return rules
+    
+    def _get_keyword_rules(
+        self,
+        category: ProductCategory,
+        rules: List[DetectionRule]
+    ) -> CompiledKeywordRules:
+        """Get the compiled keyword rules for a category's applicable rules."""
+        compiled = self.keyword_rules.get(f"category_{category.value}")
+        if compiled is None:
+            compiled = self.keyword_rules.get("category_general")
+        
+        # Compiled from this exact cache snapshot: nothing to check per product
+        if compiled is not None and compiled.source_rules is rules:
+            return compiled
+        
+        # Rules may come from outside the cache snapshot (e.g. a refresh in between)
+        if compiled is None or any(
+            rule.rule_type == RuleType.KEYWORD and rule.id not in compiled for rule in rules
+        ):
+            compiled = KeywordEvaluator.compile_rules(rules)
+        
+        return compiled
     
     async def _refresh_rules_cache(self) -> None:
         """Refresh the rules cache from database."""
@@ -686,7 +1148,19 @@ class RuleEngine(BaseAgent):
                 for rules in new_cache.values():
                     rules.sort(key=lambda r: r.priority, reverse=True)
                 
-                self.rules_cache = new_cache
+                # Store category-specific rules + general rules per category
+                general_rules = new_cache.get("category_general", [])
+                keyword_rules = {"category_general": KeywordEvaluator.compile_rules(general_rules)}
+                self.rules_cache.clear()
+                self.rules_cache.set("category_general", general_rules)
+                for cache_key, rules in new_cache.items():
+                    if cache_key != "category_general":
+                        category_rules = rules + general_rules
+                        self.rules_cache.set(cache_key, category_rules)
+                        keyword_rules[cache_key] = KeywordEvaluator.compile_rules(category_rules)
+                self.keyword_rules = keyword_rules
+                
+                self.rules_loaded = len(all_rules)
                 self.rules_cache_timestamp = datetime.utcnow()
                 
                 logger.info(
@@ -711,10 +1185,14 @@ class RuleEngine(BaseAgent):
         self, 
         rule: DetectionRule, 
         product_data: Dict[str, Any], 
-        analysis_score: Optional[float] = None
+        analysis_score: Optional[float] = None,
+        keyword_matches: Optional[Dict[str, Optional[RuleMatch]]] = None
     ) -> Optional[RuleMatch]:
-        """Evaluate a single rule against product data."""
+        """Evaluate a single rule against product data (keyword rules may be pre-matched)."""
         try:
+            if keyword_matches is not None and rule.id in keyword_matches:
+                return keyword_matches[rule.id]
+            
             if rule.rule_type == RuleType.THRESHOLD:
                 return self.threshold_evaluator.evaluate_threshold_rule(
                     rule, product_data, analysis_score
@@ -3,6 +3,7 @@ Agent utilities package for communication, registry, and monitoring.
 """
 
 from .communication import MessageBus, MessageRouter, send_heartbeat, request_agent_status, broadcast_shutdown
+from .streams import StreamTransport
 from .registry import AgentRegistry, AgentHealth
 from .monitoring import MetricsCollector, AgentMetrics, MetricType
 
@@ -13,6 +14,7 @@ __all__ = [
     "send_heartbeat",
     "request_agent_status",
     "broadcast_shutdown",
+    "StreamTransport",
     
     # Registry utilities
     "AgentRegistry",
@@ -12,24 +12,42 @@ import structlog
 from redis.asyncio import Redis
 
 from ..base import AgentMessage, AgentResponse
+from .streams import StreamTransport, agent_stream, type_stream
 from ...config.redis import get_redis_client
+from ...config.settings import get_settings
 
 logger = structlog.get_logger(module=__name__)
 
 
 class MessageBus:
     """
-    Centralized message bus for agent communication using Redis pub/sub.
+    Centralized message bus for agent communication using Redis.
     
     Provides high-level messaging patterns:
     - Point-to-point messaging
     - Broadcast messaging  
     - Request-response patterns
     - Message routing and filtering
+    
+    Point-to-point and agent-type messages go over Redis pub/sub or, with
+    the "streams" transport, over durable Redis Streams with consumer
+    groups (see StreamTransport). Broadcasts and responses always use
+    pub/sub.
     """
     
-    def __init__(self):
+    def __init__(self, transport: Optional[str] = None):
+        """
+        Initialize the message bus.
+        
+        Args:
+            transport: "pubsub" or "streams" (defaults to MESSAGE_BUS_TRANSPORT)
+        """
+        self.transport = transport or get_settings().message_bus_transport
+        if self.transport not in ("pubsub", "streams"):
+            raise ValueError(f"Unknown message bus transport: {self.transport}")
+        
         self.redis_client: Optional[Redis] = None
+        self.streams: Optional[StreamTransport] = None
         self.subscribers: Dict[str, Callable[[AgentMessage], Awaitable[None]]] = {}
         self.response_handlers: Dict[str, asyncio.Future] = {}
         self.running_tasks: List[asyncio.Task] = []
@@ -41,7 +59,9 @@ class MessageBus:
         """Initialize Redis connection and start message listeners."""
         try:
             self.redis_client = await get_redis_client()
-            self.logger.info("Message bus initialized")
+            if self.transport == "streams":
+                self.streams = StreamTransport.from_settings(self.redis_client, get_settings())
+            self.logger.info("Message bus initialized", transport=self.transport)
             
         except Exception as e:
             self.logger.error("Failed to initialize message bus", error=str(e))
@@ -103,7 +123,10 @@ class MessageBus:
         routing_key = f"agent.{recipient_id}"
         
         try:
-            await self.redis_client.publish(routing_key, message.json())
+            if self.streams:
+                await self.streams.publish(agent_stream(recipient_id), message.json(), priority)
+            else:
+                await self.redis_client.publish(routing_key, message.json())
             
             self.logger.debug(
                 "Message sent",
@@ -122,6 +145,60 @@ class MessageBus:
             )
             raise
     
+    async def dispatch_message(
+        self,
+        agent_type: str,
+        message_type: str,
+        payload: Dict[str, Any],
+        sender_id: str,
+        priority: int = 0,
+        correlation_id: Optional[str] = None
+    ) -> None:
+        """
+        Send a message to exactly one agent of a type.
+        
+        The agents of the type share the work through their consumer group,
+        so adding replicas adds throughput. Requires the streams transport.
+        
+        Args:
+            agent_type: Target agent type
+            message_type: Type of message
+            payload: Message payload
+            sender_id: Sending agent ID
+            priority: Message priority (selects the stream lane)
+            correlation_id: Optional correlation ID for request-response
+        """
+        if not self.streams:
+            raise RuntimeError("dispatch_message requires the streams transport")
+        
+        message = AgentMessage(
+            sender_id=sender_id,
+            message_type=message_type,
+            payload=payload,
+            priority=priority,
+            correlation_id=correlation_id
+        )
+        
+        try:
+            await self.streams.publish(type_stream(agent_type), message.json(), priority)
+            
+            self.logger.debug(
+                "Message dispatched",
+                message_id=message.message_id,
+                sender_id=sender_id,
+                agent_type=agent_type,
+                message_type=message_type
+            )
+            
+        except Exception as e:
+            self.logger.error(
+                "Failed to dispatch message",
+                error=str(e),
+                agent_type=agent_type,
+                message_type=message_type
+            )
+            raise
+    
     async def broadcast_message(
         self,
         message_type: str,
@@ -257,6 +334,45 @@ class MessageBus:
         
         self.logger.info("Subscribed to channels", channels=channels)
     
+    async def consume_messages(
+        self,
+        agent_id: str,
+        agent_type: str,
+        message_handler: Callable[[AgentMessage], Awaitable[None]]
+    ) -> None:
+        """
+        Receive messages addressed to an agent and to its agent type.
+        
+        With the streams transport the agent joins its type's consumer
+        group, so each type message is handled by one replica; with pub/sub
+        it subscribes to its agent and broadcast channels.
+        
+        Args:
+            agent_id: Receiving agent ID (also its consumer name)
+            agent_type: Receiving agent type
+            message_handler: Async function to handle messages
+        """
+        if not self.redis_client:
+            raise RuntimeError("Message bus not initialized")
+        
+        if not self.streams:
+            await self.subscribe([f"agent.{agent_id}", f"broadcast.{agent_type}"], message_handler)
+            return
+        
+        async def handle(message_json: str) -> None:
+            await message_handler(AgentMessage(**json.loads(message_json)))
+        
+        for target, group in [(agent_stream(agent_id), agent_id), (type_stream(agent_type), agent_type)]:
+            consumer_task = asyncio.create_task(
+                self.streams.consume(target, group, agent_id, handle, self.shutdown_event)
+            )
+            self.running_tasks.append(consumer_task)
+        
+        # Broadcasts reach every agent, so they stay on pub/sub
+        await self.subscribe([f"broadcast.{agent_type}"], message_handler)
+        
+        self.logger.info("Consuming message streams", agent_id=agent_id, agent_type=agent_type)
+    
     async def subscribe_responses(
         self,
         agent_id: str
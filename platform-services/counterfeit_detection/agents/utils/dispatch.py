@@ -0,0 +1,205 @@
+"""
+Load-aware agent selection for dispatching work to agent instances.
+"""
+
+import random
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from ..base import AgentMetadata
+
+
+@dataclass
+class AgentLoad:
+    """Outstanding requests and observed performance of one agent."""
+    agent_id: str
+    in_flight: int = 0
+    latency_ms: float = 0.0  # Exponential moving average of step latency
+    completed: int = 0
+    failures: int = 0
+    consecutive_failures: int = 0
+
+
+class LoadTracker:
+    """
+    Tracks in-flight requests and step latency per agent.
+
+    Callers report each dispatch with started() and its outcome with
+    finished(); strategies read the resulting load and health.
+    """
+
+    def __init__(self, latency_alpha: float = 0.3, slow_latency_ms: float = 1000.0):
+        """
+        Initialize the tracker.
+
+        Args:
+            latency_alpha: Weight of the newest sample in the latency average
+            slow_latency_ms: Latency above which the health score is reduced
+        """
+        self.latency_alpha = latency_alpha
+        self.slow_latency_ms = slow_latency_ms
+        self.loads: Dict[str, AgentLoad] = {}
+
+    def get(self, agent_id: str) -> AgentLoad:
+        """Get (creating if needed) the load record of an agent."""
+        load = self.loads.get(agent_id)
+        if load is None:
+            load = self.loads[agent_id] = AgentLoad(agent_id)
+        return load
+
+    def started(self, agent_id: str) -> None:
+        """Record a request dispatched to an agent."""
+        self.get(agent_id).in_flight += 1
+
+    def finished(self, agent_id: str, latency_ms: float, success: bool) -> None:
+        """Record the outcome of a dispatched request."""
+        load = self.get(agent_id)
+        load.in_flight = max(0, load.in_flight - 1)
+
+        if load.completed == 0 and load.failures == 0:
+            load.latency_ms = latency_ms
+        else:
+            load.latency_ms = (1 - self.latency_alpha) * load.latency_ms + self.latency_alpha * latency_ms
+
+        if success:
+            load.completed += 1
+            load.consecutive_failures = 0
+        else:
+            load.failures += 1
+            load.consecutive_failures += 1
+
+    def remove(self, agent_id: str) -> None:
+        """Forget a deregistered agent."""
+        self.loads.pop(agent_id, None)
+
+    def health_score(self, agent_id: str) -> float:
+        """Health score (0.0 - 1.0) from failures and observed latency."""
+        load = self.loads.get(agent_id)
+        if load is None:
+            return 1.0
+
+        score = 1.0
+
+        # Penalty for consecutive failures
+        if load.consecutive_failures > 0:
+            score *= max(0.1, 1.0 - load.consecutive_failures * 0.2)
+
+        # Penalty for slow responses
+        if load.latency_ms > self.slow_latency_ms:
+            score *= max(0.2, self.slow_latency_ms / load.latency_ms)
+
+        return score
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-agent load and health snapshot."""
+        return {
+            agent_id: {
+                "in_flight": load.in_flight,
+                "latency_ms": load.latency_ms,
+                "completed": load.completed,
+                "failures": load.failures,
+                "health_score": self.health_score(agent_id)
+            }
+            for agent_id, load in self.loads.items()
+        }
+
+
+class DispatchStrategy(ABC):
+    """Chooses which candidate agent receives the next request."""
+
+    name = ""
+
+    @abstractmethod
+    def select(self, candidates: List[AgentMetadata], loads: LoadTracker) -> AgentMetadata:
+        """
+        Select an agent.
+
+        Args:
+            candidates: Non-empty list of eligible agents
+            loads: Load tracker with in-flight counts and latencies
+
+        Returns:
+            Selected agent
+        """
+        pass
+
+    @staticmethod
+    def _cost(agent: AgentMetadata, loads: LoadTracker) -> float:
+        """Expected wait: outstanding requests times observed latency."""
+        load = loads.get(agent.agent_id)
+        return (load.in_flight + 1) * max(load.latency_ms, 1.0)
+
+
+class LeastOutstandingStrategy(DispatchStrategy):
+    """Agent with the fewest in-flight requests (ties: lowest latency, then rotation)."""
+
+    name = "least_outstanding"
+
+    def __init__(self):
+        self._rotation = 0
+
+    def select(self, candidates: List[AgentMetadata], loads: LoadTracker) -> AgentMetadata:
+        # Rotate the starting point so ties do not always go to the same agent
+        self._rotation = (self._rotation + 1) % len(candidates)
+        rotated = candidates[self._rotation:] + candidates[:self._rotation]
+
+        return min(
+            rotated,
+            key=lambda agent: (loads.get(agent.agent_id).in_flight, loads.get(agent.agent_id).latency_ms)
+        )
+
+
+class PowerOfTwoChoicesStrategy(DispatchStrategy):
+    """Better of two randomly sampled agents by expected wait."""
+
+    name = "power_of_two"
+
+    def __init__(self, rng: Optional[random.Random] = None):
+        self.rng = rng or random.Random()
+
+    def select(self, candidates: List[AgentMetadata], loads: LoadTracker) -> AgentMetadata:
+        if len(candidates) == 1:
+            return candidates[0]
+
+        first, second = self.rng.sample(candidates, 2)
+        return min((first, second), key=lambda agent: self._cost(agent, loads))
+
+
+class HealthWeightedStrategy(DispatchStrategy):
+    """Random choice weighted by health score and inversely by outstanding load."""
+
+    name = "health_weighted"
+
+    def __init__(self, rng: Optional[random.Random] = None):
+        self.rng = rng or random.Random()
+
+    def select(self, candidates: List[AgentMetadata], loads: LoadTracker) -> AgentMetadata:
+        weights = [
+            loads.health_score(agent.agent_id) / (1 + loads.get(agent.agent_id).in_flight)
+            for agent in candidates
+        ]
+        return self.rng.choices(candidates, weights=weights, k=1)[0]
+
+
+DISPATCH_STRATEGIES = {
+    strategy.name: strategy
+    for strategy in (LeastOutstandingStrategy, PowerOfTwoChoicesStrategy, HealthWeightedStrategy)
+}
+
+
+def get_dispatch_strategy(name: str) -> DispatchStrategy:
+    """
+    Create a dispatch strategy by name.
+
+    Args:
+        name: One of least_outstanding, power_of_two, health_weighted
+
+    Returns:
+        Strategy instance
+    """
+    if name not in DISPATCH_STRATEGIES:
+        raise ValueError(
+            f"Unknown dispatch strategy: {name} (expected one of {', '.join(DISPATCH_STRATEGIES)})"
+        )
+    return DISPATCH_STRATEGIES[name]()
@@ -0,0 +1,394 @@
+"""
+Redis Streams transport for agent messages.
+
+Messages are appended to per-target streams (XADD) and consumed through
+consumer groups (XREADGROUP/XACK). Unlike pub/sub, messages wait in the
+stream while a consumer is disconnected, every replica of an agent type
+shares the type's stream through one consumer group, and entries left
+pending by a crashed consumer are reclaimed by the surviving ones.
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import structlog
+from redis.asyncio import Redis
+from redis.exceptions import ResponseError
+
+logger = structlog.get_logger(module=__name__)
+
+# Lanes in consumption order; each lane is a separate stream
+PRIORITY_LANES = ("high", "normal", "low")
+HIGH_PRIORITY = 5
+
+# Handlers return False for messages they cannot take now (e.g. a paused
+# agent); those entries stay pending and are reclaimed later
+MessageHandler = Callable[[str], Awaitable[Optional[bool]]]
+
+
+def priority_lane(priority: int) -> str:
+    """Map an AgentMessage priority to its stream lane."""
+    if priority >= HIGH_PRIORITY:
+        return "high"
+    if priority < 0:
+        return "low"
+    return "normal"
+
+
+def agent_stream(agent_id: str) -> str:
+    """Stream target for messages addressed to one agent."""
+    return f"agent.{agent_id}"
+
+
+def type_stream(agent_type: str) -> str:
+    """Stream target for messages any agent of a type may process."""
+    return f"type.{agent_type}"
+
+
+class StreamTransport:
+    """
+    Durable agent messaging on Redis Streams.
+
+    Each target (an agent or an agent type) has one stream per priority
+    lane, capped at roughly ``maxlen`` entries. Consumers drain higher
+    lanes first, acknowledge entries once handled, periodically reclaim
+    entries idle in other consumers' pending lists for longer than
+    ``claim_idle_ms`` and move entries delivered more than
+    ``max_deliveries`` times to a dead-letter stream. With ``heartbeat_ms``
+    set, entries whose handler is still running are re-claimed by their
+    consumer at that interval, so long handlers are not taken over.
+    """
+
+    def __init__(
+        self,
+        redis_client: Redis,
+        maxlen: int = 100000,
+        block_ms: int = 1000,
+        batch_size: int = 10,
+        claim_idle_ms: int = 60000,
+        max_deliveries: int = 5,
+        key_prefix: str = "stream",
+        heartbeat_ms: Optional[int] = None
+    ):
+        """
+        Initialize the transport.
+
+        Args:
+            redis_client: Redis client (decode_responses=True)
+            maxlen: Approximate maximum entries kept per stream
+            block_ms: How long an idle consumer blocks per read
+            batch_size: Entries read or reclaimed per call
+            claim_idle_ms: Idle time after which pending entries are reclaimed
+            max_deliveries: Deliveries before an entry is dead-lettered
+            key_prefix: Prefix of stream keys
+            heartbeat_ms: Interval at which entries being handled are kept
+                claimed (None: never; handlers must finish within claim_idle_ms)
+        """
+        self.redis_client = redis_client
+        self.maxlen = maxlen
+        self.block_ms = block_ms
+        self.batch_size = batch_size
+        self.claim_idle_ms = claim_idle_ms
+        self.max_deliveries = max_deliveries
+        self.key_prefix = key_prefix
+        self.heartbeat_ms = heartbeat_ms
+
+        self.stats = {
+            "published": 0,
+            "processed": 0,
+            "reclaimed": 0,
+            "dead_lettered": 0,
+            "deferred": 0,
+            "handler_errors": 0
+        }
+
+    @classmethod
+    def from_settings(cls, redis_client: Redis, settings: Any, **overrides: Any) -> "StreamTransport":
+        """Create a transport configured from application settings."""
+        options = {
+            "maxlen": settings.message_stream_maxlen,
+            "block_ms": settings.message_stream_block_ms,
+            "claim_idle_ms": settings.message_stream_claim_idle_ms,
+            "max_deliveries": settings.message_stream_max_deliveries,
+            **overrides
+        }
+        return cls(redis_client, **options)
+
+    def stream_key(self, target: str, lane: str) -> str:
+        """Redis key of a target's stream for one lane."""
+        return f"{self.key_prefix}:{target}:{lane}"
+
+    async def publish(self, target: str, message_json: str, priority: int = 0) -> str:
+        """
+        Append a message to a target's stream.
+
+        Args:
+            target: Stream target (see agent_stream/type_stream)
+            message_json: Serialized AgentMessage
+            priority: Message priority, selecting the lane
+
+        Returns:
+            Stream entry ID
+        """
+        entry_id = await self.redis_client.xadd(
+            self.stream_key(target, priority_lane(priority)),
+            {"message": message_json},
+            maxlen=self.maxlen,
+            approximate=True
+        )
+        self.stats["published"] += 1
+        return entry_id
+
+    async def publish_many(self, target: str, messages: List[Tuple[str, int]]) -> List[str]:
+        """
+        Append several messages to a target's streams in one round trip.
+
+        Args:
+            target: Stream target
+            messages: (message_json, priority) pairs
+
+        Returns:
+            Stream entry IDs, in message order
+        """
+        if not messages:
+            return []
+
+        pipe = self.redis_client.pipeline(transaction=False)
+        for message_json, priority in messages:
+            pipe.xadd(
+                self.stream_key(target, priority_lane(priority)),
+                {"message": message_json},
+                maxlen=self.maxlen,
+                approximate=True
+            )
+        entry_ids = await pipe.execute()
+        self.stats["published"] += len(entry_ids)
+        return entry_ids
+
+    async def ensure_group(self, target: str, group: str) -> None:
+        """Create the consumer group on every lane of a target."""
+        for lane in PRIORITY_LANES:
+            try:
+                # From the start of the stream: messages sent before the
+                # first consumer came up are still delivered
+                await self.redis_client.xgroup_create(
+                    self.stream_key(target, lane), group, id="0", mkstream=True
+                )
+            except ResponseError as e:
+                if "BUSYGROUP" not in str(e):
+                    raise
+
+    async def consume(
+        self,
+        target: str,
+        group: str,
+        consumer: str,
+        handler: MessageHandler,
+        shutdown_event: asyncio.Event,
+        is_accepting: Optional[Callable[[], bool]] = None
+    ) -> None:
+        """
+        Consume a target's streams until shutdown.
+
+        While ``is_accepting`` returns False (e.g. a paused agent) nothing is
+        read or reclaimed, so entries wait in the stream for this or another
+        consumer instead of piling up deliveries towards the dead-letter limit.
+
+        Args:
+            target: Stream target
+            group: Consumer group (shared by all replicas that split the work)
+            consumer: Name of this consumer within the group
+            handler: Async function called with each message's JSON;
+                returning False leaves the entry pending for redelivery
+            shutdown_event: Event that stops consumption
+            is_accepting: Whether the owner currently takes messages
+        """
+        keys = [self.stream_key(target, lane) for lane in PRIORITY_LANES]
+        last_reclaim = 0.0
+
+        await self.ensure_group(target, group)
+        logger.info("Stream consumer started", target=target, group=group, consumer=consumer)
+
+        while not shutdown_event.is_set():
+            try:
+                if is_accepting is not None and not is_accepting():
+                    await asyncio.sleep(self.block_ms / 1000)
+                    continue
+
+                if time.monotonic() - last_reclaim >= self.claim_idle_ms / 1000:
+                    last_reclaim = time.monotonic()
+                    await self._reclaim(keys, group, consumer, handler)
+
+                deferred = False
+                for key, entry_id, fields in await self._read(keys, group, consumer):
+                    if not await self._handle(key, group, consumer, entry_id, fields, handler):
+                        await self._release(key, group, consumer, entry_id)
+                        deferred = True
+
+                if deferred:
+                    # Handler is not taking messages: don't spin on reads
+                    await asyncio.sleep(self.block_ms / 1000)
+
+            except asyncio.CancelledError:
+                raise
+            except ResponseError as e:
+                if "NOGROUP" in str(e):
+                    # Stream deleted under us: recreate the group
+                    await self.ensure_group(target, group)
+                else:
+                    logger.error("Stream consumer error", error=str(e), target=target)
+                    await asyncio.sleep(1)
+            except Exception as e:
+                logger.error("Stream consumer error", error=str(e), target=target)
+                await asyncio.sleep(1)
+
+    async def _read(
+        self,
+        keys: List[str],
+        group: str,
+        consumer: str
+    ) -> List[Tuple[str, str, Dict[str, str]]]:
+        """Read new entries, draining higher priority lanes first."""
+        for key in keys:
+            result = await self.redis_client.xreadgroup(
+                group, consumer, {key: ">"}, count=self.batch_size
+            )
+            entries = self._flatten(result)
+            if entries:
+                return entries
+
+        # Nothing waiting: block on all lanes at once
+        result = await self.redis_client.xreadgroup(
+            group, consumer, {key: ">" for key in keys},
+            count=self.batch_size, block=self.block_ms
+        )
+        return self._flatten(result)
+
+    async def _reclaim(
+        self,
+        keys: List[str],
+        group: str,
+        consumer: str,
+        handler: MessageHandler
+    ) -> None:
+        """Take over and process entries idle in other consumers' pending lists."""
+        for key in keys:
+            result = await self.redis_client.xautoclaim(
+                key, group, consumer,
+                min_idle_time=self.claim_idle_ms,
+                start_id="0-0",
+                count=self.batch_size
+            )
+
+            entries = result[1]
+            for index, (entry_id, fields) in enumerate(entries):
+                if not fields:
+                    # Trimmed from the stream while pending
+                    await self.redis_client.xack(key, group, entry_id)
+                    continue
+
+                self.stats["reclaimed"] += 1
+                if await self._delivery_count(key, group, entry_id) > self.max_deliveries:
+                    await self._dead_letter(key, group, entry_id, fields)
+                    continue
+
+                logger.warning("Reclaimed pending stream entry", stream=key, entry_id=entry_id)
+                if not await self._handle(key, group, consumer, entry_id, fields, handler):
+                    # Hand this and the rest of the claimed batch back to
+                    # consumers that are taking messages
+                    for pending_id, pending_fields in entries[index:]:
+                        if pending_fields:
+                            await self._release(key, group, consumer, pending_id)
+                    return
+
+    async def _handle(
+        self,
+        key: str,
+        group: str,
+        consumer: str,
+        entry_id: str,
+        fields: Dict[str, str],
+        handler: MessageHandler
+    ) -> bool:
+        """
+        Process one entry and acknowledge it.
+
+        Returns:
+            False if the handler deferred the entry, which is left pending
+            unacknowledged; True otherwise
+        """
+        heartbeat = None
+        if self.heartbeat_ms:
+            heartbeat = asyncio.create_task(self._keep_claimed(key, group, consumer, entry_id))
+
+        try:
+            if await handler(fields["message"]) is False:
+                self.stats["deferred"] += 1
+                logger.debug("Stream entry deferred", stream=key, entry_id=entry_id)
+                return False
+            self.stats["processed"] += 1
+        except Exception as e:
+            # Handler failures are not retried, as with pub/sub delivery;
+            # only consumers dying mid-message leave entries to reclaim
+            self.stats["handler_errors"] += 1
+            logger.error("Stream message handler error", error=str(e), stream=key, entry_id=entry_id)
+        finally:
+            if heartbeat is not None:
+                heartbeat.cancel()
+
+        await self.redis_client.xack(key, group, entry_id)
+        return True
+
+    async def _keep_claimed(self, key: str, group: str, consumer: str, entry_id: str) -> None:
+        """Reset an entry's idle time while its handler runs."""
+        while True:
+            await asyncio.sleep(self.heartbeat_ms / 1000)
+            try:
+                # JUSTID leaves the delivery count alone
+                await self.redis_client.xclaim(key, group, consumer, 0, [entry_id], justid=True)
+            except Exception as e:
+                logger.warning("Failed to refresh stream entry claim", error=str(e), stream=key, entry_id=entry_id)
+
+    async def _release(self, key: str, group: str, consumer: str, entry_id: str) -> None:
+        """
+        Undo the delivery of a deferred entry.
+
+        The delivery count is restored, so deferrals never lead to
+        dead-lettering, and the entry is marked idle so other consumers can
+        reclaim it right away.
+        """
+        times_delivered = await self._delivery_count(key, group, entry_id)
+        await self.redis_client.xclaim(
+            key, group, consumer, 0, [entry_id],
+            idle=self.claim_idle_ms,
+            retrycount=max(times_delivered - 1, 0),
+            justid=True
+        )
+
+    async def _delivery_count(self, key: str, group: str, entry_id: str) -> int:
+        pending = await self.redis_client.xpending_range(
+            key, group, min=entry_id, max=entry_id, count=1
+        )
+        return pending[0]["times_delivered"] if pending else 0
+
+    async def _dead_letter(self, key: str, group: str, entry_id: str, fields: Dict[str, str]) -> None:
+        """Move a repeatedly failing entry to the dead-letter stream."""
+        await self.redis_client.xadd(
+            f"{key}:dead",
+            {**fields, "group": group, "entry_id": entry_id},
+            maxlen=self.maxlen,
+            approximate=True
+        )
+        await self.redis_client.xack(key, group, entry_id)
+        self.stats["dead_lettered"] += 1
+        logger.error("Stream entry dead-lettered", stream=key, entry_id=entry_id, group=group)
+
+    @staticmethod
+    def _flatten(result: Optional[List[Any]]) -> List[Tuple[str, str, Dict[str, str]]]:
+        """Flatten an XREADGROUP reply into (stream, entry_id, fields) tuples."""
+        return [
+            (key, entry_id, fields)
+            for key, entries in (result or [])
+            for entry_id, fields in entries
+        ]
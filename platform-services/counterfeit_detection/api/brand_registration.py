@@ -5,6 +5,9 @@ Provides REST API endpoints for brand registration, verification workflow,
 product submission, and brand protection features.
 """
 
+import asyncio
+import os
+import tempfile
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, BackgroundTasks
@@ -12,7 +15,9 @@ from fastapi.responses import JSONResponse
 from pydantic import BaseModel, Field, validator
 import structlog
 
+from ..config.redis import get_shared_redis_client
 from ..core.auth import get_current_user, get_current_admin_user
+from ..core.config import get_settings
 from ..core.database import get_db_session
 from ..services.brand_registration_service import BrandRegistrationService, BrandRegistrationData
 from ..services.brand_product_service import BrandProductService, ProductSubmissionData
@@ -24,6 +29,8 @@ logger = structlog.get_logger(__name__)
 
 router = APIRouter(prefix="/brand", tags=["brand-registration"])
 
+UPLOAD_READ_SIZE = 1024 * 1024  # Bytes per read when spooling uploads to disk
+
 
 # Request/Response Models
 
@@ -94,7 +101,7 @@ async def get_brand_registration_service() -> BrandRegistrationService:
 
 async def get_brand_product_service() -> BrandProductService:
     """Get brand product service instance."""
-    return BrandProductService()
+    return BrandProductService(redis_client=await get_shared_redis_client())
 
 
 async def get_brand_protection_service() -> BrandProtectionService:
@@ -359,35 +366,31 @@ async def bulk_upload_products(
     Bulk upload products from CSV file.
     
     Accepts CSV file with product data for bulk product submission.
-    Processing is done in background for large files.
+    The file is ingested in chunks in the background; poll the returned
+    progress URL for status.
     """
     try:
         # Validate file type
         if not file.filename.endswith('.csv'):
             raise HTTPException(status_code=400, detail="Only CSV files are supported")
         
-        # Read and validate file size
-        if file.size > 50 * 1024 * 1024:  # 50MB limit
-            raise HTTPException(status_code=400, detail="File size exceeds 50MB limit")
-        
-        # Read CSV content
-        csv_content = (await file.read()).decode('utf-8')
-        
-        # Parse CSV products
-        products_data = await product_service.parse_csv_products(csv_content)
-        
-        if not products_data:
-            raise HTTPException(status_code=400, detail="No valid products found in CSV file")
+        # Spool to disk with a size limit; rows are parsed from there in chunks
+        max_file_mb = get_settings().brand_bulk_upload_max_file_mb
+        upload_path = await _spool_upload(file, max_file_mb * 1024 * 1024)
         
-        if len(products_data) > 1000:  # Limit bulk uploads
-            raise HTTPException(status_code=400, detail="Maximum 1000 products per bulk upload")
+        try:
+            upload = await product_service.start_bulk_upload(brand_id, file.filename, current_user.id)
+        except Exception:
+            os.remove(upload_path)
+            raise
         
         # Process bulk upload in background
         background_tasks.add_task(
             _process_bulk_upload,
             product_service,
             brand_id,
-            products_data,
+            upload["upload_id"],
+            upload_path,
             current_user.id
         )
         
@@ -395,24 +398,52 @@ async def bulk_upload_products(
             "Bulk product upload started",
             brand_id=brand_id,
             user_id=current_user.id,
-            product_count=len(products_data)
+            upload_id=upload["upload_id"]
         )
         
         return {
             "message": "Bulk upload started",
             "brand_id": brand_id,
-            "products_count": len(products_data),
-            "status": "processing",
-            "estimated_completion": "Products will be processed in the background"
+            "upload_id": upload["upload_id"],
+            "status": upload["status"],
+            "progress_url": f"{router.prefix}/products/{brand_id}/bulk-upload/{upload['upload_id']}"
         }
         
     except HTTPException:
         raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error("Failed to start bulk upload", error=str(e))
         raise HTTPException(status_code=500, detail="Failed to start bulk upload")
 
 
+@router.get("/products/{brand_id}/bulk-upload/{upload_id}")
+async def get_bulk_upload_progress(
+    brand_id: str,
+    upload_id: str,
+    current_user: User = Depends(get_current_user),
+    product_service: BrandProductService = Depends(get_brand_product_service)
+):
+    """
+    Get progress of a bulk product upload.
+    
+    Returns status, row counters and the first row errors of an
+    upload started with the bulk upload endpoint.
+    """
+    try:
+        progress = await product_service.get_bulk_upload_progress(brand_id, upload_id)
+        
+    except Exception as e:
+        logger.error("Failed to get bulk upload progress", upload_id=upload_id, error=str(e))
+        raise HTTPException(status_code=500, detail="Failed to retrieve bulk upload progress")
+    
+    if progress is None:
+        raise HTTPException(status_code=404, detail="Bulk upload not found")
+    
+    return progress
+
+
 @router.get("/products/{brand_id}")
 async def get_brand_products(
     brand_id: str,
@@ -715,26 +746,55 @@ async def get_brand_protection_report(
 
 # Background Task Functions
 
+async def _spool_upload(file: UploadFile, max_bytes: int) -> str:
+    """Copy an upload to a temporary file in fixed-size reads and return its path."""
+    spool = tempfile.NamedTemporaryFile(suffix=".csv", delete=False)
+    size = 0
+    
+    try:
+        with spool:
+            while chunk := await file.read(UPLOAD_READ_SIZE):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise HTTPException(
+                        status_code=400,
+                        detail=f"File size exceeds {max_bytes // (1024 * 1024)}MB limit"
+                    )
+                await asyncio.to_thread(spool.write, chunk)
+                
+    except Exception:
+        os.remove(spool.name)
+        raise
+    
+    return spool.name
+
+
 async def _process_bulk_upload(
     product_service: BrandProductService,
     brand_id: str,
-    products_data: List[Dict[str, Any]],
+    upload_id: str,
+    upload_path: str,
     user_id: str
 ):
-    """Background task to process bulk product upload."""
+    """Background task to ingest a spooled bulk product upload."""
     try:
-        result = await product_service.submit_products_bulk(
-            brand_id, products_data, user_id
-        )
+        with open(upload_path, "rb") as csv_stream:
+            result = await product_service.ingest_products_csv(
+                brand_id, upload_id, csv_stream, user_id
+            )
         
         logger.info(
             "Bulk upload completed",
             brand_id=brand_id,
             user_id=user_id,
+            upload_id=upload_id,
             total=result.total_products,
             successful=result.successful_uploads,
             failed=result.failed_uploads
         )
         
     except Exception as e:
-        logger.error("Bulk upload failed", brand_id=brand_id, user_id=user_id, error=str(e))
\ No newline at end of file
+        logger.error("Bulk upload failed", brand_id=brand_id, user_id=user_id, upload_id=upload_id, error=str(e))
+    
+    finally:
+        os.remove(upload_path)
@@ -3,10 +3,10 @@ API endpoints for authenticity analysis operations.
 """
 
 import json
-from typing import List, Optional, Dict, Any
-from uuid import UUID
+from typing import Optional
+from uuid import UUID, uuid4
 
-from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi import status
 import structlog
 
@@ -15,14 +15,15 @@ from ..schemas.analysis import (
     AnalysisResponse,
     BatchAnalysisRequest,
     BatchAnalysisResponse,
+    BatchProgressResponse,
     AnalysisStatistics,
     AgentPerformanceStats
 )
-from ...agents.authenticity_analyzer import AuthenticityAnalyzer
 from ...db.repositories.analysis_repository import AnalysisRepository
 from ...db.repositories.product_repository import ProductRepository
 from ...models.enums import AnalysisStatus
 from ...core.database import get_db_session
+from ...services.analysis_job_queue import AnalysisJobQueue, get_analysis_job_queue
 
 router = APIRouter(prefix="/analysis", tags=["authenticity-analysis"])
 logger = structlog.get_logger(module=__name__)
@@ -42,21 +43,17 @@ def get_product_repository(
     return ProductRepository(db_session)
 
 
-async def get_authenticity_analyzer() -> AuthenticityAnalyzer:
-    """Dependency to get authenticity analyzer agent."""
-    # In a full implementation, this would get the agent from a registry
-    # For now, create a new instance
-    analyzer = AuthenticityAnalyzer()
-    await analyzer.start()
-    return analyzer
+async def get_job_queue() -> AnalysisJobQueue:
+    """Dependency to get the analysis job queue served by the warm analyzer workers."""
+    return await get_analysis_job_queue()
 
 
 @router.post("/analyze", response_model=AnalysisResponse)
 async def analyze_product_authenticity(
     request: AnalysisRequest,
-    background_tasks: BackgroundTasks,
     analysis_repo: AnalysisRepository = Depends(get_analysis_repository),
-    product_repo: ProductRepository = Depends(get_product_repository)
+    product_repo: ProductRepository = Depends(get_product_repository),
+    job_queue: AnalysisJobQueue = Depends(get_job_queue)
 ):
     """
     Trigger authenticity analysis for a specific product.
@@ -68,8 +65,7 @@ async def analyze_product_authenticity(
         logger.info("Analysis requested", product_id=str(request.product_id))
         
         # Verify product exists
-        product = await product_repo.get_product_by_id(request.product_id)
-        if not product:
+        if not await product_repo.existing_ids([request.product_id]):
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Product with ID {request.product_id} not found"
@@ -93,18 +89,22 @@ async def analyze_product_authenticity(
                         created_at=recent_analysis.created_at.isoformat()
                     )
         
-        # Queue analysis task
-        background_tasks.add_task(
-            perform_analysis_task,
-            str(request.product_id),
-            request.analysis_options
+        # Queue analysis job
+        queued = await job_queue.enqueue_batch(
+            [str(request.product_id)],
+            priority=request.priority,
+            options=request.analysis_options.dict() if request.analysis_options else None,
+            force=request.force_reanalysis
         )
         
         return AnalysisResponse(
             analysis_id="pending",  # Will be generated when analysis starts
             product_id=str(request.product_id),
             status="queued",
-            message="Analysis queued for processing",
+            message=(
+                "Analysis queued for processing" if queued["queued_product_ids"]
+                else "Analysis already queued or in progress"
+            ),
             analysis_duration_ms=0.0
         )
         
@@ -121,44 +121,46 @@ async def analyze_product_authenticity(
 @router.post("/analyze/batch", response_model=BatchAnalysisResponse)
 async def analyze_products_batch(
     request: BatchAnalysisRequest,
-    background_tasks: BackgroundTasks,
-    product_repo: ProductRepository = Depends(get_product_repository)
+    product_repo: ProductRepository = Depends(get_product_repository),
+    job_queue: AnalysisJobQueue = Depends(get_job_queue)
 ):
     """
     Trigger batch authenticity analysis for multiple products.
     
     This endpoint queues multiple products for analysis and returns immediately.
-    Individual results can be retrieved using the get_analysis endpoint.
+    Batch progress can be retrieved using the get_batch_progress endpoint and
+    individual results using the get_analysis endpoint.
     """
     try:
         logger.info("Batch analysis requested", product_count=len(request.product_ids))
         
         # Verify all products exist
-        valid_product_ids = []
-        invalid_product_ids = []
+        existing_ids = await product_repo.existing_ids(request.product_ids)
+        valid_product_ids = [pid for pid in request.product_ids if str(pid) in existing_ids]
+        invalid_product_ids = [pid for pid in request.product_ids if str(pid) not in existing_ids]
         
-        for product_id in request.product_ids:
-            product = await product_repo.get_product_by_id(product_id)
-            if product:
-                valid_product_ids.append(product_id)
-            else:
-                invalid_product_ids.append(product_id)
+        # Queue analysis jobs for valid products
+        queued = await job_queue.enqueue_batch(
+            [str(product_id) for product_id in valid_product_ids],
+            batch_id=f"batch-{uuid4()}",
+            priority=request.priority,
+            options=request.analysis_options.dict() if request.analysis_options else None,
+            force=request.force_reanalysis
+        )
+        queued_count = len(queued["queued_product_ids"])
+        duplicate_count = len(queued["duplicate_product_ids"])
         
-        # Queue analysis tasks for valid products
-        for product_id in valid_product_ids:
-            background_tasks.add_task(
-                perform_analysis_task,
-                str(product_id),
-                request.analysis_options
-            )
+        message = f"Queued {queued_count} products for analysis"
+        if duplicate_count:
+            message += f" ({duplicate_count} already queued or in progress)"
         
         return BatchAnalysisResponse(
-            batch_id="batch-" + str(UUID.uuid4()),
+            batch_id=queued["batch_id"],
             total_requested=len(request.product_ids),
-            queued_count=len(valid_product_ids),
+            queued_count=queued_count,
             invalid_product_ids=[str(pid) for pid in invalid_product_ids],
             status="queued",
-            message=f"Queued {len(valid_product_ids)} products for analysis"
+            message=message
         )
         
     except Exception as e:
@@ -169,6 +171,32 @@ async def analyze_products_batch(
         )
 
 
+@router.get("/batch/{batch_id}", response_model=BatchProgressResponse)
+async def get_batch_progress(
+    batch_id: str,
+    job_queue: AnalysisJobQueue = Depends(get_job_queue)
+):
+    """Get the progress of a batch analysis."""
+    try:
+        progress = await job_queue.get_batch_progress(batch_id)
+        if not progress:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Batch with ID {batch_id} not found"
+            )
+        
+        return BatchProgressResponse(**progress)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Failed to get batch progress", batch_id=batch_id, error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to retrieve batch progress: {str(e)}"
+        )
+
+
 @router.get("/result/{analysis_id}", response_model=AnalysisResponse)
 async def get_analysis_result(
     analysis_id: UUID,
@@ -415,32 +443,3 @@ async def update_analysis_review(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to update analysis review: {str(e)}"
         )
-
-
-async def perform_analysis_task(product_id: str, analysis_options: Optional[Dict[str, Any]] = None):
-    """Background task to perform authenticity analysis."""
-    try:
-        logger.info("Starting background analysis task", product_id=product_id)
-        
-        # Create and start analyzer agent
-        analyzer = AuthenticityAnalyzer()
-        await analyzer.start()
-        
-        try:
-            # Perform analysis
-            result = await analyzer.analyze_product_authenticity(product_id)
-            
-            logger.info(
-                "Background analysis completed",
-                product_id=product_id,
-                analysis_id=result.analysis_id,
-                authenticity_score=result.authenticity_score
-            )
-            
-        finally:
-            # Clean up agent
-            await analyzer.stop()
-            
-    except Exception as e:
-        logger.error("Background analysis task failed", product_id=product_id, error=str(e))
-        # In a production system, this would update the analysis status to failed
\ No newline at end of file
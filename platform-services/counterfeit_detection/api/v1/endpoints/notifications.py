@@ -601,7 +601,9 @@ async def test_webhook_endpoint(
                 attempts=len(result.attempts),
                 final_status_code=last_attempt.status_code if last_attempt else None,
                 total_duration_ms=result.total_duration_ms,
-                error_message=last_attempt.error_message if last_attempt and not result.is_successful() else None
+                error_message=None if result.is_successful() else (
+                    result.error_message or (last_attempt.error_message if last_attempt else None)
+                )
             )
     
     except Exception as e:
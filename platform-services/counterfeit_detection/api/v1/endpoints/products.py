@@ -14,6 +14,7 @@ import structlog
 from ....config.database import get_database_session
 from ....db.repositories.product_repository import ProductRepository
 from ....services.product_service import ProductService, ImageProcessor
+from ....services.embedding_service import get_embedding_service
 from ....api.v1.schemas.products import (
     ProductIngestRequest,
     ProductIngestResponse,
@@ -35,7 +36,7 @@ async def get_product_service(session: AsyncSession = Depends(get_database_sessi
     """Dependency to get product service."""
     repository = ProductRepository(session)
     image_processor = ImageProcessor()
-    return ProductService(repository, image_processor)
+    return ProductService(repository, image_processor, embedding_service=get_embedding_service())
 
 
 @router.post("/ingest", 
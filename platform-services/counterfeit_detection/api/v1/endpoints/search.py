@@ -18,7 +18,10 @@ from ..schemas.search import (
     SimilarProduct,
     VectorSearchStats
 )
-from ...services.embedding_service import EmbeddingService
+from ...services.embedding_service import (
+    EmbeddingService,
+    get_embedding_service as get_shared_embedding_service
+)
 from ...services.product_service import ProductService
 from ...db.repositories.vector_repository import VectorRepository
 from ...db.repositories.product_repository import ProductRepository
@@ -30,8 +33,8 @@ logger = structlog.get_logger(module=__name__)
 
 
 def get_embedding_service() -> EmbeddingService:
-    """Dependency to get embedding service."""
-    return EmbeddingService()
+    """Dependency to get the shared embedding service."""
+    return get_shared_embedding_service()
 
 
 def get_product_service(
@@ -39,7 +42,7 @@ def get_product_service(
 ) -> ProductService:
     """Dependency to get product service."""
     product_repository = ProductRepository(db_session)
-    return ProductService(product_repository)
+    return ProductService(product_repository, embedding_service=get_shared_embedding_service())
 
 
 def get_vector_repository(
@@ -171,7 +174,7 @@ async def find_similar_by_image(
         image_data = await image.read()
         
         # Generate embedding for query image
-        query_embedding = embedding_service.generate_image_embedding(image_data)
+        query_embedding = await embedding_service.generate_image_embedding_async(image_data)
         
         # Parse supplier_id if provided
         parsed_supplier_id = None
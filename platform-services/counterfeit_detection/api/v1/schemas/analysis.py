@@ -233,6 +233,56 @@ class BatchAnalysisResponse(BaseModel):
         }
 
 
+class BatchProgressResponse(BaseModel):
+    """Response model for batch analysis progress."""
+    
+    batch_id: str = Field(..., description="Unique batch identifier")
+    status: str = Field(
+        ...,
+        description="Batch status (queued, processing, completed, completed_with_errors)"
+    )
+    total_requested: int = Field(..., ge=0, description="Products in the batch request")
+    queued_count: int = Field(..., ge=0, description="Products queued for analysis")
+    duplicate_count: int = Field(
+        0,
+        ge=0,
+        description="Products skipped because an analysis was already queued or running"
+    )
+    completed_count: int = Field(..., ge=0, description="Analyses completed")
+    failed_count: int = Field(..., ge=0, description="Analyses failed after all retries")
+    pending_count: int = Field(..., ge=0, description="Analyses queued or running")
+    progress: float = Field(..., ge=0.0, le=1.0, description="Fraction of queued analyses finished")
+    created_at: Optional[str] = Field(None, description="Batch creation timestamp")
+    results: Dict[str, Dict[str, Any]] = Field(
+        default_factory=dict,
+        description="Per-product outcome (status, attempts, analysis_id or error)"
+    )
+    
+    class Config:
+        schema_extra = {
+            "example": {
+                "batch_id": "batch-550e8400-e29b-41d4-a716-446655440000",
+                "status": "processing",
+                "total_requested": 25,
+                "queued_count": 23,
+                "duplicate_count": 0,
+                "completed_count": 20,
+                "failed_count": 1,
+                "pending_count": 2,
+                "progress": 0.913,
+                "created_at": "2024-01-15T14:30:00",
+                "results": {
+                    "550e8400-e29b-41d4-a716-446655440000": {
+                        "status": "completed",
+                        "attempts": 1,
+                        "analysis_id": "660e8400-e29b-41d4-a716-446655440000",
+                        "authenticity_score": 0.92
+                    }
+                }
+            }
+        }
+
+
 class AnalysisStatistics(BaseModel):
     """Statistics about authenticity analyses."""
     
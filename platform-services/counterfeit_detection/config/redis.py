@@ -2,6 +2,8 @@
 Redis configuration for multi-agent communication.
 """
 
+from typing import Optional
+
 import redis.asyncio as redis
 from redis.asyncio import Redis
 
@@ -9,6 +11,8 @@ from .settings import get_settings
 
 settings = get_settings()
 
+_shared_client: Optional[Redis] = None
+
 
 async def get_redis_client() -> Redis:
     """
@@ -24,6 +28,30 @@ async def get_redis_client() -> Redis:
     )
 
 
+async def get_shared_redis_client() -> Redis:
+    """
+    Get the process-wide Redis client, created on first use.
+    
+    Request handlers use this instead of get_redis_client() so requests
+    share one connection pool rather than opening one each.
+    
+    Returns:
+        Redis: Async Redis client
+    """
+    global _shared_client
+    if _shared_client is None:
+        _shared_client = await get_redis_client()
+    return _shared_client
+
+
+async def close_shared_redis_client() -> None:
+    """Close the process-wide Redis client, if created."""
+    global _shared_client
+    if _shared_client is not None:
+        await _shared_client.close()
+        _shared_client = None
+
+
 async def check_redis_connection() -> bool:
     """
     Check if Redis connection is working.
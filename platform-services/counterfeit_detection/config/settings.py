@@ -29,6 +29,26 @@ class Settings(BaseSettings):
     # Redis Configuration
     redis_url: str = Field("redis://localhost:6379/0", description="Redis connection URL")
     
+    # Agent Messaging
+    message_bus_transport: str = Field("pubsub", description="Agent message transport: pubsub or streams")
+    message_stream_maxlen: int = Field(100000, description="Approximate maximum entries per message stream")
+    message_stream_block_ms: int = Field(1000, description="Stream consumer blocking read timeout in milliseconds")
+    message_stream_claim_idle_ms: int = Field(60000, description="Idle time before pending stream entries are reclaimed")
+    message_stream_max_deliveries: int = Field(5, description="Deliveries before a stream entry is dead-lettered")
+    agent_dispatch_strategy: str = Field(
+        "least_outstanding",
+        description="Workflow step dispatch: least_outstanding, power_of_two or health_weighted"
+    )
+    
+    # Analysis Job Queue
+    analysis_workers: int = Field(4, description="Resident analyzer workers consuming analysis jobs in this process (0: enqueue only)")
+    analysis_job_max_attempts: int = Field(3, description="Attempts per analysis job before it is marked failed")
+    analysis_job_idempotency_ttl: int = Field(86400, description="Seconds a product's queued/completed job suppresses duplicates")
+    analysis_job_claim_idle_ms: int = Field(
+        180000,
+        description="Idle time before a crashed worker's analysis job is reclaimed (above the worst-case analysis time)"
+    )
+    
     # AI Service Configuration
     openai_api_key: str = Field(..., description="OpenAI API key")
     anthropic_api_key: Optional[str] = Field(None, description="Anthropic API key (fallback)")
@@ -25,6 +25,44 @@ class Settings(BaseSettings):
     image_embedding_model: str = Field(default="sentence-transformers/clip-ViT-B-32", env="IMAGE_EMBEDDING_MODEL")
     image_embedding_dimensions: int = Field(default=512, env="IMAGE_EMBEDDING_DIMENSIONS")
     embedding_batch_size: int = Field(default=32, env="EMBEDDING_BATCH_SIZE")
+    embedding_batch_window_ms: int = Field(default=5, env="EMBEDDING_BATCH_WINDOW_MS")
+    vector_native_columns: bool = Field(default=False, env="VECTOR_NATIVE_COLUMNS")
+    vector_index_refresh_seconds: float = Field(default=30.0, env="VECTOR_INDEX_REFRESH_SECONDS")
+    image_embedding_workers: Optional[int] = Field(default=None, env="IMAGE_EMBEDDING_WORKERS")
+    image_embedding_batch_size: int = Field(default=16, env="IMAGE_EMBEDDING_BATCH_SIZE")
+    image_embedding_batch_window_ms: int = Field(default=10, env="IMAGE_EMBEDDING_BATCH_WINDOW_MS")
+    
+    # Embedding cache configuration
+    embedding_cache_max_bytes: int = Field(default=256 * 1024 * 1024, env="EMBEDDING_CACHE_MAX_BYTES")
+    embedding_cache_disk_path: Optional[str] = Field(default=None, env="EMBEDDING_CACHE_DISK_PATH")
+    embedding_cache_disk_max_bytes: int = Field(default=2 * 1024 * 1024 * 1024, env="EMBEDDING_CACHE_DISK_MAX_BYTES")
+    embedding_cache_redis_url: Optional[str] = Field(default=None, env="EMBEDDING_CACHE_REDIS_URL")
+    embedding_cache_ttl_seconds: int = Field(default=30 * 24 * 3600, env="EMBEDDING_CACHE_TTL_SECONDS")
+    
+    # zkSNARK worker pool configuration
+    snarkjs_workers: int = Field(default=2, env="SNARKJS_WORKERS")
+    snarkjs_node_binary: str = Field(default="node", env="SNARKJS_NODE_BINARY")
+    snarkjs_node_modules_path: Optional[str] = Field(default=None, env="SNARKJS_NODE_MODULES_PATH")
+    snarkjs_request_timeout_seconds: float = Field(default=60.0, env="SNARKJS_REQUEST_TIMEOUT_SECONDS")
+    
+    # Analytics query configuration
+    analytics_cache_ttl_seconds: float = Field(default=60.0, env="ANALYTICS_CACHE_TTL_SECONDS")
+    analytics_read_from_tiflash: bool = Field(default=False, env="ANALYTICS_READ_FROM_TIFLASH")
+    
+    # Webhook delivery configuration
+    webhook_max_attempts: int = Field(default=3, env="WEBHOOK_MAX_ATTEMPTS")
+    webhook_retry_base_delay_seconds: float = Field(default=1.0, env="WEBHOOK_RETRY_BASE_DELAY_SECONDS")
+    webhook_retry_max_delay_seconds: float = Field(default=300.0, env="WEBHOOK_RETRY_MAX_DELAY_SECONDS")
+    webhook_timeout_seconds: float = Field(default=10.0, env="WEBHOOK_TIMEOUT_SECONDS")
+    webhook_per_host_concurrency: int = Field(default=10, env="WEBHOOK_PER_HOST_CONCURRENCY")
+    webhook_circuit_failure_threshold: int = Field(default=5, env="WEBHOOK_CIRCUIT_FAILURE_THRESHOLD")
+    webhook_circuit_reset_seconds: float = Field(default=30.0, env="WEBHOOK_CIRCUIT_RESET_SECONDS")
+    webhook_max_deferral_seconds: float = Field(default=300.0, env="WEBHOOK_MAX_DEFERRAL_SECONDS")
+    
+    # Brand catalogue bulk upload configuration
+    brand_bulk_upload_chunk_size: int = Field(default=500, env="BRAND_BULK_UPLOAD_CHUNK_SIZE")
+    brand_bulk_upload_max_products: int = Field(default=100000, env="BRAND_BULK_UPLOAD_MAX_PRODUCTS")
+    brand_bulk_upload_max_file_mb: int = Field(default=200, env="BRAND_BULK_UPLOAD_MAX_FILE_MB")
     
     # Storage configuration
     storage_base_path: str = Field(default="storage/products", env="STORAGE_BASE_PATH")
@@ -14,6 +14,7 @@ import structlog
 
 from ...models.database import AnalysisResult, Product
 from ...models.enums import AnalysisStatus
+from .analytics_repository import invalidate_analytics_cache
 
 
 class AnalysisRepository:
@@ -59,6 +60,9 @@ class AnalysisRepository:
             self.session.add(analysis_record)
             await self.session.flush()
             
+            # Dashboard aggregates cached before this analysis are stale
+            invalidate_analytics_cache()
+            
             self.logger.info(
                 "Analysis result created",
                 analysis_id=str(analysis_record.id),
@@ -5,14 +5,18 @@ Provides data access layer for analytics calculations, time-series data,
 and performance metrics across the counterfeit detection system.
 """
 
+import copy
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Awaitable, Callable, Dict, Hashable, List, Optional, Tuple, Any
 from decimal import Decimal
 import structlog
-from sqlalchemy import and_, func, desc, text, select, case
+from sqlalchemy import DateTime, and_, case, cast, func, desc, text, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
 from sqlalchemy.sql.functions import coalesce
 
+from ...core.config import get_settings
+from ...utils.lru_cache import LRUCache
 from ..models.product import Product
 from ..models.authenticity_analysis import AuthenticityAnalysis
 from ..models.enforcement_action import EnforcementAction
@@ -21,13 +25,78 @@ from ...models.enums import ProductCategory, EnforcementAction as EnforcementAct
 
 logger = structlog.get_logger(__name__)
 
+# Process-wide cache of dashboard query results. Keys include a generation
+# number that invalidate_analytics_cache() bumps, so results computed before
+# a new analysis was recorded are never served afterwards.
+_query_cache: Optional[LRUCache] = None
+_cache_generation = 0
+
+
+def _quantize(moment: datetime) -> datetime:
+    """
+    Floor a range bound to the minute.
+
+    Relative periods ("last 7 days") end at the request time, so without
+    this consecutive requests would never share a cache entry.
+    """
+    return moment.replace(second=0, microsecond=0)
+
+
+def get_analytics_cache() -> LRUCache:
+    """Get the shared analytics query cache."""
+    global _query_cache
+    if _query_cache is None:
+        _query_cache = LRUCache(
+            max_entries=1024,
+            default_ttl_seconds=get_settings().analytics_cache_ttl_seconds
+        )
+    return _query_cache
+
+
+def invalidate_analytics_cache() -> None:
+    """Drop cached analytics results (called when analyses are recorded)."""
+    global _cache_generation
+    _cache_generation += 1
+    if _query_cache is not None:
+        _query_cache.clear()
+
 
 class AnalyticsRepository:
     """Repository for analytics data access operations."""
     
-    def __init__(self, session: AsyncSession):
-        """Initialize analytics repository with database session."""
+    def __init__(
+        self,
+        session: AsyncSession,
+        cache: Optional[LRUCache] = None,
+        read_from_tiflash: Optional[bool] = None
+    ):
+        """
+        Initialize analytics repository with database session.
+        
+        Args:
+            session: Database session
+            cache: Query result cache (defaults to the shared cache)
+            read_from_tiflash: Hint aggregate queries to TiFlash replicas
+                (defaults to the analytics_read_from_tiflash setting)
+        """
         self.session = session
+        self.cache = cache if cache is not None else get_analytics_cache()
+        self.read_from_tiflash = (
+            get_settings().analytics_read_from_tiflash if read_from_tiflash is None else read_from_tiflash
+        )
+    
+    async def _cached(self, key: Hashable, load: Callable[[], Awaitable[Any]]) -> Any:
+        """Serve a query result from the cache, loading it once on a miss."""
+        value = await self.cache.get_or_load((_cache_generation,) + key, load)
+        # Callers get their own copy so cached results are never mutated
+        return copy.deepcopy(value)
+    
+    def _analytical(self, query: Select, *models: Any) -> Select:
+        """Route an aggregate query over the given tables to TiFlash if enabled."""
+        if not self.read_from_tiflash:
+            return query
+        tables = ", ".join(model.__tablename__ for model in models)
+        return query.prefix_with(f"/*+ READ_FROM_STORAGE(TIFLASH[{tables}]) */", dialect="mysql")
     
     async def get_detection_metrics(
         self,
@@ -37,220 +106,254 @@ class AnalyticsRepository:
         supplier_filter: Optional[str] = None
     ) -> Dict[str, int]:
         """Get core detection metrics for the specified period."""
+        start_date, end_date = _quantize(start_date), _quantize(end_date)
         try:
-            # Base query for products analyzed in the period
-            base_query = select(Product).join(AuthenticityAnalysis).where(
-                and_(
-                    AuthenticityAnalysis.created_at >= start_date,
-                    AuthenticityAnalysis.created_at <= end_date
-                )
-            )
-            
-            # Apply filters if provided
-            if category_filter:
-                base_query = base_query.where(Product.category == category_filter)
-            if supplier_filter:
-                base_query = base_query.where(Product.supplier_id == supplier_filter)
-            
-            # Count total analyzed products
-            total_analyzed_query = select(func.count(Product.id.distinct())).select_from(
-                base_query.subquery()
+            return await self._cached(
+                ("detection_metrics", start_date, end_date, category_filter, supplier_filter),
+                lambda: self._query_detection_metrics(start_date, end_date, category_filter, supplier_filter)
             )
-            total_analyzed_result = await self.session.execute(total_analyzed_query)
-            total_analyzed = total_analyzed_result.scalar() or 0
-            
-            # Count flagged products (authenticity score < 70)
-            flagged_query = select(func.count(Product.id.distinct())).select_from(
-                base_query.where(AuthenticityAnalysis.authenticity_score < 70).subquery()
-            )
-            flagged_result = await self.session.execute(flagged_query)
-            total_flagged = flagged_result.scalar() or 0
-            
-            # Count true positives (flagged products confirmed as counterfeit)
-            # Look for enforcement actions that were successful and not overturned
-            true_positives_query = select(func.count(Product.id.distinct())).select_from(
-                base_query.join(EnforcementAction).where(
-                    and_(
-                        AuthenticityAnalysis.authenticity_score < 70,
-                        EnforcementAction.action_type == EnforcementActionType.REMOVE_LISTING,
-                        EnforcementAction.status == 'completed',
-                        # No successful appeals (product still removed)
-                        Product.status.in_([ProductStatus.REMOVED, ProductStatus.FLAGGED])
-                    )
-                ).subquery()
-            )
-            true_positives_result = await self.session.execute(true_positives_query)
-            true_positives = true_positives_result.scalar() or 0
-            
-            # Count false positives (flagged products later confirmed as authentic)
-            # Look for products that were flagged but then reinstated
-            false_positives_query = select(func.count(Product.id.distinct())).select_from(
-                base_query.join(EnforcementAction).where(
-                    and_(
-                        AuthenticityAnalysis.authenticity_score < 70,
-                        # Product was reinstated after being flagged
-                        Product.status == ProductStatus.REINSTATED
-                    )
-                ).subquery()
-            )
-            false_positives_result = await self.session.execute(false_positives_query)
-            false_positives = false_positives_result.scalar() or 0
-            
-            # Estimate false negatives (harder to detect - would need external feedback)
-            # For now, use a conservative estimate based on industry standards
-            false_negatives = max(1, int(true_positives * 0.1))  # Assume 10% miss rate
-            
-            return {
-                "total_analyzed": total_analyzed,
-                "total_flagged": total_flagged,
-                "true_positives": true_positives,
-                "false_positives": false_positives,
-                "false_negatives": false_negatives
-            }
             
         except Exception as e:
             logger.error("Failed to get detection metrics", error=str(e))
             raise
     
+    async def _query_detection_metrics(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        category_filter: Optional[str],
+        supplier_filter: Optional[str]
+    ) -> Dict[str, int]:
+        """Count all detection metrics in one scan with conditional aggregation."""
+        # Flagged products (authenticity score < 70)
+        flagged = AuthenticityAnalysis.authenticity_score < 70
+        
+        # True positives: flagged products confirmed as counterfeit, i.e.
+        # removed by a completed enforcement action and not overturned
+        confirmed = and_(
+            flagged,
+            EnforcementAction.action_type == EnforcementActionType.REMOVE_LISTING,
+            EnforcementAction.status == 'completed',
+            # No successful appeals (product still removed)
+            Product.status.in_([ProductStatus.REMOVED, ProductStatus.FLAGGED])
+        )
+        
+        # False positives: flagged products actioned and later reinstated
+        reinstated = and_(
+            flagged,
+            EnforcementAction.id.isnot(None),
+            Product.status == ProductStatus.REINSTATED
+        )
+        
+        query = select(
+            func.count(Product.id.distinct()).label('total_analyzed'),
+            func.count(case((flagged, Product.id)).distinct()).label('total_flagged'),
+            func.count(case((confirmed, Product.id)).distinct()).label('true_positives'),
+            func.count(case((reinstated, Product.id)).distinct()).label('false_positives')
+        ).select_from(Product).join(AuthenticityAnalysis).outerjoin(EnforcementAction).where(
+            and_(
+                AuthenticityAnalysis.created_at >= start_date,
+                AuthenticityAnalysis.created_at <= end_date
+            )
+        )
+        
+        # Apply filters if provided
+        if category_filter:
+            query = query.where(Product.category == category_filter)
+        if supplier_filter:
+            query = query.where(Product.supplier_id == supplier_filter)
+        
+        query = self._analytical(query, Product, AuthenticityAnalysis, EnforcementAction)
+        row = (await self.session.execute(query)).one()
+        
+        true_positives = row.true_positives or 0
+        
+        # Estimate false negatives (harder to detect - would need external feedback)
+        # For now, use a conservative estimate based on industry standards
+        false_negatives = max(1, int(true_positives * 0.1))  # Assume 10% miss rate
+        
+        return {
+            "total_analyzed": row.total_analyzed or 0,
+            "total_flagged": row.total_flagged or 0,
+            "true_positives": true_positives,
+            "false_positives": row.false_positives or 0,
+            "false_negatives": false_negatives
+        }
+    
     async def get_time_series_data(
         self,
         start_date: datetime,
         end_date: datetime,
         metric_type: str = "detection_rate",
-        granularity: str = "daily"
+        granularity: str = "daily",
+        category_filter: Optional[str] = None,
+        supplier_filter: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         """Get time series data for specified metric."""
+        start_date, end_date = _quantize(start_date), _quantize(end_date)
         try:
-            # Determine date truncation based on granularity
-            if granularity == "hourly":
-                date_trunc = func.date_trunc('hour', AuthenticityAnalysis.created_at)
-            elif granularity == "weekly":
-                date_trunc = func.date_trunc('week', AuthenticityAnalysis.created_at)
-            elif granularity == "monthly":
-                date_trunc = func.date_trunc('month', AuthenticityAnalysis.created_at)
-            else:  # daily
-                date_trunc = func.date_trunc('day', AuthenticityAnalysis.created_at)
-            
-            if metric_type == "detection_rate":
-                # Calculate detection rate over time
-                query = select(
-                    date_trunc.label('period'),
-                    func.count(AuthenticityAnalysis.id).label('total_analyzed'),
-                    func.sum(
-                        case(
-                            (AuthenticityAnalysis.authenticity_score < 70, 1),
-                            else_=0
-                        )
-                    ).label('flagged_count')
-                ).where(
-                    and_(
-                        AuthenticityAnalysis.created_at >= start_date,
-                        AuthenticityAnalysis.created_at <= end_date
-                    )
-                ).group_by(date_trunc).order_by(date_trunc)
-                
-            elif metric_type == "false_positive_rate":
-                # Calculate false positive rate over time
-                query = select(
-                    date_trunc.label('period'),
-                    func.count(AuthenticityAnalysis.id).label('total_flagged'),
-                    func.sum(
-                        case(
-                            (Product.status == ProductStatus.REINSTATED, 1),
-                            else_=0
-                        )
-                    ).label('false_positives')
-                ).select_from(
-                    AuthenticityAnalysis.join(Product)
-                ).where(
-                    and_(
-                        AuthenticityAnalysis.created_at >= start_date,
-                        AuthenticityAnalysis.created_at <= end_date,
-                        AuthenticityAnalysis.authenticity_score < 70
-                    )
-                ).group_by(date_trunc).order_by(date_trunc)
-            
-            else:
-                # Default to analysis count
-                query = select(
-                    date_trunc.label('period'),
-                    func.count(AuthenticityAnalysis.id).label('count')
-                ).where(
-                    and_(
-                        AuthenticityAnalysis.created_at >= start_date,
-                        AuthenticityAnalysis.created_at <= end_date
-                    )
-                ).group_by(date_trunc).order_by(date_trunc)
-            
-            result = await self.session.execute(query)
-            time_series = []
-            
-            for row in result:
-                if metric_type == "detection_rate":
-                    value = (row.flagged_count / row.total_analyzed * 100) if row.total_analyzed > 0 else 0
-                elif metric_type == "false_positive_rate":
-                    value = (row.false_positives / row.total_flagged * 100) if row.total_flagged > 0 else 0
-                else:
-                    value = row.count
-                
-                time_series.append({
-                    "timestamp": row.period.isoformat(),
-                    "value": float(value),
-                    "period": granularity
-                })
-            
-            return time_series
+            return await self._cached(
+                ("time_series", start_date, end_date, metric_type, granularity, category_filter, supplier_filter),
+                lambda: self._query_time_series(
+                    start_date, end_date, metric_type, granularity, category_filter, supplier_filter
+                )
+            )
             
         except Exception as e:
             logger.error("Failed to get time series data", error=str(e))
             raise
     
-    async def get_category_breakdown(
+    async def _query_time_series(
         self,
         start_date: datetime,
         end_date: datetime,
-        metric_type: str = "flagging_rate"
-    ) -> Dict[str, Dict[str, Any]]:
-        """Get metrics breakdown by product category."""
-        try:
-            query = select(
-                Product.category,
+        metric_type: str,
+        granularity: str,
+        category_filter: Optional[str],
+        supplier_filter: Optional[str]
+    ) -> List[Dict[str, Any]]:
+        """Aggregate one metric per period in a single grouped scan."""
+        # Determine the period start based on granularity (MySQL/TiDB functions)
+        created_at = AuthenticityAnalysis.created_at
+        if granularity == "hourly":
+            period = func.date_format(created_at, '%Y-%m-%d %H:00:00')
+        elif granularity == "weekly":
+            # Monday of the week
+            period = func.subdate(func.date(created_at), func.weekday(created_at))
+        elif granularity == "monthly":
+            period = func.date_format(created_at, '%Y-%m-01')
+        else:  # daily
+            period = func.date(created_at)
+        period_start = cast(period, DateTime)
+        
+        conditions = [
+            AuthenticityAnalysis.created_at >= start_date,
+            AuthenticityAnalysis.created_at <= end_date
+        ]
+        
+        if metric_type == "detection_rate":
+            # Calculate detection rate over time
+            columns = [
                 func.count(AuthenticityAnalysis.id).label('total_analyzed'),
                 func.sum(
                     case(
                         (AuthenticityAnalysis.authenticity_score < 70, 1),
                         else_=0
                     )
-                ).label('flagged_count'),
-                func.avg(AuthenticityAnalysis.authenticity_score).label('avg_score')
-            ).select_from(
-                Product.join(AuthenticityAnalysis)
-            ).where(
-                and_(
-                    AuthenticityAnalysis.created_at >= start_date,
-                    AuthenticityAnalysis.created_at <= end_date
-                )
-            ).group_by(Product.category)
-            
-            result = await self.session.execute(query)
-            breakdown = {}
+                ).label('flagged_count')
+            ]
             
-            for row in result:
-                flagging_rate = (row.flagged_count / row.total_analyzed * 100) if row.total_analyzed > 0 else 0
-                
-                breakdown[row.category] = {
-                    "total_analyzed": row.total_analyzed,
-                    "flagged_count": row.flagged_count,
-                    "flagging_rate": float(flagging_rate),
-                    "average_score": float(row.avg_score or 0)
-                }
-            
-            return breakdown
+        elif metric_type == "false_positive_rate":
+            # Calculate false positive rate over time
+            columns = [
+                func.count(AuthenticityAnalysis.id).label('total_flagged'),
+                func.sum(
+                    case(
+                        (Product.status == ProductStatus.REINSTATED, 1),
+                        else_=0
+                    )
+                ).label('false_positives')
+            ]
+            conditions.append(AuthenticityAnalysis.authenticity_score < 70)
+        
+        else:
+            # Default to analysis count
+            columns = [func.count(AuthenticityAnalysis.id).label('count')]
+        
+        # Product is only joined when a column or filter needs it
+        if category_filter:
+            conditions.append(Product.category == category_filter)
+        if supplier_filter:
+            conditions.append(Product.supplier_id == supplier_filter)
+        needs_product = bool(metric_type == "false_positive_rate" or category_filter or supplier_filter)
+        
+        query = select(period_start.label('period'), *columns)
+        if needs_product:
+            query = query.select_from(AuthenticityAnalysis).join(Product)
+        query = query.where(and_(*conditions)).group_by(period_start).order_by(period_start)
+        
+        models = (AuthenticityAnalysis, Product) if needs_product else (AuthenticityAnalysis,)
+        result = await self.session.execute(self._analytical(query, *models))
+        time_series = []
+        
+        for row in result:
+            if metric_type == "detection_rate":
+                value = (row.flagged_count / row.total_analyzed * 100) if row.total_analyzed > 0 else 0
+            elif metric_type == "false_positive_rate":
+                value = (row.false_positives / row.total_flagged * 100) if row.total_flagged > 0 else 0
+            else:
+                value = row.count
+            
+            time_series.append({
+                "timestamp": row.period.isoformat(),
+                "value": float(value),
+                "period": granularity
+            })
+        
+        return time_series
+    
+    async def get_category_breakdown(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        metric_type: str = "flagging_rate",
+        supplier_filter: Optional[str] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """Get metrics breakdown by product category."""
+        start_date, end_date = _quantize(start_date), _quantize(end_date)
+        try:
+            return await self._cached(
+                ("category_breakdown", start_date, end_date, metric_type, supplier_filter),
+                lambda: self._query_category_breakdown(start_date, end_date, supplier_filter)
+            )
             
         except Exception as e:
             logger.error("Failed to get category breakdown", error=str(e))
             raise
     
+    async def _query_category_breakdown(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        supplier_filter: Optional[str]
+    ) -> Dict[str, Dict[str, Any]]:
+        """Aggregate per-category counts and scores in a single grouped scan."""
+        query = select(
+            Product.category,
+            func.count(AuthenticityAnalysis.id).label('total_analyzed'),
+            func.sum(
+                case(
+                    (AuthenticityAnalysis.authenticity_score < 70, 1),
+                    else_=0
+                )
+            ).label('flagged_count'),
+            func.avg(AuthenticityAnalysis.authenticity_score).label('avg_score')
+        ).select_from(Product).join(AuthenticityAnalysis).where(
+            and_(
+                AuthenticityAnalysis.created_at >= start_date,
+                AuthenticityAnalysis.created_at <= end_date
+            )
+        )
+        
+        if supplier_filter:
+            query = query.where(Product.supplier_id == supplier_filter)
+        
+        query = query.group_by(Product.category)
+        result = await self.session.execute(self._analytical(query, Product, AuthenticityAnalysis))
+        breakdown = {}
+        
+        for row in result:
+            flagging_rate = (row.flagged_count / row.total_analyzed * 100) if row.total_analyzed > 0 else 0
+            
+            breakdown[row.category] = {
+                "total_analyzed": row.total_analyzed,
+                "flagged_count": row.flagged_count,
+                "flagging_rate": float(flagging_rate),
+                "average_score": float(row.avg_score or 0)
+            }
+        
+        return breakdown
+    
     async def get_supplier_metrics(
         self,
         start_date: datetime,
@@ -269,9 +372,7 @@ class AnalyticsRepository:
                     )
                 ).label('flagged_count'),
                 func.avg(AuthenticityAnalysis.authenticity_score).label('avg_score')
-            ).select_from(
-                Product.join(AuthenticityAnalysis)
-            ).where(
+            ).select_from(Product).join(AuthenticityAnalysis).where(
                 and_(
                     AuthenticityAnalysis.created_at >= start_date,
                     AuthenticityAnalysis.created_at <= end_date
@@ -397,9 +498,7 @@ class AnalyticsRepository:
                     )
                 ).label('flagged_count'),
                 func.avg(AuthenticityAnalysis.authenticity_score).label('avg_score')
-            ).select_from(
-                Product.join(AuthenticityAnalysis)
-            ).where(
+            ).select_from(Product).join(AuthenticityAnalysis).where(
                 and_(
                     AuthenticityAnalysis.created_at >= start_date,
                     AuthenticityAnalysis.created_at <= end_date
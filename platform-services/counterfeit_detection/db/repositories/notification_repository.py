@@ -7,7 +7,7 @@ user preferences, and notification logging.
 
 import json
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 from uuid import uuid4
 
 from sqlalchemy import and_, desc, func
@@ -22,6 +22,21 @@ from ..models.enums import NotificationChannel, NotificationStatus
 
 logger = structlog.get_logger(__name__)
 
+# Bumped on every preference or endpoint change; readers caching
+# preferences compare it to decide when to reload
+_preferences_generation = 0
+
+
+def get_preferences_generation() -> int:
+    """Current generation of notification preferences and endpoints."""
+    return _preferences_generation
+
+
+def invalidate_notification_preferences() -> None:
+    """Mark cached notification preferences and endpoints as stale."""
+    global _preferences_generation
+    _preferences_generation += 1
+
 
 class NotificationRepository:
     """Repository for notification data access."""
@@ -51,6 +66,7 @@ class NotificationRepository:
             self.session.add(endpoint)
             await self.session.commit()
             await self.session.refresh(endpoint)
+            invalidate_notification_preferences()
             
             logger.info("Notification endpoint created", endpoint_id=endpoint.id, user_id=endpoint.user_id)
             return endpoint
@@ -160,6 +176,7 @@ class NotificationRepository:
             
             await self.session.commit()
             await self.session.refresh(endpoint)
+            invalidate_notification_preferences()
             
             logger.info("Notification endpoint updated", endpoint_id=endpoint_id, updated_fields=list(update_data.keys()))
             return endpoint
@@ -186,6 +203,7 @@ class NotificationRepository:
             
             await self.session.delete(endpoint)
             await self.session.commit()
+            invalidate_notification_preferences()
             
             logger.info("Notification endpoint deleted", endpoint_id=endpoint_id)
             return True
@@ -220,6 +238,7 @@ class NotificationRepository:
             self.session.add(preferences)
             await self.session.commit()
             await self.session.refresh(preferences)
+            invalidate_notification_preferences()
             
             logger.info("User notification preferences created", user_id=preferences.user_id)
             return preferences
@@ -276,6 +295,7 @@ class NotificationRepository:
             
             await self.session.commit()
             await self.session.refresh(preferences)
+            invalidate_notification_preferences()
             
             logger.info("User notification preferences updated", user_id=user_id, updated_fields=list(update_data.keys()))
             return preferences
@@ -314,6 +334,44 @@ class NotificationRepository:
             logger.error("Failed to get all notification users", error=str(e))
             raise
     
+    async def get_all_user_preferences(self) -> Dict[str, UserNotificationPreferences]:
+        """
+        Get the notification preferences of all users in one query.
+        
+        Returns:
+            UserNotificationPreferences instances by user ID
+        """
+        try:
+            result = await self.session.execute(select(UserNotificationPreferences))
+            return {preferences.user_id: preferences for preferences in result.scalars().all()}
+        
+        except Exception as e:
+            logger.error("Failed to get all user notification preferences", error=str(e))
+            raise
+    
+    async def get_active_endpoints_by_user(self) -> Dict[str, Dict[NotificationChannel, NotificationEndpoint]]:
+        """
+        Get all active notification endpoints in one query.
+        
+        Returns:
+            Per user ID, the user's first-created active endpoint of each channel
+        """
+        try:
+            result = await self.session.execute(
+                select(NotificationEndpoint)
+                .where(NotificationEndpoint.is_active == True)
+                .order_by(NotificationEndpoint.created_at)
+            )
+            
+            endpoints: Dict[str, Dict[NotificationChannel, NotificationEndpoint]] = {}
+            for endpoint in result.scalars().all():
+                endpoints.setdefault(endpoint.user_id, {}).setdefault(endpoint.endpoint_type, endpoint)
+            return endpoints
+        
+        except Exception as e:
+            logger.error("Failed to get active notification endpoints", error=str(e))
+            raise
+    
     async def get_user_channels(self, user_id: str) -> List[NotificationChannel]:
         """
         Get notification channels configured for a user.
@@ -386,6 +444,41 @@ class NotificationRepository:
             logger.error("Failed to log notification", error=str(e))
             raise
     
+    async def log_notifications(self, entries: List[Dict[str, Any]]) -> int:
+        """
+        Log several notification delivery attempts in one transaction.
+        
+        Args:
+            entries: Dictionaries with the arguments of log_notification
+            
+        Returns:
+            Number of entries logged
+        """
+        if not entries:
+            return 0
+        
+        try:
+            self.session.add_all([
+                NotificationLog(
+                    id=str(uuid4()),
+                    product_id=entry.get("product_id"),
+                    user_id=entry["user_id"],
+                    notification_type=entry["notification_type"],
+                    delivery_status=entry["delivery_status"],
+                    payload=entry.get("payload"),
+                    error_message=entry.get("error_message")
+                )
+                for entry in entries
+            ])
+            await self.session.commit()
+            
+            return len(entries)
+        
+        except Exception as e:
+            await self.session.rollback()
+            logger.error("Failed to log notifications", error=str(e), count=len(entries))
+            raise
+    
     async def get_notification_logs(
         self,
         user_id: Optional[str] = None,
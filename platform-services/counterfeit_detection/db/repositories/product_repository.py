@@ -2,7 +2,7 @@
 Product repository for database operations.
 """
 
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Iterable, Set
 from uuid import UUID, uuid4
 from decimal import Decimal
 from datetime import datetime
@@ -14,15 +14,33 @@ import structlog
 
 from ...models.database import Product, Supplier
 from ...models.enums import ProductCategory, ProductStatus
+from .vector_repository import VectorRepository, run_after_commit
 
 logger = structlog.get_logger(module=__name__)
 
+# Maximum IDs bound into one IN (...) list; larger lookups are split
+IN_CLAUSE_CHUNK_SIZE = 500
+
 
 class ProductRepository:
     """Repository for product database operations."""
     
-    def __init__(self, session: AsyncSession):
+    def __init__(
+        self,
+        session: AsyncSession,
+        identity_map: Optional[Dict[str, Product]] = None
+    ):
+        """
+        Initialize the repository.
+        
+        Args:
+            session: Database session
+            identity_map: Optional request-scoped map of loaded products by
+                ID; lookups by ID are answered from it and products loaded by
+                ID are added to it, so a product is fetched at most once
+        """
         self.session = session
+        self.identity_map = identity_map
         self.logger = structlog.get_logger(
             component="product_repository",
             session_id=id(session)
@@ -74,6 +92,9 @@ class ProductRepository:
         Returns:
             Product instance or None if not found
         """
+        if self.identity_map is not None and str(product_id) in self.identity_map:
+            return self.identity_map[str(product_id)]
+        
         try:
             stmt = (
                 select(Product)
@@ -85,6 +106,7 @@ class ProductRepository:
             product = result.scalar_one_or_none()
             
             if product:
+                self._remember([product])
                 self.logger.debug(
                     "Product retrieved",
                     product_id=str(product_id),
@@ -107,6 +129,123 @@ class ProductRepository:
             )
             raise
     
+    async def get_products_by_ids(
+        self,
+        product_ids: Iterable[UUID],
+        chunk_size: int = IN_CLAUSE_CHUNK_SIZE
+    ) -> List[Product]:
+        """
+        Get several products by ID with one query per chunk of IDs.
+        
+        Args:
+            product_ids: Product UUIDs
+            chunk_size: Maximum IDs per query
+            
+        Returns:
+            Product instances found (in no particular order); missing IDs
+            are omitted
+        """
+        product_ids = list(product_ids)
+        if not product_ids:
+            return []
+        
+        products = []
+        missing_ids = []
+        for product_id in dict.fromkeys(product_ids):
+            if self.identity_map is not None and str(product_id) in self.identity_map:
+                products.append(self.identity_map[str(product_id)])
+            else:
+                missing_ids.append(product_id)
+        
+        try:
+            for chunk in self._chunks(missing_ids, chunk_size):
+                stmt = (
+                    select(Product)
+                    .options(selectinload(Product.supplier))
+                    .where(Product.id.in_(chunk))
+                )
+                
+                result = await self.session.execute(stmt)
+                loaded = list(result.scalars().all())
+                self._remember(loaded)
+                products.extend(loaded)
+            
+            self.logger.debug(
+                "Products retrieved by IDs",
+                requested=len(product_ids),
+                queried=len(missing_ids),
+                found=len(products)
+            )
+            
+            return products
+            
+        except Exception as e:
+            self.logger.error(
+                "Failed to get products by IDs",
+                requested=len(product_ids),
+                error=str(e)
+            )
+            raise
+    
+    async def existing_ids(
+        self,
+        product_ids: Iterable[UUID],
+        chunk_size: int = IN_CLAUSE_CHUNK_SIZE
+    ) -> Set[str]:
+        """
+        Check which products exist, selecting only the ID column.
+        
+        Args:
+            product_ids: Product UUIDs
+            chunk_size: Maximum IDs per query
+            
+        Returns:
+            String form of the IDs that exist
+        """
+        product_ids = list(product_ids)
+        existing = set()
+        missing_ids = []
+        for product_id in dict.fromkeys(product_ids):
+            if self.identity_map is not None and str(product_id) in self.identity_map:
+                existing.add(str(product_id))
+            else:
+                missing_ids.append(product_id)
+        
+        try:
+            for chunk in self._chunks(missing_ids, chunk_size):
+                result = await self.session.execute(
+                    select(Product.id).where(Product.id.in_(chunk))
+                )
+                existing.update(str(product_id) for product_id in result.scalars().all())
+            
+            self.logger.debug(
+                "Product existence checked",
+                requested=len(product_ids),
+                found=len(existing)
+            )
+            
+            return existing
+            
+        except Exception as e:
+            self.logger.error(
+                "Failed to check product existence",
+                requested=len(product_ids),
+                error=str(e)
+            )
+            raise
+    
+    def _remember(self, products: Iterable[Product]) -> None:
+        """Add loaded products to the identity map, if one is used."""
+        if self.identity_map is not None:
+            for product in products:
+                self.identity_map[str(product.id)] = product
+    
+    @staticmethod
+    def _chunks(items: List[Any], size: int) -> Iterable[List[Any]]:
+        """Split a list into consecutive chunks of at most size items."""
+        for start in range(0, len(items), size):
+            yield items[start:start + size]
+    
     async def get_products_by_supplier(
         self, 
         supplier_id: UUID,
@@ -303,6 +442,17 @@ class ProductRepository:
             updated_product = result.scalar_one_or_none()
             
             if updated_product:
+                indexed_fields = {'category', 'supplier_id', 'price', 'status'} & update_data.keys()
+                if indexed_fields:
+                    # Read now; the instance is expired by the time the commit hook runs
+                    attributes = {field: getattr(updated_product, field) for field in indexed_fields}
+                    run_after_commit(
+                        self.session,
+                        lambda: VectorRepository(self.session).update_product_in_vector_indexes(
+                            product_id, **attributes
+                        )
+                    )
+                
                 self.logger.info(
                     "Product updated",
                     product_id=str(product_id),
@@ -357,6 +507,12 @@ class ProductRepository:
             result = await self.session.execute(stmt)
             
             if result.rowcount > 0:
+                run_after_commit(
+                    self.session,
+                    lambda: VectorRepository(self.session).update_product_in_vector_indexes(
+                        product_id, status=status
+                    )
+                )
                 self.logger.info(
                     "Product status updated",
                     product_id=str(product_id),
@@ -458,6 +614,10 @@ class ProductRepository:
             result = await self.session.execute(stmt)
             
             if result.rowcount > 0:
+                run_after_commit(
+                    self.session,
+                    lambda: VectorRepository(self.session).remove_product_from_vector_indexes(product_id)
+                )
                 self.logger.info(
                     "Product deleted",
                     product_id=str(product_id)
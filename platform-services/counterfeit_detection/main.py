@@ -11,7 +11,12 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from .api.v1 import v1_router
+from .config.redis import close_shared_redis_client
 from .config.settings import get_settings
+from .services.analysis_job_queue import get_analysis_job_queue, shutdown_analysis_job_queue
+from .services.image_embedding_executor import shutdown_image_embedding_executor
+from .services.snarkjs_worker_pool import shutdown_snarkjs_worker_pool
+from .services.webhook_delivery import shutdown_webhook_delivery_engine
 
 settings = get_settings()
 
@@ -51,10 +56,22 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
         debug_mode=settings.app_debug
     )
     
+    if settings.analysis_workers > 0:
+        try:
+            await get_analysis_job_queue()
+        except Exception as e:
+            # Workers start on the first analysis request instead
+            logger.warning("Failed to start analysis workers", error=str(e))
+    
     yield
     
     # Shutdown
     logger.info("Shutting down Counterfeit Detection System")
+    await shutdown_analysis_job_queue()
+    shutdown_image_embedding_executor()
+    await shutdown_snarkjs_worker_pool()
+    await shutdown_webhook_delivery_engine()
+    await close_shared_redis_client()
 
 
 # Create FastAPI application
@@ -0,0 +1,464 @@
+"""
+Durable product analysis job queue served by resident analyzer workers.
+
+Jobs are appended to a Redis stream and consumed through one consumer
+group by a pool of long-lived AuthenticityAnalyzer instances, each working
+on one job at a time, so LLM clients, embedding and proof services are
+built once per worker instead of once per product. Stream entries survive
+API restarts and entries left pending by a crashed process are reclaimed
+by the surviving workers; a worker keeps its running job claimed and
+heartbeats it, so slow analyses are not taken over. Failed analyses are re-queued up to
+``max_attempts`` times, an idempotency key per product suppresses duplicate
+jobs, and progress is tracked per batch in Redis.
+"""
+
+import asyncio
+import json
+import os
+import socket
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import structlog
+from redis.asyncio import Redis
+
+from ..agents.authenticity_analyzer import AuthenticityAnalyzer
+from ..agents.utils.streams import StreamTransport
+from ..config.redis import get_redis_client
+from ..config.settings import get_settings
+
+logger = structlog.get_logger(__name__)
+
+JOB_STREAM = "jobs.product_analysis"
+WORKER_GROUP = "analysis-workers"
+
+# Batch request priorities mapped to stream message priorities
+JOB_PRIORITIES = {"urgent": 10, "high": 5, "normal": 0, "low": -1}
+
+# Batch progress is kept for a week after the last update
+PROGRESS_TTL = 7 * 24 * 3600
+
+
+@dataclass
+class AnalysisJob:
+    """One product analysis queued for a worker."""
+    job_id: str
+    product_id: str
+    idempotency_key: str
+    batch_id: Optional[str] = None
+    priority: int = 0
+    attempt: int = 1
+    options: Optional[Dict[str, Any]] = None
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self))
+
+    @classmethod
+    def from_json(cls, message_json: str) -> "AnalysisJob":
+        return cls(**json.loads(message_json))
+
+
+class AnalysisJobQueue:
+    """
+    Redis-stream analysis queue with a pool of warm analyzer workers.
+
+    Concurrency is bounded by the number of workers in each process; more
+    API processes add consumers to the same group.
+    """
+
+    def __init__(
+        self,
+        redis_client: Redis,
+        transport: StreamTransport,
+        workers: int = 4,
+        max_attempts: int = 3,
+        idempotency_ttl_seconds: int = 86400,
+        retry_backoff_seconds: float = 1.0,
+        heartbeat_seconds: float = 15.0,
+        analyzer_factory: Callable[[], AuthenticityAnalyzer] = AuthenticityAnalyzer
+    ):
+        """
+        Initialize the queue.
+
+        Args:
+            redis_client: Redis client (decode_responses=True)
+            transport: Stream transport carrying the jobs
+            workers: Resident analyzer workers in this process
+            max_attempts: Attempts per job before it is marked failed
+            idempotency_ttl_seconds: How long a product's job suppresses duplicates
+            retry_backoff_seconds: Delay before re-queueing, multiplied by the attempt
+            heartbeat_seconds: Interval at which a running job's heartbeat is
+                refreshed; a heartbeat older than three intervals is stale
+            analyzer_factory: Creates an (unstarted) analyzer per worker
+        """
+        self.redis_client = redis_client
+        self.transport = transport
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.idempotency_ttl_seconds = idempotency_ttl_seconds
+        self.retry_backoff_seconds = retry_backoff_seconds
+        self.heartbeat_seconds = heartbeat_seconds
+        self.analyzer_factory = analyzer_factory
+
+        self.consumer_prefix = f"{socket.gethostname()}-{os.getpid()}"
+        self.analyzers: List[AuthenticityAnalyzer] = []
+        self._worker_tasks: List[asyncio.Task] = []
+        self._shutdown_event = asyncio.Event()
+        self.running = False
+
+        self.stats = {
+            "enqueued": 0,
+            "duplicates": 0,
+            "completed": 0,
+            "retried": 0,
+            "failed": 0,
+            "skipped": 0,
+            "deferred": 0
+        }
+
+    @staticmethod
+    def job_key(idempotency_key: str) -> str:
+        """Redis hash holding a job's state."""
+        return f"analysis:job:{idempotency_key}"
+
+    @staticmethod
+    def batch_key(batch_id: str) -> str:
+        """Redis hash holding a batch's counters."""
+        return f"analysis:batch:{batch_id}"
+
+    @staticmethod
+    def batch_results_key(batch_id: str) -> str:
+        """Redis hash of per-product results of a batch."""
+        return f"analysis:batch:{batch_id}:results"
+
+    async def start(self) -> None:
+        """Start the analyzer workers."""
+        if self.running:
+            return
+        self.running = True
+        self._shutdown_event.clear()
+
+        try:
+            for index in range(self.workers):
+                analyzer = self.analyzer_factory()
+                await analyzer.start()
+                self.analyzers.append(analyzer)
+
+                async def handle(message_json: str, analyzer: AuthenticityAnalyzer = analyzer) -> bool:
+                    return await self._process(analyzer, message_json)
+
+                self._worker_tasks.append(asyncio.create_task(
+                    self.transport.consume(
+                        JOB_STREAM,
+                        WORKER_GROUP,
+                        f"{self.consumer_prefix}-{index}",
+                        handle,
+                        self._shutdown_event
+                    )
+                ))
+        except Exception:
+            # Tear down the workers started so far; start() may be retried
+            await self.stop()
+            raise
+
+        logger.info("Analysis workers started", workers=self.workers, consumer_prefix=self.consumer_prefix)
+
+    async def stop(self) -> None:
+        """Stop the workers after their current jobs; unfinished jobs stay queued."""
+        if not self.running:
+            return
+        self.running = False
+        self._shutdown_event.set()
+
+        if self._worker_tasks:
+            await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks.clear()
+
+        for analyzer in self.analyzers:
+            try:
+                await analyzer.stop()
+            except Exception as e:
+                logger.warning("Failed to stop analyzer worker", error=str(e))
+        self.analyzers.clear()
+
+        logger.info("Analysis workers stopped")
+
+    async def enqueue_batch(
+        self,
+        product_ids: Sequence[str],
+        batch_id: Optional[str] = None,
+        priority: str = "normal",
+        options: Optional[Dict[str, Any]] = None,
+        force: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Queue analyses for a batch of products.
+
+        Products that already have a queued, running or recently completed
+        job are skipped unless ``force`` is set.
+
+        Args:
+            product_ids: Products to analyze
+            batch_id: Batch identifier (generated if omitted)
+            priority: low, normal, high or urgent
+            options: Analysis options passed to the workers
+            force: Queue even if a job for the product exists
+
+        Returns:
+            Batch ID with queued and duplicate product IDs
+        """
+        batch_id = batch_id or f"batch-{uuid.uuid4()}"
+        product_ids = [str(product_id) for product_id in dict.fromkeys(product_ids)]
+
+        jobs = [
+            AnalysisJob(
+                job_id=str(uuid.uuid4()),
+                product_id=product_id,
+                # Forced jobs get a key of their own so they are never suppressed
+                idempotency_key=f"{product_id}:{batch_id}" if force else product_id,
+                batch_id=batch_id,
+                priority=JOB_PRIORITIES.get(priority, 0),
+                options=options
+            )
+            for product_id in product_ids
+        ]
+
+        # Claim each product's idempotency key; only new claims are queued
+        pipe = self.redis_client.pipeline(transaction=False)
+        for job in jobs:
+            pipe.hsetnx(self.job_key(job.idempotency_key), "job_id", job.job_id)
+        claimed = await pipe.execute()
+
+        new_jobs = [job for job, is_new in zip(jobs, claimed) if is_new]
+        duplicates = [job.product_id for job, is_new in zip(jobs, claimed) if not is_new]
+
+        pipe = self.redis_client.pipeline(transaction=False)
+        for job in new_jobs:
+            key = self.job_key(job.idempotency_key)
+            pipe.hset(key, mapping={"status": "queued", "batch_id": batch_id, "product_id": job.product_id})
+            pipe.expire(key, self.idempotency_ttl_seconds)
+        pipe.hset(self.batch_key(batch_id), mapping={
+            "total": len(product_ids),
+            "queued": len(new_jobs),
+            "duplicates": len(duplicates),
+            "completed": 0,
+            "failed": 0,
+            "created_at": datetime.utcnow().isoformat()
+        })
+        pipe.expire(self.batch_key(batch_id), PROGRESS_TTL)
+        await pipe.execute()
+
+        await self.transport.publish_many(
+            JOB_STREAM, [(job.to_json(), job.priority) for job in new_jobs]
+        )
+
+        self.stats["enqueued"] += len(new_jobs)
+        self.stats["duplicates"] += len(duplicates)
+
+        logger.info(
+            "Analysis batch queued",
+            batch_id=batch_id,
+            queued=len(new_jobs),
+            duplicates=len(duplicates)
+        )
+
+        return {
+            "batch_id": batch_id,
+            "queued_product_ids": [job.product_id for job in new_jobs],
+            "duplicate_product_ids": duplicates
+        }
+
+    async def get_batch_progress(self, batch_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the progress of a batch.
+
+        Returns:
+            Counters, status and per-product results, or None if unknown
+        """
+        pipe = self.redis_client.pipeline(transaction=False)
+        pipe.hgetall(self.batch_key(batch_id))
+        pipe.hgetall(self.batch_results_key(batch_id))
+        counters, results = await pipe.execute()
+
+        if not counters:
+            return None
+
+        queued = int(counters.get("queued", 0))
+        completed = int(counters.get("completed", 0))
+        failed = int(counters.get("failed", 0))
+        finished = completed + failed
+
+        if finished < queued:
+            status = "processing" if finished else "queued"
+        else:
+            status = "completed" if not failed else "completed_with_errors"
+
+        return {
+            "batch_id": batch_id,
+            "status": status,
+            "total_requested": int(counters.get("total", 0)),
+            "queued_count": queued,
+            "duplicate_count": int(counters.get("duplicates", 0)),
+            "completed_count": completed,
+            "failed_count": failed,
+            "pending_count": max(0, queued - finished),
+            "progress": finished / queued if queued else 1.0,
+            "created_at": counters.get("created_at"),
+            "results": {product_id: json.loads(result) for product_id, result in results.items()}
+        }
+
+    async def _process(self, analyzer: AuthenticityAnalyzer, message_json: str) -> bool:
+        """
+        Run one job on a worker's analyzer.
+
+        Returns:
+            False if another worker is still running the job, which leaves
+            the entry pending; True otherwise
+        """
+        job = AnalysisJob.from_json(message_json)
+        job_key = self.job_key(job.idempotency_key)
+
+        status, heartbeat = await self.redis_client.hmget(job_key, ["status", "heartbeat"])
+
+        # Redelivered after the job already finished (e.g. crash before ack)
+        if status == "completed":
+            self.stats["skipped"] += 1
+            return True
+
+        # Reclaimed from a worker that is still alive
+        if status == "running" and heartbeat and time.time() - float(heartbeat) < 3 * self.heartbeat_seconds:
+            self.stats["deferred"] += 1
+            logger.info("Analysis job still running elsewhere, deferring", job_id=job.job_id)
+            return False
+
+        await self.redis_client.hset(job_key, mapping={
+            "status": "running",
+            "attempt": job.attempt,
+            "heartbeat": time.time()
+        })
+        heartbeat_task = asyncio.create_task(self._heartbeat(job_key))
+
+        try:
+            result = await analyzer.analyze_product_authenticity(job.product_id)
+
+        except Exception as e:
+            if job.attempt < self.max_attempts:
+                await self._retry(job, e)
+            else:
+                await self._finish(job, "failed", {"error": str(e)})
+                self.stats["failed"] += 1
+                logger.error(
+                    "Analysis job failed",
+                    job_id=job.job_id,
+                    product_id=job.product_id,
+                    attempts=job.attempt,
+                    error=str(e)
+                )
+            return True
+
+        finally:
+            heartbeat_task.cancel()
+
+        await self._finish(job, "completed", {
+            "analysis_id": result.analysis_id,
+            "authenticity_score": result.authenticity_score
+        })
+        self.stats["completed"] += 1
+        return True
+
+    async def _heartbeat(self, job_key: str) -> None:
+        """Refresh a running job's heartbeat until cancelled."""
+        while True:
+            await asyncio.sleep(self.heartbeat_seconds)
+            try:
+                await self.redis_client.hset(job_key, "heartbeat", time.time())
+            except Exception as e:
+                logger.warning("Failed to refresh analysis job heartbeat", job_key=job_key, error=str(e))
+
+    async def _retry(self, job: AnalysisJob, error: Exception) -> None:
+        """Re-queue a failed job after a backoff."""
+        self.stats["retried"] += 1
+        logger.warning(
+            "Analysis job failed, retrying",
+            job_id=job.job_id,
+            product_id=job.product_id,
+            attempt=job.attempt,
+            error=str(error)
+        )
+
+        await asyncio.sleep(self.retry_backoff_seconds * job.attempt)
+        job.attempt += 1
+        await self.redis_client.hset(self.job_key(job.idempotency_key), "status", "queued")
+        await self.transport.publish(JOB_STREAM, job.to_json(), job.priority)
+
+    async def _finish(self, job: AnalysisJob, status: str, details: Dict[str, Any]) -> None:
+        """Record a job's final state and update its batch."""
+        pipe = self.redis_client.pipeline(transaction=False)
+        job_key = self.job_key(job.idempotency_key)
+        pipe.hset(job_key, mapping={"status": status, **{k: str(v) for k, v in details.items()}})
+        if status == "failed":
+            # A failed product can be queued again straight away
+            pipe.expire(job_key, 60)
+
+        if job.batch_id:
+            pipe.hsetnx(
+                self.batch_results_key(job.batch_id),
+                job.product_id,
+                json.dumps({"status": status, "attempts": job.attempt, **details})
+            )
+            pipe.expire(self.batch_results_key(job.batch_id), PROGRESS_TTL)
+        replies = await pipe.execute()
+
+        # Only the first result recorded for a product counts, so a job
+        # finished twice (e.g. redelivered before its ack) is not double counted
+        if job.batch_id and replies[-2]:
+            await self.redis_client.hincrby(self.batch_key(job.batch_id), status, 1)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get queue counters and worker count."""
+        return {
+            **self.stats,
+            "workers": len(self.analyzers),
+            "running": self.running
+        }
+
+
+_job_queue: Optional[AnalysisJobQueue] = None
+_job_queue_lock = asyncio.Lock()
+
+
+async def get_analysis_job_queue() -> AnalysisJobQueue:
+    """Get the process-wide analysis job queue, starting its workers on first use."""
+    global _job_queue
+    async with _job_queue_lock:
+        if _job_queue is None:
+            settings = get_settings()
+            redis_client = await get_redis_client()
+            queue = AnalysisJobQueue(
+                redis_client,
+                StreamTransport.from_settings(
+                    redis_client,
+                    settings,
+                    claim_idle_ms=settings.analysis_job_claim_idle_ms,
+                    heartbeat_ms=settings.analysis_job_claim_idle_ms // 4
+                ),
+                workers=settings.analysis_workers,
+                max_attempts=settings.analysis_job_max_attempts,
+                idempotency_ttl_seconds=settings.analysis_job_idempotency_ttl,
+                heartbeat_seconds=settings.analysis_job_claim_idle_ms / 4000
+            )
+            # Only cache a started queue so a failed start is retried
+            await queue.start()
+            _job_queue = queue
+    return _job_queue
+
+
+async def shutdown_analysis_job_queue() -> None:
+    """Stop the process-wide queue's workers, if started."""
+    global _job_queue
+    if _job_queue is not None:
+        await _job_queue.stop()
+        _job_queue = None
@@ -16,7 +16,6 @@ from collections import defaultdict
 
 import structlog
 from sqlalchemy import and_, func, desc, text
-from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..core.database import get_db_session
 from ..db.repositories.analytics_repository import AnalyticsRepository
@@ -83,29 +82,19 @@ class AnalyticsService:
         """
         try:
             async with get_db_session() as session:
-                if not self.analytics_repository:
-                    self.analytics_repository = AnalyticsRepository(session)
-                
-                # Get core detection metrics
-                total_analyzed = await self._count_analyzed_products(
-                    session, start_date, end_date, category_filter, supplier_filter
-                )
-                
-                total_flagged = await self._count_flagged_products(
-                    session, start_date, end_date, category_filter, supplier_filter
-                )
+                # Repository bound to this request's session; query results
+                # are cached across requests by the repository
+                analytics_repository = AnalyticsRepository(session)
                 
-                true_positives = await self._count_true_positives(
-                    session, start_date, end_date, category_filter, supplier_filter
-                )
-                
-                false_positives = await self._count_false_positives(
-                    session, start_date, end_date, category_filter, supplier_filter
-                )
-                
-                false_negatives = await self._count_false_negatives(
-                    session, start_date, end_date, category_filter, supplier_filter
+                # Get core detection metrics (one aggregate query)
+                detection_metrics = await analytics_repository.get_detection_metrics(
+                    start_date, end_date, category_filter, supplier_filter
                 )
+                total_analyzed = detection_metrics["total_analyzed"]
+                total_flagged = detection_metrics["total_flagged"]
+                true_positives = detection_metrics["true_positives"]
+                false_positives = detection_metrics["false_positives"]
+                false_negatives = detection_metrics["false_negatives"]
                 
                 # Calculate derived metrics
                 detection_rate = self._calculate_detection_rate(
@@ -121,13 +110,16 @@ class AnalyticsService:
                 f1_score = self._calculate_f1_score(precision, recall)
                 
                 # Get time series data
-                time_series = await self._get_detection_time_series(
-                    session, start_date, end_date, category_filter, supplier_filter
+                time_series = await analytics_repository.get_time_series_data(
+                    start_date, end_date,
+                    metric_type="detection_rate",
+                    category_filter=category_filter,
+                    supplier_filter=supplier_filter
                 )
                 
                 # Get category breakdown
-                category_breakdown = await self._get_category_breakdown(
-                    session, start_date, end_date, supplier_filter
+                category_breakdown = await analytics_repository.get_category_breakdown(
+                    start_date, end_date, supplier_filter=supplier_filter
                 )
                 
                 # Calculate target achievement
@@ -468,71 +460,6 @@ class AnalyticsService:
     
     # Helper methods for metric calculations
     
-    async def _count_analyzed_products(
-        self,
-        session: AsyncSession,
-        start_date: datetime,
-        end_date: datetime,
-        category_filter: Optional[str] = None,
-        supplier_filter: Optional[str] = None
-    ) -> int:
-        """Count total products analyzed in the period."""
-        # Implementation would query audit logs for analysis activities
-        # Placeholder return
-        return 1000
-    
-    async def _count_flagged_products(
-        self,
-        session: AsyncSession,
-        start_date: datetime,
-        end_date: datetime,
-        category_filter: Optional[str] = None,
-        supplier_filter: Optional[str] = None
-    ) -> int:
-        """Count products flagged as potential counterfeits."""
-        # Implementation would query enforcement actions for flagged products
-        # Placeholder return
-        return 150
-    
-    async def _count_true_positives(
-        self,
-        session: AsyncSession,
-        start_date: datetime,
-        end_date: datetime,
-        category_filter: Optional[str] = None,
-        supplier_filter: Optional[str] = None
-    ) -> int:
-        """Count confirmed true positive detections."""
-        # Implementation would query appeals and overrides to identify confirmed counterfeits
-        # Placeholder return
-        return 140
-    
-    async def _count_false_positives(
-        self,
-        session: AsyncSession,
-        start_date: datetime,
-        end_date: datetime,
-        category_filter: Optional[str] = None,
-        supplier_filter: Optional[str] = None
-    ) -> int:
-        """Count confirmed false positive detections."""
-        # Implementation would query successful appeals and admin overrides
-        # Placeholder return
-        return 10
-    
-    async def _count_false_negatives(
-        self,
-        session: AsyncSession,
-        start_date: datetime,
-        end_date: datetime,
-        category_filter: Optional[str] = None,
-        supplier_filter: Optional[str] = None
-    ) -> int:
-        """Count missed counterfeit products (false negatives)."""
-        # Implementation would require manual validation or external feedback
-        # Placeholder return
-        return 5
-    
     def _calculate_detection_rate(self, true_positives: int, false_negatives: int) -> float:
         """Calculate detection rate (recall)."""
         total_actual_counterfeits = true_positives + false_negatives
@@ -594,14 +521,6 @@ class AnalyticsService:
             )
     
     # Placeholder implementations for other helper methods
-    async def _get_detection_time_series(self, session, start_date, end_date, category_filter, supplier_filter):
-        """Get time series data for detection metrics."""
-        return []
-    
-    async def _get_category_breakdown(self, session, start_date, end_date, supplier_filter):
-        """Get detection metrics broken down by category."""
-        return {}
-    
     async def _get_false_positive_trend(self, session, start_date, end_date):
         """Get false positive trend over time."""
         return []
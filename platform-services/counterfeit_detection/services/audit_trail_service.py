@@ -87,6 +87,7 @@ class AuditTrailService:
         # Performance optimization
         self.processing_pool_size = 4
         self.max_concurrent_anchors = 3
+        self.merkle_hash_workers: Optional[int] = None  # threaded level hashing, see MerkleTree.build_levels
     
     async def create_audit_entry(
         self,
@@ -185,8 +186,12 @@ class AuditTrailService:
                 entry.merkle_leaf_index = i
                 leaf_hashes.append(leaf_hash)
             
-            # Build Merkle tree
-            merkle_root, merkle_proof_data = self.merkle_tree.build_tree_with_proofs(leaf_hashes)
+            # Build Merkle tree and all leaf proofs in one pass, off the event loop
+            merkle_root, merkle_proof_data = await asyncio.to_thread(
+                self.merkle_tree.build_tree_with_proofs,
+                leaf_hashes,
+                self.merkle_hash_workers
+            )
             
             # Generate audit data hash
             audit_data_hash = self._hash_audit_batch(audit_entries)
@@ -9,15 +9,17 @@ import asyncio
 import csv
 import json
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any, Tuple
+from typing import BinaryIO, Dict, Iterator, List, Optional, Any, Tuple
 from dataclasses import dataclass
-from io import StringIO
+from io import StringIO, TextIOWrapper
 import uuid
 
 import structlog
+from redis.asyncio import Redis
 from sqlalchemy import and_, func, desc, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from ..core.config import get_settings
 from ..core.database import get_db_session
 from ..models.brand import Brand, VerificationStatus
 from ..models.brand_product import BrandProduct, ApprovalStatus
@@ -29,6 +31,12 @@ from ..services.file_storage_service import FileStorageService
 
 logger = structlog.get_logger(__name__)
 
+BULK_UPLOAD_PROGRESS_TTL = 7 * 24 * 3600  # seconds
+MAX_BULK_UPLOAD_ERRORS = 100  # Row errors kept on an upload's result and progress
+
+# Upload progress when no Redis client is configured (single process only)
+_local_bulk_upload_progress: Dict[str, Dict[str, Any]] = {}
+
 
 @dataclass
 class ProductSubmissionData:
@@ -52,7 +60,14 @@ class ProductSubmissionData:
 
 @dataclass
 class BulkUploadResult:
-    """Result of bulk product upload operation."""
+    """
+    Result of bulk product upload operation.
+    
+    Only the first MAX_BULK_UPLOAD_ERRORS row errors are kept (plus the
+    error for rows beyond the product limit); failed_uploads counts all of
+    them. uploaded_product_ids holds one ID per inserted product, so it is
+    bounded by brand_bulk_upload_max_products for CSV uploads.
+    """
     total_products: int
     successful_uploads: int
     failed_uploads: int
@@ -60,11 +75,48 @@ class BulkUploadResult:
     uploaded_product_ids: List[str]
 
 
+def iter_csv_row_chunks(
+    stream: BinaryIO,
+    chunk_size: int
+) -> Iterator[List[Tuple[int, Dict[str, str]]]]:
+    """
+    Incrementally parse a UTF-8 CSV byte stream into chunks of rows.
+    
+    Only the current chunk is held in memory; quoted fields may span lines.
+    
+    Args:
+        stream: Binary stream positioned at the CSV header
+        chunk_size: Rows per chunk
+        
+    Yields:
+        Lists of (row index, row) tuples
+    """
+    reader = csv.DictReader(TextIOWrapper(stream, encoding="utf-8-sig", newline=""))
+    chunk = []
+    
+    for row_idx, row in enumerate(reader):
+        chunk.append((row_idx, row))
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    
+    if chunk:
+        yield chunk
+
+
 class BrandProductService:
     """Service for managing brand product submissions and approvals."""
     
-    def __init__(self):
-        """Initialize brand product service."""
+    def __init__(self, redis_client: Optional[Redis] = None):
+        """
+        Initialize brand product service.
+        
+        Args:
+            redis_client: Redis client for bulk upload progress (decode_responses=True);
+                progress is kept in-process without one
+        """
+        self.settings = get_settings()
+        self.redis_client = redis_client
         self.embedding_service: Optional[EmbeddingService] = None
         self.notification_service: Optional[NotificationService] = None
         self.file_storage_service: Optional[FileStorageService] = None
@@ -88,49 +140,16 @@ class BrandProductService:
                 brand = await self._get_verified_brand(session, product_data.brand_id)
                 
                 # Create product entity
-                product = BrandProduct(
-                    brand_id=product_data.brand_id,
-                    official_product_name=product_data.official_product_name,
-                    official_description=product_data.official_description,
-                    category=product_data.category,
-                    official_price_min=product_data.official_price_min,
-                    official_price_max=product_data.official_price_max,
-                    currency=product_data.currency,
-                    official_images=product_data.official_images or [],
-                    product_specifications=product_data.product_specifications or {},
-                    authorized_distributors=product_data.authorized_distributors or [],
-                    sku=product_data.sku,
-                    barcode=product_data.barcode,
-                    similarity_threshold=product_data.similarity_threshold,
-                    priority_level=product_data.priority_level,
-                    approval_status=ApprovalStatus.PENDING
-                )
+                product = self._build_brand_product(product_data)
                 
                 session.add(product)
-                await session.flush()  # Get product ID
+                await session.flush()
                 
                 # Generate embeddings for the product
                 await self._generate_product_embeddings(product)
                 
                 # Create verification workflow
-                verification = Verification(
-                    verification_type=VerificationType.PRODUCT_SUBMISSION,
-                    verification_result=VerificationResult.PENDING,
-                    brand_id=product_data.brand_id,
-                    brand_product_id=product.id,
-                    submitted_by=product_data.submitted_by_user_id or brand.id,
-                    verification_data={
-                        "product_name": product_data.official_product_name,
-                        "category": product_data.category.value,
-                        "price_range": {
-                            "min": product_data.official_price_min,
-                            "max": product_data.official_price_max,
-                            "currency": product_data.currency
-                        },
-                        "specifications": product_data.product_specifications or {},
-                        "images_count": len(product_data.official_images or [])
-                    }
-                )
+                verification = self._build_product_verification(product, product_data, brand)
                 
                 session.add(verification)
                 await session.commit()
@@ -161,6 +180,9 @@ class BrandProductService:
         """
         Submit multiple products in bulk.
         
+        Products are validated and inserted in chunks, each chunk in one
+        transaction with batched embedding generation.
+        
         Args:
             brand_id: Brand ID
             products_data: List of product data dictionaries
@@ -173,80 +195,183 @@ class BrandProductService:
             async with get_db_session() as session:
                 # Verify brand is verified
                 brand = await self._get_verified_brand(session, brand_id)
+            
+            result = BulkUploadResult(
+                total_products=0,
+                successful_uploads=0,
+                failed_uploads=0,
+                errors=[],
+                uploaded_product_ids=[]
+            )
+            
+            chunk_size = self.settings.brand_bulk_upload_chunk_size
+            rows = list(enumerate(products_data))
+            for start in range(0, len(rows), chunk_size):
+                await self._ingest_product_chunk(
+                    brand, rows[start:start + chunk_size], submitted_by_user_id, result
+                )
+            
+            await self._finish_bulk_upload(brand, result, submitted_by_user_id)
+            
+            return result
+            
+        except Exception as e:
+            logger.error("Failed to submit products in bulk", brand_id=brand_id, error=str(e))
+            raise
+    
+    async def start_bulk_upload(
+        self,
+        brand_id: str,
+        filename: str,
+        submitted_by_user_id: str
+    ) -> Dict[str, Any]:
+        """
+        Register a bulk upload for a verified brand before ingesting it.
+        
+        Args:
+            brand_id: Brand ID
+            filename: Uploaded file name
+            submitted_by_user_id: User ID submitting products
+            
+        Returns:
+            Initial progress of the upload (status "queued")
+        """
+        async with get_db_session() as session:
+            await self._get_verified_brand(session, brand_id)
+        
+        progress = {
+            "upload_id": f"upload-{uuid.uuid4()}",
+            "brand_id": brand_id,
+            "filename": filename,
+            "submitted_by": submitted_by_user_id,
+            "status": "queued",
+            "rows_processed": 0,
+            "successful_uploads": 0,
+            "failed_uploads": 0,
+            "errors": [],
+            "error": None,
+            "created_at": datetime.utcnow().isoformat(),
+            "started_at": None,
+            "completed_at": None
+        }
+        await self._store_bulk_upload_progress(progress)
+        
+        return progress
+    
+    async def ingest_products_csv(
+        self,
+        brand_id: str,
+        upload_id: str,
+        csv_stream: BinaryIO,
+        submitted_by_user_id: str
+    ) -> BulkUploadResult:
+        """
+        Ingest a CSV product catalogue as a stream of chunks.
+        
+        Rows are parsed incrementally, so memory use does not grow with the
+        catalogue. Each chunk is validated, gets its embeddings in one batch
+        and is inserted in one transaction; progress is updated after every
+        chunk (see get_bulk_upload_progress). Rows beyond the configured
+        maximum are still read to count them, but are neither validated nor
+        kept, and are reported as one error.
+        
+        Args:
+            brand_id: Brand ID
+            upload_id: ID returned by start_bulk_upload
+            csv_stream: Binary stream of the CSV file
+            submitted_by_user_id: User ID submitting products
+            
+        Returns:
+            Bulk upload result
+        """
+        progress = await self.get_bulk_upload_progress(brand_id, upload_id)
+        if progress is None:
+            raise ValueError(f"Bulk upload {upload_id} not found")
+        
+        result = BulkUploadResult(
+            total_products=0,
+            successful_uploads=0,
+            failed_uploads=0,
+            errors=[],
+            uploaded_product_ids=[]
+        )
+        max_products = self.settings.brand_bulk_upload_max_products
+        
+        try:
+            async with get_db_session() as session:
+                brand = await self._get_verified_brand(session, brand_id)
+            
+            progress["started_at"] = datetime.utcnow().isoformat()
+            await self._update_bulk_upload_progress(progress, result, "processing")
+            
+            chunks = iter_csv_row_chunks(csv_stream, self.settings.brand_bulk_upload_chunk_size)
+            while True:
+                # Read and parse the next chunk off the event loop
+                chunk = await asyncio.to_thread(next, chunks, None)
+                if chunk is None:
+                    break
                 
-                total_products = len(products_data)
-                successful_uploads = 0
-                failed_uploads = 0
-                errors = []
-                uploaded_product_ids = []
-                
-                for idx, product_data in enumerate(products_data):
+                rows = []
+                beyond_limit = 0
+                for row_idx, row in chunk:
+                    if row_idx >= max_products:
+                        beyond_limit += 1
+                        continue
                     try:
-                        # Convert dictionary to ProductSubmissionData
-                        submission_data = ProductSubmissionData(
-                            brand_id=brand_id,
-                            official_product_name=product_data.get("official_product_name", ""),
-                            official_description=product_data.get("official_description", ""),
-                            category=ProductCategory(product_data.get("category", ProductCategory.OTHER.value)),
-                            official_price_min=product_data.get("official_price_min"),
-                            official_price_max=product_data.get("official_price_max"),
-                            currency=product_data.get("currency", "USD"),
-                            official_images=product_data.get("official_images", []),
-                            product_specifications=product_data.get("product_specifications", {}),
-                            authorized_distributors=product_data.get("authorized_distributors", []),
-                            sku=product_data.get("sku"),
-                            barcode=product_data.get("barcode"),
-                            similarity_threshold=product_data.get("similarity_threshold", 0.85),
-                            priority_level=product_data.get("priority_level", 1),
-                            submitted_by_user_id=submitted_by_user_id
-                        )
-                        
-                        # Submit individual product
-                        product_id = await self.submit_product(submission_data)
-                        uploaded_product_ids.append(product_id)
-                        successful_uploads += 1
-                        
+                        rows.append((row_idx, self._parse_csv_row(row)))
                     except Exception as e:
-                        failed_uploads += 1
-                        errors.append({
-                            "product_index": idx,
-                            "product_name": product_data.get("official_product_name", f"Product {idx}"),
-                            "error": str(e)
-                        })
-                        
-                        logger.warning(
-                            "Failed to upload product in bulk",
-                            product_index=idx,
-                            product_name=product_data.get("official_product_name", ""),
-                            error=str(e)
-                        )
-                
-                result = BulkUploadResult(
-                    total_products=total_products,
-                    successful_uploads=successful_uploads,
-                    failed_uploads=failed_uploads,
-                    errors=errors,
-                    uploaded_product_ids=uploaded_product_ids
-                )
+                        result.total_products += 1
+                        self._record_bulk_upload_error(result, row_idx, row, e)
                 
-                # Send bulk upload summary
-                if self.notification_service:
-                    await self._send_bulk_upload_summary(brand, result, submitted_by_user_id)
-                
-                logger.info(
-                    "Bulk product upload completed",
-                    brand_id=brand_id,
-                    total=total_products,
-                    successful=successful_uploads,
-                    failed=failed_uploads
-                )
+                await self._ingest_product_chunk(brand, rows, submitted_by_user_id, result)
                 
-                return result
+                if beyond_limit:
+                    # Count the rest of the file without keeping any of it
+                    beyond_limit += await asyncio.to_thread(
+                        lambda: sum(len(rest) for rest in chunks)
+                    )
+                    self._record_rows_beyond_limit(result, max_products, beyond_limit)
+                    await self._update_bulk_upload_progress(progress, result, "processing")
+                    break
                 
+                await self._update_bulk_upload_progress(progress, result, "processing")
+            
+            progress["completed_at"] = datetime.utcnow().isoformat()
+            await self._update_bulk_upload_progress(progress, result, "completed")
+            
+            await self._finish_bulk_upload(brand, result, submitted_by_user_id)
+            
+            return result
+            
         except Exception as e:
-            logger.error("Failed to submit products in bulk", brand_id=brand_id, error=str(e))
+            logger.error("Failed to ingest product CSV", brand_id=brand_id, upload_id=upload_id, error=str(e))
+            progress["error"] = str(e)
+            progress["completed_at"] = datetime.utcnow().isoformat()
+            await self._update_bulk_upload_progress(progress, result, "failed")
             raise
     
+    async def get_bulk_upload_progress(self, brand_id: str, upload_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get progress of a bulk upload.
+        
+        Args:
+            brand_id: Brand ID the upload belongs to
+            upload_id: Upload ID
+            
+        Returns:
+            Progress dictionary, or None if unknown or expired
+        """
+        if self.redis_client:
+            progress_json = await self.redis_client.get(f"brand:bulk_upload:{upload_id}")
+            progress = json.loads(progress_json) if progress_json else None
+        else:
+            progress = _local_bulk_upload_progress.get(upload_id)
+        
+        if progress is None or progress["brand_id"] != brand_id:
+            return None
+        
+        return dict(progress)
+    
     async def parse_csv_products(self, csv_content: str) -> List[Dict[str, Any]]:
         """
         Parse CSV content into product data list.
@@ -261,62 +386,9 @@ class BrandProductService:
             products = []
             csv_reader = csv.DictReader(StringIO(csv_content))
             
-            # Expected CSV columns
-            required_columns = ["official_product_name", "official_description", "category"]
-            optional_columns = [
-                "official_price_min", "official_price_max", "currency",
-                "sku", "barcode", "similarity_threshold", "priority_level",
-                "authorized_distributors", "specifications"
-            ]
-            
             for row_idx, row in enumerate(csv_reader):
                 try:
-                    # Validate required columns
-                    for col in required_columns:
-                        if not row.get(col):
-                            raise ValueError(f"Missing required column: {col}")
-                    
-                    # Parse product data
-                    product_data = {
-                        "official_product_name": row["official_product_name"].strip(),
-                        "official_description": row["official_description"].strip(),
-                        "category": row["category"].strip()
-                    }
-                    
-                    # Parse optional fields
-                    if row.get("official_price_min"):
-                        product_data["official_price_min"] = float(row["official_price_min"])
-                    
-                    if row.get("official_price_max"):
-                        product_data["official_price_max"] = float(row["official_price_max"])
-                    
-                    product_data["currency"] = row.get("currency", "USD").strip()
-                    product_data["sku"] = row.get("sku", "").strip() or None
-                    product_data["barcode"] = row.get("barcode", "").strip() or None
-                    
-                    if row.get("similarity_threshold"):
-                        product_data["similarity_threshold"] = float(row["similarity_threshold"])
-                    
-                    if row.get("priority_level"):
-                        product_data["priority_level"] = int(row["priority_level"])
-                    
-                    # Parse JSON fields
-                    if row.get("authorized_distributors"):
-                        try:
-                            product_data["authorized_distributors"] = json.loads(row["authorized_distributors"])
-                        except json.JSONDecodeError:
-                            # Treat as comma-separated list
-                            product_data["authorized_distributors"] = [
-                                dist.strip() for dist in row["authorized_distributors"].split(",")
-                            ]
-                    
-                    if row.get("specifications"):
-                        try:
-                            product_data["product_specifications"] = json.loads(row["specifications"])
-                        except json.JSONDecodeError:
-                            product_data["product_specifications"] = {"notes": row["specifications"]}
-                    
-                    products.append(product_data)
+                    products.append(self._parse_csv_row(row))
                     
                 except Exception as e:
                     logger.warning(f"Failed to parse CSV row {row_idx + 1}", error=str(e))
@@ -644,6 +716,314 @@ class BrandProductService:
         except Exception as e:
             logger.warning("Failed to generate product embeddings", product_id=product.id, error=str(e))
     
+    async def _generate_product_embeddings_batch(self, products: List[BrandProduct]) -> None:
+        """Generate text embeddings for a chunk of products in one batch."""
+        if not self.embedding_service or not products:
+            return
+        
+        try:
+            embeddings = await self.embedding_service.generate_text_embeddings_batch([
+                f"{product.official_product_name} {product.official_description}"
+                for product in products
+            ])
+            for product, embedding in zip(products, embeddings):
+                product.official_description_embedding = embedding
+            
+            logger.debug("Generated product embeddings", product_count=len(products))
+            
+        except Exception as e:
+            logger.warning("Failed to generate product embeddings", product_count=len(products), error=str(e))
+    
+    @staticmethod
+    def _parse_csv_row(row: Dict[str, str]) -> Dict[str, Any]:
+        """Parse one CSV row into product data, raising on invalid rows."""
+        # Expected CSV columns
+        required_columns = ["official_product_name", "official_description", "category"]
+        
+        # Validate required columns
+        for col in required_columns:
+            if not row.get(col):
+                raise ValueError(f"Missing required column: {col}")
+        
+        # Parse product data
+        product_data = {
+            "official_product_name": row["official_product_name"].strip(),
+            "official_description": row["official_description"].strip(),
+            "category": row["category"].strip()
+        }
+        
+        # Parse optional fields
+        if row.get("official_price_min"):
+            product_data["official_price_min"] = float(row["official_price_min"])
+        
+        if row.get("official_price_max"):
+            product_data["official_price_max"] = float(row["official_price_max"])
+        
+        product_data["currency"] = (row.get("currency") or "USD").strip()
+        product_data["sku"] = (row.get("sku") or "").strip() or None
+        product_data["barcode"] = (row.get("barcode") or "").strip() or None
+        
+        if row.get("similarity_threshold"):
+            product_data["similarity_threshold"] = float(row["similarity_threshold"])
+        
+        if row.get("priority_level"):
+            product_data["priority_level"] = int(row["priority_level"])
+        
+        # Parse JSON fields
+        if row.get("authorized_distributors"):
+            try:
+                product_data["authorized_distributors"] = json.loads(row["authorized_distributors"])
+            except json.JSONDecodeError:
+                # Treat as comma-separated list
+                product_data["authorized_distributors"] = [
+                    dist.strip() for dist in row["authorized_distributors"].split(",")
+                ]
+        
+        if row.get("specifications"):
+            try:
+                product_data["product_specifications"] = json.loads(row["specifications"])
+            except json.JSONDecodeError:
+                product_data["product_specifications"] = {"notes": row["specifications"]}
+        
+        return product_data
+    
+    @staticmethod
+    def _build_submission_data(
+        brand_id: str,
+        product_data: Dict[str, Any],
+        submitted_by_user_id: str
+    ) -> ProductSubmissionData:
+        """Validate a product data dictionary and convert it to ProductSubmissionData."""
+        submission_data = ProductSubmissionData(
+            brand_id=brand_id,
+            official_product_name=product_data.get("official_product_name", ""),
+            official_description=product_data.get("official_description", ""),
+            category=ProductCategory(product_data.get("category", ProductCategory.OTHER.value)),
+            official_price_min=product_data.get("official_price_min"),
+            official_price_max=product_data.get("official_price_max"),
+            currency=product_data.get("currency", "USD"),
+            official_images=product_data.get("official_images", []),
+            product_specifications=product_data.get("product_specifications", {}),
+            authorized_distributors=product_data.get("authorized_distributors", []),
+            sku=product_data.get("sku"),
+            barcode=product_data.get("barcode"),
+            similarity_threshold=product_data.get("similarity_threshold", 0.85),
+            priority_level=product_data.get("priority_level", 1),
+            submitted_by_user_id=submitted_by_user_id
+        )
+        
+        if not submission_data.official_product_name:
+            raise ValueError("Missing product name")
+        
+        price_min = submission_data.official_price_min
+        price_max = submission_data.official_price_max
+        if price_min is not None and price_max is not None and price_max < price_min:
+            raise ValueError("official_price_max must be greater than or equal to official_price_min")
+        
+        return submission_data
+    
+    @staticmethod
+    def _build_brand_product(product_data: ProductSubmissionData) -> BrandProduct:
+        """Create a pending product entity with a client-side ID."""
+        return BrandProduct(
+            id=str(uuid.uuid4()),
+            brand_id=product_data.brand_id,
+            official_product_name=product_data.official_product_name,
+            official_description=product_data.official_description,
+            category=product_data.category,
+            official_price_min=product_data.official_price_min,
+            official_price_max=product_data.official_price_max,
+            currency=product_data.currency,
+            official_images=product_data.official_images or [],
+            product_specifications=product_data.product_specifications or {},
+            authorized_distributors=product_data.authorized_distributors or [],
+            sku=product_data.sku,
+            barcode=product_data.barcode,
+            similarity_threshold=product_data.similarity_threshold,
+            priority_level=product_data.priority_level,
+            approval_status=ApprovalStatus.PENDING
+        )
+    
+    @staticmethod
+    def _build_product_verification(
+        product: BrandProduct,
+        product_data: ProductSubmissionData,
+        brand: Brand
+    ) -> Verification:
+        """Create the verification workflow of a submitted product."""
+        return Verification(
+            verification_type=VerificationType.PRODUCT_SUBMISSION,
+            verification_result=VerificationResult.PENDING,
+            brand_id=product_data.brand_id,
+            brand_product_id=product.id,
+            submitted_by=product_data.submitted_by_user_id or brand.id,
+            verification_data={
+                "product_name": product_data.official_product_name,
+                "category": product_data.category.value,
+                "price_range": {
+                    "min": product_data.official_price_min,
+                    "max": product_data.official_price_max,
+                    "currency": product_data.currency
+                },
+                "specifications": product_data.product_specifications or {},
+                "images_count": len(product_data.official_images or [])
+            }
+        )
+    
+    async def _ingest_product_chunk(
+        self,
+        brand: Brand,
+        rows: List[Tuple[int, Dict[str, Any]]],
+        submitted_by_user_id: str,
+        result: BulkUploadResult
+    ) -> None:
+        """Validate a chunk of products and insert the valid ones in one transaction."""
+        submissions = []
+        for product_idx, product_data in rows:
+            result.total_products += 1
+            try:
+                submissions.append((
+                    product_idx,
+                    product_data,
+                    self._build_submission_data(brand.id, product_data, submitted_by_user_id)
+                ))
+            except Exception as e:
+                self._record_bulk_upload_error(result, product_idx, product_data, e)
+        
+        if not submissions:
+            return
+        
+        products = [self._build_brand_product(submission) for _, _, submission in submissions]
+        await self._generate_product_embeddings_batch(products)
+        await self._insert_product_chunk(brand, products, submissions, result)
+    
+    async def _insert_product_chunk(
+        self,
+        brand: Brand,
+        products: List[BrandProduct],
+        submissions: List[Tuple[int, Dict[str, Any], ProductSubmissionData]],
+        result: BulkUploadResult
+    ) -> None:
+        """
+        Insert products and their verifications in one transaction.
+        
+        A failed chunk is split in halves and retried, so only the rows that
+        fail on their own (e.g. a duplicate SKU) are reported as errors.
+        """
+        try:
+            # A fresh session per chunk keeps the identity map small; products
+            # and their verifications go in as multi-row INSERTs
+            async with get_db_session() as session:
+                session.add_all(products)
+                await session.flush()
+                
+                session.add_all([
+                    self._build_product_verification(product, submission, brand)
+                    for product, (_, _, submission) in zip(products, submissions)
+                ])
+                await session.commit()
+                
+        except Exception as e:
+            if len(products) == 1:
+                product_idx, product_data, _ = submissions[0]
+                self._record_bulk_upload_error(result, product_idx, product_data, e)
+                return
+            
+            logger.warning(
+                "Failed to insert product chunk, retrying in halves",
+                brand_id=brand.id,
+                chunk_size=len(products),
+                error=str(e)
+            )
+            middle = len(products) // 2
+            await self._insert_product_chunk(brand, products[:middle], submissions[:middle], result)
+            await self._insert_product_chunk(brand, products[middle:], submissions[middle:], result)
+            return
+        
+        result.successful_uploads += len(products)
+        result.uploaded_product_ids.extend(product.id for product in products)
+    
+    @staticmethod
+    def _record_bulk_upload_error(
+        result: BulkUploadResult,
+        product_idx: int,
+        product_data: Dict[str, Any],
+        error: Exception
+    ) -> None:
+        """Count a failed product and record its error while under the cap."""
+        result.failed_uploads += 1
+        if len(result.errors) >= MAX_BULK_UPLOAD_ERRORS:
+            return
+        result.errors.append({
+            "product_index": product_idx,
+            "product_name": product_data.get("official_product_name") or f"Product {product_idx}",
+            "error": str(error)
+        })
+    
+    @staticmethod
+    def _record_rows_beyond_limit(result: BulkUploadResult, max_products: int, count: int) -> None:
+        """Count rows past the product limit as failed under a single error."""
+        result.total_products += count
+        result.failed_uploads += count
+        result.errors.append({
+            "product_index": max_products,
+            "product_name": f"Product {max_products}",
+            "error": f"{count} rows beyond the maximum of {max_products} products per bulk upload were not processed"
+        })
+    
+    async def _update_bulk_upload_progress(
+        self,
+        progress: Dict[str, Any],
+        result: BulkUploadResult,
+        status: str
+    ) -> None:
+        """Copy counters of a running upload onto its progress and store it."""
+        progress.update({
+            "status": status,
+            "rows_processed": result.total_products,
+            "successful_uploads": result.successful_uploads,
+            "failed_uploads": result.failed_uploads,
+            "errors": list(result.errors)
+        })
+        await self._store_bulk_upload_progress(progress)
+    
+    async def _store_bulk_upload_progress(self, progress: Dict[str, Any]) -> None:
+        """Store upload progress; failures only cost progress visibility."""
+        try:
+            if self.redis_client:
+                await self.redis_client.set(
+                    f"brand:bulk_upload:{progress['upload_id']}",
+                    json.dumps(progress),
+                    ex=BULK_UPLOAD_PROGRESS_TTL
+                )
+            else:
+                _local_bulk_upload_progress[progress["upload_id"]] = dict(progress)
+                
+        except Exception as e:
+            logger.warning("Failed to store bulk upload progress", upload_id=progress["upload_id"], error=str(e))
+    
+    async def _finish_bulk_upload(
+        self,
+        brand: Brand,
+        result: BulkUploadResult,
+        user_id: str
+    ) -> None:
+        """Notify about a finished bulk upload."""
+        # Send bulk upload summary
+        if self.notification_service:
+            await self._send_bulk_upload_summary(brand, result, user_id)
+            
+            if result.successful_uploads:
+                await self._notify_admin_for_bulk_review(brand, result)
+        
+        logger.info(
+            "Bulk product upload completed",
+            brand_id=brand.id,
+            total=result.total_products,
+            successful=result.successful_uploads,
+            failed=result.failed_uploads
+        )
+    
     async def _notify_admin_for_product_review(self, brand: Brand, product: BrandProduct) -> None:
         """Notify admin team about new product submission."""
         if not self.notification_service:
@@ -667,6 +1047,27 @@ class BrandProductService:
         except Exception as e:
             logger.error("Failed to notify admin for product review", error=str(e))
     
+    async def _notify_admin_for_bulk_review(self, brand: Brand, result: BulkUploadResult) -> None:
+        """Notify admin team about products submitted in one bulk upload."""
+        if not self.notification_service:
+            return
+        
+        try:
+            await self.notification_service.send_alert(
+                alert_type="product_submission_pending",
+                message=f"{result.successful_uploads} new product submissions from {brand.brand_name} (bulk upload)",
+                severity="medium",
+                recipients=["admin", "product_review_team"],
+                metadata={
+                    "brand_id": brand.id,
+                    "brand_name": brand.brand_name,
+                    "product_count": result.successful_uploads
+                }
+            )
+            
+        except Exception as e:
+            logger.error("Failed to notify admin for bulk product review", error=str(e))
+    
     async def _send_bulk_upload_summary(
         self,
         brand: Brand,
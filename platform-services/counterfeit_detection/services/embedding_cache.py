@@ -0,0 +1,423 @@
+"""
+Tiered cache for text and image embeddings.
+
+Embeddings are stored as float32 arrays in a byte-bounded in-process LRU,
+optionally backed by an on-disk store (memory-mapped .npy files shared by all
+workers on a host) and a Redis tier shared across hosts. Caches are shared
+per process, so every EmbeddingService instance benefits from the same
+entries.
+"""
+
+import asyncio
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from ..core.config import get_settings
+from ..core.logging import get_logger
+from ..utils.lru_cache import LRUCache
+
+
+class MemoryEmbeddingStore(LRUCache):
+    """In-process LRU of float32 embeddings bounded by total array bytes."""
+
+    def __init__(self, max_bytes: int):
+        """
+        Initialize the store.
+
+        Args:
+            max_bytes: Maximum total size of cached arrays in bytes
+        """
+        super().__init__(max_bytes=max_bytes, size_of=lambda value: value.nbytes)
+
+    def put(self, key: str, value: np.ndarray) -> None:
+        """Store an embedding, evicting least recently used entries over budget."""
+        self.set(key, value)
+
+
+class DiskEmbeddingStore:
+    """
+    On-disk embedding store shared by workers on the same host.
+
+    Each embedding is a .npy file named by its cache key; reads are
+    memory-mapped and writes are atomic renames, so concurrent workers never
+    observe partial files and entries survive restarts.
+
+    Entries expire ``ttl_seconds`` after they were last written or read, and
+    the namespace is pruned back under ``max_bytes`` (least recently used
+    first) whenever roughly a tenth of the budget has been written since the
+    last prune. Methods block on file I/O; async callers run them in a thread.
+    """
+
+    def __init__(
+        self,
+        base_path: str,
+        namespace: str,
+        max_bytes: int = 2 * 1024 * 1024 * 1024,
+        ttl_seconds: Optional[float] = None,
+        clock: Callable[[], float] = time.time
+    ):
+        """
+        Initialize the store.
+
+        Args:
+            base_path: Directory shared by the workers on this host
+            namespace: Cache namespace (one subdirectory per namespace)
+            max_bytes: Maximum total size of stored files in bytes
+            ttl_seconds: Age after which unused entries are dropped (None keeps them)
+            clock: Wall-clock time source, compared with file mtimes
+        """
+        self.path = Path(base_path) / namespace.replace(":", "_")
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self.evictions = 0
+
+        self._prune_lock = threading.Lock()
+        # Start due so files left by earlier processes are bounded too
+        self._prune_every_bytes = max(1, max_bytes // 10)
+        self._written_since_prune = self._prune_every_bytes
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """Load an embedding, or None if it is not stored or has expired."""
+        file_path = self._file_path(key)
+        try:
+            if self._is_expired(file_path.stat().st_mtime):
+                file_path.unlink(missing_ok=True)
+                return None
+            value = np.array(np.load(file_path, mmap_mode="r"), dtype=np.float32)
+            # Reads refresh the entry's age so hot entries survive pruning
+            os.utime(file_path)
+            return value
+        except (FileNotFoundError, ValueError, OSError):
+            return None
+
+    def put(self, key: str, value: np.ndarray) -> None:
+        """Persist an embedding atomically, pruning the store when due."""
+        file_path = self._file_path(key)
+        file_path.parent.mkdir(exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=file_path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as tmp_file:
+                np.save(tmp_file, value)
+            os.replace(tmp_path, file_path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+        with self._prune_lock:
+            self._written_since_prune += value.nbytes
+            due = self._written_since_prune >= self._prune_every_bytes
+            if due:
+                self._written_since_prune = 0
+        if due:
+            self.prune()
+
+    def prune(self) -> int:
+        """
+        Drop expired entries, then the least recently used ones over budget.
+
+        Returns:
+            Number of files removed
+        """
+        files = []
+        for file_path in self.path.glob("*/*.npy"):
+            try:
+                stat = file_path.stat()
+            except FileNotFoundError:
+                continue  # Removed by another worker
+            files.append((stat.st_mtime, stat.st_size, file_path))
+
+        files.sort()
+        total_bytes = sum(size for _, size, _ in files)
+        removed = 0
+        for mtime, size, file_path in files:
+            if total_bytes <= self.max_bytes and not self._is_expired(mtime):
+                break
+            file_path.unlink(missing_ok=True)
+            total_bytes -= size
+            removed += 1
+
+        self.evictions += removed
+        return removed
+
+    def clear(self) -> None:
+        """Remove all stored embeddings in this namespace."""
+        for file_path in self.path.glob("*/*.npy"):
+            file_path.unlink(missing_ok=True)
+
+    def _is_expired(self, mtime: float) -> bool:
+        return self.ttl_seconds is not None and self.clock() - mtime > self.ttl_seconds
+
+    def _file_path(self, key: str) -> Path:
+        return self.path / key[:2] / f"{key}.npy"
+
+
+class RedisEmbeddingStore:
+    """Redis embedding store shared across hosts, storing raw float32 bytes."""
+
+    def __init__(self, redis_url: str, namespace: str, ttl_seconds: int):
+        import redis.asyncio as redis
+
+        self.client = redis.from_url(redis_url, decode_responses=False)
+        self.prefix = f"embedding:{namespace}:"
+        self.ttl_seconds = ttl_seconds
+
+    async def get_many(self, keys: List[str]) -> List[Optional[np.ndarray]]:
+        """Fetch several embeddings in one round trip."""
+        values = await self.client.mget([self.prefix + key for key in keys])
+        return [
+            np.frombuffer(value, dtype=np.float32).copy() if value else None
+            for value in values
+        ]
+
+    async def put_many(self, items: Dict[str, np.ndarray]) -> None:
+        """Store several embeddings in one pipelined round trip."""
+        pipe = self.client.pipeline(transaction=False)
+        for key, value in items.items():
+            pipe.set(self.prefix + key, value.tobytes(), ex=self.ttl_seconds)
+        await pipe.execute()
+
+
+class EmbeddingCache:
+    """
+    Embedding cache for one model namespace, layered memory -> disk -> Redis.
+
+    Lookups fill the faster tiers on a hit. The synchronous ``*_local``
+    methods only touch the memory and disk tiers and are safe to call from
+    executor threads; the async methods also consult Redis. Tier failures
+    are logged and treated as misses.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        memory: MemoryEmbeddingStore,
+        disk: Optional[DiskEmbeddingStore] = None,
+        remote: Optional[RedisEmbeddingStore] = None
+    ):
+        self.namespace = namespace
+        self.memory = memory
+        self.disk = disk
+        self.remote = remote
+        self.logger = get_logger(__name__)
+
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "remote_hits": 0,
+            "tier_errors": 0
+        }
+
+    def __len__(self) -> int:
+        return len(self.memory)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.memory
+
+    def get_local(self, key: str) -> Optional[np.ndarray]:
+        """Look up an embedding in the memory and disk tiers."""
+        value = self._get_local(key)
+        self._count("hits" if value is not None else "misses")
+        return value
+
+    def put_local(self, key: str, embedding: Iterable[float]) -> np.ndarray:
+        """Store an embedding in the memory and disk tiers."""
+        value = self._to_array(embedding)
+        self.memory.put(key, value)
+        self._put_disk({key: value})
+        return value
+
+    async def get(self, key: str) -> Optional[np.ndarray]:
+        """Look up an embedding in all tiers."""
+        return (await self.get_many([key]))[key]
+
+    async def get_many(self, keys: List[str]) -> Dict[str, Optional[np.ndarray]]:
+        """
+        Look up several embeddings, querying Redis once for all local misses.
+
+        Args:
+            keys: Cache keys
+
+        Returns:
+            Mapping of key to embedding (None for misses)
+        """
+        results = {key: self._get_memory(key) for key in keys}
+        missing = [key for key, value in results.items() if value is None]
+
+        if missing and self.disk is not None:
+            # File reads stay off the event loop
+            disk_values = await asyncio.to_thread(lambda: [self._get_disk(key) for key in missing])
+            results.update(zip(missing, disk_values))
+            missing = [key for key in missing if results[key] is None]
+
+        if missing and self.remote is not None:
+            try:
+                remote_values = await self.remote.get_many(missing)
+            except Exception as e:
+                self._count("tier_errors")
+                self.logger.warning(f"Embedding Redis cache read failed: {e}")
+                remote_values = [None] * len(missing)
+
+            found = {key: value for key, value in zip(missing, remote_values) if value is not None}
+            if found:
+                self._count("remote_hits", len(found))
+                results.update(await self._put_local_many(found))
+
+        hits = sum(1 for value in results.values() if value is not None)
+        self._count("hits", hits)
+        self._count("misses", len(results) - hits)
+        return results
+
+    async def put(self, key: str, embedding: Iterable[float]) -> np.ndarray:
+        """Store an embedding in all tiers."""
+        return (await self.put_many({key: embedding}))[key]
+
+    async def put_many(self, items: Dict[str, Iterable[float]]) -> Dict[str, np.ndarray]:
+        """Store several embeddings in all tiers."""
+        values = await self._put_local_many(items)
+
+        if values and self.remote is not None:
+            try:
+                await self.remote.put_many(values)
+            except Exception as e:
+                self._count("tier_errors")
+                self.logger.warning(f"Embedding Redis cache write failed: {e}")
+
+        return values
+
+    def clear(self) -> None:
+        """Clear the in-process tier (shared tiers are left intact)."""
+        self.memory.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss/eviction counters and tier sizes."""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats.update({
+            "namespace": self.namespace,
+            "entries": len(self.memory),
+            "memory_bytes": self.memory.size_bytes,
+            "memory_max_bytes": self.memory.max_bytes,
+            "evictions": self.memory.evictions,
+            "hit_rate": stats["hits"] / lookups if lookups else 0.0,
+            "disk_tier": self.disk is not None,
+            "disk_evictions": self.disk.evictions if self.disk is not None else 0,
+            "remote_tier": self.remote is not None
+        })
+        return stats
+
+    def _get_local(self, key: str) -> Optional[np.ndarray]:
+        value = self._get_memory(key)
+        if value is None:
+            value = self._get_disk(key)
+        return value
+
+    def _get_memory(self, key: str) -> Optional[np.ndarray]:
+        value = self.memory.get(key)
+        if value is not None:
+            self._count("memory_hits")
+        return value
+
+    def _get_disk(self, key: str) -> Optional[np.ndarray]:
+        if self.disk is None:
+            return None
+        try:
+            value = self.disk.get(key)
+        except Exception as e:
+            self._count("tier_errors")
+            self.logger.warning(f"Embedding disk cache read failed: {e}")
+            return None
+        if value is not None:
+            self._count("disk_hits")
+            self.memory.put(key, value)
+        return value
+
+    async def _put_local_many(self, items: Dict[str, Iterable[float]]) -> Dict[str, np.ndarray]:
+        values = {key: self._to_array(embedding) for key, embedding in items.items()}
+        for key, value in values.items():
+            self.memory.put(key, value)
+        if values and self.disk is not None:
+            await asyncio.to_thread(self._put_disk, values)
+        return values
+
+    def _put_disk(self, values: Dict[str, np.ndarray]) -> None:
+        if self.disk is None:
+            return
+        for key, value in values.items():
+            try:
+                self.disk.put(key, value)
+            except Exception as e:
+                self._count("tier_errors")
+                self.logger.warning(f"Embedding disk cache write failed: {e}")
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._stats_lock:
+            self._stats[name] += amount
+
+    @staticmethod
+    def _to_array(embedding: Iterable[float]) -> np.ndarray:
+        value = np.array(embedding, dtype=np.float32).reshape(-1)
+        value.setflags(write=False)
+        return value
+
+
+_caches: Dict[str, EmbeddingCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_embedding_cache(namespace: str) -> EmbeddingCache:
+    """
+    Get the process-wide embedding cache for a model namespace.
+
+    Tiers are configured from settings: EMBEDDING_CACHE_MAX_BYTES bounds the
+    in-process LRU, EMBEDDING_CACHE_DISK_PATH enables the on-disk tier
+    (bounded by EMBEDDING_CACHE_DISK_MAX_BYTES) and EMBEDDING_CACHE_REDIS_URL
+    enables the Redis tier. EMBEDDING_CACHE_TTL_SECONDS applies to both
+    shared tiers.
+
+    Args:
+        namespace: Cache namespace, e.g. ``text:text-embedding-3-small:1536``
+
+    Returns:
+        Shared EmbeddingCache instance
+    """
+    with _caches_lock:
+        cache = _caches.get(namespace)
+        if cache is None:
+            settings = get_settings()
+            disk_path = settings.embedding_cache_disk_path
+            redis_url = settings.embedding_cache_redis_url
+
+            cache = EmbeddingCache(
+                namespace=namespace,
+                memory=MemoryEmbeddingStore(settings.embedding_cache_max_bytes),
+                disk=DiskEmbeddingStore(
+                    disk_path,
+                    namespace,
+                    max_bytes=settings.embedding_cache_disk_max_bytes,
+                    ttl_seconds=settings.embedding_cache_ttl_seconds
+                ) if disk_path else None,
+                remote=RedisEmbeddingStore(
+                    redis_url, namespace, settings.embedding_cache_ttl_seconds
+                ) if redis_url else None
+            )
+            _caches[namespace] = cache
+        return cache
+
+
+def reset_embedding_caches() -> None:
+    """Drop all process-wide embedding caches (used by tests and reconfiguration)."""
+    with _caches_lock:
+        _caches.clear()
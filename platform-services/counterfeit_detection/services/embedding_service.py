@@ -15,12 +15,21 @@ from datetime import datetime
 
 from ..core.config import get_settings
 from ..core.logging import get_logger
+from .embedding_cache import EmbeddingCache, get_embedding_cache
+from .image_embedding_executor import ImageEmbeddingExecutor, get_image_embedding_executor
+
+# Provider status codes caused by the request's inputs rather than the service
+INPUT_ERROR_STATUSES = {400, 413, 422}
 
 
 class EmbeddingService:
     """Service for generating text and image embeddings."""
     
-    def __init__(self, openai_client: Optional[AsyncOpenAI] = None):
+    def __init__(
+        self,
+        openai_client: Optional[AsyncOpenAI] = None,
+        image_executor: Optional[ImageEmbeddingExecutor] = None
+    ):
         """Initialize embedding service."""
         self.settings = get_settings()
         self.logger = get_logger(__name__)
@@ -30,8 +39,10 @@ class EmbeddingService:
             api_key=self.settings.openai_api_key
         )
         
-        # CLIP model for image embeddings (loaded lazily)
+        # CLIP model for synchronous image embeddings (loaded lazily); the
+        # async methods run CLIP in the shared worker process pool instead
         self._clip_model = None
+        self._image_executor = image_executor
         
         # Configuration
         self.text_model = "text-embedding-3-small"
@@ -39,9 +50,29 @@ class EmbeddingService:
         self.image_dimensions = 512
         self.batch_size = 32
         
-        # Embedding cache
-        self._text_cache: Dict[str, List[float]] = {}
-        self._image_cache: Dict[str, List[float]] = {}
+        # Embedding caches, shared by all instances in the process
+        self._text_cache: EmbeddingCache = get_embedding_cache(
+            f"text:{self.text_model}:{self.text_dimensions}"
+        )
+        self._image_cache: EmbeddingCache = get_embedding_cache(
+            f"image:clip-ViT-B-32:{self.image_dimensions}"
+        )
+        
+        # Micro-batching of single-text requests: requests arriving within
+        # the batch window share one API call, and identical in-flight texts
+        # share one result (single-flight)
+        self.batch_window_seconds = self.settings.embedding_batch_window_ms / 1000
+        self._pending_texts: Dict[str, asyncio.Future] = {}
+        self._queued_texts: List[Tuple[str, str]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._dispatch_tasks: set = set()
+        self._batcher_stats = {
+            "requests": 0,
+            "coalesced_requests": 0,
+            "api_calls": 0,
+            "batched_texts": 0,
+            "split_batches": 0
+        }
         
         self.logger.info("EmbeddingService initialized")
     
@@ -54,6 +85,13 @@ class EmbeddingService:
             self.logger.info("CLIP model loaded successfully")
         return self._clip_model
     
+    @property
+    def image_executor(self) -> ImageEmbeddingExecutor:
+        """Process pool used by the async image embedding methods."""
+        if self._image_executor is None:
+            self._image_executor = get_image_embedding_executor()
+        return self._image_executor
+    
     async def generate_text_embedding(self, text: str) -> List[float]:
         """
         Generate text embedding using OpenAI text-embedding-3-small.
@@ -69,30 +107,124 @@ class EmbeddingService:
         
         # Check cache first
         cache_key = self._get_text_cache_key(text)
-        if cache_key in self._text_cache:
+        cached = await self._text_cache.get(cache_key)
+        if cached is not None:
             self.logger.debug(f"Using cached embedding for text: {text[:50]}...")
-            return self._text_cache[cache_key]
+            return cached.tolist()
         
         try:
             self.logger.debug(f"Generating embedding for text: {text[:100]}...")
             
+            embedding = await self._enqueue_text(cache_key, text.strip())
+            
+            self.logger.debug(f"Generated {len(embedding)}-dimensional text embedding")
+            return embedding.tolist()
+            
+        except Exception as e:
+            self.logger.error(f"Failed to generate text embedding: {e}")
+            raise
+    
+    async def _enqueue_text(self, cache_key: str, text: str) -> np.ndarray:
+        """
+        Queue a text for the next micro-batch and wait for its embedding.
+        
+        Args:
+            cache_key: Cache key of the text
+            text: Stripped text to embed
+            
+        Returns:
+            Embedding as a float32 array
+        """
+        self._batcher_stats["requests"] += 1
+        
+        future = self._pending_texts.get(cache_key)
+        if future is not None:
+            self._batcher_stats["coalesced_requests"] += 1
+            return await asyncio.shield(future)
+        
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        # Mark exceptions as retrieved even if every waiter was cancelled
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._pending_texts[cache_key] = future
+        self._queued_texts.append((cache_key, text))
+        
+        if len(self._queued_texts) >= self.batch_size:
+            self._flush_text_queue()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.batch_window_seconds, self._flush_text_queue)
+        
+        # Shield so a cancelled caller does not cancel the shared request
+        return await asyncio.shield(future)
+    
+    def _flush_text_queue(self) -> None:
+        """Dispatch all queued texts as one embeddings request."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        
+        batch, self._queued_texts = self._queued_texts, []
+        if not batch:
+            return
+        
+        task = asyncio.ensure_future(self._dispatch_text_batch(batch))
+        self._dispatch_tasks.add(task)
+        task.add_done_callback(self._dispatch_tasks.discard)
+    
+    async def _dispatch_text_batch(self, batch: List[Tuple[str, str]]) -> None:
+        """Embed a micro-batch and fan the results out to the waiting callers."""
+        self._batcher_stats["api_calls"] += 1
+        self._batcher_stats["batched_texts"] += len(batch)
+        
+        try:
+            texts = [text for _, text in batch]
             response = await self.openai_client.embeddings.create(
                 model=self.text_model,
-                input=text.strip(),
+                input=texts if len(texts) > 1 else texts[0],
                 dimensions=self.text_dimensions
             )
             
-            embedding = response.data[0].embedding
+            embeddings = await self._text_cache.put_many({
+                cache_key: data.embedding
+                for (cache_key, _), data in zip(batch, response.data)
+            })
             
-            # Cache the result
-            self._text_cache[cache_key] = embedding
-            
-            self.logger.debug(f"Generated {len(embedding)}-dimensional text embedding")
-            return embedding
+            for cache_key, _ in batch:
+                future = self._pending_texts.pop(cache_key, None)
+                if future is not None and not future.done():
+                    future.set_result(embeddings[cache_key])
             
         except Exception as e:
-            self.logger.error(f"Failed to generate text embedding: {e}")
-            raise
+            if len(batch) > 1 and getattr(e, "status_code", None) in INPUT_ERROR_STATUSES:
+                # One invalid text rejects the whole request: bisect so only
+                # the callers of rejected texts get the error
+                self._batcher_stats["split_batches"] += 1
+                middle = len(batch) // 2
+                await asyncio.gather(
+                    self._dispatch_text_batch(batch[:middle]),
+                    self._dispatch_text_batch(batch[middle:])
+                )
+                return
+            
+            self.logger.error(f"Failed to generate embeddings for micro-batch of {len(batch)} texts: {e}")
+            for cache_key, _ in batch:
+                future = self._pending_texts.pop(cache_key, None)
+                if future is not None and not future.done():
+                    future.set_exception(e)
+    
+    def get_batcher_stats(self) -> Dict[str, Any]:
+        """Get text micro-batching statistics."""
+        stats = dict(self._batcher_stats)
+        stats.update({
+            "batch_window_ms": self.batch_window_seconds * 1000,
+            "max_batch_size": self.batch_size,
+            "queued_texts": len(self._queued_texts),
+            "in_flight_texts": len(self._pending_texts),
+            "average_batch_size": (
+                stats["batched_texts"] / stats["api_calls"] if stats["api_calls"] else 0.0
+            )
+        })
+        return stats
     
     async def generate_text_embeddings_batch(self, texts: List[str]) -> List[List[float]]:
         """
@@ -113,18 +245,13 @@ class EmbeddingService:
         for i in range(0, len(texts), self.batch_size):
             batch = texts[i:i + self.batch_size]
             
-            # Check cache for each text in batch
-            batch_embeddings = []
-            texts_to_embed = []
-            cached_indices = {}
+            # Look up the whole batch in the cache at once
+            cache_keys = [self._get_text_cache_key(text) for text in batch]
+            cached = await self._text_cache.get_many(cache_keys)
+            batch_embeddings = [cached[key] for key in cache_keys]
             
-            for j, text in enumerate(batch):
-                cache_key = self._get_text_cache_key(text)
-                if cache_key in self._text_cache:
-                    batch_embeddings.append(self._text_cache[cache_key])
-                    cached_indices[j] = len(batch_embeddings) - 1
-                else:
-                    texts_to_embed.append(text)
+            missing = [j for j, embedding in enumerate(batch_embeddings) if embedding is None]
+            texts_to_embed = [batch[j] for j in missing]
             
             # Generate embeddings for non-cached texts
             if texts_to_embed:
@@ -137,35 +264,29 @@ class EmbeddingService:
                         dimensions=self.text_dimensions
                     )
                     
-                    new_embeddings = [data.embedding for data in response.data]
-                    
                     # Cache new embeddings
-                    for text, embedding in zip(texts_to_embed, new_embeddings):
-                        cache_key = self._get_text_cache_key(text)
-                        self._text_cache[cache_key] = embedding
-                    
-                    # Merge cached and new embeddings in correct order
-                    new_embedding_idx = 0
-                    for j in range(len(batch)):
-                        if j in cached_indices:
-                            continue
-                        else:
-                            batch_embeddings.insert(j, new_embeddings[new_embedding_idx])
-                            new_embedding_idx += 1
+                    new_embeddings = await self._text_cache.put_many({
+                        cache_keys[j]: data.embedding
+                        for j, data in zip(missing, response.data)
+                    })
+                    for j in missing:
+                        batch_embeddings[j] = new_embeddings[cache_keys[j]]
                     
                 except Exception as e:
                     self.logger.error(f"Failed to generate batch embeddings: {e}")
                     # Fallback to individual generation
-                    for text in texts_to_embed:
+                    for j in missing:
                         try:
-                            embedding = await self.generate_text_embedding(text)
-                            batch_embeddings.append(embedding)
+                            batch_embeddings[j] = await self.generate_text_embedding(batch[j])
                         except Exception as individual_error:
                             self.logger.error(f"Failed individual embedding: {individual_error}")
                             # Use zero vector as fallback
-                            batch_embeddings.append([0.0] * self.text_dimensions)
+                            batch_embeddings[j] = [0.0] * self.text_dimensions
             
-            embeddings.extend(batch_embeddings)
+            embeddings.extend(
+                embedding.tolist() if isinstance(embedding, np.ndarray) else embedding
+                for embedding in batch_embeddings
+            )
         
         self.logger.info(f"Generated {len(embeddings)} text embeddings")
         return embeddings
@@ -182,9 +303,10 @@ class EmbeddingService:
         """
         # Check cache first
         cache_key = self._get_image_cache_key(image_data)
-        if cache_key in self._image_cache:
+        cached = self._image_cache.get_local(cache_key)
+        if cached is not None:
             self.logger.debug("Using cached image embedding")
-            return self._image_cache[cache_key]
+            return cached.tolist()
         
         try:
             # Load and preprocess image
@@ -206,7 +328,7 @@ class EmbeddingService:
             embedding = self._normalize_vector(embedding)
             
             # Cache the result
-            self._image_cache[cache_key] = embedding
+            embedding = self._image_cache.put_local(cache_key, embedding).tolist()
             
             self.logger.debug(f"Generated {len(embedding)}-dimensional image embedding")
             return embedding
@@ -234,9 +356,9 @@ class EmbeddingService:
         
         # Check cache for each image
         for i, image_data in enumerate(image_data_list):
-            cache_key = self._get_image_cache_key(image_data)
-            if cache_key in self._image_cache:
-                cached_embeddings[i] = self._image_cache[cache_key]
+            cached = self._image_cache.get_local(self._get_image_cache_key(image_data))
+            if cached is not None:
+                cached_embeddings[i] = cached.tolist()
             else:
                 images_to_embed.append((i, image_data))
         
@@ -265,8 +387,7 @@ class EmbeddingService:
                     
                     # Cache the result
                     cache_key = self._get_image_cache_key(image_data)
-                    self._image_cache[cache_key] = embedding
-                    cached_embeddings[original_idx] = embedding
+                    cached_embeddings[original_idx] = self._image_cache.put_local(cache_key, embedding).tolist()
                 
             except Exception as e:
                 self.logger.error(f"Failed to generate batch image embeddings: {e}")
@@ -287,6 +408,82 @@ class EmbeddingService:
         self.logger.info(f"Generated {len(embeddings)} image embeddings")
         return embeddings
     
+    async def generate_image_embedding_async(self, image_data: bytes) -> List[float]:
+        """
+        Generate image embedding without blocking the event loop.
+        
+        Decoding and CLIP inference run in the worker process pool, batched
+        with concurrent requests.
+        
+        Args:
+            image_data: Raw image bytes
+            
+        Returns:
+            512-dimensional embedding vector
+        """
+        cache_key = self._get_image_cache_key(image_data)
+        cached = await self._image_cache.get(cache_key)
+        if cached is not None:
+            self.logger.debug("Using cached image embedding")
+            return cached.tolist()
+        
+        try:
+            embedding = await self.image_executor.embed(image_data)
+        except Exception as e:
+            self.logger.error(f"Failed to generate image embedding: {e}")
+            raise
+        
+        return (await self._image_cache.put(cache_key, embedding)).tolist()
+    
+    async def generate_image_embeddings_batch_async(self, image_data_list: List[bytes]) -> List[List[float]]:
+        """
+        Generate image embeddings in the worker process pool.
+        
+        Images that cannot be embedded get a zero vector, matching
+        generate_image_embeddings_batch.
+        
+        Args:
+            image_data_list: List of raw image bytes
+            
+        Returns:
+            List of embedding vectors
+        """
+        if not image_data_list:
+            return []
+        
+        cache_keys = [self._get_image_cache_key(image_data) for image_data in image_data_list]
+        cached = await self._image_cache.get_many(cache_keys)
+        
+        # Identical images in the list are embedded once
+        missing: Dict[str, bytes] = {}
+        for cache_key, image_data in zip(cache_keys, image_data_list):
+            if cached[cache_key] is None:
+                missing.setdefault(cache_key, image_data)
+        
+        if missing:
+            self.logger.debug(f"Generating embeddings for batch of {len(missing)} images")
+            results = await asyncio.gather(
+                *(self.image_executor.embed(image_data) for image_data in missing.values()),
+                return_exceptions=True
+            )
+            
+            generated = {}
+            for cache_key, result in zip(missing, results):
+                if isinstance(result, Exception):
+                    self.logger.error(f"Failed individual image embedding: {result}")
+                else:
+                    generated[cache_key] = result
+            cached.update(await self._image_cache.put_many(generated))
+        
+        embeddings = [
+            cached[cache_key].tolist() if cached.get(cache_key) is not None
+            else [0.0] * self.image_dimensions
+            for cache_key in cache_keys
+        ]
+        
+        self.logger.info(f"Generated {len(embeddings)} image embeddings")
+        return embeddings
+    
     async def process_product_embeddings(
         self, 
         description: str, 
@@ -308,13 +505,8 @@ class EmbeddingService:
             # Generate text embedding
             text_embedding_task = self.generate_text_embedding(description)
             
-            # Generate image embeddings (run in executor to avoid blocking)
-            loop = asyncio.get_event_loop()
-            image_embeddings_task = loop.run_in_executor(
-                None, 
-                self.generate_image_embeddings_batch, 
-                image_data_list
-            )
+            # Generate image embeddings in the worker process pool
+            image_embeddings_task = self.generate_image_embeddings_batch_async(image_data_list)
             
             # Wait for both to complete
             text_embedding, image_embeddings = await asyncio.gather(
@@ -360,6 +552,8 @@ class EmbeddingService:
         return {
             "text_cache_size": len(self._text_cache),
             "image_cache_size": len(self._image_cache),
+            "text_cache": self._text_cache.get_stats(),
+            "image_cache": self._image_cache.get_stats(),
             "text_model": self.text_model,
             "text_dimensions": self.text_dimensions,
             "image_dimensions": self.image_dimensions,
@@ -367,7 +561,23 @@ class EmbeddingService:
         }
     
     def clear_cache(self) -> None:
-        """Clear embedding caches."""
+        """Clear the in-process embedding caches (shared tiers are kept)."""
         self._text_cache.clear()
         self._image_cache.clear()
-        self.logger.info("Embedding caches cleared")
\ No newline at end of file
+        self.logger.info("Embedding caches cleared")
+
+
+_embedding_service: Optional[EmbeddingService] = None
+
+
+def get_embedding_service() -> EmbeddingService:
+    """
+    Get the process-wide embedding service.
+    
+    Sharing one instance lets concurrent requests coalesce into the same
+    micro-batches instead of each request issuing its own API calls.
+    """
+    global _embedding_service
+    if _embedding_service is None:
+        _embedding_service = EmbeddingService()
+    return _embedding_service
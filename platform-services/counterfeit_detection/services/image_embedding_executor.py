@@ -0,0 +1,306 @@
+"""
+Process-pool executor for CLIP image embeddings.
+
+Image decoding, resizing and CLIP inference run in worker processes that load
+the model once at start-up. Requests from concurrent callers are collected
+into micro-batches so each worker encodes several images per call, and the
+async API never blocks the event loop.
+"""
+
+import asyncio
+import io
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+from PIL import Image
+
+from ..core.config import get_settings
+from ..core.logging import get_logger
+
+
+# Model loaded once per worker process by _init_worker
+_worker_model = None
+
+
+def _init_worker(model_name: str, torch_threads: int) -> None:
+    """Worker initializer: pin intra-op threads and preload the CLIP model."""
+    global _worker_model
+
+    try:
+        import torch
+        torch.set_num_threads(torch_threads)
+    except ImportError:
+        pass
+
+    from sentence_transformers import SentenceTransformer
+    _worker_model = SentenceTransformer(model_name)
+
+
+def _embed_in_worker(images: List[bytes], max_side: int) -> List[Union[np.ndarray, str]]:
+    """Entry point executed inside a worker process."""
+    return embed_images(_worker_model, images, max_side)
+
+
+def embed_images(model: Any, images: List[bytes], max_side: int) -> List[Union[np.ndarray, str]]:
+    """
+    Decode, resize and encode a batch of images.
+
+    Args:
+        model: SentenceTransformer-compatible CLIP model
+        images: Raw image bytes
+        max_side: Longest side images are reduced to before encoding
+
+    Returns:
+        One entry per image: a unit-length float32 embedding, or an error
+        message if the image could not be decoded
+    """
+    results: List[Union[np.ndarray, str, None]] = [None] * len(images)
+    decoded: List[Tuple[int, Image.Image]] = []
+
+    for i, image_data in enumerate(images):
+        try:
+            image = Image.open(io.BytesIO(image_data))
+            # Let JPEG decode at reduced scale; CLIP only needs 224px input
+            image.draft("RGB", (max_side, max_side))
+            if image.mode != "RGB":
+                image = image.convert("RGB")
+            image.thumbnail((max_side, max_side))
+            decoded.append((i, image))
+        except Exception as e:
+            results[i] = f"Invalid image: {e}"
+
+    if decoded:
+        vectors = model.encode(
+            [image for _, image in decoded],
+            batch_size=len(decoded),
+            convert_to_tensor=False
+        )
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(len(decoded), -1)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        vectors = vectors / norms
+
+        for (i, _), vector in zip(decoded, vectors):
+            results[i] = vector
+
+    return results
+
+
+class ImageEmbeddingExecutor:
+    """
+    Batched CLIP inference on a pool of worker processes.
+
+    With ``workers=0`` inference runs on a thread in the current process
+    instead, which is useful for tests and single-core deployments.
+    """
+
+    def __init__(
+        self,
+        model_name: str = "sentence-transformers/clip-ViT-B-32",
+        workers: Optional[int] = None,
+        batch_size: int = 16,
+        batch_window_ms: int = 10,
+        max_side: int = 448,
+        torch_threads: int = 1,
+        model: Any = None
+    ):
+        """
+        Initialize the executor. Worker processes start on first use.
+
+        Args:
+            model_name: CLIP model loaded by each worker
+            workers: Number of worker processes (defaults to CPU count, 0 for in-process)
+            batch_size: Maximum images per inference call
+            batch_window_ms: Time to wait for more images before dispatching
+            max_side: Longest side images are reduced to in the workers
+            torch_threads: Intra-op threads per worker
+            model: Preloaded model for in-process mode
+        """
+        self.model_name = model_name
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.batch_size = batch_size
+        self.batch_window_seconds = batch_window_ms / 1000
+        self.max_side = max_side
+        self.torch_threads = torch_threads
+        self.logger = get_logger(__name__)
+
+        self._model = model
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._queue: List[Tuple[bytes, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._dispatch_tasks: set = set()
+        self._stats = {
+            "images": 0,
+            "batches": 0,
+            "failed_images": 0,
+            "pool_restarts": 0
+        }
+
+    async def embed(self, image_data: bytes) -> np.ndarray:
+        """
+        Embed one image, sharing an inference batch with concurrent callers.
+
+        Args:
+            image_data: Raw image bytes
+
+        Returns:
+            512-dimensional unit-length float32 embedding
+
+        Raises:
+            ValueError: If the image cannot be decoded
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._queue.append((image_data, future))
+
+        if len(self._queue) >= self.batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.batch_window_seconds, self._flush)
+
+        return await asyncio.shield(future)
+
+    async def embed_many(self, images: List[bytes]) -> List[np.ndarray]:
+        """Embed several images; raises on the first image that fails."""
+        return list(await asyncio.gather(*(self.embed(image) for image in images)))
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the worker processes."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait, cancel_futures=True)
+            self._pool = None
+            self.logger.info("Image embedding workers stopped")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get executor statistics."""
+        stats = dict(self._stats)
+        stats.update({
+            "workers": self.workers,
+            "pool_started": self._pool is not None,
+            "queued_images": len(self._queue),
+            "in_flight_batches": len(self._dispatch_tasks),
+            "max_batch_size": self.batch_size,
+            "average_batch_size": stats["images"] / stats["batches"] if stats["batches"] else 0.0
+        })
+        return stats
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        batch, self._queue = self._queue, []
+        if not batch:
+            return
+
+        task = asyncio.ensure_future(self._dispatch(batch))
+        self._dispatch_tasks.add(task)
+        task.add_done_callback(self._dispatch_tasks.discard)
+
+    async def _dispatch(self, batch: List[Tuple[bytes, asyncio.Future]]) -> None:
+        images = [image_data for image_data, _ in batch]
+        self._stats["images"] += len(images)
+        self._stats["batches"] += 1
+
+        try:
+            results = await self._run_batch(images)
+        except Exception as e:
+            self.logger.error(f"Image embedding batch of {len(images)} failed: {e}")
+            self._fail_batch(batch, e)
+            return
+        except BaseException:
+            # Cancellation must not strand callers awaiting this batch
+            self._fail_batch(batch, RuntimeError("Image embedding batch was cancelled"))
+            raise
+
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, str):
+                self._stats["failed_images"] += 1
+                future.set_exception(ValueError(result))
+            else:
+                future.set_result(result)
+
+    def _fail_batch(self, batch: List[Tuple[bytes, asyncio.Future]], error: BaseException) -> None:
+        for _, future in batch:
+            if not future.done():
+                self._stats["failed_images"] += 1
+                future.set_exception(error)
+
+    async def _run_batch(self, images: List[bytes]) -> List[Union[np.ndarray, str]]:
+        loop = asyncio.get_running_loop()
+
+        if self.workers == 0:
+            return await asyncio.to_thread(embed_images, self._get_local_model(), images, self.max_side)
+
+        pool = self._get_pool()
+        try:
+            return await loop.run_in_executor(pool, _embed_in_worker, images, self.max_side)
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM); replace the pool and retry once
+            self._restart_pool(pool)
+            return await loop.run_in_executor(
+                self._get_pool(), _embed_in_worker, images, self.max_side
+            )
+
+    def _restart_pool(self, broken: ProcessPoolExecutor) -> None:
+        # Concurrent batches see the same breakage; only the first one to get
+        # here replaces the pool, the rest retry on its replacement. Nothing
+        # awaits between the check and the swap, so the event loop serialises it.
+        if self._pool is not broken:
+            return
+        self.logger.warning("Image embedding worker pool broken, restarting")
+        self._stats["pool_restarts"] += 1
+        self._pool = None
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn avoids forking a parent that may hold torch threads or locks
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.model_name, self.torch_threads)
+            )
+            self.logger.info(
+                f"Started {self.workers} image embedding workers with model {self.model_name}"
+            )
+        return self._pool
+
+    def _get_local_model(self) -> Any:
+        if self._model is None:
+            from sentence_transformers import SentenceTransformer
+            self._model = SentenceTransformer(self.model_name)
+        return self._model
+
+
+_executor: Optional[ImageEmbeddingExecutor] = None
+
+
+def get_image_embedding_executor() -> ImageEmbeddingExecutor:
+    """Get the process-wide image embedding executor."""
+    global _executor
+    if _executor is None:
+        settings = get_settings()
+        _executor = ImageEmbeddingExecutor(
+            model_name=settings.image_embedding_model,
+            workers=settings.image_embedding_workers,
+            batch_size=settings.image_embedding_batch_size,
+            batch_window_ms=settings.image_embedding_batch_window_ms
+        )
+    return _executor
+
+
+def shutdown_image_embedding_executor() -> None:
+    """Stop the process-wide executor's workers, if started."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown()
+        _executor = None
@@ -6,11 +6,10 @@ for analytics and monitoring purposes.
 """
 
 import asyncio
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass, asdict
 from enum import Enum
-import time
 import json
 from collections import defaultdict, deque
 
@@ -25,6 +24,11 @@ from ..services.notification_service import NotificationService
 
 logger = structlog.get_logger(__name__)
 
+# Retention of Redis metric keys
+DAILY_KEY_TTL = 30 * 24 * 3600
+BUCKET_TTL = 24 * 3600
+CURRENT_TTL = 300
+
 
 class MetricType(str, Enum):
     """Types of metrics that can be collected."""
@@ -76,7 +80,20 @@ class PerformanceSnapshot:
 class MetricsCollector:
     """Service for collecting and aggregating real-time metrics."""
     
-    def __init__(self, redis_url: str = "redis://localhost:6379"):
+    # Time series read by get_performance_snapshot
+    SNAPSHOT_SERIES = {
+        "authenticity_analyzer": MetricType.ANALYSIS_TIME,
+        "enforcement_agent": MetricType.ENFORCEMENT_ACTION,
+        "api_server": MetricType.API_REQUEST
+    }
+    SNAPSHOT_WINDOW_MINUTES = 5
+    
+    def __init__(
+        self,
+        redis_url: str = "redis://localhost:6379",
+        redis_batch_size: int = 500,
+        redis_flush_interval: float = 1.0
+    ):
         """Initialize metrics collector."""
         self.redis_client: Optional[redis.Redis] = None
         self.redis_url = redis_url
@@ -95,6 +112,17 @@ class MetricsCollector:
         self.last_flush = datetime.utcnow()
         self.flush_interval = timedelta(seconds=30)
         
+        # Redis writes are coalesced locally and flushed in one pipeline
+        # on an interval or once redis_batch_size writes are pending
+        self.redis_batch_size = redis_batch_size
+        self.redis_flush_interval = redis_flush_interval
+        self._pending_counters: Dict[Tuple[str, str], int] = defaultdict(int)
+        self._pending_float_counters: Dict[Tuple[str, str], float] = defaultdict(float)
+        self._pending_expiries: Dict[str, int] = {}
+        self._pending_values: Dict[str, Tuple[int, str]] = {}
+        self._pending_writes = 0
+        self._redis_flush_task: Optional[asyncio.Task] = None
+        
         # Background tasks
         self._background_tasks: List[asyncio.Task] = []
         self._running = False
@@ -110,6 +138,7 @@ class MetricsCollector:
             self._running = True
             self._background_tasks = [
                 asyncio.create_task(self._flush_metrics_loop()),
+                asyncio.create_task(self._flush_redis_loop()),
                 asyncio.create_task(self._aggregate_metrics_loop()),
                 asyncio.create_task(self._health_check_loop())
             ]
@@ -133,6 +162,7 @@ class MetricsCollector:
             await asyncio.gather(*self._background_tasks, return_exceptions=True)
         
         # Flush remaining metrics
+        await self._flush_redis()
         await self._flush_metrics()
         
         # Close Redis connection
@@ -150,20 +180,16 @@ class MetricsCollector:
             # Record in Redis for real-time dashboards
             if self.redis_client:
                 daily_key = f"metrics:daily:{event.timestamp.date()}"
-                await self.redis_client.hincrby(daily_key, "total_analyzed", 1)
+                self._increment(daily_key, "total_analyzed", ttl=DAILY_KEY_TTL)
                 
                 if event.flagged:
-                    await self.redis_client.hincrby(daily_key, "flagged_products", 1)
-                
-                # Set expiration for daily keys (30 days)
-                await self.redis_client.expire(daily_key, 30 * 24 * 3600)
+                    self._increment(daily_key, "flagged_products")
                 
                 # Record category-specific metrics
                 category_key = f"metrics:category:{event.category}:{event.timestamp.date()}"
-                await self.redis_client.hincrby(category_key, "total_analyzed", 1)
+                self._increment(category_key, "total_analyzed", ttl=DAILY_KEY_TTL)
                 if event.flagged:
-                    await self.redis_client.hincrby(category_key, "flagged_count", 1)
-                await self.redis_client.expire(category_key, 30 * 24 * 3600)
+                    self._increment(category_key, "flagged_count")
             
             # Record performance metric
             await self.record_metric(
@@ -202,33 +228,19 @@ class MetricsCollector:
             
             # Record in Redis for real-time access
             if self.redis_client:
-                # Current metrics
+                # Current metrics (only the latest event per flush is written)
                 current_key = f"metrics:current:{event.component}:{event.metric_type.value}"
-                await self.redis_client.setex(
-                    current_key,
-                    300,  # 5 minutes TTL
-                    json.dumps({
-                        "value": event.value,
-                        "timestamp": event.timestamp.isoformat(),
-                        "metadata": event.metadata,
-                        "tags": event.tags
-                    })
-                )
+                self._set_value(current_key, CURRENT_TTL, event)
                 
-                # Time series data (store last 24 hours)
-                ts_key = f"metrics:timeseries:{event.component}:{event.metric_type.value}"
-                await self.redis_client.zadd(
-                    ts_key,
-                    {json.dumps({
-                        "value": event.value,
-                        "timestamp": event.timestamp.isoformat(),
-                        "metadata": event.metadata
-                    }): event.timestamp.timestamp()}
+                # Per-minute count/sum buckets (kept for 24 hours)
+                bucket_key = self._bucket_key(
+                    event.component, event.metric_type.value, self._minute(event.timestamp)
                 )
+                self._increment(bucket_key, "count", ttl=BUCKET_TTL)
+                self._pending_float_counters[(bucket_key, "sum")] += event.value
+                self._pending_writes += 1
                 
-                # Keep only last 24 hours
-                cutoff = time.time() - 24 * 3600
-                await self.redis_client.zremrangebyscore(ts_key, 0, cutoff)
+                self._schedule_redis_flush()
             
         except Exception as e:
             logger.error("Failed to record metric", error=str(e))
@@ -265,12 +277,12 @@ class MetricsCollector:
             # Update Redis counters
             if self.redis_client:
                 daily_key = f"metrics:daily:{datetime.utcnow().date()}"
-                await self.redis_client.hincrby(daily_key, f"enforcement_{action_type.value}", 1)
+                self._increment(daily_key, f"enforcement_{action_type.value}")
                 
                 if success:
-                    await self.redis_client.hincrby(daily_key, "enforcement_success", 1)
+                    self._increment(daily_key, "enforcement_success")
                 else:
-                    await self.redis_client.hincrby(daily_key, "enforcement_failures", 1)
+                    self._increment(daily_key, "enforcement_failures")
             
         except Exception as e:
             logger.error("Failed to record enforcement action", error=str(e))
@@ -338,8 +350,7 @@ class MetricsCollector:
             # Update Redis health status
             if self.redis_client:
                 health_key = f"health:agent:{agent_name}"
-                await self.redis_client.setex(
-                    health_key,
+                self._pending_values[health_key] = (
                     60,  # 1 minute TTL
                     json.dumps({
                         "status": status,
@@ -349,6 +360,8 @@ class MetricsCollector:
                         "last_update": datetime.utcnow().isoformat()
                     })
                 )
+                self._pending_writes += 1
+                self._schedule_redis_flush()
             
         except Exception as e:
             logger.error("Failed to record agent health", error=str(e))
@@ -405,27 +418,32 @@ class MetricsCollector:
             agent_status = {}
             
             if self.redis_client:
-                # Get recent metrics from time series
-                components = ["authenticity_analyzer", "enforcement_agent", "api_server"]
+                # Read the per-minute buckets of the window and agent health
+                # for every component in one round trip
+                current_minute = self._minute(current_time)
+                minutes = range(current_minute - self.SNAPSHOT_WINDOW_MINUTES + 1, current_minute + 1)
+                
+                pipe = self.redis_client.pipeline(transaction=False)
+                for component, metric_type in self.SNAPSHOT_SERIES.items():
+                    for minute in minutes:
+                        pipe.hmget(self._bucket_key(component, metric_type.value, minute), "count", "sum")
+                    pipe.get(f"health:agent:{component}")
+                results = iter(await pipe.execute())
                 
-                for component in components:
+                for component in self.SNAPSHOT_SERIES:
                     # Response times
-                    ts_key = f"metrics:timeseries:{component}:analysis_time"
-                    recent_data = await self.redis_client.zrevrangebyscore(
-                        ts_key, "+inf", time.time() - 300, withscores=True
-                    )
+                    count = 0
+                    total = 0.0
+                    for _ in minutes:
+                        bucket_count, bucket_sum = next(results)
+                        count += int(bucket_count or 0)
+                        total += float(bucket_sum or 0)
                     
-                    if recent_data:
-                        values = [json.loads(item[0])["value"] for item in recent_data]
-                        response_times[component] = sum(values) / len(values)
-                        throughput[component] = len(values) / 5  # per minute
-                    else:
-                        response_times[component] = 0
-                        throughput[component] = 0
+                    response_times[component] = total / count if count else 0
+                    throughput[component] = count / self.SNAPSHOT_WINDOW_MINUTES  # per minute
                     
                     # Agent status
-                    health_key = f"health:agent:{component}"
-                    health_data = await self.redis_client.get(health_key)
+                    health_data = next(results)
                     if health_data:
                         health = json.loads(health_data)
                         agent_status[component] = health.get("status", "unknown")
@@ -452,6 +470,87 @@ class MetricsCollector:
                 resource_usage={}
             )
     
+    def _increment(self, key: str, field: str, ttl: Optional[int] = None) -> None:
+        """Queue a hash counter increment (and the key's expiry)."""
+        self._pending_counters[(key, field)] += 1
+        if ttl is not None:
+            self._pending_expiries[key] = ttl
+        self._pending_writes += 1
+    
+    def _set_value(self, key: str, ttl: int, event: MetricEvent) -> None:
+        """Queue the latest value of a metric."""
+        self._pending_values[key] = (ttl, json.dumps({
+            "value": event.value,
+            "timestamp": event.timestamp.isoformat(),
+            "metadata": event.metadata,
+            "tags": event.tags
+        }))
+        self._pending_writes += 1
+    
+    @staticmethod
+    def _bucket_key(component: str, metric_type: str, minute: int) -> str:
+        """Key of a per-minute count/sum bucket."""
+        return f"metrics:bucket:{component}:{metric_type}:{minute}"
+    
+    @staticmethod
+    def _minute(timestamp: datetime) -> int:
+        """Minutes since the epoch (naive timestamps are UTC)."""
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.replace(tzinfo=timezone.utc)
+        return int(timestamp.timestamp()) // 60
+    
+    def _schedule_redis_flush(self) -> None:
+        """Start a flush once enough writes are pending."""
+        if self._pending_writes < self.redis_batch_size:
+            return
+        if self._redis_flush_task is None or self._redis_flush_task.done():
+            self._redis_flush_task = asyncio.create_task(self._flush_redis())
+    
+    async def _flush_redis_loop(self) -> None:
+        """Background task to flush pending Redis writes."""
+        while self._running:
+            try:
+                await asyncio.sleep(self.redis_flush_interval)
+                await self._flush_redis()
+                
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error("Error in Redis flush loop", error=str(e))
+    
+    async def _flush_redis(self) -> None:
+        """Write pending counters and values to Redis in one pipeline."""
+        if not self.redis_client or not self._pending_writes:
+            return
+        
+        # Swap the buffers before awaiting so new events go to fresh ones
+        counters, self._pending_counters = self._pending_counters, defaultdict(int)
+        float_counters, self._pending_float_counters = self._pending_float_counters, defaultdict(float)
+        expiries, self._pending_expiries = self._pending_expiries, {}
+        values, self._pending_values = self._pending_values, {}
+        writes, self._pending_writes = self._pending_writes, 0
+        
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            for (key, field), amount in counters.items():
+                pipe.hincrby(key, field, amount)
+            for (key, field), amount in float_counters.items():
+                pipe.hincrbyfloat(key, field, amount)
+            for key, (ttl, value) in values.items():
+                pipe.setex(key, ttl, value)
+            for key, ttl in expiries.items():
+                pipe.expire(key, ttl)
+            await pipe.execute()
+            
+            logger.debug(
+                "Flushed metrics to Redis",
+                writes=writes,
+                commands=len(counters) + len(float_counters) + len(values) + len(expiries)
+            )
+            
+        except Exception as e:
+            logger.error("Failed to flush metrics to Redis", error=str(e), dropped_writes=writes)
+    
     async def _flush_metrics_loop(self) -> None:
         """Background task to flush metrics to database."""
         while self._running:
@@ -566,4 +665,52 @@ class MetricsCollector:
                     metadata={"health_check": "failed", "error": str(e)},
                     tags={"component": "metrics_collector"}
                 )
-            )
\ No newline at end of file
+            )
+
+
+# Process-wide collector shared by agents in this process; stopped when its
+# last user releases it
+_shared_collector: Optional[MetricsCollector] = None
+_shared_collector_users = 0
+_shared_collector_lock: Optional[asyncio.Lock] = None
+
+
+async def acquire_shared_metrics_collector(redis_url: str) -> MetricsCollector:
+    """
+    Get the process-wide metrics collector, starting it for its first user.
+
+    Every successful call must be paired with release_shared_metrics_collector().
+
+    Args:
+        redis_url: Redis URL used if the collector has to be started
+
+    Returns:
+        Started, shared MetricsCollector
+    """
+    global _shared_collector, _shared_collector_users, _shared_collector_lock
+    if _shared_collector_lock is None:
+        _shared_collector_lock = asyncio.Lock()
+
+    async with _shared_collector_lock:
+        if _shared_collector is None:
+            collector = MetricsCollector(redis_url=redis_url)
+            await collector.start()
+            _shared_collector = collector
+        _shared_collector_users += 1
+        return _shared_collector
+
+
+async def release_shared_metrics_collector() -> None:
+    """Release the process-wide collector, stopping it after its last user."""
+    global _shared_collector, _shared_collector_users
+    if _shared_collector_lock is None:
+        return
+
+    async with _shared_collector_lock:
+        if _shared_collector is None:
+            return
+        _shared_collector_users -= 1
+        if _shared_collector_users <= 0:
+            collector, _shared_collector = _shared_collector, None
+            _shared_collector_users = 0
+            await collector.stop()
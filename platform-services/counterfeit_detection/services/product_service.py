@@ -18,6 +18,7 @@ from PIL import Image
 import structlog
 
 from ..db.repositories.product_repository import ProductRepository
+from ..db.repositories.vector_repository import VectorRepository, run_after_commit
 from ..models.enums import ProductCategory, ProductStatus
 from ..api.v1.schemas.products import (
     ProductIngestRequest,
@@ -456,7 +457,24 @@ class ProductService:
                 'image_embedding': image_embeddings[0] if image_embeddings else None  # Use first image embedding
             }
             
-            await self.product_repository.update_product(product_id, embedding_data)
+            updated_product = await self.product_repository.update_product(product_id, embedding_data)
+            
+            # Keep the native vector columns and in-memory indexes in step
+            if updated_product:
+                session = self.product_repository.session
+                vector_repository = VectorRepository(session)
+                await vector_repository.update_native_embeddings(product_id, **embedding_data)
+                index_update = dict(
+                    product_id=product_id,
+                    category=updated_product.category,
+                    supplier_id=updated_product.supplier_id,
+                    price=updated_product.price,
+                    status=updated_product.status,
+                    **embedding_data
+                )
+                run_after_commit(
+                    session, lambda: vector_repository.index_product_embeddings(**index_update)
+                )
             
             self.logger.info(
                 "Successfully generated product embeddings",
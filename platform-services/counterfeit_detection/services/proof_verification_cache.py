@@ -22,9 +22,10 @@ from sqlalchemy import select, and_, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..core.database import get_db_session
-from ..models.zkproof import ZKProof, VerificationStatus, ProofType
+from ..models.zkproof import ZKProof, ZKProofCircuit, VerificationStatus, ProofType
 from ..services.zkproof_service import ZKProofService, ProofVerificationResult
 from ..utils.crypto_utils import CryptoUtils
+from ..utils.lru_cache import LRUCache
 
 logger = structlog.get_logger(__name__)
 
@@ -82,10 +83,11 @@ class ProofVerificationCache:
         self.max_memory_cache_size = max_memory_cache_size
         self.max_concurrent_verifications = max_concurrent_verifications
         
-        # Memory cache
-        self.memory_cache: Dict[str, VerificationCacheEntry] = {}
-        self.cache_access_order: List[str] = []
-        self.cache_lock = threading.RLock()
+        # Memory cache (O(1) LRU with per-entry TTL)
+        self.memory_cache = LRUCache(
+            max_entries=max_memory_cache_size,
+            default_ttl_seconds=cache_ttl_seconds
+        )
         
         # Batch processing
         self.batch_queue: List[BatchVerificationRequest] = []
@@ -306,6 +308,7 @@ class ProofVerificationCache:
                 "cache_status": {
                     "memory_cache_size": memory_cache_size,
                     "memory_cache_max_size": self.max_memory_cache_size,
+                    "memory_cache": self.memory_cache.get_stats(),
                     "redis_cache_size": redis_cache_size,
                     "cache_ttl_seconds": self.cache_ttl_seconds
                 },
@@ -331,9 +334,7 @@ class ProofVerificationCache:
             logger.info("Clearing verification cache", cache_type=cache_type)
             
             if cache_type in ["all", "memory"]:
-                with self.cache_lock:
-                    self.memory_cache.clear()
-                    self.cache_access_order.clear()
+                self.memory_cache.clear()
             
             if cache_type in ["all", "redis"] and self.redis_client:
                 keys = await self.redis_client.keys("proof_verification:*")
@@ -371,18 +372,10 @@ class ProofVerificationCache:
     ) -> Optional[VerificationCacheEntry]:
         """Get cached verification result."""
         try:
-            # Check memory cache first
-            with self.cache_lock:
-                if proof_id in self.memory_cache:
-                    cache_entry = self.memory_cache[proof_id]
-                    
-                    # Check if cache entry is still valid
-                    age_seconds = (datetime.utcnow() - cache_entry.cached_at).total_seconds()
-                    if age_seconds < cache_entry.cache_ttl_seconds:
-                        return cache_entry
-                    else:
-                        # Remove expired entry
-                        self._remove_from_memory_cache(proof_id)
+            # Check memory cache first (expired entries are dropped on lookup)
+            cache_entry = self.memory_cache.get(proof_id)
+            if cache_entry is not None:
+                return cache_entry
             
             # Check Redis cache if available
             if self.redis_client:
@@ -482,39 +475,21 @@ class ProofVerificationCache:
             logger.error("Failed to cache verification result", proof_id=proof_id, error=str(e))
     
     def _add_to_memory_cache(self, cache_entry: VerificationCacheEntry) -> None:
-        """Add entry to memory cache with LRU eviction."""
-        with self.cache_lock:
-            proof_id = cache_entry.proof_id
-            
-            # Remove if already exists
-            if proof_id in self.memory_cache:
-                self.cache_access_order.remove(proof_id)
-            
-            # Add to cache
-            self.memory_cache[proof_id] = cache_entry
-            self.cache_access_order.append(proof_id)
-            
-            # Evict if over size limit
-            while len(self.memory_cache) > self.max_memory_cache_size:
-                oldest_proof_id = self.cache_access_order.pop(0)
-                del self.memory_cache[oldest_proof_id]
+        """Add entry to memory cache for the rest of its TTL."""
+        age_seconds = (datetime.utcnow() - cache_entry.cached_at).total_seconds()
+        remaining_ttl = cache_entry.cache_ttl_seconds - age_seconds
+        if remaining_ttl > 0:
+            self.memory_cache.set(cache_entry.proof_id, cache_entry, ttl_seconds=remaining_ttl)
     
     def _remove_from_memory_cache(self, proof_id: str) -> None:
         """Remove entry from memory cache."""
-        with self.cache_lock:
-            if proof_id in self.memory_cache:
-                del self.memory_cache[proof_id]
-                self.cache_access_order.remove(proof_id)
+        self.memory_cache.pop(proof_id)
     
     def _update_cache_hit_count(self, proof_id: str) -> None:
-        """Update cache hit count for an entry."""
-        with self.cache_lock:
-            if proof_id in self.memory_cache:
-                self.memory_cache[proof_id].hit_count += 1
-                
-                # Move to end of access order (LRU)
-                self.cache_access_order.remove(proof_id)
-                self.cache_access_order.append(proof_id)
+        """Update cache hit count for an entry (recency is updated on lookup)."""
+        cache_entry = self.memory_cache.peek(proof_id)
+        if cache_entry is not None:
+            cache_entry.hit_count += 1
     
     async def _verify_proof_with_optimization(
         self, 
@@ -571,45 +546,105 @@ class ProofVerificationCache:
         self, 
         proof_ids: List[str]
     ) -> Dict[str, ProofVerificationResult]:
-        """Verify proofs in parallel batch."""
+        """
+        Verify proofs in one batch.
+        
+        Proofs and circuits are loaded with one query each and the proofs
+        are streamed to the resident snarkjs workers, so no temporary files
+        or per-proof processes are involved.
+        """
         try:
             results = {}
             
-            # Create verification tasks
-            verification_tasks = []
-            for proof_id in proof_ids:
-                task = asyncio.create_task(
-                    self._verify_proof_with_optimization(proof_id)
+            async with get_db_session() as session:
+                proof_result = await session.execute(
+                    select(ZKProof).where(ZKProof.id.in_(proof_ids))
                 )
-                verification_tasks.append((proof_id, task))
-            
-            # Track concurrent verifications
-            current_concurrent = len(verification_tasks)
-            if current_concurrent > self.performance_metrics.peak_concurrent_verifications:
-                self.performance_metrics.peak_concurrent_verifications = current_concurrent
-            
-            # Wait for all verifications
-            for proof_id, task in verification_tasks:
-                try:
-                    verification_result = await task
-                    results[proof_id] = verification_result
-                    
-                    # Cache the result
-                    await self._cache_verification_result(
-                        proof_id, verification_result, 0.0  # Time tracking handled elsewhere
+                proofs = {str(proof.id): proof for proof in proof_result.scalars().all()}
+                
+                circuit_ids = {proof.circuit_id for proof in proofs.values()}
+                circuits = {}
+                if circuit_ids:
+                    circuit_result = await session.execute(
+                        select(ZKProofCircuit).where(ZKProofCircuit.id.in_(circuit_ids))
                     )
+                    circuits = {circuit.id: circuit for circuit in circuit_result.scalars().all()}
+                
+                # Reject what can be decided without the verifier
+                now = datetime.utcnow()
+                pending = []
+                for proof_id in proof_ids:
+                    proof = proofs.get(proof_id)
+                    if not proof:
+                        error_message = "Proof not found"
+                    elif proof.expires_at and now > proof.expires_at:
+                        error_message = "Proof has expired"
+                    elif proof.circuit_id not in circuits:
+                        error_message = f"Circuit {proof.circuit_id} not found"
+                    else:
+                        pending.append(proof)
+                        continue
                     
-                except Exception as e:
-                    logger.error("Failed to verify proof in batch", proof_id=proof_id, error=str(e))
                     results[proof_id] = ProofVerificationResult(
                         proof_id=proof_id,
                         is_valid=False,
                         verification_details={},
-                        error_message=f"Batch verification failed: {str(e)}",
-                        verification_time=datetime.utcnow(),
-                        circuit_id="",
+                        error_message=error_message,
+                        verification_time=now,
+                        circuit_id=proof.circuit_id if proof else "",
                         public_signals={}
                     )
+                
+                # Track concurrent verifications
+                if len(pending) > self.performance_metrics.peak_concurrent_verifications:
+                    self.performance_metrics.peak_concurrent_verifications = len(pending)
+                
+                outcomes = await self.zkproof_service.verify_proof_payloads([
+                    (circuits[proof.circuit_id].verification_key_path, proof.proof_data, proof.public_signals)
+                    for proof in pending
+                ])
+                
+                verification_time = datetime.utcnow()
+                verified = []
+                for proof, outcome in zip(pending, outcomes):
+                    proof_id = str(proof.id)
+                    
+                    if isinstance(outcome, Exception):
+                        # Infrastructure or verifier error: not a verdict, so not cached
+                        logger.error("Failed to verify proof in batch", proof_id=proof_id, error=str(outcome))
+                        results[proof_id] = ProofVerificationResult(
+                            proof_id=proof_id,
+                            is_valid=False,
+                            verification_details={},
+                            error_message=f"Batch verification failed: {str(outcome)}",
+                            verification_time=verification_time,
+                            circuit_id=proof.circuit_id,
+                            public_signals={}
+                        )
+                        continue
+                    
+                    is_valid = bool(outcome)
+                    proof.verification_status = VerificationStatus.VALID if is_valid else VerificationStatus.INVALID
+                    proof.verified_at = verification_time
+                    
+                    results[proof_id] = ProofVerificationResult(
+                        proof_id=proof_id,
+                        is_valid=is_valid,
+                        verification_details={"verifier": "snarkjs_groth16"},
+                        error_message=None if is_valid else "Proof verification failed",
+                        verification_time=verification_time,
+                        circuit_id=proof.circuit_id,
+                        public_signals=proof.public_signals
+                    )
+                    verified.append(proof_id)
+                
+                await session.commit()
+            
+            # Cache results
+            for proof_id in verified:
+                await self._cache_verification_result(
+                    proof_id, results[proof_id], 0.0  # Time tracking handled elsewhere
+                )
             
             return results
             
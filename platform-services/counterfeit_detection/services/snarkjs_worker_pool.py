@@ -0,0 +1,425 @@
+"""
+Resident snarkjs worker pool for zkSNARK proving and verification.
+
+Each worker is a long-lived Node process running snarkjs behind a
+line-delimited JSON protocol on stdin/stdout. Verification keys, circuit
+WASM and proving keys are loaded once per worker and kept in memory, so a
+request costs only the pairing check or proof computation instead of Node
+start-up, key parsing and temporary files.
+"""
+
+import asyncio
+import itertools
+import json
+import os
+import tempfile
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import structlog
+
+from ..core.config import get_settings
+
+logger = structlog.get_logger(__name__)
+
+
+WORKER_SCRIPT = r'''#!/usr/bin/env node
+// snarkjs worker: one JSON request per line on stdin, one JSON response per line on stdout.
+const fs = require("fs");
+const readline = require("readline");
+const snarkjs = require("snarkjs");
+
+const verificationKeys = new Map();
+const artifacts = new Map();
+
+function loadVerificationKey(path) {
+    let key = verificationKeys.get(path);
+    if (!key) {
+        key = JSON.parse(fs.readFileSync(path, "utf8"));
+        verificationKeys.set(path, key);
+    }
+    return key;
+}
+
+function loadArtifact(path) {
+    let artifact = artifacts.get(path);
+    if (!artifact) {
+        artifact = { type: "mem", data: new Uint8Array(fs.readFileSync(path)) };
+        artifacts.set(path, artifact);
+    }
+    return artifact;
+}
+
+async function handle(request) {
+    switch (request.op) {
+        case "verify":
+            return await snarkjs.groth16.verify(
+                loadVerificationKey(request.vkey_path), request.public_signals, request.proof
+            );
+        case "fullprove": {
+            const { proof, publicSignals } = await snarkjs.groth16.fullProve(
+                request.input, loadArtifact(request.wasm_path), loadArtifact(request.zkey_path)
+            );
+            return { proof: proof, public_signals: publicSignals };
+        }
+        case "evict":
+            verificationKeys.delete(request.path);
+            artifacts.delete(request.path);
+            return true;
+        case "ping":
+            return "pong";
+        default:
+            throw new Error("Unknown op: " + request.op);
+    }
+}
+
+function respond(message) {
+    process.stdout.write(JSON.stringify(message) + "\n");
+}
+
+readline.createInterface({ input: process.stdin, crlfDelay: Infinity })
+    .on("line", (line) => {
+        let request;
+        try {
+            request = JSON.parse(line);
+        } catch (error) {
+            respond({ id: null, ok: false, error: "Invalid JSON request" });
+            return;
+        }
+        handle(request).then(
+            (result) => respond({ id: request.id, ok: true, result: result }),
+            (error) => respond({ id: request.id, ok: false, error: String((error && error.message) || error) })
+        );
+    })
+    .on("close", () => process.exit(0));
+'''
+
+
+class SnarkjsWorkerError(RuntimeError):
+    """A snarkjs worker rejected or failed a request."""
+
+
+class SnarkjsWorkerUnavailable(SnarkjsWorkerError):
+    """A snarkjs worker process could not be started, exited or timed out."""
+
+
+@dataclass
+class _Worker:
+    """One resident Node process and its in-flight requests."""
+    index: int
+    process: Optional[asyncio.subprocess.Process] = None
+    pending: Dict[int, asyncio.Future] = field(default_factory=dict)
+    tasks: List[asyncio.Task] = field(default_factory=list)
+    load: int = 0
+    exited: bool = False
+
+    @property
+    def alive(self) -> bool:
+        # stdout EOF is seen before the process is reaped
+        return self.process is not None and not self.exited and self.process.returncode is None
+
+
+class SnarkjsWorkerPool:
+    """
+    Pool of resident snarkjs Node workers.
+
+    Requests are routed to the worker with the fewest in-flight requests
+    and matched to responses by id, so many proofs can be pipelined through
+    each process. Workers are started on first use and restarted after
+    they exit.
+    """
+
+    def __init__(
+        self,
+        workers: int = 2,
+        node_binary: str = "node",
+        node_modules_path: Optional[str] = None,
+        request_timeout_seconds: float = 60.0,
+        max_in_flight_per_worker: int = 64,
+        script_dir: Optional[str] = None
+    ):
+        """
+        Initialize the pool.
+
+        Args:
+            workers: Number of Node processes
+            node_binary: Node executable
+            node_modules_path: NODE_PATH used to resolve snarkjs
+            request_timeout_seconds: Timeout for a single request
+            max_in_flight_per_worker: Pipelined requests allowed per process
+            script_dir: Directory the worker script is written to
+        """
+        self.node_binary = node_binary
+        self.node_modules_path = node_modules_path
+        self.request_timeout_seconds = request_timeout_seconds
+        self.script_dir = script_dir
+
+        self._workers = [_Worker(index=i) for i in range(workers)]
+        self._slots = asyncio.Semaphore(workers * max_in_flight_per_worker)
+        self._start_lock = asyncio.Lock()
+        self._request_ids = itertools.count(1)
+        self._script_path: Optional[str] = None
+        self._stats = {
+            "requests": 0,
+            "failures": 0,
+            "timeouts": 0,
+            "worker_starts": 0,
+            "worker_exits": 0
+        }
+
+    @property
+    def size(self) -> int:
+        """Number of Node processes in the pool."""
+        return len(self._workers)
+
+    async def verify(
+        self,
+        verification_key_path: str,
+        proof: Dict[str, Any],
+        public_signals: Any
+    ) -> bool:
+        """
+        Verify a Groth16 proof.
+
+        Args:
+            verification_key_path: Path to the circuit's verification key JSON
+            proof: Proof object
+            public_signals: Public signals
+
+        Returns:
+            True if the proof is valid
+        """
+        result = await self._request({
+            "op": "verify",
+            "vkey_path": verification_key_path,
+            "proof": proof,
+            "public_signals": public_signals
+        })
+        return bool(result)
+
+    async def verify_many(
+        self,
+        requests: Sequence[Tuple[str, Dict[str, Any], Any]]
+    ) -> List[Union[bool, Exception]]:
+        """
+        Verify many proofs concurrently.
+
+        Args:
+            requests: (verification_key_path, proof, public_signals) tuples
+
+        Returns:
+            One entry per request: the verification outcome, or the
+            exception raised for that request
+        """
+        return list(await asyncio.gather(
+            *(self.verify(*request) for request in requests),
+            return_exceptions=True
+        ))
+
+    async def full_prove(
+        self,
+        wasm_path: str,
+        proving_key_path: str,
+        inputs: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Compute the witness and a Groth16 proof in memory.
+
+        Args:
+            wasm_path: Circuit WASM file
+            proving_key_path: Circuit .zkey file
+            inputs: Circuit inputs
+
+        Returns:
+            Dictionary with ``proof`` and ``public_signals``
+        """
+        return await self._request({
+            "op": "fullprove",
+            "wasm_path": wasm_path,
+            "zkey_path": proving_key_path,
+            "input": inputs
+        })
+
+    async def evict(self, path: str) -> None:
+        """Drop a cached key or artifact from every running worker (e.g. after rotation)."""
+        for worker in self._workers:
+            if worker.alive:
+                await self._send(worker, {"op": "evict", "path": path})
+
+    async def close(self) -> None:
+        """Stop all worker processes."""
+        for worker in self._workers:
+            await self._stop_worker(worker)
+        logger.info("snarkjs worker pool stopped")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pool statistics."""
+        stats = dict(self._stats)
+        stats.update({
+            "workers": len(self._workers),
+            "running_workers": sum(1 for worker in self._workers if worker.alive),
+            "in_flight": sum(len(worker.pending) for worker in self._workers)
+        })
+        return stats
+
+    async def _request(self, payload: Dict[str, Any]) -> Any:
+        async with self._slots:
+            # Load is counted from selection, so workers still starting are not oversubscribed
+            worker = min(self._workers, key=lambda w: w.load)
+            worker.load += 1
+            self._stats["requests"] += 1
+            try:
+                if not worker.alive:
+                    await self._start_worker(worker)
+                return await self._send(worker, payload)
+            except SnarkjsWorkerError:
+                self._stats["failures"] += 1
+                raise
+            finally:
+                worker.load -= 1
+
+    async def _send(self, worker: _Worker, payload: Dict[str, Any]) -> Any:
+        request_id = next(self._request_ids)
+        future = asyncio.get_running_loop().create_future()
+        worker.pending[request_id] = future
+
+        try:
+            worker.process.stdin.write(
+                (json.dumps({"id": request_id, **payload}) + "\n").encode()
+            )
+            await worker.process.stdin.drain()
+            response = await asyncio.wait_for(future, self.request_timeout_seconds)
+        except asyncio.TimeoutError:
+            self._stats["timeouts"] += 1
+            raise SnarkjsWorkerUnavailable(
+                f"snarkjs worker {worker.index} timed out after {self.request_timeout_seconds}s"
+            )
+        except (BrokenPipeError, ConnectionResetError) as e:
+            raise SnarkjsWorkerUnavailable(f"snarkjs worker {worker.index} is not running: {e}")
+        finally:
+            worker.pending.pop(request_id, None)
+
+        if not response.get("ok"):
+            raise SnarkjsWorkerError(response.get("error") or "snarkjs worker request failed")
+        return response.get("result")
+
+    async def _start_worker(self, worker: _Worker) -> None:
+        async with self._start_lock:
+            if worker.alive:
+                return
+
+            await self._stop_worker(worker)
+
+            env = dict(os.environ)
+            if self.node_modules_path:
+                env["NODE_PATH"] = self.node_modules_path
+
+            try:
+                worker.process = await asyncio.create_subprocess_exec(
+                    self.node_binary, self._get_script_path(),
+                    stdin=asyncio.subprocess.PIPE,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                    env=env,
+                    limit=16 * 1024 * 1024
+                )
+            except OSError as e:
+                raise SnarkjsWorkerUnavailable(f"Failed to start snarkjs worker: {e}")
+
+            worker.exited = False
+            worker.tasks = [
+                asyncio.create_task(self._read_responses(worker)),
+                asyncio.create_task(self._drain_stderr(worker))
+            ]
+            self._stats["worker_starts"] += 1
+            logger.info("snarkjs worker started", worker=worker.index, pid=worker.process.pid)
+
+    async def _stop_worker(self, worker: _Worker) -> None:
+        for task in worker.tasks:
+            task.cancel()
+        worker.tasks = []
+
+        if worker.process is not None and worker.process.returncode is None:
+            worker.process.stdin.close()
+            try:
+                await asyncio.wait_for(worker.process.wait(), 5)
+            except asyncio.TimeoutError:
+                worker.process.kill()
+                await worker.process.wait()
+
+        self._fail_pending(worker, "snarkjs worker stopped")
+        worker.process = None
+
+    async def _read_responses(self, worker: _Worker) -> None:
+        stdout = worker.process.stdout
+        try:
+            while True:
+                line = await stdout.readline()
+                if not line:
+                    break
+
+                try:
+                    response = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning("Unparseable snarkjs worker output", worker=worker.index)
+                    continue
+
+                future = worker.pending.get(response.get("id"))
+                if future is not None and not future.done():
+                    future.set_result(response)
+        finally:
+            worker.exited = True
+            self._stats["worker_exits"] += 1
+            self._fail_pending(worker, f"snarkjs worker {worker.index} exited")
+            logger.warning("snarkjs worker exited", worker=worker.index)
+
+    async def _drain_stderr(self, worker: _Worker) -> None:
+        while True:
+            line = await worker.process.stderr.readline()
+            if not line:
+                return
+            logger.warning("snarkjs worker stderr", worker=worker.index, line=line.decode(errors="replace").rstrip())
+
+    def _fail_pending(self, worker: _Worker, message: str) -> None:
+        for future in worker.pending.values():
+            if not future.done():
+                future.set_exception(SnarkjsWorkerUnavailable(message))
+        worker.pending.clear()
+
+    def _get_script_path(self) -> str:
+        if self._script_path is None:
+            script_dir = self.script_dir or tempfile.gettempdir()
+            os.makedirs(script_dir, exist_ok=True)
+            script_path = os.path.join(script_dir, "snarkjs_worker.js")
+            # Atomic replace: other application processes may be starting workers
+            fd, tmp_path = tempfile.mkstemp(dir=script_dir, suffix=".js.tmp")
+            with os.fdopen(fd, "w") as f:
+                f.write(WORKER_SCRIPT)
+            os.replace(tmp_path, script_path)
+            self._script_path = script_path
+        return self._script_path
+
+
+_worker_pool: Optional[SnarkjsWorkerPool] = None
+
+
+def get_snarkjs_worker_pool() -> SnarkjsWorkerPool:
+    """Get the process-wide snarkjs worker pool."""
+    global _worker_pool
+    if _worker_pool is None:
+        settings = get_settings()
+        _worker_pool = SnarkjsWorkerPool(
+            workers=settings.snarkjs_workers,
+            node_binary=settings.snarkjs_node_binary,
+            node_modules_path=settings.snarkjs_node_modules_path,
+            request_timeout_seconds=settings.snarkjs_request_timeout_seconds
+        )
+    return _worker_pool
+
+
+async def shutdown_snarkjs_worker_pool() -> None:
+    """Stop the process-wide worker pool, if started."""
+    global _worker_pool
+    if _worker_pool is not None:
+        await _worker_pool.close()
+        _worker_pool = None
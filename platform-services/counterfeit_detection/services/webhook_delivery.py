@@ -0,0 +1,613 @@
+"""
+Non-blocking webhook delivery engine.
+
+Deliveries are submitted and return at once; attempts run as tasks on one
+long-lived HTTP connection pool. Failed attempts are not retried inline but
+put on a delay queue and re-attempted by a scheduler after a jittered
+exponential backoff. Each host has a concurrency cap and a circuit breaker,
+so a slow or failing customer endpoint only delays its own deliveries.
+Final outcomes are written to notification_logs in batches.
+"""
+
+import asyncio
+import heapq
+import itertools
+import random
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from urllib.parse import urlsplit
+
+import aiohttp
+import structlog
+
+from ..core.config import get_settings
+from ..core.database import get_db_session
+from ..db.repositories.notification_repository import NotificationRepository
+from ..models.enums import NotificationStatus, WebhookStatus
+
+logger = structlog.get_logger(__name__)
+
+# Client errors worth retrying; other 4xx responses fail immediately
+RETRYABLE_CLIENT_STATUSES = {408, 409, 425, 429}
+
+
+class WebhookAttempt:
+    """Represents a webhook delivery attempt."""
+
+    def __init__(
+        self,
+        attempt_number: int,
+        url: str,
+        payload: Dict[str, Any],
+        headers: Dict[str, str]
+    ):
+        self.attempt_number = attempt_number
+        self.url = url
+        self.payload = payload
+        self.headers = headers
+        self.started_at: Optional[datetime] = None
+        self.completed_at: Optional[datetime] = None
+        self.status_code: Optional[int] = None
+        self.response_body: Optional[str] = None
+        self.error_message: Optional[str] = None
+        self.duration_ms: Optional[float] = None
+
+    def is_successful(self) -> bool:
+        """Check if the endpoint accepted the webhook."""
+        return self.status_code is not None and 200 <= self.status_code < 300
+
+    def is_retryable(self) -> bool:
+        """Check if a failed attempt may succeed when repeated."""
+        if self.status_code is None:
+            return True  # Timeout or connection error
+        return self.status_code >= 500 or self.status_code in RETRYABLE_CLIENT_STATUSES
+
+
+class WebhookDeliveryResult:
+    """Result of webhook delivery including all attempts."""
+
+    def __init__(self, webhook_id: str, endpoint_url: str, max_attempts: int = 3):
+        self.webhook_id = webhook_id
+        self.endpoint_url = endpoint_url
+        self.max_attempts = max_attempts
+        self.attempts: List[WebhookAttempt] = []
+        self.final_status: WebhookStatus = WebhookStatus.PENDING
+        self.total_duration_ms: float = 0.0
+        self.created_at = datetime.utcnow()
+        self.completed_at: Optional[datetime] = None
+        # Why the delivery was given up without a final attempt (e.g. circuit open)
+        self.error_message: Optional[str] = None
+        self._completed = asyncio.Event()
+
+    def add_attempt(self, attempt: WebhookAttempt):
+        """Add an attempt to the delivery result."""
+        self.attempts.append(attempt)
+
+        # Update final status based on last attempt
+        if attempt.is_successful():
+            self.final_status = WebhookStatus.DELIVERED
+        elif len(self.attempts) >= self.max_attempts or not attempt.is_retryable():
+            self.final_status = WebhookStatus.FAILED
+        else:
+            self.final_status = WebhookStatus.RETRY
+
+    def is_successful(self) -> bool:
+        """Check if delivery was successful."""
+        return self.final_status == WebhookStatus.DELIVERED
+
+    def is_complete(self) -> bool:
+        """Check if delivery reached a final status."""
+        return self._completed.is_set()
+
+    def get_last_attempt(self) -> Optional[WebhookAttempt]:
+        """Get the last delivery attempt."""
+        return self.attempts[-1] if self.attempts else None
+
+    def complete(self) -> None:
+        """Mark the delivery as finished."""
+        self.completed_at = datetime.utcnow()
+        self.total_duration_ms = (self.completed_at - self.created_at).total_seconds() * 1000
+        self._completed.set()
+
+    async def wait(self) -> "WebhookDeliveryResult":
+        """Wait until the delivery is delivered or has finally failed."""
+        await self._completed.wait()
+        return self
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker for one host.
+
+    Opens after ``failure_threshold`` consecutive failures; after
+    ``reset_timeout_seconds`` a single probe request is let through
+    (half-open) and its outcome closes or re-opens the circuit.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout_seconds: float = 30.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_seconds = reset_timeout_seconds
+        self.clock = clock
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+
+    def allow_request(self) -> bool:
+        """Check whether a request may be sent now (claims the probe when half-open)."""
+        if self.state == self.OPEN and self.clock() - self.opened_at >= self.reset_timeout_seconds:
+            self.state = self.HALF_OPEN
+
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def retry_after(self) -> float:
+        """Seconds until a refused request is worth trying again."""
+        if self.state == self.OPEN:
+            return max(1.0, self.opened_at + self.reset_timeout_seconds - self.clock())
+        return 1.0  # Waiting for the half-open probe
+
+    def record_success(self) -> None:
+        """Record a successful request."""
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        """Record a failed request."""
+        self.consecutive_failures += 1
+        self._probe_in_flight = False
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                logger.warning("Webhook circuit opened", failures=self.consecutive_failures)
+            self.state = self.OPEN
+            self.opened_at = self.clock()
+
+
+class WebhookDelivery:
+    """A submitted delivery with its serialized request and log context."""
+
+    def __init__(
+        self,
+        result: WebhookDeliveryResult,
+        payload: Dict[str, Any],
+        payload_str: str,
+        headers: Dict[str, str],
+        log_context: Optional[Dict[str, Any]] = None,
+        deadline: float = float("inf"),
+        fail_fast: bool = False
+    ):
+        self.result = result
+        self.payload = payload
+        self.payload_str = payload_str
+        self.headers = headers
+        self.log_context = log_context
+        self.host = urlsplit(result.endpoint_url).netloc
+        # Latest time a delivery may still be waiting on an open circuit
+        self.deadline = deadline
+        self.fail_fast = fail_fast
+
+
+class WebhookDeliveryEngine:
+    """Delivers webhooks on a shared connection pool with scheduled retries."""
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        retry_base_delay_seconds: float = 1.0,
+        retry_max_delay_seconds: float = 300.0,
+        timeout_seconds: float = 10.0,
+        per_host_concurrency: int = 10,
+        max_connections: int = 100,
+        circuit_failure_threshold: int = 5,
+        circuit_reset_seconds: float = 30.0,
+        max_deferral_seconds: float = 300.0,
+        verify_ssl: bool = True,
+        log_batch_size: int = 100,
+        log_flush_interval_seconds: float = 1.0,
+        rng: Optional[random.Random] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Initialize the engine.
+
+        Args:
+            max_attempts: Attempts per delivery before it fails
+            retry_base_delay_seconds: Backoff before the first retry
+            retry_max_delay_seconds: Upper bound of the backoff
+            timeout_seconds: Total timeout of one attempt
+            per_host_concurrency: Concurrent attempts per host
+            max_connections: Size of the shared connection pool
+            circuit_failure_threshold: Consecutive failures that open a host's circuit
+            circuit_reset_seconds: Time before an open circuit lets a probe through
+            max_deferral_seconds: Time after submission a delivery may keep
+                waiting on an open circuit before it fails
+            verify_ssl: Verify TLS certificates of endpoints
+            log_batch_size: Outcomes buffered before notification_logs is written
+            log_flush_interval_seconds: Maximum time outcomes stay buffered
+            rng: Random source for backoff jitter
+            clock: Monotonic time source in seconds
+        """
+        self.max_attempts = max_attempts
+        self.retry_base_delay_seconds = retry_base_delay_seconds
+        self.retry_max_delay_seconds = retry_max_delay_seconds
+        self.timeout_seconds = timeout_seconds
+        self.per_host_concurrency = per_host_concurrency
+        self.max_connections = max_connections
+        self.circuit_failure_threshold = circuit_failure_threshold
+        self.circuit_reset_seconds = circuit_reset_seconds
+        self.max_deferral_seconds = max_deferral_seconds
+        self.verify_ssl = verify_ssl
+        self.log_batch_size = log_batch_size
+        self.log_flush_interval_seconds = log_flush_interval_seconds
+        self.rng = rng or random.Random()
+        self.clock = clock
+
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._host_slots: Dict[str, asyncio.Semaphore] = {}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+        # Delay queue of (due time, sequence, delivery)
+        self._retry_queue: List[Tuple[float, int, WebhookDelivery]] = []
+        self._sequence = itertools.count()
+        self._queue_changed = asyncio.Event()
+        self._scheduler_task: Optional[asyncio.Task] = None
+        self._attempt_tasks: Set[asyncio.Task] = set()
+        self._open_deliveries: Set[WebhookDelivery] = set()
+        self._pending_logs: List[Dict[str, Any]] = []
+        self._closed = False
+
+        self.stats = {
+            "submitted": 0,
+            "attempts": 0,
+            "delivered": 0,
+            "failed": 0,
+            "retries_scheduled": 0,
+            "short_circuited": 0,
+            "circuit_open_failures": 0
+        }
+
+    def submit(
+        self,
+        url: str,
+        payload: Dict[str, Any],
+        payload_str: str,
+        headers: Dict[str, str],
+        log_context: Optional[Dict[str, Any]] = None,
+        fail_fast: bool = False
+    ) -> WebhookDeliveryResult:
+        """
+        Submit a webhook for delivery and return without waiting.
+
+        Args:
+            url: Endpoint URL
+            payload: Payload (kept on the attempts for inspection)
+            payload_str: Serialized payload as signed
+            headers: Request headers, including X-Webhook-ID
+            log_context: user_id, product_id and alert_id for notification_logs
+                (outcomes are not logged without a user_id)
+            fail_fast: Fail at once instead of waiting when the host's circuit
+                is open (for interactive deliveries such as endpoint tests)
+
+        Returns:
+            Result that is updated as attempts complete (see WebhookDeliveryResult.wait)
+        """
+        if self._closed:
+            raise RuntimeError("Webhook delivery engine is closed")
+
+        result = WebhookDeliveryResult(headers["X-Webhook-ID"], url, self.max_attempts)
+        delivery = WebhookDelivery(
+            result, payload, payload_str, headers, log_context,
+            deadline=self.clock() + self.max_deferral_seconds,
+            fail_fast=fail_fast
+        )
+
+        self.stats["submitted"] += 1
+        self._open_deliveries.add(delivery)
+        self._ensure_scheduler()
+        self._start_attempt(delivery)
+        return result
+
+    async def close(self) -> None:
+        """Stop retries, fail unfinished deliveries, flush logs and close the pool."""
+        if self._closed:
+            return
+        self._closed = True
+
+        if self._scheduler_task:
+            self._scheduler_task.cancel()
+            await asyncio.gather(self._scheduler_task, return_exceptions=True)
+
+        for task in list(self._attempt_tasks):
+            task.cancel()
+        await asyncio.gather(*self._attempt_tasks, return_exceptions=True)
+
+        if self._retry_queue:
+            logger.warning("Webhook retries dropped on shutdown", count=len(self._retry_queue))
+            self._retry_queue.clear()
+
+        # Complete cancelled and queued deliveries so waiting callers return
+        for delivery in list(self._open_deliveries):
+            self._abort(delivery, "Delivery aborted on shutdown")
+
+        await self._flush_logs()
+
+        if self._session:
+            await self._session.close()
+            self._session = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Delivery counters, queue sizes and open circuits."""
+        return {
+            **self.stats,
+            "in_flight": len(self._attempt_tasks),
+            "scheduled_retries": len(self._retry_queue),
+            "open_circuits": [
+                host for host, breaker in self._breakers.items()
+                if breaker.state != CircuitBreaker.CLOSED
+            ]
+        }
+
+    def _ensure_scheduler(self) -> None:
+        if self._scheduler_task is None or self._scheduler_task.done():
+            self._scheduler_task = asyncio.create_task(self._run_scheduler())
+
+    def _start_attempt(self, delivery: WebhookDelivery) -> None:
+        task = asyncio.create_task(self._attempt(delivery))
+        self._attempt_tasks.add(task)
+        task.add_done_callback(self._attempt_tasks.discard)
+
+    def _schedule(self, delivery: WebhookDelivery, delay: float) -> None:
+        """Put a delivery on the delay queue."""
+        heapq.heappush(self._retry_queue, (self.clock() + delay, next(self._sequence), delivery))
+        self._queue_changed.set()
+
+    def _retry_delay(self, attempt_number: int) -> float:
+        """Exponential backoff with jitter over the upper half of the interval."""
+        delay = min(
+            self.retry_max_delay_seconds,
+            self.retry_base_delay_seconds * 2 ** (attempt_number - 1)
+        )
+        return delay / 2 + self.rng.uniform(0, delay / 2)
+
+    def _breaker(self, host: str) -> CircuitBreaker:
+        breaker = self._breakers.get(host)
+        if breaker is None:
+            breaker = self._breakers[host] = CircuitBreaker(
+                self.circuit_failure_threshold, self.circuit_reset_seconds, self.clock
+            )
+        return breaker
+
+    def _host_slot(self, host: str) -> asyncio.Semaphore:
+        slot = self._host_slots.get(host)
+        if slot is None:
+            slot = self._host_slots[host] = asyncio.Semaphore(self.per_host_concurrency)
+        return slot
+
+    async def _run_scheduler(self) -> None:
+        """Start due retries and flush buffered outcome logs."""
+        last_flush = self.clock()
+
+        while not self._closed:
+            try:
+                now = self.clock()
+                while self._retry_queue and self._retry_queue[0][0] <= now:
+                    _, _, delivery = heapq.heappop(self._retry_queue)
+                    self._start_attempt(delivery)
+
+                if self._pending_logs and now - last_flush >= self.log_flush_interval_seconds:
+                    last_flush = now
+                    await self._flush_logs()
+
+                timeout = self.log_flush_interval_seconds
+                if self._retry_queue:
+                    timeout = min(timeout, max(0.0, self._retry_queue[0][0] - now))
+
+                self._queue_changed.clear()
+                try:
+                    await asyncio.wait_for(self._queue_changed.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Webhook scheduler error", error=str(e))
+                await asyncio.sleep(1)
+
+    async def _attempt(self, delivery: WebhookDelivery) -> None:
+        """Run one attempt of a delivery and decide what happens next."""
+        result = delivery.result
+        breaker = self._breaker(delivery.host)
+
+        if not breaker.allow_request():
+            # Host is failing: come back when its circuit lets a probe through,
+            # without spending an attempt, unless that is past the deadline
+            self.stats["short_circuited"] += 1
+            retry_after = breaker.retry_after()
+            if delivery.fail_fast or self.clock() + retry_after > delivery.deadline:
+                self.stats["circuit_open_failures"] += 1
+                self._abort(delivery, f"Circuit open for {delivery.host}")
+            else:
+                self._schedule(delivery, retry_after)
+            return
+
+        attempt = WebhookAttempt(
+            len(result.attempts) + 1, result.endpoint_url, delivery.payload, delivery.headers
+        )
+        async with self._host_slot(delivery.host):
+            await self._execute_attempt(attempt, delivery.payload_str)
+        self.stats["attempts"] += 1
+
+        # Any response below 500 shows the host is up, even a rejection;
+        # recording every outcome also releases a half-open probe
+        if attempt.status_code is None or attempt.status_code >= 500:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+
+        result.add_attempt(attempt)
+
+        if result.final_status == WebhookStatus.RETRY:
+            delay = self._retry_delay(attempt.attempt_number)
+            self.stats["retries_scheduled"] += 1
+            logger.info(
+                "Webhook attempt failed, retry scheduled",
+                webhook_id=result.webhook_id,
+                attempt=attempt.attempt_number,
+                status_code=attempt.status_code,
+                error=attempt.error_message,
+                retry_in=round(delay, 2)
+            )
+            self._schedule(delivery, delay)
+        else:
+            self._complete(delivery)
+
+    async def _execute_attempt(self, attempt: WebhookAttempt, payload_str: str) -> None:
+        """Send one request; outcome and errors are recorded on the attempt."""
+        attempt.started_at = datetime.utcnow()
+
+        try:
+            async with self._get_session().post(
+                attempt.url,
+                data=payload_str,
+                headers=attempt.headers
+            ) as response:
+                attempt.status_code = response.status
+                attempt.response_body = await response.text()
+
+        except asyncio.TimeoutError:
+            attempt.error_message = "Request timeout"
+        except aiohttp.ClientError as e:
+            attempt.error_message = f"Client error: {str(e)}"
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            attempt.error_message = f"Unexpected error: {str(e)}"
+
+        attempt.completed_at = datetime.utcnow()
+        attempt.duration_ms = (attempt.completed_at - attempt.started_at).total_seconds() * 1000
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Shared HTTP session, created on first use."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                ssl=None if self.verify_ssl else False,
+                limit=self.max_connections,
+                limit_per_host=self.per_host_concurrency
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout_seconds, connect=5),
+                headers={
+                    "User-Agent": "CounterfeitDetection-Webhook/1.0",
+                    "Content-Type": "application/json"
+                }
+            )
+        return self._session
+
+    def _abort(self, delivery: WebhookDelivery, reason: str) -> None:
+        """Fail a delivery without another attempt."""
+        delivery.result.final_status = WebhookStatus.FAILED
+        delivery.result.error_message = reason
+        self._complete(delivery)
+
+    def _complete(self, delivery: WebhookDelivery) -> None:
+        """Record a delivery's final outcome."""
+        result = delivery.result
+        self._open_deliveries.discard(delivery)
+        result.complete()
+        last_attempt = result.get_last_attempt()
+
+        if result.is_successful():
+            self.stats["delivered"] += 1
+        else:
+            self.stats["failed"] += 1
+
+        logger.info(
+            "Webhook delivery completed",
+            webhook_id=result.webhook_id,
+            url=result.endpoint_url,
+            final_status=result.final_status.value,
+            total_attempts=len(result.attempts),
+            total_duration_ms=result.total_duration_ms
+        )
+
+        context = delivery.log_context or {}
+        if context.get("user_id"):
+            self._pending_logs.append({
+                "product_id": context.get("product_id"),
+                "user_id": context["user_id"],
+                "notification_type": "webhook",
+                "delivery_status": NotificationStatus.SENT if result.is_successful() else NotificationStatus.FAILED,
+                "payload": {
+                    "alert_id": context.get("alert_id"),
+                    "webhook_id": result.webhook_id,
+                    "url": result.endpoint_url,
+                    "attempts": len(result.attempts),
+                    "status_code": last_attempt.status_code if last_attempt else None
+                },
+                "error_message": None if result.is_successful() else (
+                    result.error_message or (
+                        (last_attempt.error_message or f"HTTP {last_attempt.status_code}")
+                        if last_attempt else "Not attempted"
+                    )
+                )
+            })
+            if len(self._pending_logs) >= self.log_batch_size:
+                self._queue_changed.set()
+
+    async def _flush_logs(self) -> None:
+        """Write buffered outcomes to notification_logs."""
+        if not self._pending_logs:
+            return
+        entries, self._pending_logs = self._pending_logs, []
+
+        try:
+            async with get_db_session() as session:
+                await NotificationRepository(session).log_notifications(entries)
+        except Exception as e:
+            logger.error("Failed to log webhook outcomes", error=str(e), count=len(entries))
+
+
+_delivery_engine: Optional[WebhookDeliveryEngine] = None
+
+
+def get_webhook_delivery_engine() -> WebhookDeliveryEngine:
+    """Get the process-wide webhook delivery engine."""
+    global _delivery_engine
+    if _delivery_engine is None:
+        settings = get_settings()
+        _delivery_engine = WebhookDeliveryEngine(
+            max_attempts=settings.webhook_max_attempts,
+            retry_base_delay_seconds=settings.webhook_retry_base_delay_seconds,
+            retry_max_delay_seconds=settings.webhook_retry_max_delay_seconds,
+            timeout_seconds=settings.webhook_timeout_seconds,
+            per_host_concurrency=settings.webhook_per_host_concurrency,
+            circuit_failure_threshold=settings.webhook_circuit_failure_threshold,
+            circuit_reset_seconds=settings.webhook_circuit_reset_seconds,
+            max_deferral_seconds=settings.webhook_max_deferral_seconds
+        )
+    return _delivery_engine
+
+
+async def shutdown_webhook_delivery_engine() -> None:
+    """Stop the process-wide delivery engine, if created."""
+    global _delivery_engine
+    if _delivery_engine is not None:
+        await _delivery_engine.close()
+        _delivery_engine = None
@@ -1,9 +1,9 @@
 """
 Webhook Service for external system integrations.
 
-This service handles webhook delivery with signature verification,
-retry logic, and comprehensive error handling for reliable integration
-with external systems.
+This service formats and signs webhooks and hands them to the shared
+delivery engine, which retries failed attempts in the background with
+per-host circuit breaking for reliable integration with external systems.
 """
 
 import asyncio
@@ -11,75 +11,24 @@ import hashlib
 import hmac
 import json
 import time
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import Any, Dict, List, Optional
 from uuid import uuid4
 
-import aiohttp
 import structlog
 
 from ..agents.notification_agent import AlertPayload
 from ..core.config import get_settings
 from ..models.enums import WebhookEventType, WebhookStatus
+from .webhook_delivery import (
+    WebhookDeliveryEngine,
+    WebhookDeliveryResult,
+    get_webhook_delivery_engine
+)
 
 logger = structlog.get_logger(__name__)
 
 
-class WebhookAttempt:
-    """Represents a webhook delivery attempt."""
-    
-    def __init__(
-        self,
-        attempt_number: int,
-        url: str,
-        payload: Dict[str, Any],
-        headers: Dict[str, str]
-    ):
-        self.attempt_number = attempt_number
-        self.url = url
-        self.payload = payload
-        self.headers = headers
-        self.started_at: Optional[datetime] = None
-        self.completed_at: Optional[datetime] = None
-        self.status_code: Optional[int] = None
-        self.response_body: Optional[str] = None
-        self.error_message: Optional[str] = None
-        self.duration_ms: Optional[float] = None
-
-
-class WebhookDeliveryResult:
-    """Result of webhook delivery including all attempts."""
-    
-    def __init__(self, webhook_id: str, endpoint_url: str):
-        self.webhook_id = webhook_id
-        self.endpoint_url = endpoint_url
-        self.attempts: List[WebhookAttempt] = []
-        self.final_status: WebhookStatus = WebhookStatus.PENDING
-        self.total_duration_ms: float = 0.0
-        self.created_at = datetime.utcnow()
-        self.completed_at: Optional[datetime] = None
-    
-    def add_attempt(self, attempt: WebhookAttempt):
-        """Add an attempt to the delivery result."""
-        self.attempts.append(attempt)
-        
-        # Update final status based on last attempt
-        if attempt.status_code and 200 <= attempt.status_code < 300:
-            self.final_status = WebhookStatus.DELIVERED
-        elif len(self.attempts) >= 3:  # Max attempts reached
-            self.final_status = WebhookStatus.FAILED
-        else:
-            self.final_status = WebhookStatus.RETRY
-    
-    def is_successful(self) -> bool:
-        """Check if delivery was successful."""
-        return self.final_status == WebhookStatus.DELIVERED
-    
-    def get_last_attempt(self) -> Optional[WebhookAttempt]:
-        """Get the last delivery attempt."""
-        return self.attempts[-1] if self.attempts else None
-
-
 class WebhookFormatter:
     """Formats alerts for webhook delivery."""
     
@@ -178,63 +127,42 @@ class WebhookSignatureGenerator:
 class WebhookService:
     """Service for delivering webhooks to external systems."""
     
-    def __init__(self):
+    def __init__(self, engine: Optional[WebhookDeliveryEngine] = None):
         self.settings = get_settings()
         self.formatter = WebhookFormatter()
         self.signature_generator = WebhookSignatureGenerator()
         
-        # Retry configuration
-        self.max_attempts = 3
-        self.backoff_delays = [1, 2, 4]  # seconds
-        self.timeout = 10  # seconds
-        self.verify_ssl = True
-        
-        # HTTP session for webhook delivery
-        self.session: Optional[aiohttp.ClientSession] = None
+        # Shared engine: connection pool, retry scheduler and circuit breakers
+        self.engine = engine or get_webhook_delivery_engine()
     
     async def __aenter__(self):
         """Async context manager entry."""
-        connector = aiohttp.TCPConnector(
-            verify_ssl=self.verify_ssl,
-            limit=100,  # Connection pool limit
-            limit_per_host=10
-        )
-        
-        timeout = aiohttp.ClientTimeout(
-            total=self.timeout,
-            connect=5,
-            sock_read=10
-        )
-        
-        self.session = aiohttp.ClientSession(
-            connector=connector,
-            timeout=timeout,
-            headers={
-                "User-Agent": "CounterfeitDetection-Webhook/1.0",
-                "Content-Type": "application/json"
-            }
-        )
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        """Async context manager exit."""
-        if self.session:
-            await self.session.close()
+        """Async context manager exit (the shared engine stays open)."""
+        pass
     
     async def send_webhook_notification(
         self, 
         alert: AlertPayload, 
-        config: Dict[str, Any]
+        config: Dict[str, Any],
+        user_id: Optional[str] = None
     ) -> bool:
         """
-        Send webhook notification with retry logic.
+        Queue webhook notification for delivery.
+        
+        Returns once the first attempt is started; retries and the final
+        outcome (logged to notification_logs for the user) happen in the
+        background.
         
         Args:
             alert: Alert payload to send
             config: Webhook endpoint configuration
+            user_id: Recipient user ID for the notification log
             
         Returns:
-            True if successful, False otherwise
+            True if queued, False otherwise
         """
         webhook_url = config.get("url")
         if not webhook_url:
@@ -252,26 +180,22 @@ class WebhookService:
                 payload=webhook_payload,
                 secret=config.get("secret"),
                 custom_headers=config.get("headers", {}),
-                event_type=event_type
+                event_type=event_type,
+                wait_for_completion=False,
+                log_context={
+                    "user_id": user_id,
+                    "product_id": alert.product.get("id"),
+                    "alert_id": alert.alert_id
+                }
             )
             
-            if result.is_successful():
-                logger.info(
-                    "Webhook delivered successfully",
-                    alert_id=alert.alert_id,
-                    webhook_url=webhook_url,
-                    attempts=len(result.attempts)
-                )
-                return True
-            else:
-                logger.error(
-                    "Webhook delivery failed",
-                    alert_id=alert.alert_id,
-                    webhook_url=webhook_url,
-                    attempts=len(result.attempts),
-                    final_status=result.final_status.value
-                )
-                return False
+            logger.info(
+                "Webhook queued",
+                alert_id=alert.alert_id,
+                webhook_url=webhook_url,
+                webhook_id=result.webhook_id
+            )
+            return True
         
         except Exception as e:
             logger.error("Webhook notification error", error=str(e), alert_id=alert.alert_id)
@@ -283,10 +207,13 @@ class WebhookService:
         payload: Dict[str, Any],
         secret: Optional[str] = None,
         custom_headers: Optional[Dict[str, str]] = None,
-        event_type: WebhookEventType = WebhookEventType.PRODUCT_FLAGGED
+        event_type: WebhookEventType = WebhookEventType.PRODUCT_FLAGGED,
+        wait_for_completion: bool = True,
+        log_context: Optional[Dict[str, Any]] = None,
+        fail_fast: bool = False
     ) -> WebhookDeliveryResult:
         """
-        Deliver webhook with retry logic and exponential backoff.
+        Deliver webhook with scheduled retries and exponential backoff.
         
         Args:
             webhook_url: Target webhook URL
@@ -294,141 +221,45 @@ class WebhookService:
             secret: Optional secret for signature generation
             custom_headers: Optional custom headers
             event_type: Type of webhook event
+            wait_for_completion: Wait for the final outcome instead of
+                returning the pending result
+            log_context: user_id, product_id and alert_id for notification_logs
+            fail_fast: Fail at once if the host's circuit is open instead of
+                waiting for it to recover
             
         Returns:
             WebhookDeliveryResult with delivery details
         """
         webhook_id = str(uuid4())
-        result = WebhookDeliveryResult(webhook_id, webhook_url)
-        start_time = datetime.utcnow()
         
-        try:
-            # Prepare payload
-            payload_str = json.dumps(payload, separators=(',', ':'), sort_keys=True)
-            
-            # Prepare headers
-            headers = {
-                "X-Webhook-ID": webhook_id,
-                "X-Webhook-Event": event_type.value,
-                "X-Webhook-Timestamp": str(int(time.time())),
-                "X-Webhook-Version": "1.0"
-            }
-            
-            # Add signature if secret provided
-            if secret:
-                signature = self.signature_generator.generate_signature(payload_str, secret)
-                headers["X-Webhook-Signature"] = f"sha256={signature}"
-            
-            # Add custom headers
-            if custom_headers:
-                headers.update(custom_headers)
-            
-            # Attempt delivery with retries
-            for attempt_num in range(1, self.max_attempts + 1):
-                attempt = WebhookAttempt(attempt_num, webhook_url, payload, headers.copy())
-                
-                try:
-                    await self._execute_webhook_attempt(attempt, payload_str)
-                    result.add_attempt(attempt)
-                    
-                    # Check if successful
-                    if attempt.status_code and 200 <= attempt.status_code < 300:
-                        break  # Success, exit retry loop
-                    
-                    # If this wasn't the last attempt, wait before retrying
-                    if attempt_num < self.max_attempts:
-                        delay = self.backoff_delays[min(attempt_num - 1, len(self.backoff_delays) - 1)]
-                        logger.info(
-                            "Webhook attempt failed, retrying",
-                            webhook_id=webhook_id,
-                            attempt=attempt_num,
-                            status_code=attempt.status_code,
-                            retry_in=delay
-                        )
-                        await asyncio.sleep(delay)
-                
-                except Exception as e:
-                    attempt.error_message = str(e)
-                    result.add_attempt(attempt)
-                    
-                    logger.error(
-                        "Webhook attempt error",
-                        webhook_id=webhook_id,
-                        attempt=attempt_num,
-                        error=str(e)
-                    )
-                    
-                    # If this wasn't the last attempt, wait before retrying
-                    if attempt_num < self.max_attempts:
-                        delay = self.backoff_delays[min(attempt_num - 1, len(self.backoff_delays) - 1)]
-                        await asyncio.sleep(delay)
-            
-            # Calculate total duration
-            result.completed_at = datetime.utcnow()
-            result.total_duration_ms = (result.completed_at - start_time).total_seconds() * 1000
-            
-            logger.info(
-                "Webhook delivery completed",
-                webhook_id=webhook_id,
-                url=webhook_url,
-                final_status=result.final_status.value,
-                total_attempts=len(result.attempts),
-                total_duration_ms=result.total_duration_ms
-            )
-            
-            return result
+        # Prepare payload
+        payload_str = json.dumps(payload, separators=(',', ':'), sort_keys=True)
         
-        except Exception as e:
-            logger.error("Webhook delivery failed", error=str(e), webhook_id=webhook_id)
-            result.final_status = WebhookStatus.FAILED
-            result.completed_at = datetime.utcnow()
-            result.total_duration_ms = (result.completed_at - start_time).total_seconds() * 1000
-            return result
-    
-    async def _execute_webhook_attempt(self, attempt: WebhookAttempt, payload_str: str) -> None:
-        """Execute a single webhook delivery attempt."""
-        attempt.started_at = datetime.utcnow()
+        # Prepare headers
+        headers = {
+            "X-Webhook-ID": webhook_id,
+            "X-Webhook-Event": event_type.value,
+            "X-Webhook-Timestamp": str(int(time.time())),
+            "X-Webhook-Version": "1.0"
+        }
         
-        try:
-            if not self.session:
-                # Create temporary session if not in context manager
-                async with aiohttp.ClientSession() as session:
-                    async with session.post(
-                        attempt.url,
-                        data=payload_str,
-                        headers=attempt.headers
-                    ) as response:
-                        attempt.status_code = response.status
-                        attempt.response_body = await response.text()
-            else:
-                async with self.session.post(
-                    attempt.url,
-                    data=payload_str,
-                    headers=attempt.headers
-                ) as response:
-                    attempt.status_code = response.status
-                    attempt.response_body = await response.text()
-            
-            attempt.completed_at = datetime.utcnow()
-            attempt.duration_ms = (attempt.completed_at - attempt.started_at).total_seconds() * 1000
-            
-        except asyncio.TimeoutError:
-            attempt.completed_at = datetime.utcnow()
-            attempt.duration_ms = (attempt.completed_at - attempt.started_at).total_seconds() * 1000
-            attempt.error_message = "Request timeout"
-            raise
+        # Add signature if secret provided
+        if secret:
+            signature = self.signature_generator.generate_signature(payload_str, secret)
+            headers["X-Webhook-Signature"] = f"sha256={signature}"
         
-        except aiohttp.ClientError as e:
-            attempt.completed_at = datetime.utcnow()
-            attempt.duration_ms = (attempt.completed_at - attempt.started_at).total_seconds() * 1000
-            attempt.error_message = f"Client error: {str(e)}"
-            raise
+        # Add custom headers
+        if custom_headers:
+            headers.update(custom_headers)
         
-        except Exception as e:
-            attempt.completed_at = datetime.utcnow()
-            attempt.duration_ms = (attempt.completed_at - attempt.started_at).total_seconds() * 1000
-            attempt.error_message = f"Unexpected error: {str(e)}"
-            raise
+        result = self.engine.submit(
+            webhook_url, payload, payload_str, headers, log_context, fail_fast=fail_fast
+        )
+        
+        if wait_for_completion:
+            await result.wait()
+        
+        return result
     
     async def test_webhook_endpoint(
         self,
@@ -464,57 +295,57 @@ class WebhookService:
             payload=test_payload,
             secret=secret,
             custom_headers=custom_headers,
-            event_type=WebhookEventType.TEST
+            event_type=WebhookEventType.TEST,
+            fail_fast=True
         )
     
     async def batch_deliver_webhooks(
         self,
-        deliveries: List[Dict[str, Any]]
+        deliveries: List[Dict[str, Any]],
+        wait_for_completion: bool = True
     ) -> List[WebhookDeliveryResult]:
         """
         Deliver multiple webhooks concurrently.
         
         Args:
             deliveries: List of webhook delivery configurations
+            wait_for_completion: Wait until every delivery has a final outcome;
+                pass False to return the pending results at once
             
         Returns:
             List of WebhookDeliveryResult objects
         """
-        # Create tasks for concurrent delivery
-        tasks = []
+        results = []
         for delivery in deliveries:
-            task = self.deliver_webhook(
-                webhook_url=delivery["url"],
-                payload=delivery["payload"],
-                secret=delivery.get("secret"),
-                custom_headers=delivery.get("headers"),
-                event_type=WebhookEventType(delivery.get("event_type", "product_flagged"))
-            )
-            tasks.append(task)
-        
-        # Execute all deliveries concurrently
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-        
-        # Process results
-        delivery_results = []
-        for i, result in enumerate(results):
-            if isinstance(result, Exception):
-                # Create failed result for exceptions
-                webhook_id = str(uuid4())
-                failed_result = WebhookDeliveryResult(webhook_id, deliveries[i]["url"])
-                failed_result.final_status = WebhookStatus.FAILED
-                failed_result.completed_at = datetime.utcnow()
-                delivery_results.append(failed_result)
+            try:
+                result = await self.deliver_webhook(
+                    webhook_url=delivery["url"],
+                    payload=delivery["payload"],
+                    secret=delivery.get("secret"),
+                    custom_headers=delivery.get("headers"),
+                    event_type=WebhookEventType(delivery.get("event_type", "product_flagged")),
+                    wait_for_completion=False,
+                    log_context=delivery.get("log_context")
+                )
+            except Exception as e:
+                # Create failed result so one bad delivery doesn't fail the batch
+                result = WebhookDeliveryResult(str(uuid4()), delivery.get("url"))
+                result.final_status = WebhookStatus.FAILED
+                result.error_message = str(e)
+                result.complete()
                 
                 logger.error(
                     "Batch webhook delivery failed",
-                    webhook_url=deliveries[i]["url"],
-                    error=str(result)
+                    webhook_url=delivery.get("url"),
+                    error=str(e)
                 )
-            else:
-                delivery_results.append(result)
+            results.append(result)
+        
+        # Slow endpoints delay only this wait, not the other deliveries
+        if wait_for_completion:
+            await asyncio.gather(*(result.wait() for result in results))
         
-        return delivery_results
+        return results
     
     def get_webhook_statistics(self, results: List[WebhookDeliveryResult]) -> Dict[str, Any]:
         """
@@ -29,6 +29,12 @@ from ..models.zkproof import ZKProof, ZKProofCircuit, ProofType, VerificationSta
 from ..models.audit_proof import AuditProof
 from ..services.file_storage_service import FileStorageService
 from ..services.encryption_service import EncryptionService
+from ..services.snarkjs_worker_pool import (
+    SnarkjsWorkerPool,
+    SnarkjsWorkerError,
+    SnarkjsWorkerUnavailable,
+    get_snarkjs_worker_pool
+)
 
 logger = structlog.get_logger(__name__)
 
@@ -101,6 +107,9 @@ class ZKProofService:
         self.verification_cache = {}
         self.max_cache_size = 1000
         self.cache_ttl_seconds = 3600
+        
+        # Resident snarkjs workers (shared by all service instances)
+        self.worker_pool: SnarkjsWorkerPool = get_snarkjs_worker_pool()
     
     async def generate_product_proof(
         self,
@@ -505,6 +514,40 @@ class ZKProofService:
             logger.error("Failed to batch verify proofs", error=str(e))
             raise
     
+    async def verify_proof_payloads(
+        self,
+        payloads: List[Tuple[str, Dict[str, Any], Any]]
+    ) -> List[Any]:
+        """
+        Verify already-loaded proofs through the resident snarkjs workers.
+        
+        Args:
+            payloads: (verification_key_path, proof_data, public_signals) tuples
+            
+        Returns:
+            One entry per payload: True/False, or the exception for that proof
+        """
+        outcomes = await self.worker_pool.verify_many(payloads)
+        
+        # Workers unavailable: fall back to one CLI process per proof, running
+        # as many processes at a time as the pool would
+        unavailable = [
+            i for i, outcome in enumerate(outcomes)
+            if isinstance(outcome, SnarkjsWorkerUnavailable)
+        ]
+        if unavailable:
+            slots = asyncio.Semaphore(max(self.worker_pool.size, 1))
+            
+            async def verify_with_cli(i: int) -> bool:
+                async with slots:
+                    return await self._verify_proof_with_snarkjs_cli(*payloads[i])
+            
+            cli_outcomes = await asyncio.gather(*(verify_with_cli(i) for i in unavailable))
+            for i, outcome in zip(unavailable, cli_outcomes):
+                outcomes[i] = outcome
+        
+        return outcomes
+    
     # Helper methods
     
     async def _get_active_circuit(
@@ -590,10 +633,34 @@ class ZKProofService:
         proof_data: ZKProofGenerationData
     ) -> Dict[str, Any]:
         """Generate proof using Circom circuit and snarkjs."""
+        # Combine inputs
+        all_inputs = {**proof_data.private_inputs, **proof_data.public_inputs}
+        
+        try:
+            # Witness and proof computed in memory by a resident worker
+            return await self.worker_pool.full_prove(
+                circuit.circuit_file_path.replace('.r1cs', '.wasm'),
+                circuit.proving_key_path,
+                all_inputs
+            )
+        except SnarkjsWorkerUnavailable as e:
+            logger.warning(
+                "snarkjs workers unavailable, generating proof with CLI",
+                circuit_name=circuit.circuit_name,
+                error=str(e)
+            )
+            return await self._generate_proof_with_circuit_files(circuit, all_inputs)
+        except SnarkjsWorkerError as e:
+            logger.error("Failed to generate proof with circuit", circuit_name=circuit.circuit_name, error=str(e))
+            raise
+    
+    async def _generate_proof_with_circuit_files(
+        self,
+        circuit: ZKProofCircuit,
+        all_inputs: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Generate proof with one snarkjs CLI process per step, via temporary files."""
         try:
-            # Combine inputs
-            all_inputs = {**proof_data.private_inputs, **proof_data.public_inputs}
-            
             # Create temporary input file
             with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
                 json.dump(all_inputs, f)
@@ -640,7 +707,25 @@ class ZKProofService:
         proof_data: Dict[str, Any],
         public_signals: Dict[str, Any]
     ) -> bool:
-        """Verify proof using snarkjs."""
+        """Verify proof using a resident snarkjs worker."""
+        try:
+            return await self.worker_pool.verify(verification_key_path, proof_data, public_signals)
+        except SnarkjsWorkerUnavailable as e:
+            logger.warning("snarkjs workers unavailable, verifying with CLI", error=str(e))
+            return await self._verify_proof_with_snarkjs_cli(
+                verification_key_path, proof_data, public_signals
+            )
+        except SnarkjsWorkerError as e:
+            logger.error("snarkjs verification failed", error=str(e))
+            return False
+    
+    async def _verify_proof_with_snarkjs_cli(
+        self,
+        verification_key_path: str,
+        proof_data: Dict[str, Any],
+        public_signals: Dict[str, Any]
+    ) -> bool:
+        """Verify proof by spawning the snarkjs CLI."""
         try:
             # Create temporary files for verification
             with tempfile.NamedTemporaryFile(mode='w', suffix='_proof.json', delete=False) as f:
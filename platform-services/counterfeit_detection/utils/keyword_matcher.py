@@ -0,0 +1,189 @@
+"""
+Multi-pattern keyword matcher.
+
+Compiles any number of literal keywords into one trie-shaped regular
+expression per normalisation variant, so a single scan of the text reports
+every keyword occurrence (overlapping and nested ones included) instead of
+one substring search per keyword.
+"""
+
+import re
+from typing import Dict, Hashable, Optional, Set, Tuple
+
+
+# Common character substitutions used to evade keyword filters ("r3pl1ca")
+LEET_TRANSLATION = str.maketrans({
+    "0": "o",
+    "1": "i",
+    "3": "e",
+    "4": "a",
+    "5": "s",
+    "7": "t",
+    "8": "b",
+    "@": "a",
+    "$": "s",
+    "!": "i",
+    "|": "l"
+})
+
+_SEPARATORS = re.compile(r"[\W_]+")
+
+# Normalisation variant: (case_sensitive, leet_speak, fuzzy)
+_Variant = Tuple[bool, bool, bool]
+
+
+def normalize_text(text: str, case_sensitive: bool = False, leet_speak: bool = False, fuzzy: bool = False) -> str:
+    """
+    Normalise text (or a keyword) for matching.
+
+    Args:
+        text: Text to normalise
+        case_sensitive: Keep the original case
+        leet_speak: Map leet-speak substitutions to letters (implies lower case)
+        fuzzy: Drop separators, so "r.e.p.l.i.c.a" matches "replica"
+
+    Returns:
+        Normalised text
+    """
+    if not case_sensitive or leet_speak:
+        text = text.lower()
+    if leet_speak:
+        text = text.translate(LEET_TRANSLATION)
+    if fuzzy:
+        text = _SEPARATORS.sub("", text)
+    return text
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+
+class _VariantIndex:
+    """Keywords sharing one normalisation, compiled into a trie regex."""
+
+    def __init__(self):
+        # Trie of normalised keywords; the "" key holds (key, word_boundary)
+        # entries for keywords ending at that node
+        self.trie: Dict[str, dict] = {}
+        self.regex: Optional["re.Pattern[str]"] = None
+
+    def add(self, keyword: str, key: Hashable, word_boundary: bool) -> None:
+        node = self.trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node.setdefault("", []).append((key, word_boundary))
+        self.regex = None
+
+    def compile(self) -> None:
+        # The lookahead makes every start position a (zero-width) match, so
+        # overlapping keywords are all found; the trie alternation is greedy,
+        # so each match is the longest keyword starting at that position
+        self.regex = re.compile("(?=(" + self._node_pattern(self.trie) + "))")
+
+    def _node_pattern(self, node: dict) -> str:
+        branches = [
+            re.escape(char) + self._node_pattern(child)
+            for char, child in sorted(node.items())
+            if char != ""
+        ]
+        if not branches:
+            return ""
+        pattern = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" in node:
+            pattern = "(?:" + pattern + ")?"
+        return pattern
+
+    def find(self, text: str, found: Set[Hashable]) -> None:
+        if self.regex is None:
+            self.compile()
+
+        for match in self.regex.finditer(text):
+            start = match.start()
+            boundary_before = start == 0 or not _is_word_char(text[start - 1])
+
+            # Every keyword starting here is a prefix of the longest one
+            node = self.trie
+            for offset, char in enumerate(match.group(1), start + 1):
+                node = node[char]
+                entries = node.get("")
+                if not entries:
+                    continue
+                boundary_after = offset == len(text) or not _is_word_char(text[offset])
+                for key, word_boundary in entries:
+                    if not word_boundary or (boundary_before and boundary_after):
+                        found.add(key)
+
+
+class KeywordMatcher:
+    """
+    Matches many literal keywords against a text in one pass per variant.
+
+    Each keyword is registered under a caller-chosen key; find() returns the
+    keys of all keywords present in the text. Keywords with the same
+    normalisation options share one compiled expression, so the cost of a
+    lookup is roughly independent of the number of keywords.
+    """
+
+    def __init__(self):
+        """Initialize an empty matcher."""
+        self._variants: Dict[_Variant, _VariantIndex] = {}
+        self._always: Set[Hashable] = set()
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(
+        self,
+        key: Hashable,
+        keyword: str,
+        case_sensitive: bool = False,
+        word_boundary: bool = False,
+        leet_speak: bool = False,
+        fuzzy: bool = False
+    ) -> None:
+        """
+        Register a keyword.
+
+        Args:
+            key: Value reported by find() when the keyword is present
+            keyword: Literal keyword
+            case_sensitive: Match case exactly
+            word_boundary: Only match whole words (ignored with fuzzy)
+            leet_speak: Also match leet-speak spellings
+            fuzzy: Ignore separators inside and around the keyword
+        """
+        variant = (case_sensitive and not leet_speak, leet_speak, fuzzy)
+        normalized = normalize_text(keyword, *variant)
+        self._size += 1
+
+        if not normalized:
+            # Empty keywords are contained in every text
+            self._always.add(key)
+            return
+
+        index = self._variants.get(variant)
+        if index is None:
+            index = self._variants[variant] = _VariantIndex()
+        index.add(normalized, key, word_boundary and not fuzzy)
+
+    def compile(self) -> "KeywordMatcher":
+        """Compile all variants (otherwise done lazily on first use)."""
+        for index in self._variants.values():
+            index.compile()
+        return self
+
+    def find(self, text: str) -> Set[Hashable]:
+        """
+        Find all registered keywords present in the text.
+
+        Args:
+            text: Text to scan
+
+        Returns:
+            Keys of the keywords found
+        """
+        found = set(self._always)
+        for variant, index in self._variants.items():
+            index.find(normalize_text(text, *variant), found)
+        return found
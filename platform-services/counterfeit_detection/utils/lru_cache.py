@@ -0,0 +1,249 @@
+"""
+Bounded LRU cache with per-entry TTL and byte accounting.
+
+Shared in-process cache primitive: O(1) get/set/evict on an OrderedDict,
+bounded by entry count and/or total bytes, with optional expiry per entry,
+hit/miss/eviction statistics and single-flight async loading.
+"""
+
+import asyncio
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterator, Optional, Tuple
+
+
+_MISSING = object()
+
+
+def default_size_of(value: Any) -> int:
+    """Approximate size of a cached value in bytes."""
+    nbytes = getattr(value, "nbytes", None)
+    if isinstance(nbytes, int):
+        return nbytes
+    if isinstance(value, (bytes, bytearray, str)):
+        return len(value)
+    return sys.getsizeof(value)
+
+
+class _CacheEntry:
+    __slots__ = ("value", "size", "expires_at")
+
+    def __init__(self, value: Any, size: int, expires_at: Optional[float]):
+        self.value = value
+        self.size = size
+        self.expires_at = expires_at
+
+
+class LRUCache:
+    """
+    Least-recently-used cache with optional TTL and size limits.
+
+    All operations are O(1) except purge_expired. Mutations hold a
+    threading lock for a few dictionary operations only, so the cache is
+    safe to share between the event loop and executor threads; the lock is
+    never held across an await.
+    """
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        default_ttl_seconds: Optional[float] = None,
+        size_of: Callable[[Any], int] = default_size_of,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of entries (None for unbounded)
+            max_bytes: Maximum total size of values in bytes (None for unbounded)
+            default_ttl_seconds: Expiry applied when set() is given no TTL
+            size_of: Function returning a value's size in bytes
+            clock: Monotonic time source (injectable for tests)
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl_seconds = default_ttl_seconds
+        self._size_of = size_of
+        self._clock = clock
+
+        self._entries: "OrderedDict[Hashable, _CacheEntry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._loading: Dict[Hashable, asyncio.Future] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.peek(key, _MISSING) is not _MISSING
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(list(self._entries))
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get a value and mark it as most recently used."""
+        with self._lock:
+            entry = self._live_entry(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.value
+
+    def peek(self, key: Hashable, default: Any = None) -> Any:
+        """Get a value without updating recency or statistics."""
+        with self._lock:
+            entry = self._live_entry(key)
+            return default if entry is None else entry.value
+
+    def set(
+        self,
+        key: Hashable,
+        value: Any,
+        ttl_seconds: Optional[float] = None,
+        size: Optional[int] = None
+    ) -> None:
+        """
+        Store a value, evicting least recently used entries over the limits.
+
+        Args:
+            key: Cache key
+            value: Value to store
+            ttl_seconds: Expiry for this entry (defaults to default_ttl_seconds)
+            size: Size in bytes (computed with size_of if omitted)
+        """
+        size = self._size_of(value) if size is None else size
+        ttl_seconds = self.default_ttl_seconds if ttl_seconds is None else ttl_seconds
+        expires_at = self._clock() + ttl_seconds if ttl_seconds is not None else None
+
+        with self._lock:
+            self._remove(key)
+
+            # A value larger than the whole budget is never cached
+            if self.max_bytes is not None and size > self.max_bytes:
+                return
+
+            self._entries[key] = _CacheEntry(value, size, expires_at)
+            self._bytes += size
+
+            while self._entries and (
+                (self.max_entries is not None and len(self._entries) > self.max_entries)
+                or (self.max_bytes is not None and self._bytes > self.max_bytes)
+            ):
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+                self.evictions += 1
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove a key and return its value."""
+        with self._lock:
+            entry = self._remove(key)
+            if entry is None or self._is_expired(entry):
+                return default
+            return entry.value
+
+    def clear(self) -> None:
+        """Remove all entries (statistics are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def items(self) -> Iterator[Tuple[Hashable, Any]]:
+        """Snapshot of live (key, value) pairs, least recently used first."""
+        with self._lock:
+            return iter([
+                (key, entry.value) for key, entry in self._entries.items()
+                if not self._is_expired(entry)
+            ])
+
+    def purge_expired(self) -> int:
+        """Remove all expired entries; returns the number removed."""
+        with self._lock:
+            expired = [key for key, entry in self._entries.items() if self._is_expired(entry)]
+            for key in expired:
+                self._remove(key)
+            self.expirations += len(expired)
+            return len(expired)
+
+    async def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+        ttl_seconds: Optional[float] = None
+    ) -> Any:
+        """
+        Get a value, loading and caching it on a miss.
+
+        Concurrent callers missing the same key share one loader call. A
+        loader returning None is not cached.
+        """
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        future = self._loading.get(key)
+        if future is not None:
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self._loading[key] = future
+        try:
+            value = await loader()
+            if value is not None:
+                self.set(key, value, ttl_seconds=ttl_seconds)
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark retrieved so waiter-less failures are not logged as unhandled
+            future.exception()
+            raise
+        finally:
+            self._loading.pop(key, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss/eviction counters and current size."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "size_bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations
+        }
+
+    def _live_entry(self, key: Hashable) -> Optional[_CacheEntry]:
+        """Entry for key, dropping it if expired (lock must be held)."""
+        entry = self._entries.get(key)
+        if entry is not None and self._is_expired(entry):
+            self._remove(key)
+            self.expirations += 1
+            return None
+        return entry
+
+    def _remove(self, key: Hashable) -> Optional[_CacheEntry]:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+        return entry
+
+    def _is_expired(self, entry: _CacheEntry) -> bool:
+        return entry.expires_at is not None and entry.expires_at <= self._clock()
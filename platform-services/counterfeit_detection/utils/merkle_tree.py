@@ -7,9 +7,14 @@ for immutable audit trail systems with optimal proof generation.
 
 import hashlib
 import math
-from typing import List, Dict, Any, Tuple, Optional
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Tuple, Optional, Union
 from dataclasses import dataclass
 
+from .lru_cache import LRUCache
+
 
 @dataclass
 class MerkleProof:
@@ -60,39 +65,29 @@ class MerkleTree:
         if len(leaf_hashes) == 1:
             return leaf_hashes[0]
         
-        # Build tree bottom-up
-        current_level = leaf_hashes[:]
+        # Build tree bottom-up, keeping only the current level
+        current_level = [leaf_hash.encode() for leaf_hash in leaf_hashes]
         
         while len(current_level) > 1:
-            next_level = []
-            
-            # Process pairs of nodes
-            for i in range(0, len(current_level), 2):
-                left_hash = current_level[i]
-                
-                if i + 1 < len(current_level):
-                    right_hash = current_level[i + 1]
-                else:
-                    # Odd number of nodes - duplicate the last one
-                    right_hash = left_hash
-                
-                # Combine hashes
-                parent_hash = self._combine_hashes(left_hash, right_hash)
-                next_level.append(parent_hash)
-            
-            current_level = next_level
+            current_level = self._hash_level(current_level)
         
-        return current_level[0]
+        return current_level[0].decode()
     
     def build_tree_with_proofs(
         self, 
-        leaf_hashes: List[str]
+        leaf_hashes: List[str],
+        max_workers: Optional[int] = None
     ) -> Tuple[str, Dict[str, Any]]:
         """
         Build Merkle tree and generate proof data for all leaves.
         
+        Every node is hashed once; each leaf's proof path is then read from
+        the level arrays by index arithmetic, so the whole batch costs
+        O(n log n) rather than one tree rebuild per leaf.
+        
         Args:
             leaf_hashes: List of leaf node hashes
+            max_workers: Hash large levels on this many threads (see build_levels)
             
         Returns:
             Tuple of (root_hash, proof_data_structure)
@@ -100,29 +95,78 @@ class MerkleTree:
         if not leaf_hashes:
             return self.empty_hash, {}
         
-        # Build tree with node tracking
-        tree_data = self._build_tree_with_nodes(leaf_hashes)
-        root_hash = tree_data["root_hash"]
+        levels = self.build_levels(leaf_hashes, max_workers=max_workers)
+        root_hash = levels[-1][0].decode()
+        
+        # Decode each node once; proof paths share the decoded strings
+        hex_levels = [[node.decode() for node in level] for level in levels[:-1]]
         
-        # Generate proofs for all leaves
         proof_data = {
             "root_hash": root_hash,
             "tree_size": len(leaf_hashes),
             "tree_depth": self.calculate_tree_depth(len(leaf_hashes)),
             "leaf_proofs": {},
-            "tree_structure": tree_data["tree_structure"]
+            "tree_structure": {
+                "levels": len(levels),
+                "leaf_count": len(leaf_hashes),
+                "total_nodes": sum(len(level) for level in levels),
+                "is_complete": self._is_complete_tree(len(leaf_hashes))
+            }
         }
         
+        leaf_proofs = proof_data["leaf_proofs"]
         for i, leaf_hash in enumerate(leaf_hashes):
-            proof = self.generate_proof(leaf_hashes, i)
-            proof_data["leaf_proofs"][str(i)] = {
+            leaf_proofs[str(i)] = {
                 "leaf_hash": leaf_hash,
-                "proof_path": proof.proof_path,
+                "proof_path": self._proof_path_from_levels(hex_levels, i),
                 "leaf_index": i
             }
         
         return root_hash, proof_data
     
+    def build_levels(
+        self,
+        leaf_hashes: List[str],
+        max_workers: Optional[int] = None,
+        parallel_threshold: int = 65536
+    ) -> List[List[bytes]]:
+        """
+        Compute every level of the tree, leaves first and root last.
+        
+        Nodes are kept as ASCII hex digests in bytes so parents are hashed
+        without per-node string encoding, while producing the same hashes
+        as _combine_hashes.
+        
+        Args:
+            leaf_hashes: List of leaf node hashes
+            max_workers: Threads used to hash levels with at least
+                ``parallel_threshold`` nodes. hashlib only releases the GIL
+                for inputs of 2 KiB or more, so this pays off on free-threaded
+                interpreters; leave it unset on standard builds.
+            parallel_threshold: Minimum level size for threaded hashing
+            
+        Returns:
+            List of levels, each a list of node hashes
+        """
+        if not leaf_hashes:
+            return [[self.empty_hash.encode()]]
+        
+        levels = [[leaf_hash.encode() for leaf_hash in leaf_hashes]]
+        
+        if max_workers and max_workers > 1 and len(leaf_hashes) >= parallel_threshold:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                while len(levels[-1]) > 1:
+                    levels.append(self._hash_level(
+                        levels[-1],
+                        executor if len(levels[-1]) >= parallel_threshold else None,
+                        max_workers
+                    ))
+        else:
+            while len(levels[-1]) > 1:
+                levels.append(self._hash_level(levels[-1]))
+        
+        return levels
+    
     def generate_proof(self, leaf_hashes: List[str], leaf_index: int) -> MerkleProof:
         """
         Generate Merkle proof for a specific leaf.
@@ -137,14 +181,13 @@ class MerkleTree:
         if leaf_index < 0 or leaf_index >= len(leaf_hashes):
             raise ValueError(f"Invalid leaf index: {leaf_index}")
         
-        root_hash = self.build_tree(leaf_hashes)
-        proof_path = self._generate_proof_path(leaf_hashes, leaf_index)
+        levels = self.build_levels(leaf_hashes)
         
         return MerkleProof(
             leaf_hash=leaf_hashes[leaf_index],
             leaf_index=leaf_index,
-            proof_path=proof_path,
-            root_hash=root_hash,
+            proof_path=self._proof_path_from_levels(levels[:-1], leaf_index, decode=True),
+            root_hash=levels[-1][0].decode(),
             tree_size=len(leaf_hashes)
         )
     
@@ -334,116 +377,66 @@ class MerkleTree:
         combined = left_hash + right_hash
         return self.hash_function(combined.encode()).hexdigest()
     
-    def _generate_proof_path(
-        self, 
-        leaf_hashes: List[str], 
-        leaf_index: int
+    def _hash_level(
+        self,
+        level: List[bytes],
+        executor: Optional[ThreadPoolExecutor] = None,
+        chunks: int = 1
+    ) -> List[bytes]:
+        """Hash one level into its parent level, duplicating an odd last node."""
+        if executor is None or chunks <= 1:
+            return self._hash_pairs(level, 0, len(level))
+        
+        # Even-sized chunks so no pair straddles two workers
+        chunk_size = -(-len(level) // chunks)
+        chunk_size += chunk_size % 2
+        parts = executor.map(
+            lambda start: self._hash_pairs(level, start, min(start + chunk_size, len(level))),
+            range(0, len(level), chunk_size)
+        )
+        return [node for part in parts for node in part]
+    
+    def _hash_pairs(self, level: List[bytes], start: int, end: int) -> List[bytes]:
+        """Hash pairs of nodes in level[start:end] (start must be even)."""
+        sha = self.hash_function
+        paired_end = end - (end - start) % 2
+        parents = [
+            sha(level[i] + level[i + 1]).hexdigest().encode()
+            for i in range(start, paired_end, 2)
+        ]
+        if paired_end < end:
+            # Odd number of nodes - duplicate the last one
+            parents.append(sha(level[end - 1] + level[end - 1]).hexdigest().encode())
+        return parents
+    
+    def _proof_path_from_levels(
+        self,
+        levels: List[List[Any]],
+        leaf_index: int,
+        decode: bool = False
     ) -> List[Dict[str, Any]]:
-        """Generate proof path for a specific leaf."""
-        if len(leaf_hashes) <= 1:
-            return []
-        
+        """Read a leaf's proof path from precomputed levels (root level excluded)."""
         proof_path = []
-        current_level = leaf_hashes[:]
-        current_index = leaf_index
+        index = leaf_index
         
-        while len(current_level) > 1:
-            # Find sibling
-            if current_index % 2 == 0:
-                # Current node is left child
-                if current_index + 1 < len(current_level):
-                    sibling_hash = current_level[current_index + 1]
-                    is_left = False  # Sibling is on the right
-                else:
-                    # No right sibling, use left node itself (duplicate)
-                    sibling_hash = current_level[current_index]
-                    is_left = False
+        for level_number, level in enumerate(levels):
+            if index % 2:
+                sibling, is_left = level[index - 1], True
+            elif index + 1 < len(level):
+                sibling, is_left = level[index + 1], False
             else:
-                # Current node is right child
-                sibling_hash = current_level[current_index - 1]
-                is_left = True  # Sibling is on the left
+                # No right sibling, the node is paired with itself
+                sibling, is_left = level[index], False
             
             proof_path.append({
-                "hash": sibling_hash,
+                "hash": sibling.decode() if decode else sibling,
                 "is_left": is_left,
-                "level": len(proof_path)
+                "level": level_number
             })
-            
-            # Move to next level
-            next_level = []
-            for i in range(0, len(current_level), 2):
-                left_hash = current_level[i]
-                
-                if i + 1 < len(current_level):
-                    right_hash = current_level[i + 1]
-                else:
-                    right_hash = left_hash
-                
-                parent_hash = self._combine_hashes(left_hash, right_hash)
-                next_level.append(parent_hash)
-            
-            current_level = next_level
-            current_index = current_index // 2
+            index //= 2
         
         return proof_path
     
-    def _build_tree_with_nodes(self, leaf_hashes: List[str]) -> Dict[str, Any]:
-        """Build tree and return detailed structure."""
-        if not leaf_hashes:
-            return {"root_hash": self.empty_hash, "tree_structure": {}}
-        
-        # Create leaf nodes
-        nodes = []
-        for i, leaf_hash in enumerate(leaf_hashes):
-            node = MerkleNode(
-                hash=leaf_hash,
-                is_leaf=True,
-                leaf_index=i
-            )
-            nodes.append(node)
-        
-        level_nodes = nodes[:]
-        tree_levels = [level_nodes[:]]
-        
-        # Build tree level by level
-        while len(level_nodes) > 1:
-            next_level = []
-            
-            for i in range(0, len(level_nodes), 2):
-                left_node = level_nodes[i]
-                
-                if i + 1 < len(level_nodes):
-                    right_node = level_nodes[i + 1]
-                else:
-                    # Duplicate last node for odd number
-                    right_node = left_node
-                
-                # Create parent node
-                parent_hash = self._combine_hashes(left_node.hash, right_node.hash)
-                parent_node = MerkleNode(
-                    hash=parent_hash,
-                    left=left_node,
-                    right=right_node,
-                    is_leaf=False
-                )
-                
-                next_level.append(parent_node)
-            
-            level_nodes = next_level
-            tree_levels.append(level_nodes[:])
-        
-        root_node = level_nodes[0] if level_nodes else None
-        
-        return {
-            "root_hash": root_node.hash if root_node else self.empty_hash,
-            "tree_structure": {
-                "levels": len(tree_levels),
-                "leaf_count": len(leaf_hashes),
-                "total_nodes": sum(len(level) for level in tree_levels),
-                "is_complete": self._is_complete_tree(len(leaf_hashes))
-            }
-        }
-    
     def _is_complete_tree(self, leaf_count: int) -> bool:
         """Check if tree with given leaf count is complete (power of 2)."""
         return leaf_count > 0 and (leaf_count & (leaf_count - 1)) == 0
@@ -457,25 +450,21 @@ class OptimizedMerkleTree(MerkleTree):
     with memory-efficient caching and parallel computation support.
     """
     
-    def __init__(self, cache_size: int = 10000):
-        """Initialize optimized Merkle tree with caching."""
+    def __init__(self, cache_size: int = 10000, cache_ttl_seconds: Optional[float] = None):
+        """Initialize optimized Merkle tree with LRU caching."""
         super().__init__()
         self.cache_size = cache_size
-        self.hash_cache = {}
-        self.proof_cache = {}
+        self.hash_cache = LRUCache(max_entries=cache_size, default_ttl_seconds=cache_ttl_seconds)
+        self.proof_cache = LRUCache(max_entries=cache_size, default_ttl_seconds=cache_ttl_seconds)
     
     def build_tree_cached(self, leaf_hashes: List[str]) -> str:
         """Build tree with caching for better performance."""
         cache_key = self._generate_cache_key(leaf_hashes)
         
-        if cache_key in self.hash_cache:
-            return self.hash_cache[cache_key]
-        
-        root_hash = self.build_tree(leaf_hashes)
-        
-        # Cache result if within size limit
-        if len(self.hash_cache) < self.cache_size:
-            self.hash_cache[cache_key] = root_hash
+        root_hash = self.hash_cache.get(cache_key)
+        if root_hash is None:
+            root_hash = self.build_tree(leaf_hashes)
+            self.hash_cache.set(cache_key, root_hash)
         
         return root_hash
     
@@ -487,14 +476,10 @@ class OptimizedMerkleTree(MerkleTree):
         """Generate proof with caching."""
         cache_key = f"{self._generate_cache_key(leaf_hashes)}:{leaf_index}"
         
-        if cache_key in self.proof_cache:
-            return self.proof_cache[cache_key]
-        
-        proof = self.generate_proof(leaf_hashes, leaf_index)
-        
-        # Cache result if within size limit
-        if len(self.proof_cache) < self.cache_size:
-            self.proof_cache[cache_key] = proof
+        proof = self.proof_cache.get(cache_key)
+        if proof is None:
+            proof = self.generate_proof(leaf_hashes, leaf_index)
+            self.proof_cache.set(cache_key, proof)
         
         return proof
     
@@ -508,7 +493,12 @@ class OptimizedMerkleTree(MerkleTree):
         return {
             "hash_cache_size": len(self.hash_cache),
             "proof_cache_size": len(self.proof_cache),
-            "max_cache_size": self.cache_size
+            "max_cache_size": self.cache_size,
+            "hash_cache_hits": self.hash_cache.hits,
+            "hash_cache_misses": self.hash_cache.misses,
+            "proof_cache_hits": self.proof_cache.hits,
+            "proof_cache_misses": self.proof_cache.misses,
+            "evictions": self.hash_cache.evictions + self.proof_cache.evictions
         }
     
     def _generate_cache_key(self, leaf_hashes: List[str]) -> str:
@@ -517,54 +507,254 @@ class OptimizedMerkleTree(MerkleTree):
         return self.hash_function(combined.encode()).hexdigest()[:16]
 
 
-class IncrementalMerkleTree:
+class MerkleNodeStore:
     """
-    Incremental Merkle tree that supports efficient appends.
+    In-memory store of complete-subtree digests, one 32-byte slot per node.
     
-    Optimized for audit logs where new entries are frequently added
-    and historical proofs need to remain valid.
+    Level ``k`` holds the roots of the aligned complete subtrees of 2**k
+    leaves, so level 0 is the leaves themselves. Digests are packed into one
+    bytearray per level (about 64 bytes per leaf in total) rather than kept as
+    hex strings.
     """
     
+    DIGEST_SIZE = 32
+    
     def __init__(self):
-        """Initialize incremental Merkle tree."""
-        self.base_tree = MerkleTree()
-        self.leaf_hashes = []
-        self.cached_roots = {}
-        self.cached_proofs = {}
+        """Initialize an empty node store."""
+        self._levels: List[bytearray] = []
+    
+    def level_count(self) -> int:
+        """Number of levels holding at least one node."""
+        return len(self._levels)
+    
+    def count(self, level: int) -> int:
+        """Number of nodes stored at a level."""
+        if level >= len(self._levels):
+            return 0
+        return len(self._levels[level]) // self.DIGEST_SIZE
+    
+    def get(self, level: int, index: int) -> bytes:
+        """Get the digest at a level and index."""
+        offset = index * self.DIGEST_SIZE
+        return bytes(self._levels[level][offset:offset + self.DIGEST_SIZE])
+    
+    def append(self, level: int, digest: bytes) -> None:
+        """Append a digest to a level."""
+        while level >= len(self._levels):
+            self._levels.append(bytearray())
+        self._levels[level] += digest
+    
+    def truncate(self, level: int, count: int) -> None:
+        """Drop nodes at a level beyond ``count``."""
+        if level < len(self._levels):
+            del self._levels[level][count * self.DIGEST_SIZE:]
+    
+    def flush(self) -> None:
+        """Persist pending writes (no-op for the in-memory store)."""
+    
+    def size_bytes(self) -> int:
+        """Total bytes used by stored digests."""
+        return sum(len(level) for level in self._levels)
+
+
+class FileMerkleNodeStore(MerkleNodeStore):
+    """
+    Append-only on-disk node store with one file of packed digests per level.
+    
+    Reads use positioned I/O so only the O(log n) nodes touched by a proof
+    are loaded; the store survives restarts and keeps memory use constant
+    regardless of log size.
+    """
+    
+    def __init__(self, directory: str):
+        """
+        Open (or create) a node store.
+        
+        Args:
+            directory: Directory holding the level files
+        """
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._fds: List[int] = []
+        self._counts: List[int] = []
+        
+        level = 0
+        while os.path.exists(self._level_path(level)):
+            self._open_level(level)
+            level += 1
+    
+    def level_count(self) -> int:
+        return len(self._fds)
+    
+    def count(self, level: int) -> int:
+        if level >= len(self._counts):
+            return 0
+        return self._counts[level]
+    
+    def get(self, level: int, index: int) -> bytes:
+        digest = os.pread(self._fds[level], self.DIGEST_SIZE, index * self.DIGEST_SIZE)
+        if len(digest) != self.DIGEST_SIZE:
+            raise IndexError(f"Node {index} at level {level} not stored")
+        return digest
+    
+    def append(self, level: int, digest: bytes) -> None:
+        while level >= len(self._fds):
+            self._open_level(len(self._fds))
+        os.write(self._fds[level], digest)
+        self._counts[level] += 1
+    
+    def truncate(self, level: int, count: int) -> None:
+        if level < len(self._fds):
+            os.ftruncate(self._fds[level], count * self.DIGEST_SIZE)
+            self._counts[level] = min(self._counts[level], count)
+    
+    def flush(self) -> None:
+        for fd in self._fds:
+            os.fsync(fd)
+    
+    def size_bytes(self) -> int:
+        return sum(self._counts) * self.DIGEST_SIZE
+    
+    def close(self) -> None:
+        """Close the level files."""
+        for fd in self._fds:
+            os.close(fd)
+        self._fds = []
+        self._counts = []
+    
+    def _level_path(self, level: int) -> str:
+        return os.path.join(self.directory, f"level_{level:02d}.bin")
+    
+    def _open_level(self, level: int) -> None:
+        fd = os.open(self._level_path(level), os.O_RDWR | os.O_CREAT | os.O_APPEND, 0o644)
+        size = os.fstat(fd).st_size
+        # Drop a partially written digest left by a crash
+        if size % self.DIGEST_SIZE:
+            size -= size % self.DIGEST_SIZE
+            os.ftruncate(fd, size)
+        self._fds.append(fd)
+        self._counts.append(size // self.DIGEST_SIZE)
+
+
+@dataclass
+class ConsistencyProof:
+    """Proof that a tree of ``old_size`` leaves is a prefix of one of ``new_size`` leaves."""
+    old_size: int
+    new_size: int
+    old_root: str
+    new_root: str
+    proof_path: List[str]
+
+
+class IncrementalMerkleTree:
+    """
+    Append-only Merkle tree for audit logs (RFC 6962 tree shape).
+    
+    The right-edge frontier is kept in memory so appends and the current
+    root cost O(log n). Every complete subtree digest is kept in a node
+    store, which makes inclusion proofs, consistency proofs and roots at any
+    historical size O(log n) without rebuilding the tree.
     
-    def append_leaf(self, leaf_hash: str) -> Tuple[str, int]:
+    Leaves are the 32-byte entry hashes supplied by the caller; interior
+    nodes are SHA-256(0x01 || left || right), and a tree of n leaves splits
+    at the largest power of two below n, so older roots stay provably
+    consistent with newer ones.
+    """
+    
+    def __init__(self, node_store: Optional[MerkleNodeStore] = None):
+        """
+        Initialize incremental Merkle tree.
+        
+        Args:
+            node_store: Digest store; an existing persistent store is resumed
+        """
+        self.store = node_store or MerkleNodeStore()
+        self.empty_hash = hashlib.sha256(b"").hexdigest()
+        self._lock = threading.RLock()
+        self._repair_store()
+        
+        self.size = self.store.count(0)
+        self._frontier: List[Optional[bytes]] = []
+        for level in range(self.size.bit_length()):
+            if self.size >> level & 1:
+                self._set_frontier(level, self.store.get(level, (self.size >> level) - 1))
+        self._current_root: Optional[bytes] = None
+    
+    def __len__(self) -> int:
+        return self.size
+    
+    def append_leaf(self, leaf_hash: Union[str, bytes]) -> Tuple[str, int]:
         """
         Append new leaf and return new root hash and leaf index.
         
         Args:
-            leaf_hash: Hash of new leaf
+            leaf_hash: Hash of new leaf (hex string or 32 raw bytes)
             
         Returns:
             Tuple of (new_root_hash, leaf_index)
         """
-        self.leaf_hashes.append(leaf_hash)
-        leaf_index = len(self.leaf_hashes) - 1
+        digest = self._to_digest(leaf_hash)
         
-        # Calculate new root
-        new_root = self.base_tree.build_tree(self.leaf_hashes)
-        
-        # Cache root for this size
-        self.cached_roots[len(self.leaf_hashes)] = new_root
+        with self._lock:
+            leaf_index = self.size
+            self.store.append(0, digest)
+            
+            # Merge equal-sized subtrees along the frontier, like a binary carry
+            carry = digest
+            level = 0
+            while level < len(self._frontier) and self._frontier[level] is not None:
+                carry = _hash_children(self._frontier[level], carry)
+                self._frontier[level] = None
+                level += 1
+                self.store.append(level, carry)
+            self._set_frontier(level, carry)
+            
+            self.size += 1
+            self._current_root = None
+            return self.get_current_root(), leaf_index
+    
+    def append_leaves(self, leaf_hashes: List[Union[str, bytes]]) -> Tuple[str, int]:
+        """
+        Append several leaves.
         
-        return new_root, leaf_index
+        Returns:
+            Tuple of (new_root_hash, index_of_first_appended_leaf)
+        """
+        with self._lock:
+            first_index = self.size
+            for leaf_hash in leaf_hashes:
+                self.append_leaf(leaf_hash)
+            return self.get_current_root(), first_index
     
     def get_current_root(self) -> str:
         """Get current root hash."""
-        if not self.leaf_hashes:
-            return self.base_tree.empty_hash
-        
-        size = len(self.leaf_hashes)
-        if size in self.cached_roots:
-            return self.cached_roots[size]
-        
-        root = self.base_tree.build_tree(self.leaf_hashes)
-        self.cached_roots[size] = root
-        return root
+        with self._lock:
+            if self.size == 0:
+                return self.empty_hash
+            
+            if self._current_root is None:
+                root = None
+                for node in self._frontier:
+                    if node is not None:
+                        root = node if root is None else _hash_children(node, root)
+                self._current_root = root
+            return self._current_root.hex()
+    
+    def get_root_at_size(self, tree_size: int) -> str:
+        """Get the root hash the tree had when it held ``tree_size`` leaves."""
+        with self._lock:
+            if tree_size < 0 or tree_size > self.size:
+                raise ValueError(f"Invalid tree size: {tree_size}")
+            if tree_size == 0:
+                return self.empty_hash
+            return self._subtree_root(0, tree_size).hex()
+    
+    def get_leaf(self, leaf_index: int) -> str:
+        """Get a leaf hash by index."""
+        with self._lock:
+            if leaf_index < 0 or leaf_index >= self.size:
+                raise ValueError(f"Invalid leaf index: {leaf_index}")
+            return self.store.get(0, leaf_index).hex()
     
     def get_proof_at_size(self, leaf_index: int, tree_size: int) -> MerkleProof:
         """
@@ -575,27 +765,173 @@ class IncrementalMerkleTree:
             tree_size: Size of tree when proof was valid
             
         Returns:
-            Historical Merkle proof
+            Historical Merkle proof, path ordered from leaf to root
+        """
+        with self._lock:
+            if tree_size > self.size or leaf_index < 0 or leaf_index >= tree_size:
+                raise ValueError("Invalid tree size or leaf index")
+            
+            path = []
+            start, end = 0, tree_size
+            while end - start > 1:
+                split = start + _largest_power_of_two_below(end - start)
+                if leaf_index < split:
+                    path.append({"hash": self._subtree_root(split, end).hex(), "is_left": False})
+                    end = split
+                else:
+                    path.append({"hash": self._subtree_root(start, split).hex(), "is_left": True})
+                    start = split
+            
+            path.reverse()
+            for level, element in enumerate(path):
+                element["level"] = level
+            
+            return MerkleProof(
+                leaf_hash=self.store.get(0, leaf_index).hex(),
+                leaf_index=leaf_index,
+                proof_path=path,
+                root_hash=self.get_root_at_size(tree_size),
+                tree_size=tree_size
+            )
+    
+    def get_inclusion_proof(self, leaf_index: int) -> MerkleProof:
+        """Get current inclusion proof for a leaf."""
+        with self._lock:
+            return self.get_proof_at_size(leaf_index, self.size)
+    
+    def get_consistency_proof(self, old_size: int, new_size: Optional[int] = None) -> ConsistencyProof:
         """
-        if tree_size > len(self.leaf_hashes) or leaf_index >= tree_size:
-            raise ValueError("Invalid tree size or leaf index")
+        Prove that the tree at ``old_size`` is a prefix of the tree at ``new_size``.
         
-        cache_key = f"{leaf_index}:{tree_size}"
-        if cache_key in self.cached_proofs:
-            return self.cached_proofs[cache_key]
+        Args:
+            old_size: Earlier tree size (at least 1)
+            new_size: Later tree size (defaults to the current size)
+            
+        Returns:
+            RFC 6962 consistency proof
+        """
+        with self._lock:
+            new_size = self.size if new_size is None else new_size
+            if old_size < 1 or old_size > new_size or new_size > self.size:
+                raise ValueError("Invalid tree sizes for consistency proof")
+            
+            path: List[bytes] = []
+            if old_size < new_size:
+                # Iterative form of SUBPROOF(m, D[0:n], true) from RFC 6962 2.1.2
+                start, end, m, complete = 0, new_size, old_size, True
+                while m != end - start:
+                    split = _largest_power_of_two_below(end - start)
+                    if m <= split:
+                        path.append(self._subtree_root(start + split, end))
+                        end = start + split
+                    else:
+                        path.append(self._subtree_root(start, start + split))
+                        start += split
+                        m -= split
+                        complete = False
+                if not complete:
+                    path.append(self._subtree_root(start, end))
+                path.reverse()
+            
+            return ConsistencyProof(
+                old_size=old_size,
+                new_size=new_size,
+                old_root=self.get_root_at_size(old_size),
+                new_root=self.get_root_at_size(new_size),
+                proof_path=[node.hex() for node in path]
+            )
+    
+    @staticmethod
+    def verify_inclusion_proof(proof: MerkleProof, expected_root: Optional[str] = None) -> bool:
+        """
+        Verify an inclusion proof using only the leaf index and tree size.
         
-        # Generate proof for historical tree state
-        historical_leaves = self.leaf_hashes[:tree_size]
-        proof = self.base_tree.generate_proof(historical_leaves, leaf_index)
+        Args:
+            proof: Proof from get_proof_at_size / get_inclusion_proof
+            expected_root: Trusted root (defaults to the proof's root)
+            
+        Returns:
+            True if proof is valid, False otherwise
+        """
+        try:
+            if proof.leaf_index < 0 or proof.leaf_index >= proof.tree_size:
+                return False
+            
+            fn, sn = proof.leaf_index, proof.tree_size - 1
+            node = bytes.fromhex(proof.leaf_hash)
+            for element in proof.proof_path:
+                if sn == 0:
+                    return False
+                sibling = bytes.fromhex(element["hash"])
+                if fn & 1 or fn == sn:
+                    node = _hash_children(sibling, node)
+                    while not fn & 1 and fn != 0:
+                        fn >>= 1
+                        sn >>= 1
+                else:
+                    node = _hash_children(node, sibling)
+                fn >>= 1
+                sn >>= 1
+            
+            return sn == 0 and node.hex() == (expected_root or proof.root_hash)
+        except (ValueError, KeyError, TypeError):
+            return False
+    
+    @staticmethod
+    def verify_consistency_proof(
+        proof: ConsistencyProof,
+        old_root: Optional[str] = None,
+        new_root: Optional[str] = None
+    ) -> bool:
+        """
+        Verify a consistency proof (RFC 9162 section 2.1.4.2).
         
-        # Cache the proof
-        self.cached_proofs[cache_key] = proof
+        Args:
+            proof: Proof from get_consistency_proof
+            old_root: Trusted root at ``old_size`` (defaults to the proof's)
+            new_root: Trusted root at ``new_size`` (defaults to the proof's)
+            
+        Returns:
+            True if the older tree is a prefix of the newer one
+        """
+        old_root = old_root or proof.old_root
+        new_root = new_root or proof.new_root
         
-        return proof
-    
-    def get_inclusion_proof(self, leaf_index: int) -> MerkleProof:
-        """Get current inclusion proof for a leaf."""
-        return self.base_tree.generate_proof(self.leaf_hashes, leaf_index)
+        try:
+            if proof.old_size < 1 or proof.old_size > proof.new_size:
+                return False
+            if proof.old_size == proof.new_size:
+                return not proof.proof_path and old_root == new_root
+            
+            path = [bytes.fromhex(node) for node in proof.proof_path]
+            if proof.old_size & (proof.old_size - 1) == 0:
+                path.insert(0, bytes.fromhex(old_root))
+            if not path:
+                return False
+            
+            fn, sn = proof.old_size - 1, proof.new_size - 1
+            while fn & 1:
+                fn >>= 1
+                sn >>= 1
+            
+            first = second = path[0]
+            for node in path[1:]:
+                if sn == 0:
+                    return False
+                if fn & 1 or fn == sn:
+                    first = _hash_children(node, first)
+                    second = _hash_children(node, second)
+                    while not fn & 1 and fn != 0:
+                        fn >>= 1
+                        sn >>= 1
+                else:
+                    second = _hash_children(second, node)
+                fn >>= 1
+                sn >>= 1
+            
+            return sn == 0 and first.hex() == old_root and second.hex() == new_root
+        except (ValueError, TypeError):
+            return False
     
     def verify_historical_proof(
         self, 
@@ -603,25 +939,72 @@ class IncrementalMerkleTree:
         tree_size: int
     ) -> bool:
         """Verify a historical proof against historical tree state."""
-        if tree_size > len(self.leaf_hashes):
+        if tree_size > self.size or proof.tree_size != tree_size:
             return False
-        
-        historical_leaves = self.leaf_hashes[:tree_size]
-        historical_root = self.base_tree.build_tree(historical_leaves)
-        
-        return self.base_tree.verify_proof(
-            proof.leaf_hash,
-            proof.proof_path,
-            historical_root,
-            proof.leaf_index
-        )
+        return self.verify_inclusion_proof(proof, self.get_root_at_size(tree_size))
+    
+    def flush(self) -> None:
+        """Persist the node store."""
+        self.store.flush()
     
     def get_tree_stats(self) -> Dict[str, Any]:
         """Get tree statistics."""
-        return {
-            "total_leaves": len(self.leaf_hashes),
-            "current_root": self.get_current_root(),
-            "tree_depth": self.base_tree.calculate_tree_depth(len(self.leaf_hashes)),
-            "cached_roots": len(self.cached_roots),
-            "cached_proofs": len(self.cached_proofs)
-        }
\ No newline at end of file
+        with self._lock:
+            return {
+                "total_leaves": self.size,
+                "current_root": self.get_current_root(),
+                "tree_depth": (self.size - 1).bit_length() + 1 if self.size > 1 else 1,
+                "frontier_nodes": sum(1 for node in self._frontier if node is not None),
+                "stored_nodes": sum(
+                    self.store.count(level) for level in range(self.store.level_count())
+                ),
+                "store_bytes": self.store.size_bytes()
+            }
+    
+    # Helper methods
+    
+    def _subtree_root(self, start: int, end: int) -> bytes:
+        """Root of leaves [start, end); O(log n) using stored complete subtrees."""
+        size = end - start
+        if size & (size - 1) == 0 and start % size == 0:
+            level = size.bit_length() - 1
+            return self.store.get(level, start >> level)
+        
+        split = start + _largest_power_of_two_below(size)
+        return _hash_children(self._subtree_root(start, split), self._subtree_root(split, end))
+    
+    def _set_frontier(self, level: int, digest: bytes) -> None:
+        while level >= len(self._frontier):
+            self._frontier.append(None)
+        self._frontier[level] = digest
+    
+    def _repair_store(self) -> None:
+        """Recompute parent nodes missing after an interrupted append."""
+        level = 0
+        while self.store.count(level) > 1 or self.store.count(level + 1) > 0:
+            expected = self.store.count(level) // 2
+            if self.store.count(level + 1) > expected:
+                self.store.truncate(level + 1, expected)
+            for index in range(self.store.count(level + 1), expected):
+                self.store.append(level + 1, _hash_children(
+                    self.store.get(level, 2 * index),
+                    self.store.get(level, 2 * index + 1)
+                ))
+            level += 1
+    
+    @staticmethod
+    def _to_digest(leaf_hash: Union[str, bytes]) -> bytes:
+        digest = bytes.fromhex(leaf_hash) if isinstance(leaf_hash, str) else bytes(leaf_hash)
+        if len(digest) != MerkleNodeStore.DIGEST_SIZE:
+            raise ValueError("Leaf hash must be a 32-byte digest")
+        return digest
+
+
+def _hash_children(left: bytes, right: bytes) -> bytes:
+    """RFC 6962 interior node hash."""
+    return hashlib.sha256(b"\x01" + left + right).digest()
+
+
+def _largest_power_of_two_below(n: int) -> int:
+    """Largest power of two strictly less than ``n`` (n > 1)."""
+    return 1 << ((n - 1).bit_length() - 1)
@@ -0,0 +1,135 @@
+"""
+In-process sliding-window rate limiting and expiring key sets.
+
+SlidingWindowRateLimiter keeps, per key, a ring buffer of the timestamps
+of its last ``limit`` allowed events, so each check is O(1) and memory is
+bounded by the limit. TTLSet remembers keys for a fixed time and evicts
+them in insertion order.
+"""
+
+import time
+from collections import OrderedDict, deque
+from typing import Callable, Deque, Dict, Hashable
+
+
+class SlidingWindowRateLimiter:
+    """
+    Allows at most ``limit`` events per key within any window of
+    ``window_seconds``.
+
+    The limit is given per call, so keys with different limits (e.g. per
+    user preferences) share one limiter; changing a key's limit keeps its
+    most recent events.
+    """
+
+    def __init__(self, window_seconds: float = 3600.0, clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize the limiter.
+
+        Args:
+            window_seconds: Length of the sliding window
+            clock: Monotonic time source in seconds
+        """
+        self.window_seconds = window_seconds
+        self.clock = clock
+        self._events: Dict[Hashable, Deque[float]] = {}
+
+    def allow(self, key: Hashable, limit: int) -> bool:
+        """
+        Record an event for a key if it is within the limit.
+
+        Args:
+            key: Rate-limited entity (e.g. user ID)
+            limit: Maximum events per window for this key
+
+        Returns:
+            True if the event is allowed (and recorded), False if limited
+        """
+        if limit <= 0:
+            return False
+
+        now = self.clock()
+        events = self._events.get(key)
+        if events is None or events.maxlen != limit:
+            events = self._events[key] = deque(events or (), maxlen=limit)
+
+        # Buffer full and its oldest event still inside the window
+        if len(events) == limit and now - events[0] < self.window_seconds:
+            return False
+
+        events.append(now)
+        return True
+
+    def count(self, key: Hashable) -> int:
+        """Number of events of a key inside the current window."""
+        cutoff = self.clock() - self.window_seconds
+        return sum(1 for timestamp in self._events.get(key, ()) if timestamp > cutoff)
+
+    def purge_expired(self) -> int:
+        """
+        Forget keys with no events inside the window.
+
+        Returns:
+            Number of keys removed
+        """
+        cutoff = self.clock() - self.window_seconds
+        expired = [key for key, events in self._events.items() if not events or events[-1] <= cutoff]
+        for key in expired:
+            del self._events[key]
+        return len(expired)
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+
+class TTLSet:
+    """
+    Set whose members expire ``ttl_seconds`` after they were (re-)added.
+
+    Expired members are evicted from the oldest end on every add, so the
+    set stays bounded by the number of members added per TTL.
+    """
+
+    def __init__(self, ttl_seconds: float, clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize the set.
+
+        Args:
+            ttl_seconds: Time members are kept
+            clock: Monotonic time source in seconds
+        """
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self._expires_at: "OrderedDict[Hashable, float]" = OrderedDict()
+
+    def add(self, key: Hashable) -> None:
+        """Add a member, restarting its TTL if already present."""
+        now = self.clock()
+        self._expires_at.pop(key, None)
+        self._expires_at[key] = now + self.ttl_seconds
+        self._evict(now)
+
+    def discard(self, key: Hashable) -> None:
+        """Remove a member if present."""
+        self._expires_at.pop(key, None)
+
+    def __contains__(self, key: Hashable) -> bool:
+        expires_at = self._expires_at.get(key)
+        if expires_at is None:
+            return False
+        if expires_at <= self.clock():
+            del self._expires_at[key]
+            return False
+        return True
+
+    def __len__(self) -> int:
+        self._evict(self.clock())
+        return len(self._expires_at)
+
+    def _evict(self, now: float) -> None:
+        # All members share one TTL, so insertion order is expiry order
+        while self._expires_at:
+            key, expires_at = next(iter(self._expires_at.items()))
+            if expires_at > now:
+                break
+            del self._expires_at[key]
@@ -0,0 +1,496 @@
+"""
+In-memory approximate nearest-neighbour index for product embeddings.
+
+Keeps unit-normalised float32 embeddings together with the filterable product
+attributes (category, supplier, price, status) so similarity search can apply
+filters and score candidates without re-parsing JSON vectors in TiDB.
+"""
+
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+@dataclass
+class VectorSearchFilters:
+    """Attribute filters applied before candidates are scored."""
+    category: Optional[str] = None
+    supplier_id: Optional[str] = None
+    price_min: Optional[float] = None
+    price_max: Optional[float] = None
+    status: Optional[str] = None
+
+
+@dataclass
+class VectorIndexEntry:
+    """Single product embedding with its filterable attributes."""
+    product_id: str
+    embedding: Sequence[float]
+    category: Optional[str] = None
+    supplier_id: Optional[str] = None
+    price: Optional[float] = None
+    status: Optional[str] = None
+
+
+class VectorIndex(ABC):
+    """
+    Base class for in-memory vector indexes.
+
+    Scores are reported on the same scale as the TiDB query path,
+    ``1 - cosine_distance / 2``, so similarity thresholds are interchangeable.
+    """
+
+    def __init__(self, dimensions: int, initial_capacity: int = 1024):
+        """
+        Initialize an empty index.
+
+        Args:
+            dimensions: Embedding dimensionality
+            initial_capacity: Number of rows to preallocate
+        """
+        self.dimensions = dimensions
+        self.is_warm = False
+        self._lock = threading.RLock()
+        self._size = 0
+        self._positions: Dict[str, int] = {}
+        self._allocate(max(initial_capacity, 1))
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def add(self, entries: Sequence[VectorIndexEntry]) -> int:
+        """
+        Insert or replace entries in the index.
+
+        Args:
+            entries: Entries to upsert
+
+        Returns:
+            Number of entries written (entries with invalid embeddings are skipped)
+        """
+        written = 0
+        with self._lock:
+            for entry in entries:
+                vector = self._prepare_vector(entry.embedding)
+                if vector is None:
+                    continue
+
+                position = self._positions.get(entry.product_id)
+                if position is None:
+                    if self._size == self._capacity:
+                        self._allocate(self._capacity * 2)
+                    position = self._size
+                    self._size += 1
+                    self._ids[position] = entry.product_id
+                    self._positions[entry.product_id] = position
+
+                self._vectors[position] = vector
+                self._categories[position] = entry.category
+                self._suppliers[position] = entry.supplier_id
+                self._prices[position] = np.nan if entry.price is None else float(entry.price)
+                self._statuses[position] = entry.status
+                self._alive[position] = True
+                self._on_vector_written(position)
+                written += 1
+        return written
+
+    def remove(self, product_id: str) -> bool:
+        """
+        Remove a product from the index.
+
+        Args:
+            product_id: Product identifier
+
+        Returns:
+            True if the product was indexed
+        """
+        with self._lock:
+            position = self._positions.pop(product_id, None)
+            if position is None:
+                return False
+            self._alive[position] = False
+            self._ids[position] = None
+
+            # Reclaim tombstoned rows once they make up a quarter of the index
+            if self._size - len(self._positions) > max(1024, self._size // 4):
+                self._compact()
+            return True
+
+    def update_attributes(self, product_id: str, **attributes: Any) -> bool:
+        """
+        Update the filterable attributes of an indexed product in place.
+
+        Args:
+            product_id: Product identifier
+            **attributes: Any of category, supplier_id, price and status
+
+        Returns:
+            True if the product was indexed
+        """
+        with self._lock:
+            position = self._positions.get(product_id)
+            if position is None:
+                return False
+            if "category" in attributes:
+                self._categories[position] = attributes["category"]
+            if "supplier_id" in attributes:
+                self._suppliers[position] = attributes["supplier_id"]
+            if "price" in attributes:
+                price = attributes["price"]
+                self._prices[position] = np.nan if price is None else float(price)
+            if "status" in attributes:
+                self._statuses[position] = attributes["status"]
+            return True
+
+    def search(
+        self,
+        query: Sequence[float],
+        limit: int = 10,
+        filters: Optional[VectorSearchFilters] = None,
+        similarity_threshold: float = 0.0
+    ) -> List[Tuple[str, float]]:
+        """
+        Find the most similar indexed products.
+
+        Args:
+            query: Query embedding
+            limit: Maximum number of results
+            filters: Attribute filters applied before scoring
+            similarity_threshold: Minimum similarity score (0.0-1.0)
+
+        Returns:
+            List of (product_id, similarity_score) ordered by similarity
+        """
+        query_vector = self._prepare_vector(query)
+        if query_vector is None or limit <= 0:
+            return []
+
+        with self._lock:
+            mask = self._filter_mask(filters)
+            candidates = self._candidate_positions(query_vector, mask, limit)
+            if candidates.size == 0:
+                return []
+
+            cosine = self._vectors[candidates] @ query_vector
+            similarities = 1.0 - (1.0 - cosine) / 2.0
+
+            keep = similarities > similarity_threshold
+            candidates = candidates[keep]
+            similarities = similarities[keep]
+
+            if candidates.size > limit:
+                top = np.argpartition(-similarities, limit - 1)[:limit]
+                candidates = candidates[top]
+                similarities = similarities[top]
+
+            order = np.argsort(-similarities, kind="stable")
+            return [
+                (self._ids[candidates[i]], float(similarities[i]))
+                for i in order
+            ]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get index statistics."""
+        with self._lock:
+            return {
+                "index_type": type(self).__name__,
+                "dimensions": self.dimensions,
+                "is_warm": self.is_warm,
+                "indexed_vectors": len(self._positions),
+                "allocated_rows": self._capacity,
+                "tombstoned_rows": self._size - len(self._positions),
+                "memory_bytes": int(self._vectors.nbytes)
+            }
+
+    @abstractmethod
+    def _candidate_positions(
+        self,
+        query_vector: np.ndarray,
+        mask: np.ndarray,
+        limit: int
+    ) -> np.ndarray:
+        """Return the row positions to score for a query."""
+
+    def _on_vector_written(self, position: int) -> None:
+        """Hook for subclasses that maintain per-row structures."""
+
+    def _on_compacted(self, kept: np.ndarray) -> None:
+        """Hook for subclasses to remap per-row structures after compaction."""
+
+    def _filter_mask(self, filters: Optional[VectorSearchFilters]) -> np.ndarray:
+        """Build a boolean mask of live rows matching the filters."""
+        mask = self._alive[:self._size].copy()
+        if filters is None:
+            return mask
+
+        if filters.category is not None:
+            mask &= self._categories[:self._size] == filters.category
+        if filters.supplier_id is not None:
+            mask &= self._suppliers[:self._size] == filters.supplier_id
+        if filters.status is not None:
+            mask &= self._statuses[:self._size] == filters.status
+
+        prices = self._prices[:self._size]
+        if filters.price_min is not None:
+            mask &= prices >= float(filters.price_min)
+        if filters.price_max is not None:
+            mask &= prices <= float(filters.price_max)
+
+        return mask
+
+    def _prepare_vector(self, embedding: Sequence[float]) -> Optional[np.ndarray]:
+        """Convert an embedding to a unit-length float32 vector."""
+        if embedding is None:
+            return None
+        vector = np.asarray(embedding, dtype=np.float32).reshape(-1)
+        if vector.shape[0] != self.dimensions:
+            return None
+        norm = np.linalg.norm(vector)
+        if norm == 0 or not np.isfinite(norm):
+            return None
+        return vector / norm
+
+    def _allocate(self, capacity: int) -> None:
+        """Grow (or create) the row storage to the given capacity."""
+        old_size = self._size
+
+        def grow(old: Optional[np.ndarray], shape: Tuple[int, ...], dtype: Any, fill: Any) -> np.ndarray:
+            new = np.full(shape, fill, dtype=dtype)
+            if old is not None and old_size:
+                new[:old_size] = old[:old_size]
+            return new
+
+        self._vectors = grow(
+            getattr(self, "_vectors", None), (capacity, self.dimensions), np.float32, 0.0
+        )
+        self._ids = grow(getattr(self, "_ids", None), (capacity,), object, None)
+        self._categories = grow(getattr(self, "_categories", None), (capacity,), object, None)
+        self._suppliers = grow(getattr(self, "_suppliers", None), (capacity,), object, None)
+        self._statuses = grow(getattr(self, "_statuses", None), (capacity,), object, None)
+        self._prices = grow(getattr(self, "_prices", None), (capacity,), np.float64, np.nan)
+        self._alive = grow(getattr(self, "_alive", None), (capacity,), bool, False)
+        self._capacity = capacity
+
+    def _compact(self) -> None:
+        """Drop tombstoned rows and rebuild the id -> position map."""
+        kept = np.flatnonzero(self._alive[:self._size])
+        count = kept.size
+
+        for name, fill in (
+            ("_vectors", 0.0),
+            ("_ids", None),
+            ("_categories", None),
+            ("_suppliers", None),
+            ("_statuses", None),
+            ("_prices", np.nan),
+            ("_alive", False)
+        ):
+            array = getattr(self, name)
+            array[:count] = array[kept]
+            array[count:self._size] = fill
+
+        self._size = count
+        self._positions = {self._ids[i]: i for i in range(count)}
+        self._on_compacted(kept)
+
+
+class FlatVectorIndex(VectorIndex):
+    """Exact index that scores every row passing the filters."""
+
+    def _candidate_positions(
+        self,
+        query_vector: np.ndarray,
+        mask: np.ndarray,
+        limit: int
+    ) -> np.ndarray:
+        return np.flatnonzero(mask)
+
+
+class IVFVectorIndex(VectorIndex):
+    """
+    Inverted-file index over spherical k-means clusters.
+
+    Rows are bucketed by their nearest centroid and queries only score rows in
+    the ``nprobe`` closest buckets. Until enough vectors are present to train
+    the quantizer (or when filters leave too few candidates in the probed
+    buckets) the index falls back to an exact scan of the filtered rows.
+    """
+
+    def __init__(
+        self,
+        dimensions: int,
+        initial_capacity: int = 1024,
+        nlist: Optional[int] = None,
+        nprobe: int = 8,
+        min_train_size: int = 4096,
+        train_sample_size: int = 65536,
+        train_iterations: int = 10,
+        seed: int = 0
+    ):
+        """
+        Initialize an IVF index.
+
+        Args:
+            dimensions: Embedding dimensionality
+            initial_capacity: Number of rows to preallocate
+            nlist: Number of clusters (defaults to ~sqrt(n) at training time)
+            nprobe: Number of clusters scored per query
+            min_train_size: Minimum number of vectors before clustering
+            train_sample_size: Maximum number of vectors used for k-means
+            train_iterations: Number of k-means iterations
+            seed: Random seed for sampling and centroid initialisation
+        """
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.min_train_size = min_train_size
+        self.train_sample_size = train_sample_size
+        self.train_iterations = train_iterations
+        self._rng = np.random.default_rng(seed)
+        self._centroids: Optional[np.ndarray] = None
+        self._trained_size = 0
+        super().__init__(dimensions, initial_capacity)
+
+    @property
+    def is_trained(self) -> bool:
+        return self._centroids is not None
+
+    def train(self) -> None:
+        """Cluster the current vectors and assign every row to a bucket."""
+        with self._lock:
+            live = np.flatnonzero(self._alive[:self._size])
+            if live.size < self.min_train_size:
+                return
+
+            nlist = self.nlist or int(np.clip(np.sqrt(live.size), 16, 4096))
+            nlist = min(nlist, live.size)
+
+            sample_size = min(live.size, max(self.train_sample_size, nlist * 8))
+            sample = self._vectors[self._rng.choice(live, sample_size, replace=False)]
+            centroids = sample[self._rng.choice(sample_size, nlist, replace=False)].copy()
+
+            for _ in range(self.train_iterations):
+                labels = np.argmax(sample @ centroids.T, axis=1)
+                sums = np.zeros_like(centroids)
+                np.add.at(sums, labels, sample)
+                norms = np.linalg.norm(sums, axis=1, keepdims=True)
+                # Empty clusters keep their previous centroid
+                populated = norms[:, 0] > 0
+                centroids[populated] = sums[populated] / norms[populated]
+
+            self._centroids = centroids
+            self._assignments = np.full(self._capacity, -1, dtype=np.int32)
+            for start in range(0, self._size, 65536):
+                stop = min(start + 65536, self._size)
+                self._assignments[start:stop] = np.argmax(
+                    self._vectors[start:stop] @ centroids.T, axis=1
+                )
+            self._trained_size = live.size
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = super().get_stats()
+        stats.update({
+            "is_trained": self.is_trained,
+            "nlist": 0 if self._centroids is None else int(self._centroids.shape[0]),
+            "nprobe": self.nprobe
+        })
+        return stats
+
+    def _candidate_positions(
+        self,
+        query_vector: np.ndarray,
+        mask: np.ndarray,
+        limit: int
+    ) -> np.ndarray:
+        filtered = np.flatnonzero(mask)
+        if self._centroids is None or filtered.size <= limit * 32:
+            return filtered
+
+        nprobe = min(self.nprobe, self._centroids.shape[0])
+        probe = np.argpartition(-(self._centroids @ query_vector), nprobe - 1)[:nprobe]
+        in_probe = np.isin(self._assignments[filtered], probe)
+        candidates = filtered[in_probe]
+
+        # Selective filters can leave the probed buckets nearly empty
+        if candidates.size < limit:
+            return filtered
+        return candidates
+
+    def _allocate(self, capacity: int) -> None:
+        old = getattr(self, "_assignments", None)
+        old_size = self._size
+        super()._allocate(capacity)
+        self._assignments = np.full(capacity, -1, dtype=np.int32)
+        if old is not None and old_size:
+            self._assignments[:old_size] = old[:old_size]
+
+    def _on_vector_written(self, position: int) -> None:
+        if self._centroids is None:
+            if len(self._positions) >= self.min_train_size:
+                self.train()
+            return
+
+        self._assignments[position] = int(np.argmax(self._centroids @ self._vectors[position]))
+
+        # Re-cluster once the index has doubled since the last training run
+        if len(self._positions) >= self._trained_size * 2:
+            self.train()
+
+    def _on_compacted(self, kept: np.ndarray) -> None:
+        count = kept.size
+        self._assignments[:count] = self._assignments[kept]
+        self._assignments[count:] = -1
+
+
+VectorIndexFactory = Callable[[int], VectorIndex]
+
+_index_factory: VectorIndexFactory = IVFVectorIndex
+_indexes: Dict[str, VectorIndex] = {}
+_registry_lock = threading.Lock()
+
+
+def get_vector_index(name: str, dimensions: int) -> VectorIndex:
+    """
+    Get the process-wide index for an embedding column, creating it if needed.
+
+    Args:
+        name: Index name (usually the embedding column)
+        dimensions: Embedding dimensionality
+
+    Returns:
+        Shared VectorIndex instance
+    """
+    with _registry_lock:
+        index = _indexes.get(name)
+        if index is None:
+            index = _index_factory(dimensions)
+            _indexes[name] = index
+        return index
+
+
+def set_vector_index(name: str, index: VectorIndex) -> None:
+    """Replace the shared index for an embedding column (e.g. after a rebuild)."""
+    with _registry_lock:
+        _indexes[name] = index
+
+
+def create_vector_index(dimensions: int) -> VectorIndex:
+    """Create a new, empty index using the configured implementation."""
+    return _index_factory(dimensions)
+
+
+def set_vector_index_factory(factory: VectorIndexFactory) -> None:
+    """
+    Configure the index implementation used for new indexes.
+
+    Existing indexes are discarded so they are rebuilt with the new type.
+
+    Args:
+        factory: Callable taking the embedding dimensionality
+    """
+    global _index_factory
+    with _registry_lock:
+        _index_factory = factory
+        _indexes.clear()